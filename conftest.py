@@ -14,14 +14,24 @@ from selenium import webdriver  # Librería principal para controlar el navegado
 from selenium.webdriver.chrome.options import Options as ChromeOptions  # Para configurar opciones de Chrome
 from selenium.webdriver.edge.options import Options as EdgeOptions  # Para configurar opciones de Edge
 from selenium.webdriver.firefox.options import Options as FirefoxOptions  # Para configurar opciones de Firefox
-from datetime import datetime  # Para trabajar con fechas y horas
-from utils.database import TestDatabase  # Clase personalizada de base de datos
+from datetime import datetime, timezone  # Para trabajar con fechas y horas
+from urllib.parse import urlencode, quote  # Para armar la cookie de consentimiento de OneTrust
+from utils.database import TestDatabase, orphan_spool_paths  # Clase personalizada de base de datos
+from utils.browser_pool import BrowserPool  # Pool de navegadores reutilizables
+from utils.network_capture import NetworkCapture, BodyCapturePolicy  # Captura de red vía CDP
+from utils.network_metrics import summarize_pages, site_of  # Métricas de red por página
+from utils.network_stub import NetworkStub, StubStore, STUB_MODES  # Interceptación CDP Fetch (replay/record)
+from utils.wait_engine import get_wait_stats  # Estadísticas de esperas por condición de los page objects
+from utils.locator_registry import get_locator_stats  # Telemetría de resolución de locators de los page objects
 import allure  # Para adjuntar evidencias a los reportes
 import cv2  # OpenCV para grabación de video
 import numpy as np  # Para manejo de arrays en video
 from PIL import ImageGrab  # Para capturar screenshots en Windows
 import os  # Para operaciones con archivos
 import threading  # Para captura de frames en background
+import queue  # Cola acotada entre captura y encoder de video
+import base64  # Frames JPEG del screencast CDP vienen en base64
+import json  # Para adjuntar métricas de red a Allure
 import time  # Para delays en captura de frames
 import re  # Para sanitizar nombres de archivos
 import traceback  # Para logging detallado de errores
@@ -60,9 +70,35 @@ class VideoRecorder:
     Clase para grabar video de las ejecuciones de tests.
 
     Captura frame por frame la ventana del navegador y genera un archivo MP4.
+
+    Pipeline productor/consumidor (memoria constante sin importar la duración del test):
+    - Thread de captura: toma screenshots PNG y los encola (cola acotada)
+    - Thread encoder: decodifica cada PNG y lo escribe directo en el cv2.VideoWriter
+
+    Si el encoder se atrasa:
+    - Cola llena: el frame se descarta (nunca se bloquea la captura)
+    - Cola a más de la mitad: se decodifica a media resolución (más rápido) y se reescala
+
+    Deduplicación y timing:
+    - Frames casi idénticos al anterior se omiten sin decodificarse completos
+    - Cada frame guardado se repite en el MP4 según el tiempo real que duró en pantalla,
+      así el video conserva la duración del test con muchos menos frames distintos
+
+    Backends de captura:
+    - polling: driver.get_screenshot_as_png() cada 1/fps (compite con los comandos del test
+      en la misma sesión WebDriver). Único disponible en Firefox.
+    - screencast: CDP Page.startScreencast (Chrome/Edge). El navegador empuja frames JPEG
+      por un websocket CDP aparte; la sesión WebDriver del test no se bloquea.
+      Para comparar, se mide una vez por proceso el costo de get_screenshot_as_png()
+      (SCREENSHOT_SAMPLES capturas) y el reporte de overhead muestra ambos backends.
     """
 
-    def __init__(self, driver, filename="test_video.mp4", fps=10):
+    SCREENSHOT_SAMPLES = 3  # Screenshots de muestra para comparar screencast vs polling
+    _screenshot_sample = None  # Segundos promedio por screenshot (medido una vez por proceso)
+
+    def __init__(self, driver, filename="test_video.mp4", fps=10, max_queue=8, backend="polling",
+                 quality=70, max_width=1920, max_height=1080, every_nth_frame=1,
+                 dedup=True, dedup_pixel_threshold=12):
         """
         Inicializa el grabador de video.
 
@@ -70,77 +106,379 @@ class VideoRecorder:
             driver: WebDriver de Selenium
             filename: Nombre del archivo de salida
             fps: Frames por segundo (menor = menos pesado)
+            max_queue: Frames PNG máximos pendientes de codificar
+            backend: "polling" o "screencast" (solo Chrome/Edge)
+            quality: Calidad JPEG del screencast (0-100)
+            max_width: Ancho máximo de los frames del screencast
+            max_height: Alto máximo de los frames del screencast
+            every_nth_frame: El navegador envía 1 de cada N frames pintados
+            dedup: Si True omite frames casi idénticos al anterior (ej: durante time.sleep)
+            dedup_pixel_threshold: Diferencia mínima (0-255) para considerar que un pixel cambió
         """
         self.driver = driver
         self.filename = filename
         self.fps = fps
-        self.frames = []
+        self.max_queue = max_queue
+        self.backend = backend
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.every_nth_frame = every_nth_frame
+        self.dedup = dedup
+        self.dedup_pixel_threshold = dedup_pixel_threshold
+        # Métricas de overhead: tiempo que la captura ocupa la sesión WebDriver del test
+        self.session_block_time = 0.0  # Comandos WebDriver del grabador (polling: get_screenshot_as_png())
+        self.session_block_calls = 0
+        self.cdp_ack_time = 0.0  # screencast: suma de screencastFrameAck (websocket CDP propio)
+        self.capture_path_time = 0.0  # screencast: ack + decodificación base64 de cada frame
+        self.recording_time = 0.0  # Duración de la grabación (start -> stop)
+        self.frames_received = 0  # screencast: frames empujados por el navegador
         self.is_recording = False
+        self.frame_queue = None
+        self.video_writer = None
+        self.frame_size = None  # (width, height) fijado por el primer frame
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_downscaled = 0
+        self.frames_stored = 0
+        self.frames_skipped = 0
 
     def start(self):
-        """Inicia la grabación en un thread separado."""
+        """Inicia la grabación (thread de captura + thread encoder)."""
         self.is_recording = True
-        self.frames = []
+        self.frame_queue = queue.Queue(maxsize=self.max_queue)
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_downscaled = 0
+        self.frames_stored = 0
+        self.frames_skipped = 0
+        # Estado del encoder (dedup + slots de tiempo)
+        self._last_bytes = None
+        self._last_thumb = None
+        self._last_frame = None
+        self._last_frame_writes = 0
+        self._start_time = None
+        self._stop_time = None
+        self._slots_written = 0
+        self._recording_start = time.perf_counter()
+        # Iniciar thread encoder (consumidor) antes que el de captura (productor)
+        self.encoder_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.encoder_thread.start()
         # Iniciar thread que captura frames automáticamente
-        self.recording_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        if self.backend == "screencast":
+            # Handle de la ventana actual = target id de CDP (se lee antes de entrar al thread)
+            command_start = time.perf_counter()
+            self.target_id = self.driver.current_window_handle
+            self.session_block_time += time.perf_counter() - command_start
+            self.session_block_calls += 1
+            target = self._screencast_thread
+        else:
+            target = self._capture_loop
+        self.recording_thread = threading.Thread(target=target, daemon=True)
         self.recording_thread.start()
 
     def _capture_loop(self):
-        """Loop que captura frames continuamente mientras graba."""
-        frame_count = 0
+        """Loop que captura frames continuamente mientras graba (productor)."""
         while self.is_recording:
             try:
-                # Capturar screenshot como PNG bytes
+                # Capturar screenshot como PNG bytes (sin decodificar: eso lo hace el encoder)
+                timestamp = time.time()
+                capture_start = time.perf_counter()
                 screenshot = self.driver.get_screenshot_as_png()
-                # Convertir a numpy array para OpenCV
-                import io
-                from PIL import Image
-                img = Image.open(io.BytesIO(screenshot))
-                frame = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                self.frames.append(frame)
-                frame_count += 1
+                self.session_block_time += time.perf_counter() - capture_start
+                self.session_block_calls += 1
+                self.frames_captured += 1
+                try:
+                    self.frame_queue.put_nowait((timestamp, screenshot))
+                except queue.Full:
+                    # Encoder atrasado: descartar en lugar de bloquear
+                    self.frames_dropped += 1
             except Exception as e:
                 # Ignorar errores silenciosamente (ej: ventana cerrada)
                 pass
             # Esperar antes del siguiente frame (con FPS=2, sleep=0.5 segundos)
             time.sleep(1.0 / self.fps)
 
+    def _sample_screenshot_cost(self):
+        """
+        Mide el costo real de get_screenshot_as_png() (una vez por proceso).
+
+        El tiempo de la muestra cuenta como bloqueo de la sesión WebDriver: es
+        un costo que el screencast paga para poder compararse con polling.
+        """
+        if VideoRecorder._screenshot_sample is not None:
+            return
+        elapsed = []
+        for _ in range(self.SCREENSHOT_SAMPLES):
+            capture_start = time.perf_counter()
+            try:
+                self.driver.get_screenshot_as_png()
+            except Exception:
+                return  # Ventana cerrada u otro error: sin comparación
+            elapsed.append(time.perf_counter() - capture_start)
+        self.session_block_time += sum(elapsed)
+        self.session_block_calls += len(elapsed)
+        VideoRecorder._screenshot_sample = sum(elapsed) / len(elapsed)
+
+    def _screencast_thread(self):
+        """Thread del backend screencast: corre la sesión CDP async (trio)."""
+        self._sample_screenshot_cost()
+        try:
+            import trio
+            trio.run(self._screencast_session)
+        except Exception as e:
+            # Sin conexión CDP (grid remoto, versión de devtools, etc.): volver a polling
+            print(f"[VIDEO] Screencast unavailable ({str(e)[:100]}), falling back to polling")
+            self.backend = "polling"
+            self._capture_loop()
+
+    async def _screencast_session(self):
+        """
+        Recibe frames de Page.startScreencast y los encola para el encoder.
+
+        - Cada frame se confirma (screencastFrameAck); sin ack el navegador deja de enviar
+        - Se limita a `fps` frames por segundo usando el timestamp del frame
+        - La sesión CDP se abre sobre el target de la ventana actual del test
+        """
+        import trio
+
+        async with self.driver.bidi_connection() as connection:
+            cdp, devtools = connection.cdp, connection.devtools
+            conn = cdp.get_connection_context("screencast")
+
+            # Elegir el target de la ventana del test (bidi_connection usa el primero de la lista)
+            targets = await conn.execute(devtools.target.get_targets())
+            page_ids = [t.target_id for t in targets if t.type_ == "page"]
+            target_id = self.target_id if self.target_id in page_ids else page_ids[0]
+
+            async with conn.open_session(target_id) as session:
+                await session.execute(devtools.page.enable())
+                frames = session.listen(devtools.page.ScreencastFrame, buffer_size=self.max_queue)
+                await session.execute(devtools.page.start_screencast(
+                    format_="jpeg",
+                    quality=self.quality,
+                    max_width=self.max_width,
+                    max_height=self.max_height,
+                    every_nth_frame=self.every_nth_frame
+                ))
+                print(f"[VIDEO] Screencast started on target {target_id[:12]}")
+
+                interval = 1.0 / self.fps
+                last_accepted = [None]
+
+                async def receive_frames():
+                    async for frame in frames:
+                        self.frames_received += 1
+                        ack_start = time.perf_counter()
+                        await session.execute(devtools.page.screencast_frame_ack(frame.session_id))
+                        ack_time = time.perf_counter() - ack_start
+                        self.cdp_ack_time += ack_time
+                        self.capture_path_time += ack_time
+
+                        # Limitar a `fps`: el navegador envía un frame por cada repintado
+                        timestamp = frame.metadata.timestamp  # Segundos desde epoch (float)
+                        timestamp = float(timestamp) if timestamp is not None else time.time()
+                        if last_accepted[0] is not None and timestamp - last_accepted[0] < interval:
+                            continue
+                        last_accepted[0] = timestamp
+
+                        self.frames_captured += 1
+                        decode_start = time.perf_counter()
+                        data = base64.b64decode(frame.data)
+                        self.capture_path_time += time.perf_counter() - decode_start
+                        try:
+                            self.frame_queue.put_nowait((timestamp, data))
+                        except queue.Full:
+                            self.frames_dropped += 1
+
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(receive_frames)
+                    while self.is_recording:
+                        await trio.sleep(0.1)
+                    try:
+                        await session.execute(devtools.page.stop_screencast())
+                    except Exception:
+                        pass  # La ventana pudo cerrarse al final del test
+                    nursery.cancel_scope.cancel()
+
+    def get_overhead_summary(self):
+        """
+        Resume el costo de la grabación sobre la sesión WebDriver del test.
+
+        Returns:
+            str: Backend, frames y tiempo que la captura bloqueó la sesión
+
+        Todos los tiempos son medidos. Con screencast se agrega la comparación con
+        polling: costo medido por screenshot x capturas que polling haría en la
+        misma duración (una cada 1/fps + lo que tarda el screenshot).
+        """
+        stored_pct = self.frames_stored / self.frames_captured * 100 if self.frames_captured else 0.0
+        lines = [f"Backend: {self.backend}",
+                 f"Frames stored vs captured: {self.frames_stored}/{self.frames_captured} ({stored_pct:.0f}%) | "
+                 f"duplicates skipped: {self.frames_skipped} | dropped: {self.frames_dropped}",
+                 f"Frames written to MP4 (with timing repeats): {self.frames_written}"]
+        avg = self.session_block_time / self.session_block_calls * 1000 if self.session_block_calls else 0.0
+        lines.append(f"Recording time: {self.recording_time:.2f}s")
+        lines.append(f"WebDriver session blocked: {self.session_block_time:.2f}s "
+                     f"({self.session_block_calls} WebDriver calls, avg {avg:.1f}ms each)")
+        if self.backend == "screencast":
+            avg_ack = self.cdp_ack_time / self.frames_received * 1000 if self.frames_received else 0.0
+            avg_path = self.capture_path_time / self.frames_received * 1000 if self.frames_received else 0.0
+            lines.append(f"Frames pushed by browser: {self.frames_received}")
+            lines.append(f"CDP frame ack: total {self.cdp_ack_time:.2f}s, avg {avg_ack:.1f}ms")
+            lines.append(f"Capture path (ack + decode, separate CDP websocket): total {self.capture_path_time:.2f}s, "
+                         f"avg {avg_path:.1f}ms per frame")
+            sample = VideoRecorder._screenshot_sample
+            if sample is not None:
+                polling_shots = int(self.recording_time / (1.0 / self.fps + sample))
+                lines.append(f"Polling backend for the same recording: ~{polling_shots * sample:.2f}s session blocked "
+                             f"({polling_shots} screenshots x measured {sample * 1000:.1f}ms, "
+                             f"{self.SCREENSHOT_SAMPLES}-shot sample) vs screencast "
+                             f"{self.session_block_time:.2f}s")
+        return "\n".join(lines)
+
+    def _encode_loop(self):
+        """Loop que decodifica PNGs y los escribe en el video (consumidor)."""
+        while True:
+            item = self.frame_queue.get()
+            if item is None:  # Señal de fin enviada por stop()
+                break
+            timestamp, screenshot = item
+            try:
+                # Deduplicación: frames casi idénticos no se decodifican completos
+                if self.dedup and self._is_duplicate(screenshot):
+                    self.frames_skipped += 1
+                    continue
+
+                # Con backlog, decodificar a media resolución (IMREAD_REDUCED_COLOR_2 es ~4x más barato)
+                backlog = self.frame_queue.qsize() > self.max_queue // 2
+                flags = cv2.IMREAD_REDUCED_COLOR_2 if backlog else cv2.IMREAD_COLOR
+                frame = cv2.imdecode(np.frombuffer(screenshot, dtype=np.uint8), flags)
+                if frame is None:
+                    continue
+                if backlog:
+                    self.frames_downscaled += 1
+                self._store_frame(frame, timestamp)
+            except Exception as e:
+                print(f"[VIDEO ERROR] Error encoding frame: {e}")
+
+        # Flush: el último frame cubre el tiempo hasta stop()
+        try:
+            self._fill_until(self._stop_time, flush=True)
+        except Exception as e:
+            print(f"[VIDEO ERROR] Error flushing last frame: {e}")
+
+    def _is_duplicate(self, screenshot):
+        """
+        Indica si el frame es casi idéntico al último frame guardado.
+
+        Comparación barata en 2 niveles:
+        1. Bytes idénticos (página sin cambios produce el mismo PNG/JPEG)
+        2. Miniatura en grises a 1/8 de resolución (IMREAD_REDUCED_GRAYSCALE_8):
+           duplicado si ningún pixel cambia más de dedup_pixel_threshold
+
+        Returns:
+            bool: True si el frame puede omitirse
+        """
+        if screenshot == self._last_bytes:
+            return True
+
+        thumb = cv2.imdecode(np.frombuffer(screenshot, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if thumb is None:
+            return False
+
+        last_thumb = self._last_thumb
+        if last_thumb is not None and last_thumb.shape == thumb.shape:
+            changed = np.count_nonzero(cv2.absdiff(thumb, last_thumb) > self.dedup_pixel_threshold)
+            if changed == 0:
+                return True
+
+        self._last_thumb = thumb
+        self._last_bytes = screenshot
+        return False
+
+    def _store_frame(self, frame, timestamp):
+        """
+        Guarda un frame distinto y completa el tiempo del frame anterior.
+
+        El MP4 (mp4v) es de fps constante: el tiempo omitido por deduplicación se
+        representa repitiendo el frame anterior en los "slots" de 1/fps que cubrió.
+        """
+        if self.video_writer is None and not self._open_writer(frame):
+            return
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        # El frame anterior ocupa los slots hasta el timestamp del nuevo
+        self._fill_until(timestamp)
+
+        # VideoWriter exige tamaño fijo: reescalar frames reducidos o de otra ventana
+        if (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        self._last_frame = frame
+        self._last_frame_writes = 0
+        self.frames_stored += 1
+
+    def _fill_until(self, timestamp, flush=False):
+        """Escribe el último frame guardado hasta el slot correspondiente a timestamp."""
+        if self._last_frame is None or self._start_time is None:
+            return
+        target_slots = int((timestamp - self._start_time) * self.fps)
+        if flush and self._last_frame_writes == 0:
+            target_slots = max(target_slots, self._slots_written + 1)  # Al menos una vez
+        while self._slots_written < target_slots:
+            self.video_writer.write(self._last_frame)
+            self._slots_written += 1
+            self._last_frame_writes += 1
+            self.frames_written += 1
+
+    def _open_writer(self, frame):
+        """Abre el VideoWriter con el tamaño del primer frame."""
+        height, width = frame.shape[:2]
+        self.frame_size = (width, height)
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        self.video_writer = cv2.VideoWriter(self.filename, fourcc, self.fps, self.frame_size)
+        print(f"[VIDEO DEBUG] Video dimensions: {width}x{height}")
+        print(f"[VIDEO DEBUG] Output file: {self.filename}")
+        # Verificar que el video writer se creó correctamente
+        if not self.video_writer.isOpened():
+            print(f"[VIDEO ERROR] VideoWriter failed to open file: {self.filename}")
+            self.video_writer = None
+            self.is_recording = False  # Sin writer no tiene sentido seguir capturando
+            return False
+        return True
+
     def stop(self):
-        """Detiene la grabación y guarda el video."""
+        """Detiene la grabación, vacía la cola y cierra el video."""
         self.is_recording = False
 
-        # Esperar a que el thread termine
+        # Esperar a que el thread de captura termine
         if hasattr(self, 'recording_thread'):
             self.recording_thread.join(timeout=2.0)
 
-        if not self.frames:
-            print("[VIDEO ERROR] No frames captured, skipping video creation")
-            return None
+        # Señal de fin al encoder y esperar a que procese los frames pendientes
+        self._stop_time = time.time()
+        if hasattr(self, '_recording_start'):
+            self.recording_time = time.perf_counter() - self._recording_start
+        if hasattr(self, 'encoder_thread'):
+            self.frame_queue.put(None)
+            self.encoder_thread.join(timeout=30.0)
 
-        try:
-            # Obtener dimensiones del primer frame
-            height, width, _ = self.frames[0].shape
-            print(f"[VIDEO DEBUG] Video dimensions: {width}x{height}")
-            print(f"[VIDEO DEBUG] Total frames to write: {len(self.frames)}")
-            print(f"[VIDEO DEBUG] Output file: {self.filename}")
-
-            # Crear video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            video_writer = cv2.VideoWriter(self.filename, fourcc, self.fps, (width, height))
-
-            # Verificar que el video writer se creó correctamente
-            if not video_writer.isOpened():
-                print(f"[VIDEO ERROR] VideoWriter failed to open file: {self.filename}")
-                return None
+        print(f"[VIDEO DEBUG] Frames captured: {self.frames_captured} | "
+              f"stored: {self.frames_stored} | duplicates skipped: {self.frames_skipped} | "
+              f"written (with timing repeats): {self.frames_written} | "
+              f"dropped: {self.frames_dropped} | downscaled: {self.frames_downscaled}")
 
-            # Escribir todos los frames
-            for i, frame in enumerate(self.frames):
-                video_writer.write(frame)
-                if i % 5 == 0:  # Log cada 5 frames
-                    print(f"[VIDEO DEBUG] Written frame {i+1}/{len(self.frames)}")
+        try:
+            if self.video_writer is not None:
+                self.video_writer.release()
+                print(f"[VIDEO DEBUG] VideoWriter released successfully")
 
-            video_writer.release()
-            print(f"[VIDEO DEBUG] VideoWriter released successfully")
+            if self.frames_written == 0:
+                print("[VIDEO ERROR] No frames captured, skipping video creation")
+                return None
 
             # Verificar que el archivo se creó
             if os.path.exists(self.filename):
@@ -158,6 +496,18 @@ class VideoRecorder:
             return None
 
 # ==================== HELPERS PARA CONFIGURACIÓN DINÁMICA ====================
+def _get_case_id(module_name):
+    """
+    Obtiene el id del caso (ej: "case_3") a partir del nombre del módulo de test.
+
+    Los archivos de test terminan en _CaseN (ej: test_login_network_Case3).
+
+    Returns:
+        str o None si el módulo no corresponde a un caso
+    """
+    case_match = re.search(r"Case(\d+)", module_name)
+    return f"case_{case_match.group(1)}" if case_match else None
+
 def _get_available_environments():
     """
     Carga la lista de ambientes disponibles desde parameter_options.json
@@ -332,6 +682,62 @@ def pytest_addoption(parser):
         default="none",
         help="Video recording mode: none or enabled (default: none)"
     )
+    parser.addoption(
+        "--video-backend",
+        action="store",
+        default="auto",
+        help="Video capture backend: auto, screencast (Chrome/Edge CDP) or polling (default: auto)"
+    )
+    parser.addoption(
+        "--browser-profile",
+        action="store",
+        default="full",
+        help="Browser profile: full (headed, all features) or lean (headless, no images/fonts/media) (default: full)"
+    )
+    parser.addoption(
+        "--browser-pool",
+        action="store",
+        default="enabled",
+        help="Reuse warm browsers between tests: enabled or none (default: enabled)"
+    )
+    parser.addoption(
+        "--max-browser-reuse",
+        action="store",
+        default="20",
+        type=int,
+        help="Tests served by a pooled browser before it is relaunched (default: 20)"
+    )
+    parser.addoption(
+        "--network-metrics",
+        action="store",
+        default="enabled",
+        help="Per-page network metrics (TTFB, bytes, third parties) for tests using the network_metrics fixture: enabled or none (default: enabled)"
+    )
+    parser.addoption(
+        "--network-stub",
+        action="store",
+        default="none",
+        help="Serve recorded API responses (replay), record live ones (record) or none, for tests using the network_stub fixture (Chrome/Edge) (default: none)"
+    )
+    parser.addoption(
+        "--network-stub-dir",
+        action="store",
+        default="network_stubs",
+        help="Directory of recorded API responses, one subfolder per case (default: network_stubs)"
+    )
+    parser.addoption(
+        "--network-latency-ms",
+        action="store",
+        default="0",
+        type=int,
+        help="Artificial latency added to each stubbed endpoint request, in ms (default: 0)"
+    )
+    parser.addoption(
+        "--seat-strategy",
+        action="store",
+        default="first_available",
+        help="Seat choice on the seatmap (Cases 1 and 2): first_available, adjacent, window or aisle (default: first_available)"
+    )
     # ==================== CASE 3 SPECIFIC OPTIONS ====================
     parser.addoption(
         "--origin",
@@ -488,22 +894,7 @@ def pytest_generate_tests(metafunc):
     # Filtrar ambientes según opción y env_options del caso
     if "base_url" in metafunc.fixturenames:
         # Detectar qué caso se está ejecutando por el nombre del módulo
-        test_module = metafunc.module.__name__
-        case_id = None
-        if "test_oneway_booking_Case1" in test_module:
-            case_id = "case_1"
-        elif "test_roundtrip_booking_Case2" in test_module:
-            case_id = "case_2"
-        elif "test_login_network_Case3" in test_module:
-            case_id = "case_3"
-        elif "test_language_change_Case4" in test_module:
-            case_id = "case_4"
-        elif "test_pos_change_Case5" in test_module:
-            case_id = "case_5"
-        elif "test_header_redirections_Case6" in test_module:
-            case_id = "case_6"
-        elif "test_footer_redirections_Case7" in test_module:
-            case_id = "case_7"
+        case_id = _get_case_id(metafunc.module.__name__)
 
         # Obtener los env_options permitidos para este caso desde case_mappings.json
         # Cargar todos los ambientes disponibles dinámicamente como default
@@ -534,32 +925,128 @@ def pytest_generate_tests(metafunc):
 
         metafunc.parametrize("base_url", envs, scope="function")
 
-# ==================== FIXTURE: DRIVER DEL NAVEGADOR ====================
-@pytest.fixture(scope="function")
-def driver(request, browser):
+# ==================== CREACIÓN DE NAVEGADORES ====================
+# Perfil "lean": argumentos extra para Chrome/Edge (headless y sin procesos en segundo plano)
+LEAN_CHROMIUM_ARGS = [
+    "--headless=new",  # Headless moderno (mismo motor de render que el modo con ventana)
+    "--window-size=1920,1080",  # Tamaño fijo (--start-maximized no aplica en headless)
+    "--disable-extensions",  # Sin extensiones
+    "--disable-background-networking",  # Sin tráfico de fondo (updates, safe browsing, etc.)
+    "--disable-dev-shm-usage",  # Evita /dev/shm pequeño en contenedores CI
+]
+
+# Perfil "lean": recursos bloqueados vía CDP Network.setBlockedURLs
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",  # Imágenes
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",  # Fuentes
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",  # Media
+]
+
+# ==================== CONSENTIMIENTO DE COOKIES ====================
+# Grupos de consentimiento de OneTrust aceptados al pre-sembrar la cookie (todas las categorías)
+CONSENT_COOKIE_GROUPS = ["C0001", "C0002", "C0003", "C0004"]
+
+
+def _needs_performance_log(request):
     """
-    Fixture principal: crea, configura y destruye el navegador para cada test.
+    Indica si el test necesita el performance log (captura de red con NetworkCapture).
 
-    Parámetros:
-    - request: Objeto de pytest con información del test
-    - browser: Parámetro que indica qué navegador usar (chrome, edge o firefox)
-                Viene de pytest_generate_tests según opción CLI
+    En perfil "full" siempre se habilita (comportamiento histórico).
+    En perfil "lean" solo para tests marcados con @pytest.mark.network_capture.
+    """
+    if request.config.getoption("--browser-profile") != "lean":
+        return True
+    return request.node.get_closest_marker("network_capture") is not None
 
-    Navegadores soportados:
-    - chrome: Google Chrome
-    - edge: Microsoft Edge
-    - firefox: Mozilla Firefox
 
-    scope="function": Crea un navegador NUEVO para cada test individual
+def _apply_blocked_urls(driver, urls):
+    """
+    Bloquea URLs vía CDP Network.setBlockedURLs (solo Chrome/Edge).
+
+    Args:
+        driver: WebDriver de Chrome/Edge
+        urls: Patrones con comodines (perfil lean + blocked_urls del caso)
+
+    Se aplica en cada préstamo del navegador porque Network.disable (usado por
+    NetworkCapture.disable_network_tracking) desactiva también el bloqueo, y
+    porque cada caso tiene su propia lista.
+    """
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+    except Exception as e:
+        print(f"[PROFILE] Could not apply blocked URLs: {e}")
+
+
+def _preseed_consent_cookie(driver, base_url):
     """
+    Guarda el consentimiento de OneTrust ANTES de navegar (CDP Network.setCookie).
+
+    Con OptanonAlertBoxClosed y OptanonConsent presentes OneTrust no muestra el
+    modal de cookies, y PaymentPage.wait_for_page_load omite buscarlo.
+    El pool borra las cookies al devolver el navegador: se siembran en cada préstamo.
+
+    Args:
+        driver: WebDriver de Chrome/Edge
+        base_url: URL del ambiente (la cookie se guarda para todo su dominio)
+    """
+    now = datetime.now(timezone.utc)
+    consent_groups = ",".join(f"{group}:1" for group in CONSENT_COOKIE_GROUPS)
+    cookies = {
+        "OptanonAlertBoxClosed": now.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "OptanonConsent": urlencode({
+            "isGpcEnabled": "0",
+            "datestamp": now.strftime("%a %b %d %Y %H:%M:%S GMT+0000"),
+            "isIABGlobal": "false",
+            "landingPath": "NotLandingPage",
+            "groups": consent_groups,
+            "AwaitingReconsent": "false",
+        }, quote_via=quote),
+    }
+    domain = "." + site_of(base_url)
+    try:
+        for name, value in cookies.items():
+            driver.execute_cdp_cmd('Network.setCookie', {
+                'name': name, 'value': value, 'domain': domain, 'path': '/',
+                'secure': base_url.startswith("https"), 'sameSite': 'Lax',
+                'expires': time.time() + 365 * 24 * 3600,
+            })
+    except Exception as e:
+        print(f"[PROFILE] Could not pre-seed consent cookie: {e}")
+
+
+def _create_driver(browser, profile="full", performance_log=True):
+    """
+    Lanza un navegador nuevo (Chrome, Edge o Firefox) con las opciones del proyecto.
+
+    Args:
+        browser: Navegador a lanzar (chrome, edge o firefox)
+        profile: Perfil del navegador ("full" o "lean")
+        performance_log: Si True habilita el performance log (Chrome/Edge)
+
+    Returns:
+        WebDriver: Instancia del navegador lanzado
+
+    Se usa como "factory" del BrowserPool: solo se llama cuando no hay un
+    navegador libre reutilizable para la misma clave.
+
+    Perfil "lean" (pensado para CI con muchos workers de xdist):
+    - Headless con tamaño de ventana fijo
+    - Sin extensiones ni background networking
+    - Imágenes, fuentes y media bloqueadas
+    """
+    lean = profile == "lean"
 
     # PASO 1: Configurar opciones comunes para todos los navegadores
     common_args = [
-        "--start-maximized",  # Ventana maximizada
         "--disable-notifications",  # Bloquea notificaciones
         "--disable-popup-blocking",  # Permite popups
         "--disable-blink-features=AutomationControlled"  # Oculta detección de Selenium
     ]
+    if lean:
+        common_args.extend(LEAN_CHROMIUM_ARGS)
+    else:
+        common_args.insert(0, "--start-maximized")  # Ventana maximizada
 
     # PASO 2: Crear navegador según parámetro
     if browser == "chrome":
@@ -571,11 +1058,12 @@ def driver(request, browser):
 
         # Habilitar performance logging para captura de red (Case 3: CDP Network)
         # Permite acceder a eventos de red mediante driver.get_log('performance')
-        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        if performance_log:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
         # Usar Selenium Manager (integrado en Selenium 4.x)
         # No requiere webdriver-manager, descarga el driver automáticamente
-        driver = webdriver.Chrome(options=chrome_options)
+        return webdriver.Chrome(options=chrome_options)
 
     elif browser == "edge":
         # Configurar Edge
@@ -586,27 +1074,120 @@ def driver(request, browser):
 
         # Habilitar performance logging para captura de red (Case 3: CDP Network)
         # Edge es Chromium-based, soporta las mismas capacidades que Chrome
-        edge_options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
+        if performance_log:
+            edge_options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
 
         # Usar Selenium Manager (no requiere webdriver-manager)
-        driver = webdriver.Edge(options=edge_options)
+        return webdriver.Edge(options=edge_options)
 
     elif browser == "firefox":
         # Configurar Firefox
         firefox_options = FirefoxOptions()
         # Firefox usa diferentes nombres para algunas opciones
         # firefox_options.add_argument("--headless")  # Descomentar para modo invisible
+        if lean:
+            # Firefox no soporta CDP setBlockedURLs: se bloquea con preferencias
+            firefox_options.add_argument("-headless")
+            firefox_options.add_argument("--width=1920")
+            firefox_options.add_argument("--height=1080")
+            firefox_options.set_preference("permissions.default.image", 2)  # Sin imágenes
+            firefox_options.set_preference("gfx.downloadable_fonts.enabled", False)  # Sin web fonts
+            firefox_options.set_preference("media.autoplay.default", 5)  # Sin autoplay de media
+            firefox_options.set_preference("extensions.update.enabled", False)
+            firefox_options.set_preference("app.update.enabled", False)
+
+        # Firefox no tiene performance log: la captura de red usa WebDriver BiDi (WebSocket)
+        if performance_log:
+            firefox_options.set_capability("webSocketUrl", True)
 
         # Usar Selenium Manager (integrado en Selenium 4.x)
         # No requiere webdriver-manager, descarga el driver automáticamente
-        driver = webdriver.Firefox(options=firefox_options)
+        return webdriver.Firefox(options=firefox_options)
 
     else:
         raise ValueError(f"Browser '{browser}' not supported. Use 'chrome', 'edge', or 'firefox'.")
 
+
+# ==================== FIXTURE: POOL DE NAVEGADORES ====================
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    """
+    Fixture del pool de navegadores: mantiene navegadores "calientes" entre tests.
+
+    scope="session":
+    - Se crea UNA SOLA VEZ por sesión (con pytest-xdist: una vez por worker)
+    - Al final de la sesión cierra todos los navegadores del pool
+
+    Con --browser-pool=none devuelve None y cada test lanza su propio navegador.
+    """
+    if request.config.getoption("--browser-pool") != "enabled":
+        yield None
+        return
+
+    pool = BrowserPool(max_reuse=request.config.getoption("--max-browser-reuse"))
+    yield pool
+
+    summary = pool.get_stats_summary()
+    pool.shutdown()
+    print(f"\n[POOL] Browser pool statistics:\n{summary}")
+
+
+# ==================== FIXTURE: DRIVER DEL NAVEGADOR ====================
+@pytest.fixture(scope="function")
+def driver(request, browser, browser_pool, test_config):
+    """
+    Fixture principal: entrega un navegador configurado a cada test.
+
+    Parámetros:
+    - request: Objeto de pytest con información del test
+    - browser: Parámetro que indica qué navegador usar (chrome, edge o firefox)
+                Viene de pytest_generate_tests según opción CLI
+    - browser_pool: Pool de navegadores reutilizables (None si --browser-pool=none)
+    - test_config: Configuraciones JSON (blocked_urls y preseed_consent_cookie del caso)
+
+    Navegadores soportados:
+    - chrome: Google Chrome
+    - edge: Microsoft Edge
+    - firefox: Mozilla Firefox
+
+    scope="function": Cada test recibe un navegador limpio. Con el pool habilitado
+    el navegador se reutiliza (reseteado) en lugar de lanzarse de nuevo.
+    """
+
+    # PASO 1-2: Obtener navegador (del pool o lanzando uno nuevo)
+    # La clave del pool incluye perfil y performance log: navegadores con
+    # capacidades distintas no son intercambiables
+    profile = request.config.getoption("--browser-profile")
+    performance_log = _needs_performance_log(request)
+    if browser_pool is not None:
+        driver = browser_pool.acquire(
+            (browser, profile, performance_log),
+            lambda: _create_driver(browser, profile, performance_log)
+        )
+    else:
+        driver = _create_driver(browser, profile, performance_log)
+
+    # PASO 2.5: Reglas de red al prestar el navegador (Chrome/Edge vía CDP)
+    # - Perfil lean: imágenes/fuentes/media bloqueadas
+    # - Caso: blocked_urls (trackers, assets pesados) y preseed_consent_cookie de case_mappings.json
+    case_id = _get_case_id(request.node.module.__name__)
+    case_info = (test_config.get_case_info(case_id) or {}) if case_id else {}
+    if browser in ("chrome", "edge"):
+        blocked_urls = (LEAN_BLOCKED_URLS if profile == "lean" else []) + case_info.get("blocked_urls", [])
+        # Siempre se envía (también vacía): un navegador del pool no debe heredar la lista del caso anterior
+        _apply_blocked_urls(driver, blocked_urls)
+        if case_info.get("preseed_consent_cookie") and "base_url" in request.fixturenames:
+            _preseed_consent_cookie(driver, request.getfixturevalue("base_url"))
+
     # PASO 3: Configurar esperas implícitas (para todos los navegadores)
     driver.implicitly_wait(10)
 
+    # Estadísticas del wait engine y de locators: el navegador del pool trae las del test anterior
+    wait_stats = get_wait_stats(driver)
+    wait_stats.reset()
+    locator_stats = get_locator_stats(driver)
+    locator_stats.reset()
+
     # PASO 3.5: Iniciar grabación de video si está habilitado
     video_mode = request.config.getoption("--video")
     video_recorder = None
@@ -620,10 +1201,18 @@ def driver(request, browser):
         # Crear directorio si no existe
         os.makedirs("reports", exist_ok=True)
 
+        # Backend: screencast CDP en Chrome/Edge (no bloquea la sesión), polling en Firefox
+        video_backend = request.config.getoption("--video-backend")
+        if video_backend == "auto":
+            video_backend = "screencast" if browser in ("chrome", "edge") else "polling"
+        elif video_backend == "screencast" and browser not in ("chrome", "edge"):
+            print(f"[VIDEO] Screencast not supported on {browser}, using polling")
+            video_backend = "polling"
+
         # Crear y iniciar el recorder (FPS bajo = 2 para no saturar Selenium)
-        video_recorder = VideoRecorder(driver, filename=video_filename, fps=2)
+        video_recorder = VideoRecorder(driver, filename=video_filename, fps=2, backend=video_backend)
         video_recorder.start()
-        print(f"\n[VIDEO] Recording started: {video_filename}")
+        print(f"\n[VIDEO] Recording started: {video_filename} (backend: {video_backend})")
         print(f"[VIDEO] Original test name: {test_name}")
         print(f"[VIDEO] Sanitized filename: {sanitized_test_name}")
 
@@ -635,10 +1224,19 @@ def driver(request, browser):
         print(f"[VIDEO] Stopping recording...")
         video_file = video_recorder.stop()
 
+        # Adjuntar overhead de la captura (comparación polling vs screencast)
+        overhead = video_recorder.get_overhead_summary()
+        print(f"[VIDEO] Capture overhead:\n{overhead}")
+        try:
+            allure.attach(overhead, name="Video Capture Overhead", attachment_type=allure.attachment_type.TEXT)
+        except Exception as e:
+            print(f"[VIDEO] Error attaching overhead to Allure: {e}")
+
         if video_file and os.path.exists(video_file):
             print(f"[VIDEO] Video created successfully: {video_file}")
             print(f"[VIDEO] File size: {os.path.getsize(video_file) / (1024*1024):.2f} MB")
-            print(f"[VIDEO] Total frames captured: {len(video_recorder.frames)}")
+            print(f"[VIDEO] Frames stored vs captured: {video_recorder.frames_stored}/{video_recorder.frames_captured} "
+                  f"(duplicates skipped: {video_recorder.frames_skipped}, dropped: {video_recorder.frames_dropped})")
 
             # Adjuntar video a Allure
             try:
@@ -660,10 +1258,32 @@ def driver(request, browser):
                 print(f"[VIDEO] Error removing file: {e}")
         else:
             print(f"[VIDEO] No video file created or file doesn't exist")
-            print(f"[VIDEO] Frames captured: {len(video_recorder.frames) if video_recorder.frames else 0}")
+            print(f"[VIDEO] Frames captured: {video_recorder.frames_captured} "
+                  f"(written: {video_recorder.frames_written}, dropped: {video_recorder.frames_dropped})")
+
+    # PASO 5.5: Reporte del wait engine (espera real vs sleeps fijos que reemplaza)
+    wait_summary = wait_stats.get_summary()
+    if wait_summary:
+        print(f"\n[WAITS] {wait_summary.splitlines()[0]}")
+        try:
+            allure.attach(wait_summary, name="Wait Engine", attachment_type=allure.attachment_type.TEXT)
+        except Exception as e:
+            print(f"[WAITS] Error attaching wait report to Allure: {e}")
 
-    # PASO 6: Cierra el navegador después del test
-    driver.quit()
+    # PASO 5.6: Reporte de locators (selectores más lentos, hits/misses, caché)
+    locator_summary = locator_stats.get_summary()
+    if locator_summary:
+        print(f"\n[LOCATORS] {locator_summary.splitlines()[0]}")
+        try:
+            allure.attach(locator_summary, name="Locators", attachment_type=allure.attachment_type.TEXT)
+        except Exception as e:
+            print(f"[LOCATORS] Error attaching locator report to Allure: {e}")
+
+    # PASO 6: Devolver el navegador al pool (o cerrarlo si el pool está deshabilitado)
+    if browser_pool is not None:
+        browser_pool.release(driver)
+    else:
+        driver.quit()
 
 
 # ==================== FIXTURE: SCREENSHOTS MODE ====================
@@ -682,6 +1302,20 @@ def screenshots_mode(request):
     return request.config.getoption("--screenshots")
 
 
+# ==================== FIXTURE: ESTRATEGIA DE ASIENTOS ====================
+@pytest.fixture(scope="session")
+def seat_strategy(request):
+    """
+    Fixture que devuelve la estrategia de selección de asientos (--seat-strategy).
+
+    Valores posibles (utils/seatmap_scanner.py > SEAT_STRATEGIES):
+    - "first_available": Primer asiento disponible (default)
+    - "adjacent": Pasajeros juntos en la misma fila
+    - "window" / "aisle": Ventana o pasillo primero
+    """
+    return request.config.getoption("--seat-strategy")
+
+
 # ==================== FIXTURE: BASE DE DATOS ====================
 @pytest.fixture(scope="session")
 def db():
@@ -696,10 +1330,180 @@ def db():
     ¿Por qué "session" y no "function"?
     - Crear la BD y tablas muchas veces sería lento e innecesario
     - Los resultados deben acumularse en la misma BD
+
+    Modo buffered: los resultados se insertan por lotes (y al cerrar), lo que evita
+    un commit por test y los "database is locked" con pytest -n N.
     """
-    database = TestDatabase()  # Crea instancia de la clase de BD
+    database = TestDatabase(buffered=True)  # Crea instancia de la clase de BD
     yield database  # Entrega la conexión a los tests que la soliciten
-    database.close()  # Cierra conexión al terminar todos los tests
+    database.close()  # Inserta filas pendientes y cierra conexión al terminar todos los tests
+
+
+# ==================== FIXTURE: MÉTRICAS DE RED ====================
+@pytest.fixture(scope="function")
+def network_metrics(request, driver, db, browser):
+    """
+    Fixture que mide el rendimiento de red por página durante el test.
+
+    - Chrome/Edge: drena el performance log en segundo plano; Firefox: eventos
+      WebDriver BiDi (sin pedir response bodies en ambos casos)
+    - Al terminar calcula por página: TTFB, bytes, peticiones por tipo, las más
+      lentas y dominios de terceros (ver utils/network_metrics.py)
+    - Adjunta el resultado a Allure ("Network Metrics") y lo guarda en la tabla
+      network_metrics de la BD
+    - Correlaciona la red con cada allure.step: adjunta "Network (step)" a cada
+      paso y al final "Network by Step" con todos los pasos (ver utils/network_steps.py)
+
+    network_busy_share compara el tiempo con red ocupada contra la duración del test:
+    un valor alto indica que el test esperó al backend, uno bajo que el tiempo se
+    fue en la automatización (esperas, sleeps, interacción).
+
+    Yields:
+        NetworkCapture o None (--network-metrics=none, perfil lean sin performance log o BiDi no disponible)
+    """
+    if request.config.getoption("--network-metrics") != "enabled" or not _needs_performance_log(request):
+        yield None
+        return
+
+    # Sin bodies: solo interesan los eventos y sus timings
+    capture = NetworkCapture(driver, body_policy=BodyCapturePolicy(deny=["*"]))
+    if capture.backend == "bidi":
+        try:
+            capture.enable_network_tracking()
+        except Exception as e:
+            print(f"[NETWORK] Network metrics disabled: {e}")
+            yield None
+            return
+    capture.start_background_collection()
+    capture.track_allure_steps()
+    start_time = time.time()
+
+    yield capture
+
+    capture.untrack_allure_steps()
+    try:
+        capture.stop_background_collection()
+        pages = capture.get_page_metrics()
+        summary = summarize_pages(pages)
+        summary['test_duration_ms'] = round((time.time() - start_time) * 1000, 1)
+        summary['network_busy_share'] = round(summary['network_busy_ms'] / summary['test_duration_ms'], 3) if summary['test_duration_ms'] else None
+        print(f"\n[NETWORK] {summary['pages']} pages, {summary['requests']} requests, "
+              f"{summary['transfer_bytes'] / 1024:.0f} KB, server wait {summary['server_wait_ms']:.0f}ms, "
+              f"network busy {summary['network_busy_ms']:.0f}ms of {summary['test_duration_ms']:.0f}ms")
+
+        allure.attach(
+            json.dumps({'summary': summary, 'pages': pages}, indent=2, ensure_ascii=False),
+            name="Network Metrics",
+            attachment_type=allure.attachment_type.JSON
+        )
+        steps = [step for step in capture.get_step_network_report() if step['requests']]
+        if steps:
+            allure.attach(
+                json.dumps(steps, indent=2, ensure_ascii=False),
+                name="Network by Step",
+                attachment_type=allure.attachment_type.JSON
+            )
+
+        case_id = _get_case_id(request.node.module.__name__)
+        db.save_network_metrics(
+            request.node.name, pages,
+            case_number=case_id.split("_")[1] if case_id else None,
+            browser=browser
+        )
+    except Exception as e:
+        print(f"[NETWORK] Error computing network metrics: {e}")
+
+
+# ==================== FIXTURE: STUBS DE RED ====================
+@pytest.fixture(scope="function")
+def network_stub(request, driver, browser, test_config):
+    """
+    Fixture opt-in que intercepta las APIs del caso con CDP Fetch (ver utils/network_stub.py).
+
+    - --network-stub=replay: responde con las grabaciones de --network-stub-dir/case_N
+      (corridas rápidas y deterministas para regresión de UI)
+    - --network-stub=record: deja pasar las peticiones y graba las respuestas reales
+    - --network-latency-ms=N: demora cada petición interceptada (sola o con replay)
+
+    Los endpoints se leen de case_mappings.json -> case_N -> network_stubs.endpoints.
+    Al terminar adjunta las estadísticas a Allure ("Network Stub").
+
+    Yields:
+        NetworkStub o None (sin modo ni latencia, Firefox, caso sin endpoints o CDP no disponible)
+    """
+    mode = request.config.getoption("--network-stub")
+    latency_ms = request.config.getoption("--network-latency-ms")
+    if mode not in STUB_MODES:
+        raise pytest.UsageError(f"--network-stub must be one of: {', '.join(STUB_MODES)}")
+    if mode == "none" and latency_ms <= 0:
+        yield None
+        return
+    if browser not in ("chrome", "edge"):
+        print(f"[STUB] Network stubbing requires CDP Fetch, not available on {browser}")
+        yield None
+        return
+
+    case_id = _get_case_id(request.node.module.__name__)
+    stub_config = (test_config.get_case_info(case_id) or {}).get("network_stubs", {}) if case_id else {}
+    if not stub_config.get("endpoints"):
+        print(f"[STUB] No network_stubs endpoints configured for {case_id}")
+        yield None
+        return
+
+    store = StubStore(
+        os.path.join(request.config.getoption("--network-stub-dir"), case_id),
+        match_query=stub_config.get("match_query", False),
+        match_body=stub_config.get("match_body", False)
+    )
+    stub = NetworkStub(driver, store, stub_config["endpoints"], mode=mode, latency_ms=latency_ms)
+    if not stub.start():
+        yield None
+        return
+    print(f"\n[STUB] Intercepting {len(stub.endpoints)} endpoints (mode: {mode}, latency: {latency_ms}ms)")
+
+    yield stub
+
+    stub.stop()
+    stats = stub.get_stats()
+    print(f"[STUB] Intercepted {stats['intercepted']}: replayed {stats['replayed']}, recorded {stats['recorded']}, "
+          f"passthrough {stats['passthrough']}, errors {stats['errors']}")
+    try:
+        allure.attach(json.dumps(stats, indent=2), name="Network Stub", attachment_type=allure.attachment_type.JSON)
+    except Exception as e:
+        print(f"[STUB] Error attaching stub stats to Allure: {e}")
+
+
+def _recover_spooled_results(config):
+    """
+    Recupera resultados de workers que cayeron antes de hacer flush.
+
+    Solo en el proceso principal (con xdist los workers tienen config.workerinput).
+    Solo se adoptan spools de procesos que ya terminaron: otra sesión de pytest
+    que use el mismo .db en paralelo conserva los suyos. La base solo se abre si hay
+    spools que recuperar (así `pytest tests/unit` no crea ni migra test_results.db).
+    """
+    if hasattr(config, "workerinput"):
+        return
+    try:
+        if not orphan_spool_paths():
+            return
+        database = TestDatabase()
+        recovered = database.recover_spooled_results()
+        database.close()
+        if recovered:
+            print(f"\n[DB] Recovered {recovered} test results from crashed workers")
+    except Exception as e:
+        print(f"\n[DB] Could not recover spooled test results: {e}")
+
+
+def pytest_sessionstart(session):
+    """Hook de inicio de sesión: recupera resultados de ejecuciones anteriores interrumpidas."""
+    _recover_spooled_results(session.config)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Hook de fin de sesión: recupera resultados de workers caídos durante esta ejecución."""
+    _recover_spooled_results(session.config)
 
 
 # ==================== FIXTURE: CONFIGURACIONES JSON ====================
@@ -7,8 +7,10 @@ Contiene todos los selectores (locators) y acciones que se pueden hacer en esta
 
 # ==================== IMPORTS ====================
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+from utils.wait_engine import WaitEngine, url_changed_or_new_window
+from utils.locator_registry import Locator, LocatorRegistry
 import logging
-import time
 import random
 import json
 from pathlib import Path
@@ -23,7 +25,7 @@ class HomePage:
     Page Object de la página principal de nuxqa.
 
     Responsabilidades:
-    - Almacenar locators (selectores XPath)
+    - Almacenar locators (constantes XPath + registro LOCATORS con CSS equivalentes)
     - Proveer métodos para interactuar con elementos
     - Registrar logs de cada acción (requisito del PDF)
     """
@@ -62,6 +64,47 @@ class HomePage:
     FOOTER_AVIANCADIRECT = (By.XPATH, "//footer//a[contains(@href, 'aviancadirect')]//span[@class='link-label']")
     FOOTER_CONTACTANOS = (By.XPATH, "//footer//a[contains(@href, 'contact') or contains(@href, 'contato')]//span[@class='link-label']")
 
+    # ==================== REGISTRO DE LOCATORS ====================
+    # Cada elemento con estrategias equivalentes: el CSS ([class*=x] = contains(@class, x),
+    # [href*=x] = contains(@href, x), lista "a, b" = "or") se intenta antes que el XPath original
+    # y el registro recuerda la que funciona (utils/locator_registry.py)
+    # Los campos {} se completan en cada búsqueda (idioma, POS); cache=False = opción efímera de un dropdown
+    LOCATORS = {
+        "language_button": Locator((By.CSS_SELECTOR, "button[class*='dropdown_trigger']"), LANGUAGE_BUTTON),
+        "language_option": Locator((By.XPATH, "//span[contains(text(), '{}')]"), cache=False),
+        "offers_text": Locator(
+            (By.CSS_SELECTOR, "button[class*='main-header_nav-primary_item_link'] span[class='button_label']"), OFFERS_TEXT),
+        "pos_button": Locator(POS_BUTTON),
+        "pos_option": Locator(
+            (By.XPATH, "//span[@class='points-of-sale_list_item_label' and contains(text(), '{}')]"), cache=False),
+        "pos_apply_button": Locator(
+            (By.CSS_SELECTOR, "button[class*='points-of-sale_footer_action_button']"), POS_APPLY_BUTTON),
+        "pos_selected_text": Locator(
+            (By.CSS_SELECTOR, "button#pointOfSaleSelectorId span[class='button_label']"), POS_SELECTED_TEXT),
+        "navbar_offers": Locator(NAVBAR_OFFERS),
+        "navbar_your_reservation": Locator(NAVBAR_YOUR_RESERVATION),
+        "navbar_info_and_help": Locator(NAVBAR_INFO_AND_HELP),
+        "submenu_flight_offers": Locator(
+            (By.CSS_SELECTOR, "a[href*='ofertas-de'], a[href*='offres-de'], a[href*='flight-offers'], a[href*='voos-promocionais']"),
+            SUBMENU_FLIGHT_OFFERS),
+        "submenu_avianca_credits": Locator((By.CSS_SELECTOR, "a[href*='credit']"), SUBMENU_AVIANCA_CREDITS),
+        "submenu_changements_remboursements": Locator(
+            (By.CSS_SELECTOR, "a[href*='changements-et-remboursements']"), SUBMENU_CHANGEMENTS_REMBOURSEMENTS),
+        "submenu_luggage": Locator(
+            (By.CSS_SELECTOR, "a[href*='equipaje'], a[href*='baggage'], a[href*='bagages'], a[href*='bagagem']"), SUBMENU_LUGGAGE),
+        "footer_vuelos_baratos": Locator(
+            (By.CSS_SELECTOR, "footer a[href*='ofertas-'] span[class='link-label'], footer a[href*='offres-'] span[class='link-label'], "
+                              "footer a[href*='offers-'] span[class='link-label']"), FOOTER_VUELOS_BARATOS),
+        "footer_noticias_corporativas": Locator(
+            (By.CSS_SELECTOR, "footer a[href*='noticias'] span[class='link-label'], footer a[href*='nouvelles'] span[class='link-label'], "
+                              "footer a[href*='news'] span[class='link-label']"), FOOTER_NOTICIAS_CORPORATIVAS),
+        "footer_aviancadirect": Locator(
+            (By.CSS_SELECTOR, "footer a[href*='aviancadirect'] span[class='link-label']"), FOOTER_AVIANCADIRECT),
+        "footer_contactanos": Locator(
+            (By.CSS_SELECTOR, "footer a[href*='contact'] span[class='link-label'], footer a[href*='contato'] span[class='link-label']"),
+            FOOTER_CONTACTANOS),
+    }
+
     # ==================== CONSTRUCTOR ====================
     def __init__(self, driver):
         """
@@ -71,6 +114,8 @@ class HomePage:
             driver: Instancia de Selenium WebDriver (recibida desde el test)
         """
         self.driver = driver
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
+        self.locators = LocatorRegistry(driver, "Home", self.LOCATORS)  # Locators con caché por época y telemetría
         logger.info("HomePage object initialized")
 
     # ==================== MÉTODOS AUXILIARES ====================
@@ -152,7 +197,9 @@ class HomePage:
         """
         logger.info(f"Opening URL: {url}")
         self.driver.get(url)
-        time.sleep(1)  # OPTIMIZADO: 2s → 1s (ahorro: 1s)
+        self.locators.new_epoch("open")
+        # ⏳ Se ESPERA (WAIT ENGINE): Angular estable y red en reposo (antes: sleep fijo de 1s)
+        self.waits.settle("Home: page open", replaces=1)
         logger.info("Page loaded successfully")
 
     def click_language_button(self):
@@ -161,9 +208,8 @@ class HomePage:
         Abre el dropdown con las opciones de idioma.
         """
         logger.info("Clicking language button")
-        element = self.driver.find_element(*self.LANGUAGE_BUTTON)
-        element.click()
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.locators.click("language_button")
+        self.waits.settle("Home: language dropdown", replaces=0.5)
         logger.info("Language dropdown opened")
 
     def select_language(self, language_name):
@@ -178,10 +224,9 @@ class HomePage:
         # Primero abrir el dropdown de idiomas
         self.click_language_button()
         # XPath dinámico: busca por texto visible
-        xpath = f"//span[contains(text(), '{language_name}')]"
-        element = self.driver.find_element(By.XPATH, xpath)
-        element.click()
-        time.sleep(1)  # OPTIMIZADO: 2s → 1s (ahorro: 1s)
+        self.locators.click("language_option", language_name)
+        self.waits.settle("Home: language applied", replaces=1)
+        self.locators.new_epoch("language changed")  # La página se vuelve a renderizar en el nuevo idioma
         logger.info(f"Language '{language_name}' selected successfully")
 
     def get_offers_text(self):
@@ -192,8 +237,7 @@ class HomePage:
             str: Texto del elemento (ej: "Ofertas y destinos", "Offers and destinations")
         """
         logger.info("Getting offers text for validation")
-        element = self.driver.find_element(*self.OFFERS_TEXT)
-        text = element.text
+        text = self.locators.text("offers_text")
         logger.info(f"Offers text retrieved: '{text}'")
         return text
 
@@ -205,12 +249,10 @@ class HomePage:
         Abre el dropdown con las opciones de países/regiones.
         """
         logger.info("Clicking POS button")
-        # 🔍 Se BUSCA (SELENIUM): Botón para abrir dropdown de POS
-        element = self.driver.find_element(*self.POS_BUTTON)
         # 🖱️ Se PRESIONA (SELENIUM): Botón POS para abrir dropdown de selección
-        element.click()
-        # ⏳ Se ESPERA (SELENIUM): Dropdown de POS se abra
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.locators.click("pos_button")
+        # ⏳ Se ESPERA (WAIT ENGINE): Dropdown de POS se abra
+        self.waits.settle("Home: POS dropdown", replaces=0.5)
         logger.info("POS dropdown opened")
 
     def select_pos(self, pos_name):
@@ -237,19 +279,17 @@ class HomePage:
                 break
 
         # 🔍 Se BUSCA (SELENIUM): POS específico en dropdown por button_text
-        xpath = f"//span[@class='points-of-sale_list_item_label' and contains(text(), '{button_text}')]"
-        element = self.driver.find_element(By.XPATH, xpath)
         # 🖱️ Se PRESIONA (SELENIUM): POS específico para seleccionarlo
-        element.click()
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.locators.click("pos_option", button_text)
+        self.waits.settle("Home: POS option", replaces=0.5)
         logger.info(f"POS '{pos_name}' (button: '{button_text}') clicked")
 
         # 🖱️ Se PRESIONA (SELENIUM): Botón "Aplicar" para confirmar cambio de POS
         logger.info("Clicking 'Aplicar' button to confirm POS change")
-        apply_button = self.driver.find_element(*self.POS_APPLY_BUTTON)
-        apply_button.click()
-        # ⏳ Se ESPERA (SELENIUM): POS se aplique y página recargue
-        time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+        self.locators.click("pos_apply_button")
+        # ⏳ Se ESPERA (WAIT ENGINE): POS se aplique y página recargue
+        self.waits.settle("Home: POS applied", replaces=2)
+        self.locators.new_epoch("POS applied")
         logger.info(f"POS '{pos_name}' applied successfully")
 
     def get_pos_text(self):
@@ -260,8 +300,7 @@ class HomePage:
             str: Texto del POS seleccionado (ej: "Chile", "Colombia", "España")
         """
         logger.info("Getting POS text for validation")
-        element = self.driver.find_element(*self.POS_SELECTED_TEXT)
-        text = element.text.strip()  # .strip() remueve espacios en blanco
+        text = self.locators.text("pos_selected_text").strip()  # .strip() remueve espacios en blanco
         logger.info(f"POS text retrieved: '{text}'")
         return text
 
@@ -281,8 +320,6 @@ class HomePage:
             tuple: (success: bool, new_url: str, message: str, selected_language: str)
         """
         from selenium.webdriver.common.action_chains import ActionChains
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
 
         # Cargar mapeo de idiomas a códigos URL desde JSON
         language_codes = self._get_language_codes()
@@ -290,19 +327,19 @@ class HomePage:
         # Cargar validaciones de URL desde JSON
         url_validations = self._get_url_validations("header-link")
 
-        # Mapear nombre corto a selectores
+        # Mapear nombre corto a locators del registro (LOCATORS)
         navigation_map = {
             "ofertas-vuelos": {
-                "navbar": self.NAVBAR_OFFERS,
-                "submenu": self.SUBMENU_FLIGHT_OFFERS
+                "navbar": "navbar_offers",
+                "submenu": "submenu_flight_offers"
             },
             "credits": {
-                "navbar": self.NAVBAR_YOUR_RESERVATION,
-                "submenu": self.SUBMENU_AVIANCA_CREDITS
+                "navbar": "navbar_your_reservation",
+                "submenu": "submenu_avianca_credits"
             },
             "equipaje": {
-                "navbar": self.NAVBAR_INFO_AND_HELP,
-                "submenu": self.SUBMENU_LUGGAGE
+                "navbar": "navbar_info_and_help",
+                "submenu": "submenu_luggage"
             }
         }
 
@@ -330,7 +367,7 @@ class HomePage:
             # PASO NUEVO: Cambiar idioma antes de navegar
             logger.info(f"Changing language to: {selected_language}")
             self.select_language(selected_language)
-            time.sleep(2)  # Esperar a que se aplique el cambio de idioma
+            self.waits.settle("Home: language change", replaces=2)  # Esperar a que se aplique el cambio de idioma
 
             # CASO ESPECIAL: Verificar si hay excepciones de idioma definidas en JSON
             from ide_test.core.config_manager import ConfigManager
@@ -346,8 +383,8 @@ class HomePage:
                     logger.info(f"Reason: {exception_config.get('reason', 'No reason provided')}")
                     logger.info("Using alternate submenu XPath")
                     nav_data = {
-                        "navbar": self.NAVBAR_YOUR_RESERVATION,
-                        "submenu": self.SUBMENU_CHANGEMENTS_REMBOURSEMENTS
+                        "navbar": "navbar_your_reservation",
+                        "submenu": "submenu_changements_remboursements"
                     }
 
             # Guardar URL inicial
@@ -357,19 +394,16 @@ class HomePage:
 
             # Paso 1: Hacer CLICK en el navbar button para abrir el menú dropdown
             logger.info(f"Looking for navbar button for '{header_link_name}'")
-            navbar_element = self.driver.find_element(*nav_data["navbar"])
-            logger.info(f"Navbar button found, clicking it to open dropdown")
-
             # Click en el botón del navbar
-            navbar_element.click()
+            self.locators.click(nav_data["navbar"])
             logger.info("Navbar button clicked, dropdown should open")
-            time.sleep(3)  # Espera para que se abra el menú (aumentado a 3 segundos)
+            # La visibilidad del submenú se espera en el Paso 2 (antes: sleep fijo de 3s)
 
             # Paso 2: Esperar explícitamente a que el elemento del submenú sea visible
             logger.info(f"Waiting for submenu option to be visible for '{header_link_name}'")
-            wait = WebDriverWait(self.driver, 15)
-            submenu_element = wait.until(
-                EC.visibility_of_element_located(nav_data["submenu"])
+            submenu_element = self.waits.until(
+                self.locators.visible(nav_data["submenu"]),
+                "Home: header submenu visible", timeout=15, replaces=3
             )
             logger.info(f"Submenu element is now visible")
 
@@ -377,7 +411,13 @@ class HomePage:
             logger.info(f"Clicking submenu option for '{header_link_name}'")
             self.driver.execute_script("arguments[0].click();", submenu_element)
             logger.info(f"Submenu clicked via JavaScript")
-            time.sleep(3)  # Espera a que cargue la página/nueva pestaña
+            # ⏳ Se ESPERA (WAIT ENGINE): Nueva pestaña o cambio de URL (antes: sleep fijo de 3s)
+            try:
+                self.waits.until(url_changed_or_new_window(initial_url, 1), "Home: submenu navigation",
+                                 timeout=10, replaces=3)
+            except TimeoutException:
+                logger.warning("No navigation detected after click")
+            self.locators.new_epoch("link navigation")
 
             # Paso 4: Verificar si se abrió en nueva pestaña
             all_windows = self.driver.window_handles
@@ -386,7 +426,7 @@ class HomePage:
                 logger.info("New tab detected, switching to new tab")
                 new_window = [w for w in all_windows if w != initial_window][0]
                 self.driver.switch_to.window(new_window)
-                time.sleep(2)
+                self.waits.settle("Home: new tab loaded", replaces=2)
 
             # Paso 5: Obtener URL final
             final_url = self.driver.current_url
@@ -442,6 +482,7 @@ class HomePage:
                 logger.info(f"Closed extra tab: {window}")
             # Regresar a la pestaña principal
             self.driver.switch_to.window(main_window)
+            self.locators.new_epoch("returned to main tab")
             logger.info("Returned to main tab")
         except Exception as e:
             logger.warning(f"Error closing extra tabs: {str(e)}")
@@ -461,8 +502,6 @@ class HomePage:
         Returns:
             tuple: (success: bool, new_url: str, message: str, selected_language: str)
         """
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
 
         # Cargar mapeo de idiomas a códigos URL desde JSON
         language_codes = self._get_language_codes()
@@ -470,19 +509,19 @@ class HomePage:
         # Cargar validaciones de URL desde JSON
         url_validations = self._get_url_validations("footer-link")
 
-        # Mapear nombre corto a selectores
+        # Mapear nombre corto a locators del registro (LOCATORS)
         navigation_map = {
             "vuelos": {
-                "selector": self.FOOTER_VUELOS_BARATOS
+                "selector": "footer_vuelos_baratos"
             },
             "noticias": {
-                "selector": self.FOOTER_NOTICIAS_CORPORATIVAS
+                "selector": "footer_noticias_corporativas"
             },
             "aviancadirect": {
-                "selector": self.FOOTER_AVIANCADIRECT
+                "selector": "footer_aviancadirect"
             },
             "contactanos": {
-                "selector": self.FOOTER_CONTACTANOS
+                "selector": "footer_contactanos"
             }
         }
 
@@ -510,7 +549,7 @@ class HomePage:
             # PASO NUEVO: Cambiar idioma antes de navegar
             logger.info(f"Changing language to: {selected_language}")
             self.select_language(selected_language)
-            time.sleep(2)  # Esperar a que se aplique el cambio de idioma
+            self.waits.settle("Home: language change", replaces=2)  # Esperar a que se aplique el cambio de idioma
 
             # Guardar URL inicial
             initial_url = self.driver.current_url
@@ -520,13 +559,13 @@ class HomePage:
             # Paso 1: Scroll hacia el footer para que sea visible
             logger.info(f"Scrolling to footer to make link visible")
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Espera para que el scroll complete
+            # La visibilidad del link se espera en el Paso 2 (antes: sleep fijo de 2s)
 
             # Paso 2: Esperar explícitamente a que el elemento del footer sea visible
             logger.info(f"Waiting for footer link '{footer_link_name}' to be visible")
-            wait = WebDriverWait(self.driver, 10)
-            footer_element = wait.until(
-                EC.visibility_of_element_located(nav_data["selector"])
+            footer_element = self.waits.until(
+                self.locators.visible(nav_data["selector"]),
+                "Home: footer link visible", timeout=10, replaces=2
             )
             logger.info(f"Footer link is now visible")
 
@@ -534,7 +573,13 @@ class HomePage:
             logger.info(f"Clicking footer link '{footer_link_name}'")
             self.driver.execute_script("arguments[0].click();", footer_element)
             logger.info(f"Footer link clicked via JavaScript")
-            time.sleep(3)  # Espera a que cargue la página/nueva pestaña
+            # ⏳ Se ESPERA (WAIT ENGINE): Nueva pestaña o cambio de URL (antes: sleep fijo de 3s)
+            try:
+                self.waits.until(url_changed_or_new_window(initial_url, 1), "Home: footer link navigation",
+                                 timeout=10, replaces=3)
+            except TimeoutException:
+                logger.warning("No navigation detected after click")
+            self.locators.new_epoch("link navigation")
 
             # Paso 4: Verificar si se abrió en nueva pestaña
             all_windows = self.driver.window_handles
@@ -543,7 +588,7 @@ class HomePage:
                 logger.info("New tab detected, switching to new tab")
                 new_window = [w for w in all_windows if w != initial_window][0]
                 self.driver.switch_to.window(new_window)
-                time.sleep(2)
+                self.waits.settle("Home: new tab loaded", replaces=2)
 
             # Paso 5: Obtener URL final
             final_url = self.driver.current_url
@@ -17,8 +17,8 @@ de configuración de idioma y POS.
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from utils.wait_engine import count_at_least, element_clickable
 import logging
-import time
 from pages.nuxqa.home_page import HomePage  # Importar HomePage para heredar
 
 # ==================== LOGGER ====================
@@ -121,7 +121,7 @@ class LoginPage(HomePage):
         """
         logger.info(f"Configuring POS: {pos_name}")
         self.click_pos_button()  # Abre el modal (método heredado de HomePage)
-        time.sleep(1)  # Espera a que se abra completamente el modal
+        self.waits.settle("Login: POS modal", replaces=1)  # Espera a que se abra completamente el modal
         self.select_pos(pos_name)  # Selecciona el POS (método heredado de HomePage)
         logger.info(f"POS '{pos_name}' configured successfully")
 
@@ -159,7 +159,7 @@ class LoginPage(HomePage):
                 # Hacer click usando JavaScript para mayor confiabilidad
                 self.driver.execute_script("arguments[0].click();", one_way_radio)
                 logger.info("✓ One-way trip type selected (journeytypeId_1)")
-                time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+                self.waits.settle("Login: trip type", replaces=0.5)
                 return True
 
             elif trip_type.lower() == "round-trip":
@@ -169,7 +169,7 @@ class LoginPage(HomePage):
                 )
                 self.driver.execute_script("arguments[0].click();", round_trip_radio)
                 logger.info("✓ Round-trip trip type selected (journeytypeId_0)")
-                time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+                self.waits.settle("Login: trip type", replaces=0.5)
                 return True
 
             else:
@@ -191,36 +191,32 @@ class LoginPage(HomePage):
         """
         logger.info(f"Selecting origin: {city_code} by searching '{search_text}'")
 
-        # OPTIMIZADO: 2s → 1s (ahorro: 1s)
-        time.sleep(1)
+        # ⏳ Se ESPERA (WAIT ENGINE): Página asentada antes de abrir el buscador (antes: sleeps fijos de 1s + 0.5s)
+        self.waits.settle("Login: before origin", replaces=1.5)
 
         # Scroll al top
         self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
 
         # Encontrar el botón de origen (puede no estar visible pero sí presente)
         origin_btn = self.wait.until(EC.presence_of_element_located(self.ORIGIN_BUTTON))
 
         # Hacer el botón visible y clickeable con JavaScript (bypassing CSS display issues)
         self.driver.execute_script("arguments[0].style.display='block'; arguments[0].style.visibility='visible';", origin_btn)
-        time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
 
         # Hacer click con JavaScript (más confiable)
         self.driver.execute_script("arguments[0].click();", origin_btn)
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
 
         # Escribir en el input y esperar opciones
-        origin_input = self.wait.until(EC.visibility_of_element_located(self.ORIGIN_INPUT))
+        origin_input = self.waits.until(EC.visibility_of_element_located(self.ORIGIN_INPUT),
+                                        "Login: origin input", replaces=0.8)
         origin_input.clear()
         origin_input.send_keys(search_text)
-        time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
 
-        # Esperar a que la opción específica esté clickeable
-        airport_option = self.wait.until(
-            EC.element_to_be_clickable((By.ID, city_code))
-        )
+        # Esperar a que la opción específica esté clickeable (la búsqueda de aeropuertos es un XHR)
+        airport_option = self.waits.until(element_clickable((By.ID, city_code)), "Login: origin option",
+                                          replaces=1.5)
         airport_option.click()
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.waits.settle("Login: origin selected", replaces=0.5)
 
         logger.info(f"Origin '{city_code}' selected successfully")
 
@@ -238,14 +234,12 @@ class LoginPage(HomePage):
         dest_input = self.wait.until(EC.visibility_of_element_located(self.DESTINATION_INPUT))
         dest_input.clear()
         dest_input.send_keys(search_text)
-        time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
 
-        # Esperar a que la opción específica esté clickeable
-        airport_option = self.wait.until(
-            EC.element_to_be_clickable((By.ID, city_code))
-        )
+        # Esperar a que la opción específica esté clickeable (la búsqueda de aeropuertos es un XHR)
+        airport_option = self.waits.until(element_clickable((By.ID, city_code)), "Login: destination option",
+                                          replaces=1.5)
         airport_option.click()
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.waits.settle("Login: destination selected", replaces=0.5)
 
         logger.info(f"Destination '{city_code}' selected successfully")
 
@@ -276,7 +270,7 @@ class LoginPage(HomePage):
             EC.element_to_be_clickable((By.XPATH, departure_xpath))
         )
         departure_element.click()
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+        self.waits.settle("Login: departure date", replaces=0.5)
         logger.info(f"Departure date selected: {departure_date.strftime('%Y-%m-%d')} (day {departure_day})")
 
         # Seleccionar día de regreso si se proporciona
@@ -291,7 +285,7 @@ class LoginPage(HomePage):
                 EC.element_to_be_clickable((By.XPATH, return_xpath))
             )
             return_element.click()
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
+            self.waits.settle("Login: return date", replaces=0.5)
             logger.info(f"Return date selected: {return_date.strftime('%Y-%m-%d')} (day {return_day})")
 
     def select_passengers(self, adults=3, teens=3, children=3, infants=3):
@@ -319,23 +313,19 @@ class LoginPage(HomePage):
         # IMPORTANTE: El modal de pasajeros se abre AUTOMÁTICAMENTE después de seleccionar fechas
         # NO hacer click en el botón de pasajeros, ya que eso lo CERRARÍA
         logger.info("Waiting for passengers modal to open automatically after date selection...")
-        time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
 
-        # Esperar a que los botones + estén presentes
+        # ⏳ Se ESPERA (WAIT ENGINE): Botones + presentes (antes: sleeps fijos de 2s + 0.5s)
         # Selector correcto: <button _ngcontent-gjl-c21="" class="ui-num-ud_button plus"></button>
         plus_button_selector = "//button[contains(@class, 'ui-num-ud_button') and contains(@class, 'plus')]"
 
         try:
-            self.wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, plus_button_selector))
-            )
+            self.waits.until(count_at_least((By.XPATH, plus_button_selector), 1), "Login: passengers modal",
+                             replaces=2.5)
             logger.info("✓ Passenger modal opened and plus buttons found")
         except:
             logger.error("✗ Could not find plus buttons - modal may not have opened")
             raise
 
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
-
         # Función para hacer click en el botón + por índice
         def click_plus_by_index(index, times, passenger_type):
             """
@@ -364,11 +354,11 @@ class LoginPage(HomePage):
 
                     # Scroll al botón para visibilidad
                     self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", plus_btn)
-                    time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s por click)
 
                     # Click con JavaScript
                     self.driver.execute_script("arguments[0].click();", plus_btn)
-                    time.sleep(0.4)  # OPTIMIZADO: 0.6s → 0.4s (ahorro: 0.2s por click)
+                    # Cambio local (sin XHR): basta con que Angular esté estable (idle_ms=0)
+                    self.waits.settle(f"Login: {passenger_type} +1", replaces=0.55, idle_ms=0)
 
                     logger.info(f"  ✓ {passenger_type} click {i+1}/{times} successful")
 
@@ -390,14 +380,12 @@ class LoginPage(HomePage):
         # BEBÉS (índice 3): Inicia en 0, queremos 3 → 3 clicks
         click_plus_by_index(3, infants, "Infants")
 
-        # Esperar un momento antes de confirmar
-        time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
-
         # Confirmar selección de pasajeros
         logger.info("Confirming passenger selection...")
-        confirm_btn = self.wait.until(EC.element_to_be_clickable(self.PASSENGERS_CONFIRM_BUTTON))
+        confirm_btn = self.waits.until(element_clickable(self.PASSENGERS_CONFIRM_BUTTON), "Login: passengers confirm",
+                                       replaces=0.5)
         confirm_btn.click()
-        time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+        self.waits.settle("Login: passengers confirmed", replaces=1.5)
         logger.info("✓ Passengers selection confirmed and modal closed")
         logger.info(f"TOTAL: {adults} adults + {teens} teens + {children} children + {infants} infants = {adults+teens+children} passengers + {infants} infants")
 
@@ -410,8 +398,8 @@ class LoginPage(HomePage):
 
         # Scroll al botón y usar JavaScript click para evitar interceptación
         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", search_btn)
-        time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
         self.driver.execute_script("arguments[0].click();", search_btn)
 
-        time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+        # ⏳ Se ESPERA (WAIT ENGINE): Búsqueda enviada (antes: sleeps fijos de 0.3s + 2s)
+        self.waits.settle("Login: search", replaces=2.3)
         logger.info("Search button clicked, waiting for Select Flight page to load")
@@ -7,18 +7,78 @@ Contiene todos los selectores y acciones para llenar información de pasajeros.
 Caso 1 y 2: Ingresar información de pasajeros (datos fake permitidos)
 
 OPTIMIZACIÓN V3: Uso de prefijos fijos + índice + búsquedas directas por CSS Selector
+LLENADO EN LOTE: todos los pasajeros en un execute_script + una verificación (respaldo: campo a campo)
 """
 
 # ==================== IMPORTS ====================
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from utils.wait_engine import WaitEngine, count_at_least
 import logging
-import time
 
 # ==================== LOGGER ====================
 logger = logging.getLogger(__name__)
 
+# ==================== JAVASCRIPT (LLENADO EN LOTE) ====================
+# arguments[0]: [{index, first_name, ..., nationality}], arguments[1]: [[campo, selector, tipo], ...]
+# Devuelve por pasajero {campo: [estado, valor esperado]} (estado: set | missing | error)
+_BULK_FILL_JS = """
+var specs = arguments[0], fields = arguments[1];
+var setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+function fire(element, type) { element.dispatchEvent(new Event(type, {bubbles: true})); }
+function clean(text) { return (text || '').replace(/\\s+/g, ' ').trim(); }
+function optionByText(text) {
+    var options = document.querySelectorAll("button[role='option']");
+    for (var i = 0; i < options.length; i++) {
+        if ((options[i].textContent || '').indexOf(text) >= 0) { return options[i]; }
+    }
+    return null;
+}
+var results = [];
+for (var p = 0; p < specs.length; p++) {
+    var result = {};
+    for (var f = 0; f < fields.length; f++) {
+        var name = fields[f][0], kind = fields[f][2], value = specs[p][name];
+        var element = document.querySelectorAll(fields[f][1])[specs[p].index];
+        if (!element) { result[name] = ['missing', null]; continue; }
+        try {
+            if (kind === 'input') {
+                element.focus();
+                setValue.call(element, value);
+                fire(element, 'input'); fire(element, 'change'); fire(element, 'blur');
+                result[name] = ['set', value];
+                continue;
+            }
+            element.click();
+            var option = kind === 'option-text' ? optionByText(value) : document.getElementById(element.id + value);
+            if (!option) { element.click(); result[name] = ['missing', null]; continue; }
+            var text = clean(option.textContent);
+            option.click();
+            result[name] = ['set', text];
+        } catch (e) { result[name] = ['error', String(e)]; }
+    }
+    results.push(result);
+}
+return results;
+"""
+
+# Lee el formulario: value de los inputs y texto visible del botón de cada dropdown
+_READ_FORM_JS = """
+var indexes = arguments[0], fields = arguments[1], forms = [];
+for (var p = 0; p < indexes.length; p++) {
+    var values = {};
+    for (var f = 0; f < fields.length; f++) {
+        var element = document.querySelectorAll(fields[f][1])[indexes[p]];
+        values[fields[f][0]] = !element ? null
+            : fields[f][2] === 'input' ? element.value : (element.textContent || '').replace(/\\s+/g, ' ').trim();
+    }
+    forms.push(values);
+}
+return forms;
+"""
+
 # ==================== CLASE ====================
 class PassengersPage:
     """
@@ -26,11 +86,28 @@ class PassengersPage:
 
     Responsabilidades:
     - Esperar a que cargue la página Passengers
-    - Llenar formularios de pasajeros usando prefijos fijos + índice (OPTIMIZADO V3)
+    - Llenar formularios de pasajeros en lote (un execute_script) con respaldo campo a campo
     - Validar que se complete correctamente
     - Continuar al siguiente paso
     """
 
+    # ==================== LOCATORS ====================
+
+    # Campos del formulario de cada pasajero (prefijo del ID + índice del pasajero), en orden de llenado
+    # Tipo: input (texto), option-id (opción = ID del botón + sufijo), option-text (opción por texto visible)
+    FORM_FIELDS = {
+        "first_name": ("input[id^='IdFirstName']", "input"),
+        "last_name": ("input[id^='IdLastName']", "input"),
+        "gender": ("button[id^='IdPaxGender_']", "option-id"),
+        "year": ("button[id^='dateYearId_IdDateOfBirthHidden_']", "option-id"),
+        "month": ("button[id^='dateMonthId_IdDateOfBirthHidden_']", "option-id"),
+        "day": ("button[id^='dateDayId_IdDateOfBirthHidden_']", "option-id"),
+        "nationality": ("button[id^='IdDocNationality_']", "option-text"),
+    }
+
+    # Año base de cada tipo de pasajero (sufijo de la opción de año = -(base - año))
+    YEAR_BASES = {"Adult": 2010, "Infant": 2025, "Teen": 2013, "Child": 2023}
+
     # ==================== CONSTRUCTOR ====================
     def __init__(self, driver):
         """
@@ -41,6 +118,7 @@ class PassengersPage:
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 25)
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
         logger.info("PassengersPage object initialized (OPTIMIZED V3 - Prefix + Index)")
 
     # ==================== MÉTODOS ====================
@@ -55,17 +133,16 @@ class PassengersPage:
         logger.info("Waiting for Passengers page to load...")
 
         try:
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
-
             current_url = self.driver.current_url
             logger.info(f"Current URL: {current_url}")
 
             # Esperar a que aparezcan los campos de nombre usando CSS Selector con prefijo
             try:
                 logger.info("Waiting for passenger form fields...")
-                wait_extended = WebDriverWait(self.driver, 30)
-                first_name_inputs = wait_extended.until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "input[id^='IdFirstName']"))
+                # ⏳ Se ESPERA (WAIT ENGINE): Formularios presentes (antes: sleep fijo de 2s + espera de presencia)
+                first_name_inputs = self.waits.until(
+                    count_at_least((By.CSS_SELECTOR, "input[id^='IdFirstName']"), 1),
+                    "Passengers: forms loaded", timeout=30, replaces=2
                 )
                 logger.info(f"✓ Found {len(first_name_inputs)} passenger forms")
 
@@ -86,10 +163,131 @@ class PassengersPage:
             logger.error(f"✗ Error waiting for Passengers page: {e}")
             return False
 
+    def _passenger_field_values(self, passenger_type, first_name, last_name, birth_date, gender, nationality):
+        """
+        Valores de cada campo de FORM_FIELDS para un pasajero.
+
+        Los dropdowns usan el sufijo del ID de la opción (ID del botón + sufijo);
+        la nacionalidad se busca por el texto visible de la opción.
+
+        Returns:
+            dict: {campo: valor o sufijo}
+        """
+        year, month, day = (int(part) for part in birth_date.split("-"))
+        year_base = self.YEAR_BASES.get(passenger_type, 2010)
+        return {
+            "first_name": first_name,
+            "last_name": last_name,
+            "gender": "-0" if gender == "M" else "-1",
+            "year": str(-(year_base - year)),
+            "month": f"-{month - 1}",  # Forzar formato con guión
+            "day": str(-(day - 1)),
+            "nationality": nationality,
+        }
+
+    def _fill_text_field(self, field, passenger_index, value):
+        """
+        Escribe en un input del pasajero con send_keys (camino campo a campo).
+
+        Returns:
+            bool: True si el input existe y se llenó
+        """
+        # 🔍 Se BUSCA (SELENIUM): Input del pasajero por prefijo + índice
+        inputs = self.driver.find_elements(By.CSS_SELECTOR, self.FORM_FIELDS[field][0])
+        if len(inputs) <= passenger_index:
+            return False
+
+        text_input = inputs[passenger_index]
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", text_input)
+        text_input.clear()
+        # ⌨️ Se INGRESA (SELENIUM): Valor del campo
+        text_input.send_keys(value)
+        logger.info(f"  ✓ {field} filled: {value}")
+        return True
+
+    def _select_dropdown_option(self, field, passenger_index, option_suffix):
+        """
+        Abre un dropdown del pasajero y hace click en la opción (ID del botón + sufijo).
+
+        Returns:
+            bool: True si se hizo click en la opción
+        """
+        # 🔍 Se BUSCA (SELENIUM): Botón del dropdown por prefijo + índice
+        buttons = self.driver.find_elements(By.CSS_SELECTOR, self.FORM_FIELDS[field][0])
+        if len(buttons) <= passenger_index:
+            return False
+
+        button = buttons[passenger_index]
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
+        # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir el dropdown
+        self.driver.execute_script("arguments[0].click();", button)
+        self.waits.settle(f"Passengers: {field} dropdown", replaces=0.3, idle_ms=0)
+
+        option_id = f"{button.get_attribute('id')}{option_suffix}"
+        selected = False
+        try:
+            # 🖱️ Se PRESIONA (SELENIUM): Opción específica del dropdown
+            option = self.driver.find_element(By.ID, option_id)
+            self.driver.execute_script("arguments[0].click();", option)
+            logger.info(f"  ✓ {field} selected (ID: {option_id})")
+            selected = True
+        except Exception:
+            logger.warning(f"  ✗ {field} option not found with ID {option_id}")
+
+        self.waits.settle(f"Passengers: {field} selected", replaces=0.15, idle_ms=0)
+        return selected
+
+    def _select_nationality(self, passenger_index, nationality):
+        """
+        Abre el dropdown de nacionalidad y elige la opción por texto visible (traducido según idioma).
+
+        Returns:
+            bool: True si se hizo click en la opción
+        """
+        buttons = self.driver.find_elements(By.CSS_SELECTOR, self.FORM_FIELDS["nationality"][0])
+        if len(buttons) <= passenger_index:
+            return False
+
+        button = buttons[passenger_index]
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
+        self.driver.execute_script("arguments[0].click();", button)
+        self.waits.settle("Passengers: nationality dropdown", replaces=0.2, idle_ms=0)
+
+        selected = False
+        try:
+            # XPath: //button[@role='option' and contains(., '{nationality}')]
+            nationality_xpath = f"//button[@role='option' and contains(., '{nationality}')]"
+            nationality_option = self.wait.until(
+                EC.presence_of_element_located((By.XPATH, nationality_xpath))
+            )
+            self.driver.execute_script("arguments[0].click();", nationality_option)
+            logger.info(f"  ✓ Nationality selected: {nationality}")
+            selected = True
+        except Exception as e:
+            logger.warning(f"  ✗ Nationality '{nationality}' not found: {e}")
+
+        self.waits.settle("Passengers: nationality selected", replaces=0.1, idle_ms=0)
+        return selected
+
+    def _fill_field(self, field, passenger_index, value):
+        """Llena un campo con el camino campo a campo (input, dropdown por ID o nacionalidad)."""
+        kind = self.FORM_FIELDS[field][1]
+        try:
+            if kind == "input":
+                return self._fill_text_field(field, passenger_index, value)
+            if kind == "option-id":
+                return self._select_dropdown_option(field, passenger_index, value)
+            return self._select_nationality(passenger_index, value)
+        except Exception as e:
+            logger.warning(f"  Could not fill {field}: {e}")
+            return False
+
     def fill_passenger_info(self, passenger_index, passenger_type, first_name, last_name,
                            birth_date, gender="M", nationality="Colombia"):
         """
-        Llena la información de un pasajero usando prefijos fijos + índice (OPTIMIZADO V3).
+        Llena la información de un pasajero campo a campo usando prefijos fijos + índice (OPTIMIZADO V3).
+
+        Es el camino de respaldo del llenado en lote (fill_all_passengers).
 
         Args:
             passenger_index (int): Índice del pasajero (0-3)
@@ -106,191 +304,17 @@ class PassengersPage:
         logger.info(f"Filling passenger {passenger_index + 1} ({passenger_type}): {first_name} {last_name}")
 
         try:
-            # ==================== PASO 1: NOMBRE ====================
-            logger.info(f"  1. Filling first name: {first_name}")
-            # 🔍 Se BUSCA (SELENIUM): Campo de nombre del pasajero
-            first_name_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[id^='IdFirstName']")
+            values = self._passenger_field_values(passenger_type, first_name, last_name,
+                                                  birth_date, gender, nationality)
 
-            if len(first_name_inputs) <= passenger_index:
+            # ==================== PASO 1: NOMBRE ====================
+            if not self._fill_text_field("first_name", passenger_index, first_name):
                 logger.error(f"Passenger form {passenger_index + 1} not found")
                 return False
 
-            first_name_field = first_name_inputs[passenger_index]
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", first_name_field)
-            time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
-            first_name_field.clear()
-            # ⌨️ Se INGRESA (SELENIUM): Nombre del pasajero
-            first_name_field.send_keys(first_name)
-            logger.info(f"  ✓ First name filled: {first_name}")
-
-            # ==================== PASO 2: APELLIDO ====================
-            logger.info(f"  2. Filling last name: {last_name}")
-            # 🔍 Se BUSCA (SELENIUM): Campo de apellido del pasajero
-            last_name_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[id^='IdLastName']")
-            if len(last_name_inputs) > passenger_index:
-                last_name_field = last_name_inputs[passenger_index]
-                last_name_field.clear()
-                # ⌨️ Se INGRESA (SELENIUM): Apellido del pasajero
-                last_name_field.send_keys(last_name)
-                logger.info(f"  ✓ Last name filled: {last_name}")
-
-            # ==================== PASO 3: GÉNERO ====================
-            logger.info(f"  3. Selecting gender: {gender}")
-            try:
-                # 🔍 Se BUSCA (SELENIUM): Dropdown de género
-                gender_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[id^='IdPaxGender_']")
-                if len(gender_buttons) > passenger_index:
-                    gender_button = gender_buttons[passenger_index]
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", gender_button)
-                    time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
-                    # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir dropdown de género
-                    self.driver.execute_script("arguments[0].click();", gender_button)
-                    time.sleep(0.2)  # OPTIMIZADO: 0.3s → 0.2s (ahorro: 0.1s)
-
-                    # Obtener el ID del botón para construir el ID de la opción
-                    gender_button_id = gender_button.get_attribute("id")
-                    gender_suffix = "-0" if gender == "M" else "-1"
-                    gender_option_id = f"{gender_button_id}{gender_suffix}"
-
-                    try:
-                        # 🖱️ Se PRESIONA (SELENIUM): Opción de género específica (M/F)
-                        gender_option = self.driver.find_element(By.ID, gender_option_id)
-                        self.driver.execute_script("arguments[0].click();", gender_option)
-                        gender_text = "Masculino" if gender == "M" else "Femenino"
-                        logger.info(f"  ✓ Gender selected: {gender_text}")
-                    except:
-                        logger.warning(f"  Could not find gender option with ID {gender_option_id}")
-
-                    time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s)
-            except Exception as e:
-                logger.warning(f"  Could not select gender: {e}")
-
-            # ==================== PASO 4: FECHA DE NACIMIENTO ====================
-            logger.info(f"  4. Filling birth date: {birth_date} (Year → Month → Day)")
-            try:
-                year, month, day = birth_date.split("-")
-                year, month, day = int(year), int(month), int(day)
-
-                month_names = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-                             "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
-
-                # A) AÑO
-                logger.info(f"  → Selecting YEAR: {year}")
-                year_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[id^='dateYearId_IdDateOfBirthHidden_']")
-                if len(year_buttons) > passenger_index:
-                    year_button = year_buttons[passenger_index]
-                    year_button_id = year_button.get_attribute("id")
-
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", year_button)
-                    time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
-                    self.driver.execute_script("arguments[0].click();", year_button)
-                    time.sleep(0.2)  # OPTIMIZADO: 0.3s → 0.2s (ahorro: 0.1s)
-
-                    # Buscar año por CSS Selector (prefijo del ID + sufijo calculado)
-                    # Intentar calcular sufijo basado en año
-                    year_bases = {"Adult": 2010, "Infant": 2025, "Teen": 2013, "Child": 2023}
-                    year_base = year_bases.get(passenger_type, 2010)
-                    year_suffix = -(year_base - year)
-                    year_option_id = f"{year_button_id}{year_suffix}"
-
-                    try:
-                        year_option = self.driver.find_element(By.ID, year_option_id)
-                        self.driver.execute_script("arguments[0].click();", year_option)
-                        logger.info(f"  ✓ Year selected: {year} (ID: {year_option_id})")
-                    except:
-                        logger.warning(f"  ✗ Year {year} not found with ID {year_option_id}")
-
-                    time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s)
-
-                # B) MES
-                logger.info(f"  → Selecting MONTH: {month_names[month-1]}")
-                # 🔍 Se BUSCA (SELENIUM): Dropdown de mes para fecha de nacimiento
-                month_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[id^='dateMonthId_IdDateOfBirthHidden_']")
-                if len(month_buttons) > passenger_index:
-                    month_button = month_buttons[passenger_index]
-                    month_button_id = month_button.get_attribute("id")
-
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", month_button)
-                    time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
-                    # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir dropdown de meses
-                    self.driver.execute_script("arguments[0].click();", month_button)
-                    time.sleep(0.2)  # OPTIMIZADO: 0.3s → 0.2s (ahorro: 0.1s)
-
-                    # Calcular sufijo: -(mes - 1), pero forzar formato con guión
-                    month_value = month - 1
-                    month_option_id = f"{month_button_id}-{month_value}"
-
-                    try:
-                        # 🖱️ Se PRESIONA (SELENIUM): Mes específico en dropdown
-                        month_option = self.driver.find_element(By.ID, month_option_id)
-                        self.driver.execute_script("arguments[0].click();", month_option)
-                        logger.info(f"  ✓ Month selected: {month_names[month-1]} (ID: {month_option_id})")
-                    except:
-                        logger.warning(f"  ✗ Month {month_names[month-1]} not found with ID {month_option_id}")
-
-                    time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s)
-
-                # C) DÍA
-                logger.info(f"  → Selecting DAY: {day}")
-                # 🔍 Se BUSCA (SELENIUM): Dropdown de día para fecha de nacimiento
-                day_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[id^='dateDayId_IdDateOfBirthHidden_']")
-                if len(day_buttons) > passenger_index:
-                    day_button = day_buttons[passenger_index]
-                    day_button_id = day_button.get_attribute("id")
-
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", day_button)
-                    time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
-                    # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir dropdown de días
-                    self.driver.execute_script("arguments[0].click();", day_button)
-                    time.sleep(0.2)  # OPTIMIZADO: 0.3s → 0.2s (ahorro: 0.1s)
-
-                    day_suffix = -(day - 1)
-                    day_option_id = f"{day_button_id}{day_suffix}"
-
-                    try:
-                        # 🖱️ Se PRESIONA (SELENIUM): Día específico en dropdown
-                        day_option = self.driver.find_element(By.ID, day_option_id)
-                        self.driver.execute_script("arguments[0].click();", day_option)
-                        logger.info(f"  ✓ Day selected: {day} (ID: {day_option_id})")
-                    except:
-                        logger.warning(f"  ✗ Day {day} not found with ID {day_option_id}")
-
-                    time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s)
-
-            except Exception as e:
-                logger.warning(f"  Could not fill birth date: {e}")
-                import traceback
-                traceback.print_exc()
-
-            # ==================== PASO 5: NACIONALIDAD ====================
-            # 🚀 XPATH OPTIMIZADO: Ya usa XPath directo para buscar nacionalidad
-            logger.info(f"  5. Selecting nationality: {nationality}")
-            try:
-                nationality_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[id^='IdDocNationality_']")
-                if len(nationality_buttons) > passenger_index:
-                    nationality_button = nationality_buttons[passenger_index]
-                    nationality_button_id = nationality_button.get_attribute("id")
-
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", nationality_button)
-                    time.sleep(0.05)  # 🚀 OPTIMIZADO: 0.1s → 0.05s (ahorro: 0.05s × 4 = 0.2s)
-                    self.driver.execute_script("arguments[0].click();", nationality_button)
-                    time.sleep(0.15)  # 🚀 OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s × 4 = 0.2s)
-
-                    # Buscar opción por texto visible (traducido según idioma)
-                    # XPath: //button[@role='option' and contains(., '{nationality}')]
-                    try:
-                        nationality_xpath = f"//button[@role='option' and contains(., '{nationality}')]"
-                        nationality_option = self.wait.until(
-                            EC.presence_of_element_located((By.XPATH, nationality_xpath))
-                        )
-                        self.driver.execute_script("arguments[0].click();", nationality_option)
-                        logger.info(f"  ✓ Nationality selected: {nationality}")
-                    except Exception as e:
-                        logger.warning(f"  ✗ Nationality '{nationality}' not found: {e}")
-
-                    time.sleep(0.1)  # 🚀 OPTIMIZADO: 0.15s → 0.1s (ahorro: 0.05s × 4 = 0.2s)
-            except Exception as e:
-                logger.warning(f"  Could not select nationality: {e}")
+            # ==================== PASOS 2-6: APELLIDO, GÉNERO, AÑO → MES → DÍA, NACIONALIDAD ====================
+            for field in list(self.FORM_FIELDS)[1:]:
+                self._fill_field(field, passenger_index, values[field])
 
             logger.info(f"✓ Passenger {passenger_index + 1} ({passenger_type}) filled successfully")
 
@@ -312,36 +336,115 @@ class PassengersPage:
 
             return False
 
-    def fill_all_passengers(self, passengers_data):
+    def _bulk_fill(self, passengers_data):
+        """
+        Llena TODOS los pasajeros en una llamada execute_script y verifica el
+        formulario resultante en otra.
+
+        Inputs: setter nativo de value + eventos input/change/blur (lo que escucha
+        el ValueAccessor de Angular). Dropdowns: click en el botón y en la opción
+        dentro del mismo script.
+
+        Returns:
+            dict: {índice de pasajero: [campos que no quedaron bien]} (vacío = todo OK),
+                  o None si el navegador rechazó el llenado en lote
+        """
+        fields = [[field, selector, kind] for field, (selector, kind) in self.FORM_FIELDS.items()]
+        specs = []
+        for index, passenger in enumerate(passengers_data):
+            spec = self._passenger_field_values(
+                passenger["type"], passenger["first_name"], passenger["last_name"], passenger["birth_date"],
+                passenger.get("gender", "M"), passenger.get("nationality", "Colombia")
+            )
+            spec["index"] = index
+            specs.append(spec)
+
+        try:
+            # ⌨️ Se INGRESA (JAVASCRIPT): Todos los campos de todos los pasajeros en UNA llamada
+            applied = self.driver.execute_script(_BULK_FILL_JS, specs, fields)
+            # ⏳ Se ESPERA (WAIT ENGINE): Angular procese los eventos antes de leer el formulario
+            self.waits.settle("Passengers: bulk fill", replaces=0.5, idle_ms=0)
+            # 🔍 Se VERIFICA (JAVASCRIPT): Formulario resultante en UNA llamada
+            current = self.driver.execute_script(_READ_FORM_JS, [spec["index"] for spec in specs], fields)
+        except WebDriverException as e:
+            logger.warning(f"Bulk fill rejected by the browser: {str(e)[:100]}")
+            return None
+
+        pending = {}
+        for spec, result, form in zip(specs, applied, current):
+            failed = []
+            for field, _, kind in fields:
+                status, expected = result.get(field, ["missing", None])
+                value = form.get(field)
+                if status != "set" or value is None:
+                    failed.append(field)
+                elif kind == "input" and value != expected:
+                    failed.append(field)
+                elif kind != "input" and (not value or (expected and expected not in value)):
+                    failed.append(field)
+            if failed:
+                pending[spec["index"]] = failed
+        return pending
+
+    def fill_all_passengers(self, passengers_data, bulk=True):
         """
         Llena la información de todos los pasajeros.
 
+        Modo lote (default): todos los campos en un execute_script y una sola
+        verificación; los campos que no quedaron bien (o todo, si el navegador
+        rechaza el script) se llenan con el camino campo a campo.
+
         Args:
             passengers_data (list): Lista de diccionarios con datos
+            bulk (bool): False para llenar siempre campo a campo
 
         Returns:
             bool: True si se llenaron todos
         """
-        logger.info(f"Filling {len(passengers_data)} passengers...")
+        logger.info(f"Filling {len(passengers_data)} passengers{' (bulk)' if bulk else ''}...")
+
+        pending = self._bulk_fill(passengers_data) if bulk else None
+
+        if pending is not None:
+            all_success = True
+            if not pending:
+                logger.info(f"✓ Bulk fill verified for all {len(passengers_data)} passengers")
+            for index, fields in pending.items():
+                passenger = passengers_data[index]
+                logger.warning(f"Bulk fill incomplete for passenger {index + 1} ({passenger['type']}): "
+                               f"{', '.join(fields)} → per-field fallback")
+                values = self._passenger_field_values(
+                    passenger["type"], passenger["first_name"], passenger["last_name"], passenger["birth_date"],
+                    passenger.get("gender", "M"), passenger.get("nationality", "Colombia")
+                )
+                for field in fields:
+                    if not self._fill_field(field, index, values[field]):
+                        logger.warning(f"Failed to fill {field} for passenger {index + 1}")
+                        all_success = False
 
-        all_success = True
-        for index, passenger in enumerate(passengers_data):
-            success = self.fill_passenger_info(
-                passenger_index=index,
-                passenger_type=passenger["type"],
-                first_name=passenger["first_name"],
-                last_name=passenger["last_name"],
-                birth_date=passenger["birth_date"],
-                gender=passenger.get("gender", "M"),
-                nationality=passenger.get("nationality", "Colombia")
-            )
+            # Screenshot
+            screenshot_name = "reports/debug_passengers_bulk.png"
+            self.driver.save_screenshot(screenshot_name)
+            logger.info(f"📸 Screenshot: {screenshot_name}")
+        else:
+            all_success = True
+            for index, passenger in enumerate(passengers_data):
+                success = self.fill_passenger_info(
+                    passenger_index=index,
+                    passenger_type=passenger["type"],
+                    first_name=passenger["first_name"],
+                    last_name=passenger["last_name"],
+                    birth_date=passenger["birth_date"],
+                    gender=passenger.get("gender", "M"),
+                    nationality=passenger.get("nationality", "Colombia")
+                )
 
-            if not success:
-                logger.warning(f"Failed to fill passenger {index + 1}")
-                all_success = False
+                if not success:
+                    logger.warning(f"Failed to fill passenger {index + 1}")
+                    all_success = False
 
-            # OPTIMIZADO: Reducido de 2s → 1s (ahorro: 1s por pasajero = 3s total)
-            time.sleep(1)
+                # ⏳ Se ESPERA (WAIT ENGINE): Formulario asentado antes del siguiente pasajero (antes: sleep fijo de 1s)
+                self.waits.settle("Passengers: passenger filled", replaces=1)
 
         if all_success:
             logger.info("✓ All passengers filled successfully")
@@ -374,7 +477,7 @@ class PassengersPage:
         try:
             # Scroll hacia abajo para ver el contenedor
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.9);")
-            time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
+            self.waits.settle("Passengers: holder section", replaces=0.3)
 
             # PASO 1: SELECCIONAR PASAJERO (usualmente ya está preseleccionado el adulto)
             logger.info("  1. Checking passenger selection (Adult should be pre-selected)...")
@@ -390,15 +493,14 @@ class PassengersPage:
             try:
                 phone_prefix_button = self.driver.find_element(By.ID, "phone_prefixPhoneId")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", phone_prefix_button)
-                time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
                 self.driver.execute_script("arguments[0].click();", phone_prefix_button)
-                time.sleep(0.2)  # OPTIMIZADO: 0.3s → 0.2s (ahorro: 0.1s)
+                self.waits.settle("Passengers: phone prefix dropdown", replaces=0.3, idle_ms=0)
 
                 # Seleccionar Colombia (primer item: -0)
                 phone_prefix_option = self.driver.find_element(By.ID, "phone_prefixPhoneId-0")
                 self.driver.execute_script("arguments[0].click();", phone_prefix_option)
                 logger.info("  ✓ Phone prefix selected: Colombia (+57)")
-                time.sleep(0.15)  # OPTIMIZADO: 0.2s → 0.15s (ahorro: 0.05s)
+                self.waits.settle("Passengers: phone prefix selected", replaces=0.15, idle_ms=0)
             except Exception as e:
                 logger.warning(f"  Could not select phone prefix: {e}")
 
@@ -407,7 +509,6 @@ class PassengersPage:
             try:
                 phone_input = self.driver.find_element(By.ID, "phone_phoneNumberId")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", phone_input)
-                time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
                 phone_input.clear()
                 phone_input.send_keys(phone)
                 logger.info(f"  ✓ Phone number filled: {phone}")
@@ -419,7 +520,6 @@ class PassengersPage:
             try:
                 email_input = self.driver.find_element(By.ID, "email")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", email_input)
-                time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
                 email_input.clear()
                 email_input.send_keys(email)
                 logger.info(f"  ✓ Email filled: {email}")
@@ -431,7 +531,6 @@ class PassengersPage:
             try:
                 confirm_email_input = self.driver.find_element(By.ID, "confirmEmail")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", confirm_email_input)
-                time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
                 confirm_email_input.clear()
                 confirm_email_input.send_keys(email)
                 logger.info(f"  ✓ Email confirmed: {email}")
@@ -443,7 +542,6 @@ class PassengersPage:
             try:
                 checkbox = self.driver.find_element(By.ID, "sendNewsLetter")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", checkbox)
-                time.sleep(0.1)  # OPTIMIZADO: 0.2s → 0.1s (ahorro: 0.1s)
 
                 # Verificar si ya está seleccionado
                 if not checkbox.is_selected():
@@ -485,7 +583,7 @@ class PassengersPage:
 
         try:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)  # OPTIMIZADO: 2s → 1s (ahorro: 1s)
+            self.waits.settle("Passengers: before continue", replaces=1)
 
             continue_selectors = [
                 "//button[contains(@class, 'btn-next')]",
@@ -504,10 +602,10 @@ class PassengersPage:
                         continue_btn = self.driver.find_element(By.XPATH, selector)
 
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", continue_btn)
-                    time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
                     self.driver.execute_script("arguments[0].click();", continue_btn)
                     logger.info("✓ Continue button clicked")
-                    time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+                    # ⏳ Se ESPERA (WAIT ENGINE): Navegación a Services (antes: sleeps fijos de 0.3s + 2s)
+                    self.waits.settle("Passengers: continue", replaces=2.3)
                     return True
                 except:
                     continue
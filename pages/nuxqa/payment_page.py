@@ -12,6 +12,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+from utils.wait_engine import WaitEngine
+from utils.dom_query import no_implicit_wait, find_present
 import logging
 import time
 
@@ -52,6 +55,9 @@ class PaymentPage:
     # Botón Final
     CONFIRM_PAYMENT_BUTTON = (By.XPATH, "//button[contains(@class, 'save-user-consent-confirmation')]")
 
+    # Cookie que OneTrust escribe al aceptar (si existe, el modal de cookies no aparece)
+    CONSENT_COOKIE_NAME = "OptanonAlertBoxClosed"
+
     # ==================== CONSTRUCTOR ====================
     def __init__(self, driver):
         """
@@ -62,10 +68,24 @@ class PaymentPage:
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 25)
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
         logger.info("PaymentPage object initialized")
 
     # ==================== MÉTODOS ====================
 
+    def _consent_cookie_present(self):
+        """
+        Indica si el consentimiento de cookies de OneTrust ya está guardado.
+
+        Returns:
+            bool: True si existe la cookie OptanonAlertBoxClosed
+        """
+        try:
+            return self.driver.get_cookie(self.CONSENT_COOKIE_NAME) is not None
+        except Exception as e:
+            logger.debug(f"Could not read consent cookie: {e}")
+            return False
+
     def wait_for_page_load(self):
         """
         Espera a que la página de Payment cargue completamente.
@@ -79,9 +99,12 @@ class PaymentPage:
         logger.info("Waiting for Payment page to load...")
 
         try:
-            # Esperar a que cambie la URL (reducido - página carga rápido)
-            logger.info("Waiting 2 seconds for page navigation...")
-            time.sleep(2)
+            # ⏳ Se ESPERA (WAIT ENGINE): URL de payment (antes: sleep fijo de 2s)
+            logger.info("Waiting for page navigation...")
+            try:
+                self.waits.until(EC.url_contains("pay"), "Payment: navigation", timeout=2, replaces=2)
+            except TimeoutException:
+                pass
 
             current_url = self.driver.current_url
             logger.info(f"Current URL: {current_url}")
@@ -90,7 +113,7 @@ class PaymentPage:
             if 'payment' not in current_url.lower() and 'pay' not in current_url.lower():
                 logger.warning(f"URL doesn't seem to be a payment page: {current_url}")
                 logger.info("Waiting extra time for navigation...")
-                time.sleep(2)
+                self.waits.settle("Payment: extra navigation wait", replaces=2)
                 current_url = self.driver.current_url
                 logger.info(f"URL after extra wait: {current_url}")
 
@@ -99,114 +122,123 @@ class PaymentPage:
             # AHORA: cookies inmediato → esperar iframe
             # CRÍTICO: Detectar y aceptar modal de cookies si aparece
             # IMPORTANTE: El modal de OneTrust puede estar en un IFRAME separado o en el DOM principal
-            logger.info("Checking for cookies consent modal (may be in iframe or main DOM)...")
-
-            # 📸 Se CAPTURA (SELENIUM): Screenshot y HTML antes de manejar cookies
-            try:
-                debug_screenshot = f"reports/debug_payment_before_cookies_{int(time.time())}.png"
-                self.driver.save_screenshot(debug_screenshot)
-                logger.info(f"📸 Screenshot saved BEFORE cookies handling: {debug_screenshot}")
-
-                # Guardar HTML completo para análisis
-                html_source = self.driver.page_source
-                with open(f"reports/debug_payment_html_{int(time.time())}.html", "w", encoding="utf-8") as f:
-                    f.write(html_source)
-                logger.info("📄 Page HTML saved for debugging")
-            except:
-                pass
+            # Consentimiento pre-cargado (conftest: preseed_consent_cookie en case_mappings.json):
+            # OneTrust no renderiza el modal, así que no hace falta buscarlo (ahorra ~10s de esperas)
+            if self._consent_cookie_present():
+                logger.info("OneTrust consent cookie already set: skipping cookies modal probing")
+            else:
+                logger.info("Checking for cookies consent modal (may be in iframe or main DOM)...")
 
-            try:
-                # ESTRATEGIA 1: Intentar buscar el botón directamente en el DOM principal
-                logger.info("Strategy 1: Looking for cookies button in main DOM...")
-                logger.info("  Waiting up to 10 seconds for button to be clickable...")
+                # 📸 Se CAPTURA (SELENIUM): Screenshot y HTML antes de manejar cookies
                 try:
-                    # ⏳ Se ESPERA (SELENIUM): Botón de cookies sea clickeable (max 10 segundos)
-                    cookies_accept_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                    )
-                    logger.info("✓ Cookies button found in main DOM")
-
-                    # 🖱️ Se PRESIONA (SELENIUM): Botón "Aceptar cookies" en modal OneTrust
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", cookies_accept_button)
-                    time.sleep(1)
-                    cookies_accept_button.click()
-                    # ⏳ Se ESPERA (SELENIUM): Modal de cookies se cierre - OPTIMIZADO: 2s → 1.5s
-                    time.sleep(1.5)
-                    logger.info("✓ Cookies accepted successfully (main DOM)")
+                    debug_screenshot = f"reports/debug_payment_before_cookies_{int(time.time())}.png"
+                    self.driver.save_screenshot(debug_screenshot)
+                    logger.info(f"📸 Screenshot saved BEFORE cookies handling: {debug_screenshot}")
+
+                    # Guardar HTML completo para análisis
+                    html_source = self.driver.page_source
+                    with open(f"reports/debug_payment_html_{int(time.time())}.html", "w", encoding="utf-8") as f:
+                        f.write(html_source)
+                    logger.info("📄 Page HTML saved for debugging")
+                except:
+                    pass
 
-                except Exception as e:
-                    logger.info(f"Button not found in main DOM: {e}")
-
-                    # ESTRATEGIA 2: Buscar en IFRAME de OneTrust
-                    logger.info("Strategy 2: Looking for OneTrust iframe...")
-
-                    # Posibles selectores de iframe de OneTrust
-                    iframe_selectors = [
-                        "//iframe[contains(@id, 'onetrust')]",
-                        "//iframe[contains(@title, 'cookie')]",
-                        "//iframe[contains(@title, 'Cookie')]",
-                        "//iframe[contains(@name, 'onetrust')]",
-                        "//iframe[contains(@class, 'onetrust')]",
-                    ]
-
-                    iframe_found = False
-                    for iframe_selector in iframe_selectors:
-                        try:
-                            logger.info(f"  Trying iframe selector: {iframe_selector[:50]}...")
-                            iframe = self.driver.find_element(By.XPATH, iframe_selector)
-
-                            # Cambiar al contexto del iframe
-                            self.driver.switch_to.frame(iframe)
-                            logger.info(f"  ✓ Switched to iframe: {iframe_selector[:50]}")
-
-                            # Buscar el botón DENTRO del iframe
-                            logger.info("  Looking for cookies button inside iframe...")
-                            cookies_accept_button = WebDriverWait(self.driver, 5).until(
-                                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                            )
-                            logger.info("  ✓ Cookies button found inside iframe")
-
-                            # Click en el botón
-                            cookies_accept_button.click()
-                            time.sleep(2)
-                            logger.info("  ✓ Cookies button clicked inside iframe")
-
-                            # CRÍTICO: Volver al contexto principal
-                            self.driver.switch_to.default_content()
-                            logger.info("  ✓ Switched back to main content")
-
-                            time.sleep(2)  # OPTIMIZADO: Reducido de 3s a 2s (ahorro: 1s)
-                            logger.info("✓ Cookies accepted successfully (iframe)")
-                            iframe_found = True
-                            break
-
-                        except Exception as iframe_error:
-                            # Si falla, volver al contexto principal y seguir intentando
+                try:
+                    # ESTRATEGIA 1: Intentar buscar el botón directamente en el DOM principal
+                    logger.info("Strategy 1: Looking for cookies button in main DOM...")
+                    logger.info("  Waiting up to 10 seconds for button to be clickable...")
+                    try:
+                        # ⏳ Se ESPERA (SELENIUM): Botón de cookies sea clickeable (max 10 segundos)
+                        cookies_accept_button = WebDriverWait(self.driver, 10).until(
+                            EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+                        )
+                        logger.info("✓ Cookies button found in main DOM")
+
+                        # 🖱️ Se PRESIONA (SELENIUM): Botón "Aceptar cookies" en modal OneTrust
+                        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", cookies_accept_button)
+                        cookies_accept_button.click()
+                        # ⏳ Se ESPERA (WAIT ENGINE): Modal de cookies se cierre (antes: sleeps fijos de 1s + 1.5s)
+                        self.waits.settle("Payment: cookies modal closed", replaces=2.5)
+                        logger.info("✓ Cookies accepted successfully (main DOM)")
+
+                    except Exception as e:
+                        logger.info(f"Button not found in main DOM: {e}")
+
+                        # ESTRATEGIA 2: Buscar en IFRAME de OneTrust
+                        logger.info("Strategy 2: Looking for OneTrust iframe...")
+
+                        # Posibles selectores de iframe de OneTrust
+                        iframe_selectors = [
+                            "//iframe[contains(@id, 'onetrust')]",
+                            "//iframe[contains(@title, 'cookie')]",
+                            "//iframe[contains(@title, 'Cookie')]",
+                            "//iframe[contains(@name, 'onetrust')]",
+                            "//iframe[contains(@class, 'onetrust')]",
+                        ]
+
+                        # Una sola consulta para saber qué selectores existen: los ausentes ya no
+                        # cuestan un find_element con implicit wait de 10s cada uno
+                        present_iframes = find_present(self.driver, [(By.XPATH, sel) for sel in iframe_selectors])
+                        logger.info(f"  {len(present_iframes)}/{len(iframe_selectors)} iframe selectors present")
+
+                        iframe_found = False
+                        for index, iframe in present_iframes:
+                            iframe_selector = iframe_selectors[index]
                             try:
+                                logger.info(f"  Trying iframe selector: {iframe_selector[:50]}...")
+
+                                # Cambiar al contexto del iframe
+                                self.driver.switch_to.frame(iframe)
+                                logger.info(f"  ✓ Switched to iframe: {iframe_selector[:50]}")
+
+                                # Buscar el botón DENTRO del iframe
+                                logger.info("  Looking for cookies button inside iframe...")
+                                # Sin implicit wait: el WebDriverWait de 5s no se estira a 10s por cada polling
+                                with no_implicit_wait(self.driver):
+                                    cookies_accept_button = WebDriverWait(self.driver, 5).until(
+                                        EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+                                    )
+                                logger.info("  ✓ Cookies button found inside iframe")
+
+                                # Click en el botón
+                                cookies_accept_button.click()
+                                logger.info("  ✓ Cookies button clicked inside iframe")
+
+                                # CRÍTICO: Volver al contexto principal
                                 self.driver.switch_to.default_content()
-                            except:
-                                pass
-                            logger.debug(f"  Iframe selector failed: {str(iframe_error)[:80]}")
-                            continue
-
-                    if not iframe_found:
-                        logger.warning("No iframe with cookies modal found")
-
-            except Exception as e:
-                # Si no hay modal de cookies, continuar normalmente
-                logger.info(f"No cookies modal detected (or already accepted): {e}")
-                # Asegurar que estamos en el contexto principal
-                try:
-                    self.driver.switch_to.default_content()
-                except:
-                    pass
+                                logger.info("  ✓ Switched back to main content")
+
+                                self.waits.settle("Payment: cookies modal closed (iframe)", replaces=4)
+                                logger.info("✓ Cookies accepted successfully (iframe)")
+                                iframe_found = True
+                                break
+
+                            except Exception as iframe_error:
+                                # Si falla, volver al contexto principal y seguir intentando
+                                try:
+                                    self.driver.switch_to.default_content()
+                                except:
+                                    pass
+                                logger.debug(f"  Iframe selector failed: {str(iframe_error)[:80]}")
+                                continue
+
+                        if not iframe_found:
+                            logger.warning("No iframe with cookies modal found")
+
+                except Exception as e:
+                    # Si no hay modal de cookies, continuar normalmente
+                    logger.info(f"No cookies modal detected (or already accepted): {e}")
+                    # Asegurar que estamos en el contexto principal
+                    try:
+                        self.driver.switch_to.default_content()
+                    except:
+                        pass
 
             # CRÍTICO: Después de aceptar cookies, esperar a que Angular inyecte el iframe de payment
             # OPTIMIZACIÓN V3: Reducido de 10s → 6s → 5s (ahorro adicional de 1 segundo)
             # Total ahorro desde original: 13s+8s=21s → 5s = 16 segundos ahorrados
-            # Razón: Ya aceptamos cookies inmediatamente, ahora Angular puede cargar el iframe
-            logger.info("Waiting 5 seconds for Angular to inject payment iframe after cookies...")
-            time.sleep(5)
+            # WAIT ENGINE: el sleep fijo de 5s se reemplazó por la espera del iframe (abajo)
+            logger.info("Waiting for Angular to inject payment iframe after cookies...")
 
             # CRÍTICO: Los campos de tarjeta (Holder, Data, CVV, etc.) están dentro de un IFRAME externo
             # de payment gateway (api-pay.avtest.ink). Necesitamos cambiar al contexto del iframe.
@@ -215,8 +247,9 @@ class PaymentPage:
 
             try:
                 # Buscar el iframe de payment
-                payment_iframe = WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "payment-forms-layout_iframe"))
+                payment_iframe = self.waits.until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "payment-forms-layout_iframe")),
+                    "Payment: payment iframe injected", timeout=30, replaces=5
                 )
                 logger.info("✓ Payment iframe found")
 
@@ -253,7 +286,7 @@ class PaymentPage:
                     pass
                 raise
 
-            time.sleep(1)
+            self.waits.settle("Payment: card form ready", replaces=1)
 
             logger.info("✓ Payment page loaded successfully")
             return True
@@ -309,7 +342,7 @@ class PaymentPage:
             # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir dropdown de mes de expiración
             month_button = self.driver.find_element(*self.CARD_MONTH_BUTTON)
             self.driver.execute_script("arguments[0].click();", month_button)
-            time.sleep(0.3)
+            self.waits.settle("Payment: month dropdown", replaces=0.3, idle_ms=0)
 
             # 🖱️ Se PRESIONA (SELENIUM): Mes de expiración específico
             month_option_id = f"expirationMonth_ExpirationDate-{exp_month}"
@@ -322,7 +355,7 @@ class PaymentPage:
             # 🖱️ Se PRESIONA (SELENIUM): Botón para abrir dropdown de año de expiración
             year_button = self.driver.find_element(*self.CARD_YEAR_BUTTON)
             self.driver.execute_script("arguments[0].click();", year_button)
-            time.sleep(0.3)
+            self.waits.settle("Payment: year dropdown", replaces=0.3, idle_ms=0)
 
             # 🖱️ Se PRESIONA (SELENIUM): Año de expiración específico
             year_option_id = f"expirationYear_ExpirationDate-{exp_year}"
@@ -344,7 +377,7 @@ class PaymentPage:
             self.driver.switch_to.default_content()
             logger.info("✓ Switched back to main DOM context (out of payment iframe)")
 
-            time.sleep(0.5)
+            self.waits.settle("Payment: back to main DOM", replaces=0.5)
             return True
 
         except Exception as e:
@@ -375,7 +408,7 @@ class PaymentPage:
         try:
             # Scroll hacia abajo para ver formulario de facturación
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-            time.sleep(0.3)
+            self.waits.settle("Payment: billing section", replaces=0.3)
 
             # PASO 1: Email
             logger.info(f"  1. Email: {email}...")
@@ -402,11 +435,11 @@ class PaymentPage:
             logger.info(f"  4. Country: {country_name} (searching with '{country_text}')...")
             country_button = self.driver.find_element(*self.BILLING_COUNTRY_BUTTON)
             self.driver.execute_script("arguments[0].click();", country_button)
-            time.sleep(0.3)
+            self.waits.settle("Payment: country dropdown", replaces=0.3, idle_ms=0)
 
             # Escribir primeros caracteres para buscar país
             country_button.send_keys(country_text)
-            time.sleep(0.5)
+            self.waits.settle("Payment: country search", replaces=0.5)
 
             # Seleccionar país (traducido según idioma del test)
             # XPath: //button[@role='option' and contains(., '{country_name}')]
@@ -418,7 +451,7 @@ class PaymentPage:
             logger.info(f"  ✓ Country selected: {country_name}")
 
             logger.info("✓ Billing information filled successfully")
-            time.sleep(0.5)
+            self.waits.settle("Payment: billing filled", replaces=0.5)
             return True
 
         except Exception as e:
@@ -439,7 +472,7 @@ class PaymentPage:
         try:
             # Scroll hacia abajo para ver el checkbox
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.9);")
-            time.sleep(0.3)
+            self.waits.settle("Payment: terms section", replaces=0.3)
 
             terms_checkbox = self.wait.until(EC.presence_of_element_located(self.TERMS_CHECKBOX))
 
@@ -450,7 +483,7 @@ class PaymentPage:
             else:
                 logger.info("✓ Terms already accepted")
 
-            time.sleep(0.5)
+            self.waits.settle("Payment: terms accepted", replaces=0.5)
             return True
 
         except Exception as e:
@@ -470,7 +503,7 @@ class PaymentPage:
         try:
             # Scroll hacia abajo para ver el botón
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
+            self.waits.settle("Payment: before confirm", replaces=0.5)
 
             confirm_btn = self.wait.until(EC.presence_of_element_located(self.CONFIRM_PAYMENT_BUTTON))
 
@@ -478,7 +511,7 @@ class PaymentPage:
             self.driver.execute_script("arguments[0].click();", confirm_btn)
             logger.info("✓ 'Confirmar y pagar' button clicked successfully")
 
-            time.sleep(2)  # Esperar a que se procese el pago (reducido de 3s a 2s)
+            self.waits.settle("Payment: confirm", replaces=2)  # Esperar a que se procese el pago
             return True
 
         except Exception as e:
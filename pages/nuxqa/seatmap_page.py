@@ -11,7 +11,14 @@ Caso 1: Seleccionar asientos Economy para los 3 pasajeros (Adulto, Joven, Niño)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from utils.wait_engine import WaitEngine, element_stale
+from utils.dom_query import no_implicit_wait, find_present, selector_locator
+from utils.seatmap_scanner import (
+    DEFAULT_SEAT_STRATEGY, any_seat, economy_seat, get_seat_strategy, scan_seatmap, seat_outcome
+)
 import logging
+import os
 import time
 import sys
 from pathlib import Path
@@ -26,6 +33,10 @@ from core.config_manager import ConfigManager
 # ==================== LOGGER ====================
 logger = logging.getLogger(__name__)
 
+# ==================== CONSTANTES ====================
+# SEATMAP_RECORD_PAGE=1 guarda el HTML del seatmap al cargar (para el benchmark de utils/dom_query.py)
+RECORD_PAGE_ENV = "SEATMAP_RECORD_PAGE"
+
 # ==================== CLASE ====================
 class SeatmapPage:
     """
@@ -34,7 +45,7 @@ class SeatmapPage:
     Responsabilidades:
     - Esperar a que cargue la página Seatmap
     - Seleccionar pasajero por tipo (Adulto, Joven, Niño)
-    - Seleccionar asiento Economy disponible
+    - Seleccionar asientos con un solo scan del seatmap (utils/seatmap_scanner.py)
     - Continuar al siguiente paso (Payment)
     """
 
@@ -70,19 +81,26 @@ class SeatmapPage:
     ECONOMY_SEAT_IDS = _generate_economy_seat_ids()
 
     # ==================== CONSTRUCTOR ====================
-    def __init__(self, driver, language="Español"):
+    def __init__(self, driver, language="Español", seat_strategy=DEFAULT_SEAT_STRATEGY, record_page=None):
         """
         Constructor de la clase.
 
         Args:
             driver: Instancia de Selenium WebDriver
             language: Idioma de la UI (Español, English, Français, Português)
+            seat_strategy: Estrategia de asientos (first_available, adjacent, window, aisle)
+            record_page: Si True guarda el HTML del seatmap al cargar (por defecto: variable
+                         de entorno SEATMAP_RECORD_PAGE=1)
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 25)  # Wait más largo para carga de mapa de asientos
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
         self.language = language
         self.config = ConfigManager()
-        logger.info(f"SeatmapPage object initialized (language: {language})")
+        get_seat_strategy(seat_strategy)  # Falla aquí si el nombre no existe (no a mitad del seatmap)
+        self.seat_strategy = seat_strategy
+        self.record_page = os.environ.get(RECORD_PAGE_ENV) == "1" if record_page is None else record_page
+        logger.info(f"SeatmapPage object initialized (language: {language}, seat strategy: {seat_strategy})")
 
     # ==================== MÉTODOS ====================
 
@@ -100,27 +118,24 @@ class SeatmapPage:
         logger.info("Waiting for Seatmap page to load...")
 
         try:
-            # Esperar a que cambie la URL
-            time.sleep(1)
-
             current_url = self.driver.current_url
             logger.info(f"Current URL: {current_url}")
 
             # Esperar a que aparezca la lista de pasajeros
-            self.wait.until(EC.presence_of_element_located(self.PASSENGER_LIST))
+            self.waits.until(EC.presence_of_element_located(self.PASSENGER_LIST), "Seatmap: passenger list",
+                             timeout=25, replaces=1)
             logger.info("Passenger list found")
 
-            # Esperar a que aparezcan asientos Economy
-            time.sleep(1)
-
             # CRÍTICO: Esperar más tiempo para que Angular complete la inicialización del estado interno
             # Sin esto, obtenemos "ConfigurationErrorsException" al hacer click en asientos
             # El problema: Angular necesita tiempo para inicializar el estado de la reserva (PNR),
             # pasajeros, y configuración del seatmap ANTES de procesar clicks
-            # OPTIMIZADO: Reducido de 7s a 5s (ahorro: 2s)
-            logger.info("Waiting additional 5 seconds for Angular to fully initialize internal state...")
+            # WAIT ENGINE: en lugar de sleeps fijos (1s + 5s) se espera Angular estable y red en reposo 500ms
+            logger.info("Waiting for Angular to fully initialize internal state...")
             logger.info("(This prevents ConfigurationErrorsException modal)")
-            time.sleep(5)
+            self.waits.settle("Seatmap: Angular state initialized", replaces=6, idle_ms=500)
+            if self.record_page:
+                self.save_page_source()  # Seatmap grabado (benchmark: python -m utils.dom_query)
 
             logger.info("✓ Seatmap page loaded successfully")
             return True
@@ -208,6 +223,32 @@ class SeatmapPage:
         except:
             pass
 
+    def _click_first_present(self, selectors):
+        """
+        Hace click en el primer selector presente que acepte el click.
+
+        Los selectores ausentes se descartan en UNA llamada (find_present), sin
+        pagar el implicit wait de 10s por cada uno.
+
+        Args:
+            selectors: Lista de selectores ("//..." = XPath, si no CSS)
+
+        Returns:
+            str: Selector usado (None si ninguno funcionó)
+        """
+        for index, element in find_present(self.driver, [selector_locator(s) for s in selectors]):
+            try:
+                element.click()
+                return selectors[index]
+            except Exception:
+                continue
+        return None
+
+    def _alert_modal_present(self):
+        """Detecta el modal de error del seatmap sin esperar el implicit wait."""
+        with no_implicit_wait(self.driver):
+            return self.driver.find_elements(By.CSS_SELECTOR, "ngb-modal-window.modal-alert")
+
     def select_passenger_by_text(self, passenger_text):
         """
         Selecciona un pasajero por el texto de su tipo.
@@ -231,463 +272,236 @@ class SeatmapPage:
 
             # Scroll al elemento
             self.driver.execute_script("arguments[0].scrollIntoView(true);", passenger_button)
-            time.sleep(0.5)
 
             # Click usando JavaScript
             self.driver.execute_script("arguments[0].click();", passenger_button)
             logger.info(f"✓ Passenger '{passenger_text}' selected")
 
-            time.sleep(1)  # Esperar a que se actualice el mapa de asientos
+            self.waits.settle("Seatmap: passenger selected", replaces=1.5)  # Esperar a que se actualice el mapa de asientos
             return True
 
         except Exception as e:
             logger.error(f"✗ Error selecting passenger '{passenger_text}': {e}")
             return False
 
-    def select_first_available_economy_seat(self):
+    def _try_seat(self, seat):
         """
-        Selecciona el primer asiento Economy disponible de la lista de 6 asientos exactos.
-        Itera por los IDs específicos (4A_ECONOMY, 4B_ECONOMY, 4C_ECONOMY, 4D_ECONOMY, 4E_ECONOMY, 4K_ECONOMY).
-        Verifica que NO tenga la clase "selected" ni "unavailable".
-        Después del click, espera a que el asiento se marque como "selected".
+        Hace click en un asiento del snapshot y espera el resultado.
+
+        Args:
+            seat (Seat): Asiento disponible (con su WebElement del scan)
 
         Returns:
-            tuple: (bool, str) - (Éxito, ID del asiento seleccionado)
+            bool: True si el asiento quedó marcado como "selected"
         """
-        logger.info("Selecting first available Economy seat from pre-loaded seat directory...")
+        try:
+            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", seat.element)
+
+            # CAMBIO CRÍTICO: Usar click NORMAL de Selenium (no JavaScript click)
+            # El JavaScript click no dispara los event listeners correctos
+            seat.element.click()
+            logger.info(f"  Clicked on seat: {seat.id}")
+        except WebDriverException as e:
+            logger.warning(f"  ⚠ Seat {seat.id} not clickable: {str(e)[:100]}")
+            return False
 
+        # ⏳ Se ESPERA (WAIT ENGINE): Asiento "selected" o modal de error, en UNA consulta por sondeo
+        # (reemplaza los sleeps de 1.1s antes de buscar el modal y 1.5s antes de verificar "selected")
         try:
-            # PASO 1: Pre-cargar TODOS los elementos de asientos Economy de UNA SOLA VEZ
-            # Esto evita hacer find_element() repetidamente, lo cual interrumpe Angular
-            logger.info("  STEP 1: Loading all Economy seat elements into directory (one-time batch query)...")
-
-            seat_directory = {}  # Dictionary: {seat_id: WebElement}
-
-            for seat_id in self.ECONOMY_SEAT_IDS:
-                try:
-                    seat_element = self.driver.find_element(By.ID, seat_id)
-                    seat_directory[seat_id] = seat_element
-                except:
-                    # Si un asiento no existe en el DOM, simplemente no lo agregamos
-                    pass
-
-            logger.info(f"  ✓ Loaded {len(seat_directory)} Economy seat elements into directory")
-
-            # PASO 2: Iterar por el directorio pre-cargado (SIN más búsquedas dinámicas)
-            logger.info("  STEP 2: Iterating through pre-loaded seat directory...")
-
-            attempts = 0
-            for seat_id, seat in seat_directory.items():
-                attempts += 1
-                try:
-                    seat_classes = seat.get_attribute("class")
-
-                    # VISUAL DEBUG: Mostrar información del asiento en pantalla
-                    # self.show_seat_info(seat_id, seat_classes, "CHECKING")
-
-                    logger.info(f"  Checking seat {seat_id}: classes = '{seat_classes}'")
-
-                    # IMPORTANTE: Verificar que es clase Economy (NO tiene "upfront" ni "xlarge")
-                    # Premium seats: class="seat upfront ng-star-inserted"
-                    # Plus seats: class="seat xlarge ng-star-inserted"
-                    # Economy seats: class="seat ng-star-inserted" (solo "seat", sin palabras extra)
-                    if "upfront" in seat_classes or "xlarge" in seat_classes:
-                        logger.info(f"  ✗ Seat {seat_id} is NOT Economy (has upfront/xlarge class)")
-                        continue
+            outcome = self.waits.until(seat_outcome(seat.id), "Seatmap: seat selected or alert modal",
+                                       timeout=6, replaces=2.6)
+        except TimeoutException:
+            logger.warning(f"⚠ Seat {seat.id} still not marked as 'selected'")
+            return False
 
-                    # Verificar si está disponible (tiene "seat" pero NO tiene "selected" ni "unavailable")
-                    if "seat" in seat_classes and "selected" not in seat_classes and "unavailable" not in seat_classes:
-                        logger.info(f"  ✓ Seat {seat_id} is available, attempting to select...")
-
-                        # Scroll al asiento
-                        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", seat)
-                        time.sleep(0.5)
-
-                        # Esperar a que el asiento sea clickeable
-                        try:
-                            clickable_seat = self.wait.until(
-                                EC.element_to_be_clickable((By.ID, seat_id))
-                            )
-                        except:
-                            logger.warning(f"  ⚠ Seat {seat_id} not clickable, skipping...")
-                            continue
-
-                        # VISUAL DEBUG: Mostrar que estamos haciendo click
-                        # self.show_seat_info(seat_id, seat_classes, "CLICKING")
-
-                        # CAMBIO CRÍTICO: Usar click NORMAL de Selenium (no JavaScript click)
-                        # El JavaScript click no dispara los event listeners correctos
-                        clickable_seat.click()
-                        logger.info(f"  Clicked on seat: {seat_id}")
-
-                        # Esperar 1 segundo para ver si aparece un modal
-                        time.sleep(1)
-
-                        # IMPORTANTE: Verificar si apareció un modal de error/advertencia
-                        try:
-                            modal = self.driver.find_element(By.CSS_SELECTOR, "ngb-modal-window.modal-alert")
-
-                            # VISUAL DEBUG: Mostrar que se detectó un modal (ERROR)
-                            # self.show_seat_info(seat_id, seat_classes, "ERROR")
-
-                            logger.error(f"⚠⚠⚠ MODAL DETECTED! This should NOT happen in manual testing!")
-
-                            # TOMAR SCREENSHOT DEL MODAL ANTES DE CERRARLO
-                            try:
-                                screenshot_path = f"reports/modal_error_{seat_id}.png"
-                                self.driver.save_screenshot(screenshot_path)
-                                logger.error(f"⚠⚠⚠ MODAL SCREENSHOT SAVED: {screenshot_path}")
-                            except Exception as e:
-                                logger.error(f"Failed to save modal screenshot: {e}")
-
-                            # Intentar capturar el texto del modal
-                            try:
-                                modal_body = modal.find_element(By.CSS_SELECTOR, ".modal-body, .modal-content, .alert-warning, div")
-                                modal_text = modal_body.text if modal_body else modal.text
-                                logger.error(f"⚠⚠⚠ MODAL TEXT: {modal_text}")
-                            except Exception as e:
-                                logger.error(f"Failed to get modal text: {e}")
-
-                            # NO CERRAR EL MODAL - Dejar que el usuario lo vea en el screenshot
-                            # Esperar 5 segundos para que quede bien visible en el screenshot
-                            logger.error(f"Stopping execution for screenshot inspection...")
-                            time.sleep(5)
-
-                            # Ahora buscar botón de cierre del modal (X, Cerrar, Aceptar, OK, etc.)
-                            close_selectors = [
-                                "button[aria-label='Close']",
-                                "button.close",
-                                "button.btn-close",
-                                "//button[contains(text(), 'Aceptar')]",
-                                "//button[contains(text(), 'OK')]",
-                                "//button[contains(text(), 'Cerrar')]",
-                                "//button[contains(@class, 'close')]"
-                            ]
-
-                            modal_closed = False
-                            for selector in close_selectors:
-                                try:
-                                    if selector.startswith("//"):
-                                        close_btn = self.driver.find_element(By.XPATH, selector)
-                                    else:
-                                        close_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
-                                    close_btn.click()
-                                    logger.info(f"  ✓ Modal closed using selector: {selector[:30]}...")
-                                    modal_closed = True
-                                    break
-                                except:
-                                    continue
-
-                            if not modal_closed:
-                                logger.warning(f"  ⚠ Could not close modal, continuing anyway...")
-
-                            time.sleep(1)
-                        except:
-                            # No hay modal, perfecto
-                            pass
-
-                        # Esperar 3 segundos más para que el asiento cambie a 'selected'
-                        logger.info(f"  Waiting 3 more seconds for seat to change to 'selected'...")
-                        time.sleep(3)
-
-                        # Verificar UNA SOLA VEZ si se marcó como selected
-                        try:
-                            updated_seat = self.driver.find_element(By.ID, seat_id)
-                            updated_classes = updated_seat.get_attribute("class")
-                            logger.info(f"  After 3s, seat classes: '{updated_classes}'")
-
-                            if "selected" in updated_classes:
-                                # VISUAL DEBUG: Mostrar que el asiento fue seleccionado exitosamente
-                                # self.show_seat_info(seat_id, updated_classes, "SELECTED")
-
-                                logger.info(f"✓ Economy seat selected successfully: {seat_id}")
-                                # time.sleep(2)  # YA NO NECESARIO - debug visual removido
-                                return True, seat_id
-                            else:
-                                logger.warning(f"⚠ Seat {seat_id} still not marked as 'selected' after 3 seconds")
-                                # Continuar probando el siguiente asiento
-                                continue
-                        except Exception as e:
-                            logger.warning(f"⚠ Error checking seat status: {e}")
-                            continue
-                    else:
-                        logger.info(f"  ✗ Seat {seat_id} is NOT available (selected or unavailable)")
-
-                except Exception as e:
-                    logger.warning(f"  ✗ Could not find or check seat {seat_id}: {e}")
-                    continue
+        if outcome == "selected":
+            return True
 
-            # Si llegamos aquí, ningún asiento estuvo disponible o pudo ser seleccionado
-            logger.error(f"✗ No available Economy seats found after checking {attempts} seats")
-            return False, None
+        logger.error(f"⚠⚠⚠ MODAL DETECTED for seat {seat.id}! This should NOT happen in manual testing!")
 
+        # TOMAR SCREENSHOT DEL MODAL ANTES DE CERRARLO
+        try:
+            screenshot_path = f"reports/modal_error_{seat.id}.png"
+            self.driver.save_screenshot(screenshot_path)
+            logger.error(f"⚠⚠⚠ MODAL SCREENSHOT SAVED: {screenshot_path}")
         except Exception as e:
-            logger.error(f"✗ Error selecting Economy seat: {e}")
-            import traceback
-            traceback.print_exc()
-            return False, None
+            logger.error(f"Failed to save modal screenshot: {e}")
 
-    def assign_seats_to_passengers(self, passenger_count=3):
+        # Intentar capturar el texto del modal
+        try:
+            modals = self._alert_modal_present()
+            if modals:
+                logger.error(f"⚠⚠⚠ MODAL TEXT: {modals[0].text}")
+        except Exception as e:
+            logger.error(f"Failed to get modal text: {e}")
+
+        # Buscar botón de cierre del modal (X, Cerrar, Aceptar, OK, etc.)
+        close_selectors = [
+            "button[aria-label='Close']",
+            "button.close",
+            "button.btn-close",
+            "//button[contains(text(), 'Aceptar')]",
+            "//button[contains(text(), 'OK')]",
+            "//button[contains(text(), 'Cerrar')]",
+            "//button[contains(@class, 'close')]"
+        ]
+
+        used_selector = self._click_first_present(close_selectors)
+        if used_selector:
+            logger.info(f"  ✓ Modal closed using selector: {used_selector[:30]}...")
+        else:
+            logger.warning(f"  ⚠ Could not close modal, continuing anyway...")
+
+        self.waits.settle("Seatmap: modal closed", replaces=1)
+        return False
+
+    def select_seat(self, seat_filter=any_seat, strategy=None, group_size=1, preferred_id=None,
+                    snapshot=None, rejected=None, max_attempts=3):
         """
-        Asigna asientos Economy a todos los pasajeros en orden.
+        Selecciona un asiento a partir de UN scan del seatmap (scan_seatmap).
 
-        FLUJO CORRECTO (según comportamiento real de nuxqa):
-        1. El primer pasajero YA está seleccionado automáticamente
-        2. Solo hacer click en el asiento → la página se RECARGA automáticamente
-        3. El siguiente pasajero queda seleccionado automáticamente
-        4. Repetir: click en asiento → recarga → siguiente pasajero
-
-        NO SE DEBE HACER CLICK EN LOS PASAJEROS MANUALMENTE.
+        La elección se hace en Python sobre el snapshot; solo el click y la
+        confirmación vuelven al navegador. Si un asiento falla (modal, no se
+        marca), se vuelve a escanear y se prueba el siguiente candidato.
 
         Args:
-            passenger_count (int): Número de pasajeros (default 3)
+            seat_filter: Filtro de asientos (economy_seat, any_seat)
+            strategy (str): Estrategia de SEAT_STRATEGIES (default: la del page object)
+            group_size (int): Pasajeros que faltan por sentar (para "adjacent")
+            preferred_id (str): Asiento planificado; se usa primero si sigue disponible
+            snapshot (SeatmapSnapshot): Scan ya hecho para el primer intento (evita repetirlo)
+            rejected (set): IDs que ya fallaron (se agregan los nuevos; compartido entre pasajeros)
+            max_attempts (int): Asientos diferentes a intentar
 
         Returns:
-            dict: Diccionario con pasajeros y sus asientos asignados
+            tuple: (bool, str) - (Éxito, ID del asiento seleccionado)
         """
-        logger.info(f"Assigning Economy seats to {passenger_count} passengers...")
-        logger.info("NOTE: Passengers are auto-selected after each seat click. NO manual passenger selection needed.")
+        choose = get_seat_strategy(strategy or self.seat_strategy)
+        rejected = set() if rejected is None else rejected
 
-        passenger_types = [
-            "Adulto 1",
-            "Joven 1",
-            "Niño 1"
-        ][:passenger_count]  # Solo para tracking/logging
+        for attempt in range(max_attempts):
+            try:
+                if snapshot is None or attempt > 0:
+                    snapshot = scan_seatmap(self.driver)
 
-        seat_assignments = {}
+                ranked = [seat for seat in choose(snapshot, group_size, seat_filter) if seat.id not in rejected]
+                preferred = next((seat for seat in ranked if seat.id == preferred_id), None)
+                if preferred:
+                    ranked.remove(preferred)
+                    ranked.insert(0, preferred)
 
-        try:
-            for i, passenger_type in enumerate(passenger_types):
-                logger.info(f"")
-                logger.info(f"========== Passenger {i+1}/3: {passenger_type} ==========")
-                logger.info(f"  (Passenger is ALREADY auto-selected by the page)")
-
-                # Solo seleccionar el asiento (NO seleccionar pasajero manualmente)
-                logger.info(f"  Selecting Economy seat for passenger {i+1}...")
-                seat_selected, seat_id = self.select_first_available_economy_seat()
+                if not ranked:
+                    logger.error("✗ No available seats found in seatmap scan")
+                    return False, None
 
-                if not seat_selected:
-                    logger.error(f"  ✗ Failed to select seat for passenger {i+1}")
-                    continue
+                seat = ranked[0]
+                logger.info(f"  ✓ Found available seat: {seat.id} ({seat.seat_type}) - Attempt {attempt + 1}/{max_attempts}")
 
-                seat_assignments[passenger_type] = seat_id
-                logger.info(f"✓ Passenger {i+1} ({passenger_type}) → Seat {seat_id}")
+                if self._try_seat(seat):
+                    logger.info(f"✓ Seat {seat.id} ({seat.seat_type}) selected successfully")
+                    return True, seat.id
+                rejected.add(seat.id)
 
-                # Esperar a que la página se recargue y seleccione el siguiente pasajero
-                # Solo si no es el último pasajero
-                if i < passenger_count - 1:
-                    logger.info(f"  Waiting for page reload and auto-selection of next passenger...")
-                    time.sleep(1)
-
-            logger.info(f"✓ All {len(seat_assignments)} passengers assigned seats successfully")
+            except Exception as e:
+                logger.warning(f"  ✗ Error in attempt {attempt + 1}: {e}")
 
-            # CRÍTICO: Esperar tiempo adicional para que la página actualice el botón correctamente
-            logger.info("Waiting 2 additional seconds for page to finalize seat selection state...")
-            time.sleep(2)
+        logger.error(f"✗ No available seats could be selected after {max_attempts} attempts")
+        return False, None
 
-            return seat_assignments
+    def select_first_available_economy_seat(self):
+        """
+        Selecciona el primer asiento Economy disponible (sin clases "upfront" ni "xlarge",
+        ni "selected"/"unavailable"). Un solo scan del seatmap en lugar de leer las
+        clases asiento por asiento.
 
-        except Exception as e:
-            logger.error(f"✗ Error assigning seats: {e}")
-            return seat_assignments
+        Returns:
+            tuple: (bool, str) - (Éxito, ID del asiento seleccionado)
+        """
+        logger.info("Selecting first available Economy seat from seatmap scan...")
+        return self.select_seat(economy_seat, strategy="first_available")
 
     def select_first_available_seat_any_type(self):
         """
-        🚀 OPTIMIZADO CON XPATH - Selecciona el primer asiento disponible de CUALQUIER tipo.
-
-        MEJORAS DE RENDIMIENTO:
-        - Antes: Iteraba 120 asientos uno por uno (~5-6s por vuelo)
-        - Ahora: 1 solo XPath encuentra directamente el asiento (~0.5-1s por vuelo)
-        - Ahorro estimado: 4-5s por vuelo (10s total en Case 2)
+        Selecciona el primer asiento disponible de CUALQUIER tipo (Economy, Plus o Premium).
 
         Returns:
             tuple: (bool, str) - (Éxito, ID del asiento seleccionado)
         """
-        logger.info("🚀 XPATH OPTIMIZED: Selecting first available seat (any type)...")
-
-        max_attempts = 3  # Intentar hasta 3 asientos diferentes si alguno falla
+        logger.info("Selecting first available seat (any type) from seatmap scan...")
+        return self.select_seat(any_seat, strategy="first_available")
 
-        for attempt in range(max_attempts):
-            try:
-                # 🔍 XPATH DIRECTO: Encuentra DIRECTAMENTE el primer asiento disponible
-                # Sin iteraciones, sin pre-cargar 120 elementos
-                # ESTRATEGIA: Buscar solo elementos <button> cuyo @id termine en _ECONOMY, _PLUS o _PREMIUM
-                # Esto garantiza que solo encontramos asientos reales, no contenedores
-                # Asientos reales tienen IDs como: 4A_ECONOMY, 11B_ECONOMY, 15C_PLUS, 1A_PREMIUM, etc.
-                xpath_available_seat = (
-                    "//button[contains(@class, 'seat') and "
-                    "("
-                    "  substring(@id, string-length(@id) - string-length('_ECONOMY') + 1) = '_ECONOMY' or "
-                    "  substring(@id, string-length(@id) - string-length('_PLUS') + 1) = '_PLUS' or "
-                    "  substring(@id, string-length(@id) - string-length('_PREMIUM') + 1) = '_PREMIUM'"
-                    ") and "
-                    "not(contains(@class, 'selected')) and "
-                    "not(contains(@class, 'unavailable')) and "
-                    "not(contains(@class, 'occupied'))]"
-                )
-
-                # Buscar TODOS los asientos disponibles
-                available_seats = self.driver.find_elements(By.XPATH, xpath_available_seat)
-
-                if not available_seats:
-                    logger.error("✗ No available seats found via XPath")
-                    return False, None
-
-                # Tomar el asiento en la posición 'attempt' (0, 1, 2)
-                # Esto permite intentar diferentes asientos si el primero falla
-                seat_index = min(attempt, len(available_seats) - 1)
-                seat = available_seats[seat_index]
-                seat_id = seat.get_attribute("id")
-
-                # Identificar tipo de asiento para logging
-                seat_classes = seat.get_attribute("class")
-                seat_type = "Economy"
-                if "upfront" in seat_classes:
-                    seat_type = "Premium"
-                elif "xlarge" in seat_classes:
-                    seat_type = "Plus"
-
-                logger.info(f"  ✓ Found available seat: {seat_id} ({seat_type}) - Attempt {attempt + 1}/{max_attempts}")
-
-                # Scroll al asiento (optimizado: reducido de 0.5s a 0.3s)
-                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", seat)
-                time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s × 6 = 1.2s)
-
-                # ⏳ Esperar que sea clickeable
-                try:
-                    clickable_seat = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((By.ID, seat_id))
-                    )
-                except:
-                    logger.warning(f"  ⚠ Seat {seat_id} not clickeable, trying next...")
-                    continue
-
-                # 🖱️ Click en el asiento
-                clickable_seat.click()
-                logger.info(f"  ✓ Clicked on seat: {seat_id}")
-
-                # OPTIMIZADO: Esperar menos tiempo para detectar modal (1s → 0.8s)
-                time.sleep(0.8)  # OPTIMIZADO: 1s → 0.8s (ahorro: 0.2s × 6 = 1.2s)
-
-                # 🔍 Verificar si apareció modal de error
-                try:
-                    modal = self.driver.find_element(By.CSS_SELECTOR, "ngb-modal-window.modal-alert")
-                    logger.error(f"  ⚠ Modal detected for seat {seat_id}, trying next seat...")
-
-                    # Cerrar modal
-                    close_selectors = [
-                        "button[aria-label='Close']",
-                        "button.close",
-                        "//button[contains(text(), 'Aceptar')]",
-                        "//button[contains(text(), 'OK')]",
-                        "//button[contains(text(), 'Cerrar')]"
-                    ]
-
-                    for selector in close_selectors:
-                        try:
-                            if selector.startswith("//"):
-                                close_btn = self.driver.find_element(By.XPATH, selector)
-                            else:
-                                close_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            close_btn.click()
-                            logger.info(f"    ✓ Modal closed")
-                            break
-                        except:
-                            continue
-
-                    time.sleep(0.5)
-                    continue  # Intentar con el siguiente asiento
-
-                except:
-                    # No hay modal, perfecto
-                    pass
-
-                # OPTIMIZADO: Esperar confirmación (reducido de 2s a 1.5s)
-                logger.info(f"  Waiting 1.5s for seat confirmation...")
-                time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s × 6 = 3s)
-
-                # Verificar si se marcó como selected
-                try:
-                    updated_seat = self.driver.find_element(By.ID, seat_id)
-                    updated_classes = updated_seat.get_attribute("class")
-
-                    if "selected" in updated_classes:
-                        logger.info(f"✓ XPATH OPTIMIZED: Seat {seat_id} ({seat_type}) selected successfully!")
-                        return True, seat_id
-                    else:
-                        logger.warning(f"  ⚠ Seat {seat_id} not marked as 'selected', trying next...")
-                        continue
-
-                except Exception as e:
-                    logger.warning(f"  ⚠ Error checking seat status: {e}, trying next...")
-                    continue
-
-            except Exception as e:
-                logger.warning(f"  ✗ Error in attempt {attempt + 1}: {e}")
-                if attempt < max_attempts - 1:
-                    continue
-                else:
-                    logger.error(f"✗ Failed to select seat after {max_attempts} attempts")
-                    import traceback
-                    traceback.print_exc()
-                    return False, None
-
-        logger.error(f"✗ No available seats could be selected after {max_attempts} attempts")
-        return False, None
-
-    def assign_any_type_seats_to_passengers(self, passenger_count=3):
+    def _assign_seats(self, seat_filter, passenger_count, strategy):
         """
-        Asigna asientos de CUALQUIER tipo (Plus/Premium/Economy) a todos los pasajeros en orden.
-        Versión para Case 2 donde se permite cualquier tipo de asiento según disponibilidad.
+        Asigna asientos a los pasajeros en orden con un plan de grupo.
 
-        FLUJO:
-        1. El primer pasajero YA está seleccionado automáticamente
-        2. Click en asiento → recarga automática → siguiente pasajero
-        3. Repetir para todos los pasajeros
+        El plan (un asiento por pasajero) se calcula con la estrategia sobre el
+        primer scan; en cada pasajero se vuelve a escanear (la página se recarga
+        tras cada click) y, si el asiento planificado ya no está disponible o se
+        eligió otro, se recalcula el plan para los pasajeros que faltan.
 
         Args:
-            passenger_count (int): Número de pasajeros (default 3)
+            seat_filter: Filtro de asientos (economy_seat, any_seat)
+            passenger_count (int): Número de pasajeros
+            strategy (str): Estrategia de SEAT_STRATEGIES (None = la del page object)
 
         Returns:
             dict: Diccionario con pasajeros y sus asientos asignados
         """
-        logger.info(f"Assigning seats (ANY type) to {passenger_count} passengers...")
-        logger.info("NOTE: Passengers are auto-selected after each seat click.")
+        strategy = strategy or self.seat_strategy
+        choose = get_seat_strategy(strategy)
 
         passenger_types = [
             "Adulto 1",
             "Joven 1",
             "Niño 1"
-        ][:passenger_count]
+        ][:passenger_count]  # Solo para tracking/logging
 
         seat_assignments = {}
+        plan = []  # IDs planificados, uno por pasajero
+        rejected = set()  # Asientos que dieron modal o no se marcaron (no se reintentan en este vuelo)
 
         try:
             for i, passenger_type in enumerate(passenger_types):
                 logger.info(f"")
-                logger.info(f"========== Passenger {i+1}/3: {passenger_type} ==========")
+                logger.info(f"========== Passenger {i+1}/{passenger_count}: {passenger_type} ==========")
                 logger.info(f"  (Passenger is ALREADY auto-selected by the page)")
 
-                logger.info(f"  Selecting seat (any type) for passenger {i+1}...")
-                seat_selected, seat_id = self.select_first_available_seat_any_type()
+                # PASO 1: Scan del seatmap (UNA llamada) y plan para los pasajeros que faltan
+                remaining = passenger_count - i
+                snapshot = scan_seatmap(self.driver)
+                planned = snapshot.get(plan[i]) if i < len(plan) else None
+                if planned is None or not planned.available or planned.id in rejected:
+                    candidates = [seat for seat in choose(snapshot, remaining, seat_filter) if seat.id not in rejected]
+                    plan = plan[:i] + [seat.id for seat in candidates[:remaining]]
+                    logger.info(f"  Seat plan ({strategy}): {plan[i:]}")
+
+                # PASO 2: Click en el asiento planificado (o el siguiente candidato si falla)
+                seat_selected, seat_id = self.select_seat(
+                    seat_filter, strategy, group_size=remaining,
+                    preferred_id=plan[i] if i < len(plan) else None, snapshot=snapshot, rejected=rejected
+                )
 
                 if not seat_selected:
                     logger.error(f"  ✗ Failed to select seat for passenger {i+1}")
+                    plan = plan[:i]
                     continue
 
+                if i >= len(plan) or seat_id != plan[i]:
+                    plan = plan[:i] + [seat_id]  # Se desvió del plan: se recalcula en el próximo pasajero
+
                 seat_assignments[passenger_type] = seat_id
                 logger.info(f"✓ Passenger {i+1} ({passenger_type}) → Seat {seat_id}")
 
-                # Esperar recarga y auto-selección del siguiente pasajero
+                # Esperar a que la página se recargue y seleccione el siguiente pasajero
                 if i < passenger_count - 1:
                     logger.info(f"  Waiting for page reload and auto-selection of next passenger...")
-                    time.sleep(1)
+                    self.waits.settle("Seatmap: next passenger", replaces=1)
 
             logger.info(f"✓ All {len(seat_assignments)} passengers assigned seats successfully")
 
-            # Esperar tiempo adicional para que la página finalice
-            logger.info("Waiting 2 additional seconds for page to finalize seat selection state...")
-            time.sleep(2)
+            # CRÍTICO: Esperar tiempo adicional para que la página actualice el botón correctamente
+            logger.info("Waiting for page to finalize seat selection state...")
+            self.waits.settle("Seatmap: seat selection finalized", replaces=2)
 
             return seat_assignments
 
@@ -695,6 +509,46 @@ class SeatmapPage:
             logger.error(f"✗ Error assigning seats: {e}")
             return seat_assignments
 
+    def assign_seats_to_passengers(self, passenger_count=3, strategy=None):
+        """
+        Asigna asientos Economy a todos los pasajeros en orden.
+
+        FLUJO CORRECTO (según comportamiento real de nuxqa):
+        1. El primer pasajero YA está seleccionado automáticamente
+        2. Solo hacer click en el asiento → la página se RECARGA automáticamente
+        3. El siguiente pasajero queda seleccionado automáticamente
+        4. Repetir: click en asiento → recarga → siguiente pasajero
+
+        NO SE DEBE HACER CLICK EN LOS PASAJEROS MANUALMENTE.
+
+        Args:
+            passenger_count (int): Número de pasajeros (default 3)
+            strategy (str): Estrategia de asientos (default: la del page object, --seat-strategy)
+
+        Returns:
+            dict: Diccionario con pasajeros y sus asientos asignados
+        """
+        logger.info(f"Assigning Economy seats to {passenger_count} passengers...")
+        logger.info("NOTE: Passengers are auto-selected after each seat click. NO manual passenger selection needed.")
+        return self._assign_seats(economy_seat, passenger_count, strategy)
+
+    def assign_any_type_seats_to_passengers(self, passenger_count=3, strategy=None):
+        """
+        Asigna asientos de CUALQUIER tipo (Plus/Premium/Economy) a todos los pasajeros en orden.
+        Versión para Case 2 donde se permite cualquier tipo de asiento según disponibilidad
+        (se llama una vez por vuelo).
+
+        Args:
+            passenger_count (int): Número de pasajeros (default 3)
+            strategy (str): Estrategia de asientos (default: la del page object, --seat-strategy)
+
+        Returns:
+            dict: Diccionario con pasajeros y sus asientos asignados
+        """
+        logger.info(f"Assigning seats (ANY type) to {passenger_count} passengers...")
+        logger.info("NOTE: Passengers are auto-selected after each seat click.")
+        return self._assign_seats(any_seat, passenger_count, strategy)
+
     def click_go_to_payment(self):
         """
         Hace click en el botón de pago para ir a la página de Payment.
@@ -715,7 +569,7 @@ class SeatmapPage:
         try:
             # Scroll hacia abajo para ver el botón
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            self.waits.settle("Seatmap: before payment button", replaces=1)
 
             # 📸 Screenshot antes de hacer click en botón
             try:
@@ -753,46 +607,49 @@ class SeatmapPage:
 
             go_to_payment_btn = None
             used_selector = None
-            for selector in go_to_payment_selectors:
-                try:
-                    # 🔍 USAR find_elements (plural) para obtener TODOS los botones que coinciden
-                    # Si el selector busca span, obtenemos los botones padres de TODOS los spans
-                    if selector.startswith("//span"):
-                        span_elems = self.driver.find_elements(By.XPATH, selector)
-                        candidate_buttons = [span.find_element(By.XPATH, "./ancestor::button") for span in span_elems]
-                        logger.info(f"Found {len(candidate_buttons)} buttons via span selector")
-                    else:
-                        candidate_buttons = self.driver.find_elements(By.XPATH, selector)
-                        logger.info(f"Found {len(candidate_buttons)} buttons with selector")
-
-                    # Iterar por TODOS los botones encontrados y validar cada uno
-                    for button in candidate_buttons:
-                        # VALIDACIÓN DINÁMICA: Validar texto del botón usando keywords del JSON
-                        button_text = button.text.strip().lower()
-                        logger.debug(f"  Checking button with text: '{button.text}'")
-
-                        # Verificar que NO sea un botón incorrecto (ej: "Vuelo anterior", "Previous flight")
-                        # Convertir todas las keywords a lowercase para comparación
-                        exclude_keywords_lower = [kw.lower() for kw in exclude_keywords]
-                        if any(keyword in button_text for keyword in exclude_keywords_lower):
-                            logger.warning(f"  Skipping button with text '{button.text}' (matches exclude keywords)")
-                            continue
-
-                        # Verificar que SÍ contenga palabras relacionadas con pago
-                        payment_keywords_lower = [kw.lower() for kw in payment_keywords]
-                        if any(keyword in button_text for keyword in payment_keywords_lower):
-                            go_to_payment_btn = button
-                            used_selector = selector
-                            logger.info(f"✓ Button validated: '{go_to_payment_btn.text}'")
-                            break  # Salir del loop de botones
-
-                    # Si encontramos el botón correcto, salir del loop de selectores
-                    if go_to_payment_btn:
-                        break
-
-                except Exception as e:
-                    logger.debug(f"Selector failed: {str(e)[:50]}...")
-                    continue
+            # Sin implicit wait: un selector sin coincidencias (ej: aria-labelledby de otro idioma)
+            # devuelve [] al instante en lugar de esperar 10s
+            with no_implicit_wait(self.driver):
+                for selector in go_to_payment_selectors:
+                    try:
+                        # 🔍 USAR find_elements (plural) para obtener TODOS los botones que coinciden
+                        # Si el selector busca span, obtenemos los botones padres de TODOS los spans
+                        if selector.startswith("//span"):
+                            span_elems = self.driver.find_elements(By.XPATH, selector)
+                            candidate_buttons = [span.find_element(By.XPATH, "./ancestor::button") for span in span_elems]
+                            logger.info(f"Found {len(candidate_buttons)} buttons via span selector")
+                        else:
+                            candidate_buttons = self.driver.find_elements(By.XPATH, selector)
+                            logger.info(f"Found {len(candidate_buttons)} buttons with selector")
+
+                        # Iterar por TODOS los botones encontrados y validar cada uno
+                        for button in candidate_buttons:
+                            # VALIDACIÓN DINÁMICA: Validar texto del botón usando keywords del JSON
+                            button_text = button.text.strip().lower()
+                            logger.debug(f"  Checking button with text: '{button.text}'")
+
+                            # Verificar que NO sea un botón incorrecto (ej: "Vuelo anterior", "Previous flight")
+                            # Convertir todas las keywords a lowercase para comparación
+                            exclude_keywords_lower = [kw.lower() for kw in exclude_keywords]
+                            if any(keyword in button_text for keyword in exclude_keywords_lower):
+                                logger.warning(f"  Skipping button with text '{button.text}' (matches exclude keywords)")
+                                continue
+
+                            # Verificar que SÍ contenga palabras relacionadas con pago
+                            payment_keywords_lower = [kw.lower() for kw in payment_keywords]
+                            if any(keyword in button_text for keyword in payment_keywords_lower):
+                                go_to_payment_btn = button
+                                used_selector = selector
+                                logger.info(f"✓ Button validated: '{go_to_payment_btn.text}'")
+                                break  # Salir del loop de botones
+
+                        # Si encontramos el botón correcto, salir del loop de selectores
+                        if go_to_payment_btn:
+                            break
+
+                    except Exception as e:
+                        logger.debug(f"Selector failed: {str(e)[:50]}...")
+                        continue
 
             if not go_to_payment_btn:
                 logger.error("Payment button not found with any selector")
@@ -803,14 +660,13 @@ class SeatmapPage:
 
             # Scroll al botón
             self.driver.execute_script("arguments[0].scrollIntoView(true);", go_to_payment_btn)
-            time.sleep(1)
 
             # 🖱️ Click en el botón de pago
             self.driver.execute_script("arguments[0].click();", go_to_payment_btn)
             logger.info("✓ Payment button clicked successfully")
 
             # ⏳ Esperar a que cargue la página de Payment
-            time.sleep(2)
+            self.waits.settle("Seatmap: go to payment", replaces=3)
             return True
 
         except Exception as e:
@@ -832,7 +688,7 @@ class SeatmapPage:
         try:
             # Scroll hacia abajo para ver el botón
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            self.waits.settle("Seatmap: before next flight button", replaces=1)
 
             # 📸 Se CAPTURA (SELENIUM): Screenshot antes de hacer click en botón
             try:
@@ -851,30 +707,21 @@ class SeatmapPage:
                 "//button[@aria-labelledby='Siguiente vuelo']",
                 # Selector 2: Por clase específica amount-summary_button--nextflight
                 "//ds-button[contains(@class, 'amount-summary_button--nextflight')]//button",
-                # Selector 3: Por span con texto exacto (incluyendo espacios)
-                "//span[@class='button_label' and contains(text(), 'Siguiente vuelo')]",
+                # Selector 3: Por span con texto exacto (incluyendo espacios), subiendo al botón que lo contiene
+                "//span[@class='button_label' and contains(text(), 'Siguiente vuelo')]/ancestor::button[1]",
                 # Selector 4: Fallback - Por cualquier botón que contenga "Siguiente vuelo"
                 "//button[contains(., 'Siguiente vuelo')]",
             ]
 
+            # Todos los selectores se resuelven en UNA llamada (find_present): los ausentes
+            # (ej: aria-labelledby en español con el sitio en otro idioma) no pagan el implicit wait
             next_flight_btn = None
             used_selector = None
-            for selector in next_flight_selectors:
-                try:
-                    if selector.startswith("//span") and "ancestor" not in selector:
-                        span_elem = self.driver.find_element(By.XPATH, selector)
-                        next_flight_btn = span_elem.find_element(By.XPATH, "./ancestor::button")
-                        logger.info(f"✓ 'Siguiente vuelo' button found via span, selector: {selector[:60]}...")
-                    else:
-                        next_flight_btn = self.driver.find_element(By.XPATH, selector)
-                        logger.info(f"✓ 'Siguiente vuelo' button found directly, selector: {selector[:60]}...")
-
-                    used_selector = selector
-                    logger.info(f"✓ Button found successfully with selector: {selector}")
-                    break
-                except Exception as e:
-                    logger.debug(f"Selector '{selector[:40]}...' failed: {e}")
-                    continue
+            found = find_present(self.driver, [selector_locator(s) for s in next_flight_selectors], first_only=True)
+            if found:
+                index, next_flight_btn = found[0]
+                used_selector = next_flight_selectors[index]
+                logger.info(f"✓ Button found successfully with selector: {used_selector}")
 
             if not next_flight_btn:
                 logger.error("'Siguiente vuelo' button not found with any selector")
@@ -885,18 +732,20 @@ class SeatmapPage:
 
             # Scroll al botón
             self.driver.execute_script("arguments[0].scrollIntoView(true);", next_flight_btn)
-            time.sleep(1)
 
             # 🖱️ Se PRESIONA (SELENIUM): Botón "Siguiente vuelo" para continuar a seatmap de vuelta
             self.driver.execute_script("arguments[0].click();", next_flight_btn)
             logger.info("✓ 'Siguiente vuelo' button clicked successfully")
 
-            # ⏳ Se ESPERA (SELENIUM): Página recargue con seatmap del vuelo de vuelta
-            time.sleep(3)
+            # ⏳ Se ESPERA (WAIT ENGINE): Página recargue con seatmap del vuelo de vuelta (el botón queda obsoleto)
+            try:
+                self.waits.until(element_stale(next_flight_btn), "Seatmap: next flight navigation", timeout=4, replaces=4)
+            except TimeoutException:
+                logger.warning("'Siguiente vuelo' button still attached, continuing")
 
-            # ⏳ Se ESPERA (SELENIUM): Angular inicialice completamente el seatmap del vuelo de vuelta
-            logger.info("Waiting additional 5 seconds for Angular to initialize return flight seatmap...")
-            time.sleep(5)
+            # ⏳ Se ESPERA (WAIT ENGINE): Angular inicialice completamente el seatmap del vuelo de vuelta
+            logger.info("Waiting for Angular to initialize return flight seatmap...")
+            self.waits.settle("Seatmap: return flight seatmap", replaces=5, idle_ms=500)
 
             return True
 
@@ -924,3 +773,24 @@ class SeatmapPage:
         except Exception as e:
             logger.error(f"Error taking screenshot: {e}")
             return None
+
+    def save_page_source(self, filename="debug_seatmap_page.html"):
+        """
+        Guarda el HTML actual del seatmap (página "grabada" para el benchmark de
+        búsqueda de asientos: python -m utils.dom_query).
+
+        Args:
+            filename: Nombre del archivo dentro de reports/
+
+        Returns:
+            str: Path del HTML guardado (None si falló)
+        """
+        try:
+            source_path = f"reports/{filename}"
+            with open(source_path, "w", encoding="utf-8") as f:
+                f.write(self.driver.page_source)
+            logger.info(f"Page source saved: {source_path}")
+            return source_path
+        except Exception as e:
+            logger.error(f"Error saving page source: {e}")
+            return None
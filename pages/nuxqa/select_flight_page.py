@@ -11,8 +11,9 @@ Caso 3: Seleccionar vuelos después de búsqueda
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from utils.wait_engine import WaitEngine, count_at_least, no_page_loader
 import logging
-import time
 
 # ==================== LOGGER ====================
 logger = logging.getLogger(__name__)
@@ -41,6 +42,10 @@ class SelectFlightPage:
     # Contenedor de vuelos
     FLIGHT_CONTAINER = (By.XPATH, "//div[contains(@class, 'flight-list') or contains(@class, 'flights')]")
 
+    # Botones de vuelo (precio por trayecto) y de plan de tarifa (Basic, Classic, Flex)
+    JOURNEY_BUTTONS = (By.CSS_SELECTOR, "button.journey_price_button")
+    FARE_BUTTONS = (By.CSS_SELECTOR, "button.fare_button")
+
     # ==================== CONSTRUCTOR ====================
     def __init__(self, driver):
         """
@@ -51,6 +56,7 @@ class SelectFlightPage:
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 20)  # Wait más largo para carga de vuelos
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
         logger.info("SelectFlightPage object initialized")
 
     # ==================== MÉTODOS ====================
@@ -68,16 +74,17 @@ class SelectFlightPage:
         logger.info("Waiting for Select Flight page to load...")
 
         try:
-            # Esperar a que cambie la URL (puede contener 'select', 'flight', etc)
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+            # ⏳ Se ESPERA (WAIT ENGINE): Vuelos listados y página asentada (antes: sleeps fijos de 2s + 3s)
+            try:
+                self.waits.until(count_at_least(self.JOURNEY_BUTTONS, 1), "SelectFlight: journeys listed",
+                                 timeout=20, replaces=2)
+            except TimeoutException:
+                logger.warning("No journey buttons detected yet, continuing")
+            self.waits.settle("SelectFlight: page settled", replaces=3)
 
             current_url = self.driver.current_url
             logger.info(f"Current URL after search: {current_url}")
 
-            # Esperar a que aparezcan elementos de vuelos o el botón continuar
-            # (la página puede tener diferentes estructuras según el ambiente)
-            time.sleep(3)  # OPTIMIZADO: 5s → 3s (ahorro: 2s)
-
             logger.info("✓ Select Flight page loaded successfully")
             return True
 
@@ -103,7 +110,7 @@ class SelectFlightPage:
             # PASO 1: Seleccionar primer vuelo de IDA
             # ⏳ Se ESPERA (SELENIUM): Botones de vuelos disponibles aparezcan
             journey_buttons = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button.journey_price_button"))
+                EC.presence_of_all_elements_located(self.JOURNEY_BUTTONS)
             )
 
             if not journey_buttons:
@@ -115,18 +122,17 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Primer vuelo disponible de ida
             first_journey = journey_buttons[0]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", first_journey)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", first_journey)  # JavaScript click
             logger.info("✓ Outbound flight selected (first one)")
 
-            # ⏳ Se ESPERA (SELENIUM): Planes de tarifa se carguen
-            time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+            # ⏳ Se ESPERA (WAIT ENGINE): Planes de tarifa se carguen (antes: sleeps fijos de 0.5s + 1.5s)
+            self.waits.settle("SelectFlight: outbound fares loading", replaces=2)
 
             # PASO 2: Seleccionar plan BASIC (primer botón fare_button)
             logger.info("Waiting for fare plans to appear...")
             # 🔍 Se BUSCA (SELENIUM): Botones de planes de tarifa (Basic, Classic, Flex)
             fare_buttons = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button.fare_button"))
+                EC.presence_of_all_elements_located(self.FARE_BUTTONS)
             )
 
             if len(fare_buttons) < 1:
@@ -138,11 +144,11 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Plan BASIC (primer botón - índice 0)
             basic_button = fare_buttons[0]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", basic_button)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", basic_button)  # JavaScript click
             logger.info("✓ BASIC plan selected for outbound flight (1st button)")
 
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+            # ⏳ Se ESPERA (WAIT ENGINE): La selección se aplique (antes: sleeps fijos de 0.5s + 2s)
+            self.waits.settle("SelectFlight: outbound fare applied", replaces=2.5)
 
             return True
 
@@ -168,7 +174,7 @@ class SelectFlightPage:
             # PASO 1: Seleccionar primer vuelo de IDA
             # ⏳ Se ESPERA (SELENIUM): Botones de vuelos disponibles aparezcan
             journey_buttons = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button.journey_price_button"))
+                EC.presence_of_all_elements_located(self.JOURNEY_BUTTONS)
             )
 
             if not journey_buttons:
@@ -180,18 +186,17 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Primer vuelo disponible de ida
             first_journey = journey_buttons[0]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", first_journey)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", first_journey)  # JavaScript click
             logger.info("✓ Outbound flight selected (first one)")
 
-            # ⏳ Se ESPERA (SELENIUM): Planes de tarifa se carguen
-            time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+            # ⏳ Se ESPERA (WAIT ENGINE): Planes de tarifa se carguen (antes: sleeps fijos de 0.5s + 1.5s)
+            self.waits.settle("SelectFlight: outbound fares loading", replaces=2)
 
             # PASO 2: Seleccionar plan FLEX (tercer botón fare_button)
             logger.info("Waiting for fare plans to appear...")
             # 🔍 Se BUSCA (SELENIUM): Botones de planes de tarifa (Basic, Classic, Flex)
             fare_buttons = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button.fare_button"))
+                EC.presence_of_all_elements_located(self.FARE_BUTTONS)
             )
 
             if len(fare_buttons) < 3:
@@ -203,11 +208,11 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Plan FLEX (tercer botón - índice 2)
             flex_button = fare_buttons[2]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", flex_button)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", flex_button)  # JavaScript click
             logger.info("✓ FLEX plan selected for outbound flight (3rd button)")
 
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+            # ⏳ Se ESPERA (WAIT ENGINE): La selección se aplique (antes: sleeps fijos de 0.5s + 2s)
+            self.waits.settle("SelectFlight: outbound fare applied", replaces=2.5)
 
             return True
 
@@ -234,21 +239,16 @@ class SelectFlightPage:
             # Se muestra un avión en movimiento (page-loader) mientras carga los vuelos de VUELTA
             logger.info("Waiting for page to reload with return flights (this takes ~25-30 seconds)...")
 
-            # OPTIMIZADO: Esperar a que aparezca el loader (3s → 2s)
-            time.sleep(2)  # Reducido para mejorar performance (ahorro: 1s)
-
-            # Esperar a que el loader (avión en movimiento) DESAPAREZCA
-            # Aumentamos el timeout a 40 segundos para cubrir los 25-30 segundos de carga
+            # ⏳ Se ESPERA (WAIT ENGINE): Loader (avión en movimiento) fuera y luego un settle corto
+            # Timeout de 40 segundos solo para el loader (cubre los 25-30 segundos de carga); la red
+            # puede no quedar en reposo nunca (polling), por eso no se espera page_settled 40s
+            # (antes: sleep 2s para que aparezca el loader + invisibilidad del loader + sleep 1s)
             try:
-                page_loader = (By.CSS_SELECTOR, "div.page-loader")
-                wait_loader = WebDriverWait(self.driver, 40)  # 40 segundos de timeout
-                wait_loader.until(EC.invisibility_of_element_located(page_loader))
+                self.waits.until(no_page_loader(), "SelectFlight: return flights loading", timeout=40, replaces=2)
                 logger.info("✓ Page loader (airplane animation) disappeared")
-            except:
-                logger.info("No page loader found or already disappeared")
-
-            # OPTIMIZADO: Esperar a que los elementos se estabilicen (2s → 1s)
-            time.sleep(1)  # Reducido para mejorar performance (ahorro: 1s)
+            except TimeoutException:
+                logger.info("Page loader still visible after 40s, continuing")
+            self.waits.settle("SelectFlight: return flights settled", replaces=1)
 
             # Hacer scroll hacia abajo para ver los vuelos de VUELTA (más abajo que el calendario)
             logger.info("Scrolling down to see return flights list (below the calendar)...")
@@ -256,17 +256,17 @@ class SelectFlightPage:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
 
             # OPTIMIZADO: Esperar a que aparezcan al menos 30 vuelos (return flights)
-            # Cambiado de sleep(10) fijo a WebDriverWait inteligente con fallback de 4s
+            # Cambiado de sleep(10) fijo a espera por condición con fallback de 4s
             logger.info("Waiting for return flights to fully render (smart wait)...")
             try:
-                # Esperar a que haya al menos 30 botones de vuelo visibles (cantidad típica de vuelos de vuelta)
-                wait_return = WebDriverWait(self.driver, 15)  # Max 15s
-                wait_return.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "button.journey_price_button")) >= 30)
+                # Esperar a que haya al menos 30 botones de vuelo (cantidad típica de vuelos de vuelta)
+                self.waits.until(count_at_least(self.JOURNEY_BUTTONS, 30), "SelectFlight: 30+ return journeys",
+                                 timeout=15)
                 logger.info("✓ Return flights loaded (30+ buttons detected)")
-                time.sleep(1)  # Pequeña espera adicional para estabilidad
-            except:
+                self.waits.settle("SelectFlight: return list settled", replaces=1)
+            except TimeoutException:
                 logger.warning("Timeout waiting for 30 buttons, proceeding with fallback wait...")
-                time.sleep(4)  # OPTIMIZADO: 10s → 4s fallback (ahorro: 6s)
+                self.waits.settle("SelectFlight: return list fallback", replaces=4)
 
             # PASO 1: Seleccionar primer vuelo de VUELTA
             # IMPORTANTE: Los botones correctos tienen texto variable según idioma:
@@ -309,22 +309,21 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Primer vuelo de vuelta disponible
             first_journey = return_flight_buttons[0]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", first_journey)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", first_journey)  # JavaScript click
             logger.info("✓ Return flight selected (first one available)")
 
             # OPTIMIZADO: Esperar inteligentemente a que aparezcan los 3 planes de tarifa
-            # Cambiado de sleep(5) fijo a WebDriverWait inteligente con fallback de 2s
+            # Cambiado de sleep(5) fijo a espera por condición con fallback de 2s
             logger.info("Waiting for fare plans to appear for return flight (smart wait)...")
             try:
-                # Esperar a que aparezcan exactamente 3 botones de tarifa (Basic, Classic, Flex)
-                wait_fares = WebDriverWait(self.driver, 10)  # Max 10s
-                wait_fares.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "button.fare_button")) >= 3)
+                # Esperar a que aparezcan los 3 botones de tarifa (Basic, Classic, Flex)
+                self.waits.until(count_at_least(self.FARE_BUTTONS, 3), "SelectFlight: return fares listed",
+                                 timeout=10, replaces=0.5)
                 logger.info("✓ Fare buttons loaded (3 detected)")
-                time.sleep(0.5)  # Pequeña espera para estabilidad
-            except:
+                self.waits.settle("SelectFlight: return fares settled", replaces=0.5)
+            except TimeoutException:
                 logger.warning("Timeout waiting for fare buttons, proceeding with fallback wait...")
-                time.sleep(2)  # OPTIMIZADO: 5s → 2s fallback (ahorro: 3s)
+                self.waits.settle("SelectFlight: return fares fallback", replaces=2)
 
             # PASO 2: Seleccionar plan FLEX (tercer botón fare_button)
             logger.info("Locating fare plan buttons...")
@@ -332,7 +331,7 @@ class SelectFlightPage:
             # ⏳ Se ESPERA (SELENIUM): Botones de planes de tarifa aparezcan (max 25 segundos)
             wait_longer = WebDriverWait(self.driver, 25)
             fare_buttons = wait_longer.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "button.fare_button"))
+                EC.presence_of_all_elements_located(self.FARE_BUTTONS)
             )
 
             if len(fare_buttons) < 3:
@@ -344,11 +343,11 @@ class SelectFlightPage:
             # 🖱️ Se PRESIONA (SELENIUM): Plan FLEX para vuelo de vuelta (tercer botón - índice 2)
             flex_button = fare_buttons[2]
             self.driver.execute_script("arguments[0].scrollIntoView(true);", flex_button)
-            time.sleep(0.5)  # OPTIMIZADO: 1s → 0.5s (ahorro: 0.5s)
             self.driver.execute_script("arguments[0].click();", flex_button)  # JavaScript click
             logger.info("✓ FLEX plan selected for return flight (3rd button)")
 
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+            # ⏳ Se ESPERA (WAIT ENGINE): La selección se aplique (antes: sleeps fijos de 0.5s + 2s)
+            self.waits.settle("SelectFlight: return fare applied", replaces=2.5)
 
             return True
 
@@ -391,9 +390,9 @@ class SelectFlightPage:
                         continue_btn = self.driver.find_element(By.XPATH, selector)
 
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", continue_btn)
-                    time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
                     self.driver.execute_script("arguments[0].click();", continue_btn)  # JavaScript click
-                    time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+                    # ⏳ Se ESPERA (WAIT ENGINE): Navegación a Passengers (antes: sleeps fijos de 0.3s + 1.5s)
+                    self.waits.settle("SelectFlight: continue", replaces=1.8)
 
                     logger.info("✓ Continue button clicked successfully")
                     return True
@@ -12,8 +12,8 @@ Caso 2: Seleccionar Avianca Lounges (o cualquier otro si no disponible)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from utils.wait_engine import WaitEngine
 import logging
-import time
 
 # ==================== LOGGER ====================
 logger = logging.getLogger(__name__)
@@ -61,6 +61,7 @@ class ServicesPage:
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 20)
+        self.waits = WaitEngine(driver)  # Esperas por condición (en lugar de sleeps fijos)
         logger.info("ServicesPage object initialized")
 
     # ==================== MÉTODOS ====================
@@ -75,7 +76,8 @@ class ServicesPage:
         logger.info("Waiting for Services page to load...")
 
         try:
-            time.sleep(2)  # OPTIMIZADO: 3s → 2s (ahorro: 1s)
+            # ⏳ Se ESPERA (WAIT ENGINE): Página asentada (antes: sleeps fijos de 2s + 1s)
+            self.waits.settle("Services: page loaded", replaces=3)
 
             current_url = self.driver.current_url
             logger.info(f"Current URL: {current_url}")
@@ -86,9 +88,6 @@ class ServicesPage:
             if not is_services_page:
                 logger.warning(f"URL doesn't contain 'service' or 'product': {current_url}")
 
-            # Esperar a que aparezcan elementos
-            time.sleep(1)  # OPTIMIZADO: 2s → 1s (ahorro: 1s)
-
             logger.info("✓ Services page loaded successfully")
             return True
 
@@ -112,10 +111,9 @@ class ServicesPage:
                 skip_button = self.driver.find_element(*self.SKIP_SERVICES_BUTTON)
                 logger.info("Skip button found, clicking it...")
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", skip_button)
-                time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
                 self.driver.execute_script("arguments[0].click();", skip_button)
                 logger.info("✓ Services skipped using Skip button")
-                time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+                self.waits.settle("Services: skip", replaces=1.8)
                 return True
             except Exception as e:
                 logger.info(f"Skip button not found: {e}")
@@ -174,7 +172,6 @@ class ServicesPage:
 
             # Scroll al elemento
             self.driver.execute_script("arguments[0].scrollIntoView(true);", service_element)
-            time.sleep(0.5)
 
             # Intentar encontrar checkbox dentro del servicio
             try:
@@ -249,13 +246,11 @@ class ServicesPage:
 
             # 🖱️ Se PRESIONA (SELENIUM): Botón "Añadir" para abrir modal de Avianca Lounges
             self.driver.execute_script("arguments[0].scrollIntoView(true);", service_button)
-            time.sleep(1)
             self.driver.execute_script("arguments[0].click();", service_button)
             logger.info("✓ Clicked on Avianca Lounges 'Añadir' button")
 
-            # ⏳ Se ESPERA (SELENIUM): Modal de Avianca Lounges se abra
-            # OPTIMIZADO: Reducido de 2s a 1.5s (ahorro: 0.5s)
-            time.sleep(1.5)
+            # ⏳ Se ESPERA (WAIT ENGINE): Modal de Avianca Lounges se abra (antes: sleeps fijos de 1s + 1.5s)
+            self.waits.settle("Services: lounges modal", replaces=2.5)
             logger.info("Waiting for modal to appear...")
 
             # PASO 3: Seleccionar SOLO 1 opción del modal
@@ -285,7 +280,6 @@ class ServicesPage:
 
                         # 🖱️ Se PRESIONA (SELENIUM): Opción disponible en modal de Avianca Lounges
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", option_label)
-                        time.sleep(0.5)
                         self.driver.execute_script("arguments[0].click();", option_label)
                         logger.info(f"✓ Selected option in modal")
 
@@ -298,7 +292,7 @@ class ServicesPage:
                 logger.error("No available options found in modal")
                 return False
 
-            time.sleep(1)
+            self.waits.settle("Services: lounges option selected", replaces=1.5)
 
             # PASO 4: Click en "Confirmar" del modal
             logger.info("Looking for 'Confirmar' button in modal...")
@@ -342,13 +336,11 @@ class ServicesPage:
 
             # 🖱️ Se PRESIONA (SELENIUM): Botón "Confirmar" para cerrar modal y confirmar selección
             self.driver.execute_script("arguments[0].scrollIntoView(true);", confirm_button)
-            time.sleep(0.5)
             self.driver.execute_script("arguments[0].click();", confirm_button)
             logger.info("✓ Clicked 'Confirmar' button in modal")
 
-            # ⏳ Se ESPERA (SELENIUM): Modal se cierre y página recargue
-            # OPTIMIZADO: Reducido de 3s a 2s (ahorro: 1s)
-            time.sleep(2)
+            # ⏳ Se ESPERA (WAIT ENGINE): Modal se cierre y página recargue (antes: sleeps fijos de 0.5s + 2s)
+            self.waits.settle("Services: lounges modal closed", replaces=2.5)
             logger.info("✓ Modal closed, page reloaded")
 
             logger.info("✓ Avianca Lounges service selected successfully")
@@ -377,7 +369,6 @@ class ServicesPage:
             if checkboxes:
                 first_checkbox = checkboxes[0]
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", first_checkbox)
-                time.sleep(0.5)
 
                 if not first_checkbox.is_selected():
                     self.driver.execute_script("arguments[0].click();", first_checkbox)
@@ -389,7 +380,6 @@ class ServicesPage:
                 if add_buttons:
                     first_button = add_buttons[0]
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", first_button)
-                    time.sleep(0.5)
                     self.driver.execute_script("arguments[0].click();", first_button)
                     logger.info("✓ First available service selected via Add button")
                     return True
@@ -413,7 +403,7 @@ class ServicesPage:
         try:
             # Scroll hacia abajo para asegurar que el botón esté visible
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)  # OPTIMIZADO: 2s → 1s (ahorro: 1s)
+            self.waits.settle("Services: before continue", replaces=1)
 
             # Buscar botón continuar con diferentes estrategias
             # El botón tiene estructura: <button class="btn-next"><span>Continuar</span></button>
@@ -440,9 +430,8 @@ class ServicesPage:
                         continue_btn = self.driver.find_element(By.XPATH, selector)
 
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", continue_btn)
-                    time.sleep(0.3)  # OPTIMIZADO: 0.5s → 0.3s (ahorro: 0.2s)
                     self.driver.execute_script("arguments[0].click();", continue_btn)  # JavaScript click
-                    time.sleep(1.5)  # OPTIMIZADO: 2s → 1.5s (ahorro: 0.5s)
+                    self.waits.settle("Services: continue", replaces=1.8)
 
                     logger.info("✓ Continue button clicked successfully")
                     return True
@@ -43,6 +43,7 @@ PASSENGERS_EACH_TYPE = 3  # 3 pasajeros de cada tipo según PDF
 @allure.story("Search Flights with Session Event Capture")
 @allure.severity(allure.severity_level.CRITICAL)
 @pytest.mark.case3
+@pytest.mark.network_capture
 def test_flight_search_and_network_capture(driver, base_url, db, browser, language, screenshots_mode, request, test_config):
     """
     Caso 3: Búsqueda de vuelos y captura del evento Session del Network.
@@ -116,6 +117,9 @@ def test_flight_search_and_network_capture(driver, base_url, db, browser, langua
     ORIGIN_SEARCH = cities_info[ORIGIN_CODE]["search_string"]
     DESTINATION_SEARCH = cities_info[DESTINATION_CODE]["search_string"]
 
+    # Specs de extracción del Session JSON (case_mappings.json -> case_3 -> extraction_specs)
+    extraction_specs = (test_config.get_case_info("case_3") or {}).get("extraction_specs", {})
+
     # Agregar tags dinámicos a Allure
     allure.dynamic.tag(f"browser-{browser}")
     allure.dynamic.tag(f"env-{env}")
@@ -135,6 +139,14 @@ def test_flight_search_and_network_capture(driver, base_url, db, browser, langua
         # Habilitar captura de red ANTES de navegar
         network_capture.enable_network_tracking()
 
+        # Drenar el performance log en segundo plano (el test es largo y el buffer puede descartar eventos)
+        network_capture.start_background_collection()
+        request.addfinalizer(network_capture.stop_background_collection)
+
+        # Peticiones por paso: cada allure.step siguiente recibe su adjunto "Network (step)"
+        network_capture.track_allure_steps()
+        request.addfinalizer(network_capture.untrack_allure_steps)
+
         # Calculate dates for display
         from datetime import datetime, timedelta
         today = datetime.now()
@@ -407,6 +419,15 @@ def test_flight_search_and_network_capture(driver, base_url, db, browser, langua
         # Guardar logs completos en archivo (evidencia)
         network_capture.save_network_logs_to_file(f"reports/network_logs_case3_{browser}.json")
 
+        # Exportar HAR 1.2 (waterfall de red abrible en DevTools)
+        har_file = f"reports/network_case3_{browser}.har"
+        if network_capture.save_har_file(har_file):
+            allure.attach.file(
+                har_file,
+                name="Network HAR",
+                extension="har"
+            )
+
         allure.attach(
             json.dumps(network_summary, indent=2),
             name="Network Summary",
@@ -425,7 +446,9 @@ def test_flight_search_and_network_capture(driver, base_url, db, browser, langua
 
             # ==================== EXTRAER 4 CAMPOS ESPECÍFICOS ====================
             # Extraer closingCheckInDate, fares, openingCheckInDate, segments
-            session_extracted_fields = network_capture.extract_session_fields()
+            session_extracted_fields = network_capture.extract_session_fields(
+                spec=extraction_specs.get("session_journeys")
+            )
 
             if session_extracted_fields:
                 allure.attach(
@@ -39,7 +39,7 @@ logger = logging.getLogger(__name__)
 @allure.story("Complete One-way Flight Booking Flow")
 @allure.severity(allure.severity_level.CRITICAL)
 @pytest.mark.case1
-def test_oneway_booking(driver, base_url, db, browser, language, screenshots_mode, request, test_config):
+def test_oneway_booking(driver, base_url, db, browser, language, screenshots_mode, request, test_config, network_metrics, network_stub, seat_strategy):
     """
     Caso 1: One-way Booking - Flujo completo de reserva de ida.
 
@@ -399,7 +399,7 @@ def test_oneway_booking(driver, base_url, db, browser, language, screenshots_mod
     # ==================== PASO 7: Seatmap Page - Asignar Asientos Economy ====================
     with allure.step("Step 6: Seatmap - Assign ECONOMY Seats to All Passengers"):
         current_step = "Seatmap - Economy Seat Assignment"
-        seatmap_page = SeatmapPage(driver)
+        seatmap_page = SeatmapPage(driver, seat_strategy=seat_strategy)
 
         page_loaded = seatmap_page.wait_for_page_load()
         assert page_loaded, "Seatmap page did not load"
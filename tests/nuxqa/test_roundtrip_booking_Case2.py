@@ -47,7 +47,7 @@ logger = logging.getLogger(__name__)
 @allure.severity(allure.severity_level.CRITICAL)
 # 🔖 Se MARCA (PYTEST): Test marcado como case2
 @pytest.mark.case2
-def test_roundtrip_booking(driver, base_url, db, browser, language, screenshots_mode, request, test_config):
+def test_roundtrip_booking(driver, base_url, db, browser, language, screenshots_mode, request, test_config, network_metrics, network_stub, seat_strategy):
     """
     Caso 2: Round-trip Booking - Flujo completo de reserva de ida y vuelta.
 
@@ -501,7 +501,7 @@ def test_roundtrip_booking(driver, base_url, db, browser, language, screenshots_
     # 📋 Se REPORTA (ALLURE): Step "Seatmap - Assign Seats for Outbound and Return Flights"
     with allure.step("Step 6: Seatmap - Assign Seats (ANY TYPE) for Outbound and Return Flights"):
         current_step = "Seatmap - Seat Assignment (Round-trip)"
-        seatmap_page = SeatmapPage(driver, language=language)
+        seatmap_page = SeatmapPage(driver, language=language, seat_strategy=seat_strategy)
 
         # ⏳ Se ESPERA (SELENIUM): Página de seatmap cargue completamente
         page_loaded = seatmap_page.wait_for_page_load()
@@ -0,0 +1 @@
+# This file makes the unit directory a Python package
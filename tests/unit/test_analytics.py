@@ -0,0 +1,114 @@
+"""
+test_analytics.py - Tests unitarios de utils/analytics.py
+
+Percentiles por histograma, resultado efectivo, refresh incremental desde la
+marca de agua, flips en orden cronológico y rankings sobre una BD temporal.
+No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import pytest
+
+from utils.analytics import ResultsAnalytics, histogram_percentile, _bucket_for, main
+from utils.database import TestDatabase as ResultsDatabase  # Alias: pytest no la toma como clase de tests
+
+
+# ==================== FIXTURES ====================
+@pytest.fixture
+def database(tmp_path):
+    database = ResultsDatabase(str(tmp_path / "results.db"))
+    yield database
+    database.close()
+
+
+def _save(database, status, execution_time=1.0, timestamp=None, validation_result=None,
+          test_name="test_pos_change", browser="chrome", language="Español"):
+    """Guarda una ejecución del caso 5 (opcionalmente con un timestamp fijo)."""
+    database.save_test_result(test_name, status, execution_time, browser=browser, language=language,
+                              case_number="5", environment="qa4", validation_result=validation_result)
+    if timestamp is not None:
+        with database.connection:
+            database.connection.execute(
+                "UPDATE executions SET timestamp = ? WHERE id = (SELECT MAX(id) FROM executions)", (timestamp,))
+
+
+# ==================== HISTOGRAMA ====================
+def test_histogram_percentile_is_close_to_exact_value():
+    times = [0.5, 1.0, 2.0, 4.0, 30.0]
+    histogram = {}
+    for value in times:
+        bucket = _bucket_for(value)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    assert histogram_percentile({}, 50) is None
+    assert histogram_percentile(histogram, 50) == pytest.approx(2.0, rel=0.03)
+    assert histogram_percentile(histogram, 99) == pytest.approx(30.0, rel=0.03)
+
+
+# ==================== REFRESH INCREMENTAL ====================
+def test_refresh_only_processes_new_executions(database):
+    analytics = ResultsAnalytics(database)
+    _save(database, "PASSED", 2.0)
+    _save(database, "PASSED", 3.0, validation_result="FAILED")  # Validación fallida = FAILED
+    _save(database, "SKIPPED", 0.1)
+
+    assert analytics.refresh() == 3
+    assert analytics.refresh() == 0
+    _save(database, "PASSED", 2.5)
+    assert analytics.refresh() == 1
+    assert analytics.get_watermark() == 4
+
+    group = analytics.get_group_summary()[0]
+    assert (group["case_number"], group["runs"]) == ("5", 4)
+    assert group["pass_rate"] == pytest.approx(2 / 3, abs=1e-4)  # SKIPPED no cuenta
+
+
+def test_rebuild_matches_incremental_refresh(database):
+    analytics = ResultsAnalytics(database, batch_size=2)
+    for status in ("PASSED", "FAILED", "PASSED", "FAILED", "FAILED"):
+        _save(database, status)
+    analytics.refresh()
+    incremental = analytics.get_flakiest(min_runs=1)
+
+    analytics.rebuild()
+    assert analytics.get_flakiest(min_runs=1) == incremental
+    assert incremental[0]["flips"] == 3
+
+
+def test_flips_follow_timestamp_order_not_id_order(database):
+    analytics = ResultsAnalytics(database)
+    # Con xdist un worker puede hacer flush tarde: ids en otro orden que la ejecución
+    _save(database, "FAILED", timestamp="2026-01-01 10:00:02")
+    _save(database, "PASSED", timestamp="2026-01-01 10:00:01")
+    _save(database, "FAILED", timestamp="2026-01-01 10:00:03")
+    analytics.refresh()
+
+    flaky = analytics.get_flakiest(min_runs=1)[0]
+    assert flaky["flips"] == 1  # PASSED -> FAILED -> FAILED (por id serían 2)
+    assert flaky["flakiness"] == 0.5
+
+
+# ==================== RANKINGS Y CLI ====================
+def test_slowest_ranks_by_p95(database):
+    analytics = ResultsAnalytics(database)
+    for seconds in (1.0, 1.2, 1.1):
+        _save(database, "PASSED", seconds, browser="chrome")
+        _save(database, "PASSED", seconds * 10, browser="firefox")
+    analytics.refresh()
+
+    slowest = analytics.get_slowest(limit=2, min_runs=3)
+    assert [row["browser"] for row in slowest] == ["firefox", "chrome"]
+    assert slowest[0]["p95"] == pytest.approx(12.0, rel=0.03)
+
+
+def test_cli_prints_case_and_language(database, capsys):
+    _save(database, "PASSED", timestamp="2026-01-01 10:00:01")
+    _save(database, "FAILED", timestamp="2026-01-01 10:00:02")
+    database.flush()
+
+    main(["--db", database.db_name, "--min-runs", "1"])
+    output = capsys.readouterr().out
+
+    assert "Processed 2 new executions" in output
+    assert "case" in output and "language" in output
+    assert "Español" in output
@@ -0,0 +1,125 @@
+"""
+test_bidi_network.py - Tests unitarios de la traducción BiDi -> CDP (utils/bidi_network.py)
+
+translate_event, _timing y _headers_to_dict: la forma de los mensajes que
+NetworkCapture, el exportador HAR y las métricas reciben en Firefox. No
+requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import base64
+
+from utils.bidi_network import _headers_to_dict, _timing, translate_event
+
+# ==================== DATOS ====================
+EVENT_MS = 1_700_000_000_250  # Timestamp BiDi (ms epoch)
+
+
+def bidi_event(method, request_id="42", **params):
+    """Evento BiDi network.* con el request mínimo."""
+    request = params.pop("request", {})
+    request.setdefault("request", request_id)
+    request.setdefault("url", "https://www.example.com/")
+    return {"method": method, "params": dict(timestamp=EVENT_MS, context="ctx-1", request=request, **params)}
+
+
+# ==================== HEADERS ====================
+def test_headers_decode_base64_and_join_repeated_names():
+    headers = [
+        {"name": "content-type", "value": {"type": "string", "value": "text/html"}},
+        {"name": "set-cookie", "value": {"type": "string", "value": "a=1"}},
+        {"name": "set-cookie", "value": {"type": "base64", "value": base64.b64encode("b=ñ".encode("latin-1")).decode()}},
+        {"name": "x-legacy", "value": 7},
+    ]
+
+    assert _headers_to_dict(headers) == {"content-type": "text/html", "set-cookie": "a=1\nb=ñ", "x-legacy": "7"}
+    assert _headers_to_dict(None) == {}
+
+
+# ==================== TIMINGS ====================
+def test_timing_offsets_are_relative_to_fetch_start():
+    request = {"timings": {
+        "fetchStart": 1000.0, "dnsStart": 0, "dnsEnd": 0,
+        "connectStart": 1002.0, "tlsStart": 1004.0, "connectEnd": 1008.0,
+        "requestStart": 1010.0, "responseStart": 1050.0,
+    }}
+
+    timing = _timing(request, EVENT_MS)
+
+    assert timing["dnsStart"] == -1 and timing["dnsEnd"] == -1  # Sin DNS (conexión reutilizada)
+    assert timing["connectStart"] == 2.0
+    assert timing["sslStart"] == 4.0 and timing["sslEnd"] == 8.0
+    assert timing["sendStart"] == timing["sendEnd"] == 10.0
+    assert timing["receiveHeadersEnd"] == 50.0
+    # requestTime: timestamp de responseStarted menos el offset de responseStart, en segundos
+    assert timing["requestTime"] == (EVENT_MS - 50.0) / 1000
+
+
+def test_timing_without_tls_or_base_time():
+    request = {"timings": {"fetchStart": 1000.0, "connectEnd": 1008.0, "responseStart": 1020.0}}
+
+    assert _timing(request, EVENT_MS)["sslEnd"] == -1
+    assert _timing({"timings": {}}, EVENT_MS) is None
+    assert _timing({}, EVENT_MS) is None
+
+
+# ==================== EVENTOS ====================
+def test_navigation_request_uses_request_id_as_loader_id():
+    navigation = translate_event(bidi_event(
+        "network.beforeRequestSent", navigation="nav-1",
+        request={"method": "GET", "headers": [{"name": "accept", "value": {"type": "string", "value": "*/*"}}]},
+    ))
+    subresource = translate_event(bidi_event(
+        "network.beforeRequestSent", request_id="43",
+        request={"url": "https://www.example.com/app.js", "destination": "script"},
+    ))
+
+    assert navigation["method"] == "Network.requestWillBeSent"
+    params = navigation["params"]
+    assert params["requestId"] == params["loaderId"] == "42"
+    assert params["type"] == "Document"
+    assert params["frameId"] == "ctx-1"
+    assert params["request"]["headers"] == {"accept": "*/*"}
+    assert subresource["params"]["loaderId"] == ""
+    assert subresource["params"]["type"] == "Script"
+
+
+def test_timestamps_are_converted_from_ms_to_seconds():
+    message = translate_event(bidi_event("network.beforeRequestSent"))
+
+    assert message["params"]["timestamp"] == EVENT_MS / 1000
+    assert message["params"]["wallTime"] == EVENT_MS / 1000
+
+
+def test_response_started_becomes_response_received_with_timing():
+    message = translate_event(bidi_event(
+        "network.responseStarted",
+        request={"initiatorType": "fetch", "timings": {"fetchStart": 5.0, "requestStart": 6.0, "responseStart": 30.0}},
+        response={"url": "https://api.example.com/session", "status": 200, "mimeType": "application/json",
+                  "headers": [], "headersSize": 310, "fromCache": False},
+    ))
+
+    assert message["method"] == "Network.responseReceived"
+    response = message["params"]["response"]
+    assert message["params"]["type"] == "Fetch"
+    assert response["status"] == 200 and response["mimeType"] == "application/json"
+    assert response["encodedDataLength"] == 310
+    assert response["timing"]["receiveHeadersEnd"] == 25.0
+    assert response["timing"]["requestTime"] == (EVENT_MS - 25.0) / 1000
+
+
+def test_response_completed_and_fetch_error_mapping():
+    finished = translate_event(bidi_event("network.responseCompleted", response={"bytesReceived": 1234}))
+    failed = translate_event(bidi_event(
+        "network.fetchError", errorText="NS_ERROR_NET_RESET", request={"destination": "image"}))
+
+    assert finished == {"method": "Network.loadingFinished",
+                        "params": {"requestId": "42", "timestamp": EVENT_MS / 1000, "encodedDataLength": 1234}}
+    assert failed["method"] == "Network.loadingFailed"
+    assert failed["params"]["errorText"] == "NS_ERROR_NET_RESET"
+    assert failed["params"]["type"] == "Image"
+
+
+def test_events_without_request_id_or_unknown_are_ignored():
+    assert translate_event({"method": "network.beforeRequestSent", "params": {"request": {}}}) is None
+    assert translate_event(bidi_event("network.authRequired")) is None
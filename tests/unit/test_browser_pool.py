@@ -0,0 +1,220 @@
+"""
+test_browser_pool.py - Tests unitarios de utils/browser_pool.py
+
+Lógica de préstamo del BrowserPool con una factory y un driver falsos: límite
+de reutilización, health check, claves del pool y estadísticas de
+lanzamiento vs préstamo. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+from types import SimpleNamespace
+
+from utils import browser_pool as browser_pool_module
+from utils.browser_pool import BrowserPool
+
+
+# ==================== DRIVER Y FACTORY FALSOS ====================
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    """Driver mínimo que soporta el reset del pool (Chrome vía CDP)."""
+
+    def __init__(self, name, history=None):
+        self.name = name
+        self.capabilities = {"browserName": "chrome"}
+        self.handles = ["main"]
+        self.current = "main"
+        self.history = history or {}  # handle -> URLs del historial de esa pestaña
+        self.switch_to = FakeSwitchTo(self)
+        self.cdp_calls = []
+        self.alive = True
+        self.quit_calls = 0
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return list(self.handles)
+
+    def close(self):
+        self.handles.remove(self.current)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_calls.append((command, params))
+        if command == "Page.getNavigationHistory":
+            return {"entries": [{"url": url} for url in self.history.get(self.current, [])]}
+        if command == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"url": "about:blank"}}}
+        return {}
+
+    def get_log(self, log_type):
+        return []
+
+    def delete_all_cookies(self):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_calls += 1
+        self.alive = False
+
+
+class FakeFactory:
+    """Factory que cuenta lanzamientos y entrega drivers numerados."""
+
+    def __init__(self):
+        self.launched = []
+
+    def __call__(self):
+        driver = FakeDriver(f"browser-{len(self.launched) + 1}")
+        self.launched.append(driver)
+        return driver
+
+
+CHROME_FULL = ("chrome", "full", False)
+
+
+# ==================== REUTILIZACIÓN ====================
+def test_browser_is_reused_until_max_reuse_then_retired():
+    pool = BrowserPool(max_reuse=2)
+    factory = FakeFactory()
+
+    first = pool.acquire(CHROME_FULL, factory)
+    pool.release(first)
+    second = pool.acquire(CHROME_FULL, factory)
+    pool.release(second)  # Segundo uso: alcanzó max_reuse
+    third = pool.acquire(CHROME_FULL, factory)
+
+    assert second is first
+    assert first.quit_calls == 1
+    assert third is not first
+    assert len(factory.launched) == 2
+    assert pool.stats["reuses"] == 1
+    assert pool.stats["retired_max_reuse"] == 1
+
+
+def test_max_reuse_zero_disables_reuse():
+    pool = BrowserPool(max_reuse=0)
+    factory = FakeFactory()
+
+    first = pool.acquire(CHROME_FULL, factory)
+    pool.release(first)
+    second = pool.acquire(CHROME_FULL, factory)
+
+    assert second is not first
+    assert first.quit_calls == 1
+
+
+# ==================== HEALTH CHECK ====================
+def test_unhealthy_idle_browser_is_discarded_and_replaced():
+    pool = BrowserPool(max_reuse=5)
+    factory = FakeFactory()
+
+    first = pool.acquire(CHROME_FULL, factory)
+    pool.release(first)
+    first.alive = False  # La sesión murió mientras estaba libre en el pool
+    second = pool.acquire(CHROME_FULL, factory)
+
+    assert second is not first
+    assert len(factory.launched) == 2
+    assert first.quit_calls == 1
+    assert pool.stats["retired_unhealthy"] == 1
+    assert pool.stats["reuses"] == 0
+
+
+def test_browser_without_windows_fails_the_health_check():
+    pool = BrowserPool(max_reuse=5)
+    factory = FakeFactory()
+
+    first = pool.acquire(CHROME_FULL, factory)
+    pool.release(first)
+    first.handles = []
+    second = pool.acquire(CHROME_FULL, factory)
+
+    assert second is not first
+    assert pool.stats["retired_unhealthy"] == 1
+
+
+# ==================== CLAVES DEL POOL ====================
+def test_pool_is_keyed_by_browser_profile_and_performance_log():
+    pool = BrowserPool(max_reuse=5, max_idle_per_key=2)
+    factory = FakeFactory()
+    keys = [("chrome", "full", False), ("chrome", "full", True), ("chrome", "lean", False), ("edge", "full", False)]
+
+    drivers = {key: pool.acquire(key, factory) for key in keys}
+    for driver in drivers.values():
+        pool.release(driver)
+    reacquired = {key: pool.acquire(key, factory) for key in reversed(keys)}
+
+    assert len(factory.launched) == len(keys)  # Cada clave reutiliza SOLO su propio navegador
+    assert all(reacquired[key] is drivers[key] for key in keys)
+
+
+def test_release_closes_browsers_beyond_max_idle_per_key():
+    pool = BrowserPool(max_reuse=5, max_idle_per_key=1)
+    factory = FakeFactory()
+
+    first = pool.acquire(CHROME_FULL, factory)
+    second = pool.acquire(CHROME_FULL, factory)
+    pool.release(first)
+    pool.release(second)
+
+    assert first.quit_calls == 0
+    assert second.quit_calls == 1
+
+
+# ==================== RESET ====================
+def test_reset_clears_storage_of_every_visited_origin_and_cdp_state():
+    pool = BrowserPool(max_reuse=5)
+    driver = FakeDriver("browser-1", history={
+        "main": ["https://www.example.com/es/", "about:blank"],
+        "popup": ["https://help.example.org/faq"],
+    })
+    driver.handles = ["main", "popup"]
+    pool.acquire(CHROME_FULL, lambda: driver)
+    pool.release(driver)
+
+    cleared = {params["origin"] for command, params in driver.cdp_calls if command == "Storage.clearDataForOrigin"}
+    assert cleared == {"https://www.example.com", "https://help.example.org"}
+    assert ("Network.setBlockedURLs", {"urls": []}) in driver.cdp_calls
+    assert ("Fetch.disable", {}) in driver.cdp_calls
+    assert driver.handles == ["main"]
+
+
+# ==================== ESTADÍSTICAS ====================
+def test_stats_separate_launch_time_from_lease_time(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(browser_pool_module, "time", SimpleNamespace(
+        perf_counter=lambda: clock.now, time=lambda: 0.0))
+
+    def slow_factory():
+        clock.now += 4.0  # Lanzar el navegador tarda 4s
+        return FakeDriver("browser-1")
+
+    pool = BrowserPool(max_reuse=5)
+    driver = pool.acquire(CHROME_FULL, slow_factory)
+    pool.release(driver)
+    pool.acquire(CHROME_FULL, slow_factory)  # Reutilizado: no pasa por la factory
+
+    assert pool.stats["launches"] == 1
+    assert pool.stats["launch_time_total"] == 4.0
+    assert pool.stats["leases"] == 2
+    assert pool.stats["reuses"] == 1
+    assert pool.stats["lease_time_total"] == 4.0  # Solo el primer préstamo esperó el lanzamiento
+    summary = pool.get_stats_summary()
+    assert "Browser launches: 1 (avg 4.00s" in summary
+    assert "Leases: 2 (avg 2.00s) | Reuses: 1" in summary
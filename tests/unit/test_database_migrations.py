@@ -0,0 +1,151 @@
+"""
+test_database_migrations.py - Tests unitarios de las migraciones de utils/database.py
+
+Lleva bases SQLite creadas con el esquema viejo (tabla ancha test_executions,
+user_version 0) hasta SCHEMA_VERSION y verifica que los datos y la vista de
+compatibilidad sobrevivan. También cubre la recuperación de spools huérfanos.
+"""
+
+# ==================== IMPORTS ====================
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+from utils.database import RESULT_COLUMNS, SCHEMA_VERSION, orphan_spool_paths
+from utils.database import TestDatabase as ResultsDatabase  # Alias: pytest no la toma como clase de tests
+
+# ==================== DATOS ====================
+# Tabla ancha de una versión anterior del proyecto (antes de las columnas del Case 3)
+OLD_LEGACY_TABLE_SQL = """
+    CREATE TABLE test_executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_number TEXT,
+        test_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        execution_time REAL,
+        error_message TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        browser TEXT,
+        url TEXT,
+        language TEXT,
+        pos TEXT
+    )
+"""
+
+SESSION_JSON = json.dumps({"journeys": [{"origin": "BOG", "destination": "MDE"}] * 20})
+
+
+def _create_old_database(path, with_session=False):
+    """BD v0: tabla ancha sin PRAGMA user_version (como la creaban las versiones viejas)."""
+    connection = sqlite3.connect(path)
+    connection.execute(OLD_LEGACY_TABLE_SQL)
+    connection.executemany(
+        "INSERT INTO test_executions (id, case_number, test_name, status, execution_time, timestamp, browser, language, pos) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(7, "4", "test_language_change", "PASSED", 3.5, "2025-01-01 10:00:00", "chrome", "English", None),
+         (9, "5", "test_pos_change", "FAILED", 4.0, "2025-01-02 10:00:00", "edge", None, "Chile")]
+    )
+    if with_session:
+        connection.execute("ALTER TABLE test_executions ADD COLUMN session_data_json TEXT")
+        connection.execute("UPDATE test_executions SET session_data_json = ?", (SESSION_JSON,))
+    connection.commit()
+    connection.close()
+
+
+def _user_version(database):
+    return database.connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+# ==================== MIGRACIONES ====================
+def test_fresh_database_is_created_at_current_version(tmp_path):
+    database = ResultsDatabase(str(tmp_path / "fresh.db"))
+    database.save_test_result("test_x", "PASSED", 1.0, case_number="1", browser="chrome")
+
+    assert _user_version(database) == SCHEMA_VERSION
+    assert len(database.get_all_results()[0]) == len(RESULT_COLUMNS) + 1
+    database.close()
+
+
+def test_legacy_rows_survive_migration_v1_to_v4(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    _create_old_database(path)
+
+    database = ResultsDatabase(path)
+    rows = database.connection.execute(
+        "SELECT id, case_number, test_name, status, browser, language, pos, session_data_json "
+        "FROM test_executions ORDER BY id"
+    ).fetchall()
+
+    assert _user_version(database) == SCHEMA_VERSION
+    assert rows == [(7, "4", "test_language_change", "PASSED", "chrome", "English", None, None),
+                    (9, "5", "test_pos_change", "FAILED", "edge", None, "Chile", None)]
+    assert database.connection.execute("SELECT run_uid FROM test_runs").fetchall() == [("legacy",)]
+    assert database.connection.execute("SELECT COUNT(*) FROM network_metrics").fetchone()[0] == 0
+
+    # Las filas nuevas continúan después de los ids migrados
+    database.save_test_result("test_new", "PASSED", 1.0, case_number="1")
+    assert database.get_latest_results(1)[0][0] == 10
+    database.close()
+
+
+def test_legacy_payloads_are_compressed_and_deduplicated(tmp_path):
+    path = str(tmp_path / "legacy_session.db")
+    _create_old_database(path, with_session=True)
+
+    database = ResultsDatabase(path)
+    stats = database.get_payload_storage_stats()
+
+    assert stats["references"] == 2
+    assert stats["unique_blobs"] == 1
+    assert stats["stored_bytes"] < stats["raw_bytes"]
+    assert database.get_payload(7) == SESSION_JSON
+    assert database.connection.execute(
+        "SELECT session_data_json FROM test_executions WHERE id = 9"
+    ).fetchone()[0].startswith("sha256:")
+    database.close()
+
+
+def test_reopening_a_migrated_database_keeps_data(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    _create_old_database(path)
+    ResultsDatabase(path).close()
+
+    database = ResultsDatabase(path)
+    assert _user_version(database) == SCHEMA_VERSION
+    assert len(database.get_all_results()) == 2
+    database.close()
+
+
+# ==================== SPOOLS ====================
+def test_recover_only_adopts_spools_of_exited_processes(tmp_path):
+    path = str(tmp_path / "results.db")
+    database = ResultsDatabase(path)
+    row = ["1", "test_spooled", "PASSED", 1.0] + [None] * (len(RESULT_COLUMNS) - 4)
+
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    spools = {pid: f"{path}.spool-{pid}.jsonl" for pid in (finished.pid, os.getppid())}
+    for spool in spools.values():
+        with open(spool, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"run_uid": "crashed-run", "row": row}) + "\n")
+
+    assert database.recover_spooled_results() == 1
+    assert not os.path.exists(spools[finished.pid])
+    assert os.path.exists(spools[os.getppid()])  # Proceso vivo (sesión concurrente): no se toca
+    database.close()
+
+
+def test_orphan_spool_lookup_does_not_create_the_database(tmp_path):
+    path = str(tmp_path / "results.db")
+    assert orphan_spool_paths(path) == []
+
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    spool = f"{path}.spool-{finished.pid}.jsonl"
+    open(spool, "w", encoding="utf-8").close()
+    open(f"{path}.spool-{os.getpid()}.jsonl", "w", encoding="utf-8").close()  # Spool propio: no es huérfano
+
+    assert orphan_spool_paths(path) == [spool]
+    assert not os.path.exists(path)
@@ -0,0 +1,121 @@
+"""
+test_har_exporter.py - Tests unitarios de utils/har_exporter.py
+
+Conversión de eventos CDP a entries HAR 1.2 (timings, redirects, peticiones
+incompletas) y escritura en streaming (.har y .har.gz). No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import gzip
+import json
+
+from utils.har_exporter import build_har_entry, export_har, iter_har_entries
+
+# ==================== DATOS ====================
+TIMING = {
+    "requestTime": 100.0, "dnsStart": 1.0, "dnsEnd": 3.0, "connectStart": 3.0, "connectEnd": 10.0,
+    "sslStart": 5.0, "sslEnd": 10.0, "sendStart": 10.5, "sendEnd": 11.0, "receiveHeadersEnd": 61.0,
+}
+
+
+def _request(request_id, url, timestamp=100.0, redirect=None, **request):
+    params = {"requestId": request_id, "timestamp": timestamp, "wallTime": 1767225600.0, "type": "XHR",
+              "request": {"url": url, "method": "GET", "headers": {"Accept": "*/*"}, **request}}
+    if redirect:
+        params["redirectResponse"] = redirect
+    return {"method": "Network.requestWillBeSent", "params": params}
+
+
+def _response(request_id, status=200, **response):
+    return {"method": "Network.responseReceived", "params": {
+        "requestId": request_id, "response": {"status": status, "statusText": "OK", "protocol": "h2",
+                                              "mimeType": "application/json", "headers": {}, **response}}}
+
+
+def _finished(request_id, timestamp=100.1, encoded=500):
+    return {"method": "Network.loadingFinished",
+            "params": {"requestId": request_id, "timestamp": timestamp, "encodedDataLength": encoded}}
+
+
+# ==================== ENTRIES ====================
+def test_build_har_entry_timings_and_sizes():
+    request = _request("1", "https://api.example.com/search?origin=BOG&pax=3", method="POST", postData='{"a":1}',
+                       headers={"Content-Type": "application/json"})["params"]
+    response = _response("1", timing=TIMING, encodedDataLength=200, remoteIPAddress="10.0.0.1")["params"]["response"]
+    entry = build_har_entry(request, response, _finished("1")["params"], data_length=1200, body='{"ok":true}')
+
+    assert entry["time"] == 100.0
+    assert entry["request"]["queryString"] == [{"name": "origin", "value": "BOG"}, {"name": "pax", "value": "3"}]
+    assert entry["request"]["postData"] == {"mimeType": "application/json", "text": '{"a":1}'}
+    assert entry["response"]["httpVersion"] == "HTTP/2"
+    assert entry["response"]["bodySize"] == 300
+    assert entry["response"]["content"] == {"size": 1200, "mimeType": "application/json", "text": '{"ok":true}'}
+    assert entry["serverIPAddress"] == "10.0.0.1"
+    assert entry["timings"] == {"blocked": 1.0, "dns": 2.0, "connect": 7.0, "ssl": 5.0,
+                                "send": 0.5, "wait": 50.0, "receive": 39.0}
+
+
+def test_incomplete_request_has_unknown_time():
+    entry = build_har_entry(_request("1", "https://example.com/")["params"])
+
+    assert entry["time"] == -1
+    assert entry["response"]["status"] == 0
+    assert entry["timings"]["blocked"] == -1
+
+
+def test_iter_har_entries_splits_redirect_hops():
+    redirect = {"status": 302, "statusText": "Found", "headers": {"Location": "https://example.com/b"}}
+    events = [
+        _request("1", "https://example.com/a"),
+        _request("1", "https://example.com/b", timestamp=100.05, redirect=redirect),
+        _response("1"),
+        {"method": "Network.dataReceived", "params": {"requestId": "1", "dataLength": 40}},
+        {"method": "Network.dataReceived", "params": {"requestId": "1", "dataLength": 60}},
+        _finished("1"),
+    ]
+    entries = list(iter_har_entries(events, get_body=lambda request_id: "body"))
+
+    assert [e["request"]["url"] for e in entries] == ["https://example.com/a", "https://example.com/b"]
+    assert entries[0]["response"]["status"] == 302
+    assert entries[0]["response"]["redirectURL"] == "https://example.com/b"
+    assert entries[0]["time"] == 50.0
+    assert entries[1]["response"]["content"]["size"] == 100
+    assert entries[1]["response"]["content"]["text"] == "body"
+
+
+def test_failed_and_pending_requests_are_exported():
+    events = [
+        _request("1", "https://example.com/failed"),
+        {"method": "Network.loadingFailed", "params": {"requestId": "1", "timestamp": 100.2, "errorText": "net::ERR_BLOCKED"}},
+        _request("2", "https://example.com/pending"),
+    ]
+    entries = list(iter_har_entries(events))
+
+    assert entries[0]["response"]["_error"] == "net::ERR_BLOCKED"
+    assert entries[1]["request"]["url"] == "https://example.com/pending"
+    assert entries[1]["time"] == -1
+
+
+# ==================== ESCRITURA ====================
+def test_export_har_writes_valid_json(tmp_path):
+    filename = tmp_path / "case3.har"
+    events = [_request("1", "https://example.com/"), _response("1"), _finished("1"),
+              _request("2", "https://example.com/x"), _finished("2")]
+
+    written = export_har(events, str(filename), comment="2 events dropped")
+    har = json.loads(filename.read_text(encoding="utf-8"))
+
+    assert written == 2
+    assert har["log"]["version"] == "1.2"
+    assert har["log"]["comment"] == "2 events dropped"
+    assert [e["_requestId"] for e in har["log"]["entries"]] == ["1", "2"]
+
+
+def test_export_har_gzip_and_empty(tmp_path):
+    filename = tmp_path / "empty.har.gz"
+
+    assert export_har([], str(filename), compress=True) == 0
+    with gzip.open(filename, "rt", encoding="utf-8") as f:
+        har = json.load(f)
+    assert har["log"]["entries"] == []
+    assert "comment" not in har["log"]
@@ -0,0 +1,134 @@
+"""
+test_locator_registry.py - Tests unitarios de utils/locator_registry.py
+
+Locator.compile (orden por estrategia, preferida primero, campos {}), y
+LocatorRegistry con un driver falso: resolución en una llamada JS, caché por
+época, reintento de elementos obsoletos, fallback con implicit wait y
+telemetría. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import pytest
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from utils.locator_registry import Locator, LocatorRegistry, get_locator_stats
+
+
+# ==================== DRIVER FALSO ====================
+class FakeElement:
+    def __init__(self, name, stale_clicks=0):
+        self.name = name
+        self.text = f"text of {name}"
+        self.clicks = 0
+        self.stale_clicks = stale_clicks
+
+    def click(self):
+        if self.stale_clicks:
+            self.stale_clicks -= 1
+            raise StaleElementReferenceException("stale")
+        self.clicks += 1
+
+    def is_displayed(self):
+        return True
+
+
+class FakeDriver:
+    """Simula _RESOLVE_JS: `present` = {(by, valor): elemento} presentes en la página."""
+
+    def __init__(self, present=None):
+        self.present = present or {}
+        self.script_calls = 0
+        self.find_calls = 0
+
+    def execute_script(self, script, strategies):
+        self.script_calls += 1
+        timings = []
+        for index, (by, value) in enumerate(strategies):
+            timings.append(0.5)
+            if (by, value) in self.present:
+                return [index, self.present[(by, value)], timings]
+        return [-1, None, timings]
+
+    def find_element(self, by, value):
+        self.find_calls += 1
+        if (by, value) in self.present:
+            return self.present[(by, value)]
+        raise NoSuchElementException(value)
+
+
+# ==================== LOCATOR ====================
+def test_strategies_are_ordered_fastest_first():
+    locator = Locator((By.XPATH, "//button[@id='go']"), (By.CSS_SELECTOR, "button.go"), (By.ID, "go"))
+    assert [by for _, by, _ in locator.compile()] == [By.ID, By.CSS_SELECTOR, By.XPATH]
+
+
+def test_compile_puts_preferred_first_and_fills_fields():
+    locator = Locator((By.CSS_SELECTOR, "li[lang='{}']"), (By.XPATH, "//li[text()='{}']"))
+    locator.preferred = 1
+
+    compiled = locator.compile(("English",))
+    assert compiled == [(1, By.XPATH, "//li[text()='English']"), (0, By.CSS_SELECTOR, "li[lang='English']")]
+    assert locator.compile(("English",)) is compiled  # Memorizado
+
+
+@pytest.mark.parametrize("strategies", [(), ((By.NAME, "q"),)])
+def test_unsupported_strategies_are_rejected(strategies):
+    with pytest.raises(ValueError):
+        Locator(*strategies)
+
+
+# ==================== REGISTRO ====================
+def test_find_learns_working_strategy_and_caches_per_epoch():
+    button = FakeElement("pos")
+    locator = Locator((By.ID, "missing-id"), (By.CSS_SELECTOR, "button.pos"))
+    driver = FakeDriver({(By.CSS_SELECTOR, "button.pos"): button})
+    registry = LocatorRegistry(driver, "Home", {"pos_button": locator})
+
+    assert registry.find("pos_button") is button
+    assert locator.preferred == 1
+    assert registry.find("pos_button") is button
+    assert driver.script_calls == 1  # Segunda búsqueda: caché
+
+    registry.new_epoch("navigation")
+    registry.find("pos_button")
+    assert driver.script_calls == 2
+
+    stats = get_locator_stats(driver)
+    assert (stats.lookups, stats.cache_hits) == (3, 1)
+    assert "Home.pos_button" in stats.get_summary()
+
+
+def test_stale_cached_element_is_resolved_again():
+    stale = FakeElement("stale", stale_clicks=1)
+    fresh = FakeElement("fresh")
+    driver = FakeDriver({(By.ID, "go"): stale})
+    registry = LocatorRegistry(driver, "Home", {"go": Locator((By.ID, "go"))})
+    registry.find("go")
+
+    driver.present[(By.ID, "go")] = fresh
+    registry.click("go")
+
+    assert fresh.clicks == 1
+    assert get_locator_stats(driver).stale == 1
+
+
+def test_missing_element_falls_back_to_find_element():
+    driver = FakeDriver()
+    registry = LocatorRegistry(driver, "Home", {"news": Locator((By.ID, "news"))})
+
+    with pytest.raises(NoSuchElementException):
+        registry.find("news")
+    assert driver.find_calls == 1
+    assert get_locator_stats(driver).fallbacks == 1
+
+
+def test_uncached_locator_and_visible_predicate():
+    option = FakeElement("option")
+    driver = FakeDriver({(By.XPATH, "//li[text()='English']"): option})
+    registry = LocatorRegistry(driver, "Home", {"language": Locator((By.XPATH, "//li[text()='{}']"), cache=False)})
+
+    assert registry.text("language", "English") == "text of option"
+    assert registry.visible("language", "English")(driver) is option
+    assert registry.visible("language", "Français")(driver) is False
+    assert driver.script_calls == 3  # cache=False: cada búsqueda vuelve a resolver
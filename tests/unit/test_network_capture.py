@@ -0,0 +1,252 @@
+"""
+test_network_capture.py - Tests unitarios de utils/network_capture.py
+
+Usa un driver falso cuyo get_log('performance') devuelve lotes preparados por
+el test: ingesta incremental (entradas repetidas e intercaladas entre drenados,
+deduplicadas por evento), colector en segundo plano y política de captura de
+bodies, sin navegador.
+"""
+
+# ==================== IMPORTS ====================
+import json
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.network_capture import BodyCapturePolicy, NetworkCapture
+
+
+# ==================== DRIVER FALSO ====================
+class FakeDriver:
+    """Driver mínimo: cada get_log devuelve el siguiente lote (o falla si se pide)."""
+
+    capabilities = {"browserName": "chrome"}
+
+    def __init__(self, batches=(), error=None, bodies=None):
+        self.batches = list(batches)
+        self.error = error
+        self.bodies = bodies or {}  # requestId -> body que devuelve Network.getResponseBody
+        self.get_log_calls = 0
+        self.cdp_calls = []
+
+    def get_log(self, log_type):
+        self.get_log_calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_calls.append((command, params))
+        return {"body": self.bodies.get(params.get("requestId"), "")}
+
+
+def log_entry(method, **params):
+    """Entrada del performance log con el formato de chromedriver."""
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+# ==================== COLECTOR EN SEGUNDO PLANO ====================
+def test_collector_thread_exits_when_the_session_is_gone():
+    driver = FakeDriver(error=WebDriverException("invalid session id"))
+    capture = NetworkCapture(driver, backend="cdp")
+
+    capture.start_background_collection(interval=0.01)
+    thread = capture._collector_thread
+    thread.join(timeout=2.0)
+
+    assert not thread.is_alive()
+    assert driver.get_log_calls == 1  # Terminó en el primer error, no siguió reintentando
+    capture.stop_background_collection()  # Sigue siendo seguro detenerlo
+
+
+def test_foreground_ingest_still_swallows_get_log_errors():
+    driver = FakeDriver(error=WebDriverException("invalid session id"))
+    capture = NetworkCapture(driver, backend="cdp")
+
+    assert capture._ingest() == 0
+
+
+def test_collector_keeps_draining_while_the_session_is_alive():
+    batches = [[log_entry("Network.requestWillBeSent", requestId="1", timestamp=1.0, wallTime=100.0,
+                          request={"url": "https://example.com/"})]]
+    driver = FakeDriver(batches)
+    capture = NetworkCapture(driver, backend="cdp")
+
+    capture.start_background_collection(interval=0.01)
+    deadline = time.monotonic() + 2.0
+    while driver.get_log_calls < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert capture._collector_thread.is_alive()
+    capture.stop_background_collection()
+
+    assert "1" in capture.requests
+
+
+# ==================== INGESTA INCREMENTAL ====================
+def _session_flow():
+    """Eventos de dos peticiones intercaladas: un documento con redirect y una API de sesión."""
+    return {
+        "doc_redirect": log_entry("Network.requestWillBeSent", requestId="doc", timestamp=1.0, wallTime=100.0,
+                                  request={"url": "http://example.com/"}),
+        "api_request": log_entry("Network.requestWillBeSent", requestId="api", timestamp=1.1, wallTime=100.1,
+                                 request={"url": "https://example.com/api/session"}),
+        "doc_request": log_entry("Network.requestWillBeSent", requestId="doc", timestamp=1.2, wallTime=100.2,
+                                 request={"url": "https://example.com/"},
+                                 redirectResponse={"url": "http://example.com/", "status": 301}),
+        "api_response": log_entry("Network.responseReceived", requestId="api", timestamp=1.3,
+                                  response={"url": "https://example.com/api/session", "status": 200,
+                                            "mimeType": "application/json"}),
+        "doc_response": log_entry("Network.responseReceived", requestId="doc", timestamp=1.4,
+                                  response={"url": "https://example.com/", "status": 200, "mimeType": "text/html"}),
+        "doc_data_1": log_entry("Network.dataReceived", requestId="doc", timestamp=1.5, dataLength=1000),
+        "doc_data_2": log_entry("Network.dataReceived", requestId="doc", timestamp=1.6, dataLength=500),
+        "api_finished": log_entry("Network.loadingFinished", requestId="api", timestamp=1.7, encodedDataLength=80),
+        "doc_finished": log_entry("Network.loadingFinished", requestId="doc", timestamp=1.8, encodedDataLength=900),
+    }
+
+
+def test_duplicate_and_interleaved_entries_are_ingested_once():
+    events = _session_flow()
+    batches = [
+        [events["doc_redirect"], events["api_request"], events["doc_request"]],
+        # Reentrega del lote anterior (parcial) mezclada con eventos nuevos
+        [events["api_request"], events["api_response"], events["doc_redirect"], events["doc_response"],
+         events["doc_data_1"]],
+        [events["doc_data_2"], events["doc_data_1"], events["api_finished"], events["api_response"]],
+        [events["doc_finished"], events["api_finished"], events["doc_finished"]],
+    ]
+    driver = FakeDriver(batches)
+    capture = NetworkCapture(driver, backend="cdp")
+
+    ingested = [capture._ingest() for _ in range(len(batches) + 1)]
+
+    assert ingested == [3, 3, 2, 1, 0]
+    assert capture.cursor == sum(len(batch) for batch in batches)  # Cada entrada leída avanza el cursor
+    assert len(capture.network_events) == len(events)
+    keys = [(e["params"]["requestId"], e["method"], e["params"]["timestamp"]) for e in capture.network_events]
+    assert len(set(keys)) == len(keys)
+
+    assert set(capture.requests) == {"doc", "api"}
+    assert capture.requests["doc"]["request"]["url"] == "https://example.com/"  # Último salto del redirect
+    assert [hop["request"]["url"] for hop in capture.redirect_hops["doc"]] == ["http://example.com/"]
+    assert set(capture.responses) == {"doc", "api"}
+    assert set(capture.finished) == {"doc", "api"}
+    assert capture.data_lengths == {"doc": 1500}
+    assert capture.method_counts == {
+        "Network.requestWillBeSent": 3, "Network.responseReceived": 2,
+        "Network.dataReceived": 2, "Network.loadingFinished": 2,
+    }
+    assert capture.request_index.between(0.0, 999.0) == ["doc", "api"]
+
+    assert capture.session_response_ids == ["api"]
+    assert [e["method"] for e in capture.session_events] == ["Network.requestWillBeSent", "Network.responseReceived"]
+    body_calls = [params["requestId"] for command, params in driver.cdp_calls if command == "Network.getResponseBody"]
+    assert body_calls == ["api"]  # Body de sesión pedido una sola vez, al llegar loadingFinished
+
+
+def test_non_network_and_malformed_entries_are_skipped():
+    batches = [[
+        {"message": "not json"},
+        {"level": "INFO"},
+        {"message": json.dumps({"message": {"method": "Page.frameNavigated", "params": {}}})},
+        log_entry("Network.requestWillBeSent", requestId="1", timestamp=1.0, wallTime=100.0,
+                  request={"url": "https://example.com/"}),
+    ]]
+    capture = NetworkCapture(FakeDriver(batches), backend="cdp")
+
+    assert capture._ingest() == 1
+    assert capture.cursor == 4
+    assert list(capture.requests) == ["1"]
+
+
+# ==================== POLÍTICA DE CAPTURA DE BODIES ====================
+def test_policy_deny_wins_over_allow_globs():
+    policy = BodyCapturePolicy(allow=["https://*.example.com/api/*"], deny=["*/api/telemetry*"], mime_types=None)
+
+    assert policy.check("https://www.example.com/api/session", None, None, 0) is None
+    assert policy.check("https://WWW.EXAMPLE.COM/API/session", None, None, 0) is None  # Sin distinguir mayúsculas
+    assert policy.check("https://www.example.com/api/telemetry/v1", None, None, 0) == "deny"
+    assert policy.check("https://cdn.example.org/api/session", None, None, 0) == "not_allowed"
+    assert policy.check(None, None, None, 0) == "not_allowed"
+
+
+def test_policy_regex_patterns():
+    policy = BodyCapturePolicy(allow=[r"re:/api/v\d+/session"], deny=[r"re:debug=1$"], mime_types=None)
+
+    assert policy.check("https://api.example.com/api/v2/session?x=1", None, None, 0) is None
+    assert policy.check("https://api.example.com/api/vX/session", None, None, 0) == "not_allowed"
+    assert policy.check("https://api.example.com/api/v2/session?debug=1", None, None, 0) == "deny"
+
+
+def test_policy_mime_filter():
+    policy = BodyCapturePolicy(mime_types=("application/json", "text/plain"))
+
+    assert policy.check("https://x/", "application/json; charset=utf-8", None, 0) is None
+    assert policy.check("https://x/", "TEXT/PLAIN", None, 0) is None
+    assert policy.check("https://x/", "text/html", None, 0) == "mime"
+    assert policy.check("https://x/", None, None, 0) == "mime"
+    assert BodyCapturePolicy(mime_types=None).check("https://x/", "image/png", None, 0) is None
+
+
+def test_policy_body_cap_and_total_budget():
+    policy = BodyCapturePolicy(mime_types=None, max_body_bytes=100, max_total_bytes=250)
+
+    assert policy.check_size(100, 0) is None
+    assert policy.check_size(101, 0) == "too_large"
+    assert policy.check_size(100, 150) is None
+    assert policy.check_size(100, 151) == "budget"
+    assert policy.check_size(None, 10_000) is None  # Tamaño desconocido: se decide con el body real
+    assert BodyCapturePolicy(max_body_bytes=None, max_total_bytes=None).check_size(10 ** 9, 10 ** 9) is None
+
+
+def _json_response(request_id, url, size, timestamp, mime_type="application/json"):
+    """responseReceived + loadingFinished de una respuesta."""
+    return [
+        log_entry("Network.responseReceived", requestId=request_id, timestamp=timestamp,
+                  response={"url": url, "status": 200, "mimeType": mime_type}),
+        log_entry("Network.loadingFinished", requestId=request_id, timestamp=timestamp + 0.1,
+                  encodedDataLength=size),
+    ]
+
+
+def test_capture_applies_policy_and_reports_cdp_calls_and_bytes_saved():
+    entries = (
+        _json_response("ok", "https://api.example.com/api/flights", 40, 1.0)
+        + _json_response("denied", "https://api.example.com/api/telemetry", 30, 2.0)
+        + _json_response("html", "https://www.example.com/", 500, 3.0, mime_type="text/html")
+        + _json_response("big", "https://api.example.com/api/catalog", 5000, 4.0)
+        # encodedDataLength comprimido pasa el límite, el body real (descomprimido) no
+        + _json_response("gzip", "https://api.example.com/api/gzip", 20, 5.0)
+        + _json_response("over_budget", "https://api.example.com/api/more", 60, 6.0)
+    )
+    bodies = {"ok": "x" * 40, "gzip": "y" * 150, "over_budget": "z" * 60}
+    driver = FakeDriver([entries], bodies=bodies)
+    policy = BodyCapturePolicy(deny=["*telemetry*"], max_body_bytes=100, max_total_bytes=80, session_only=False)
+    capture = NetworkCapture(driver, body_policy=policy, backend="cdp")
+
+    capture._ingest()
+    report = capture.get_body_capture_report()
+
+    fetched = [params["requestId"] for command, params in driver.cdp_calls if command == "Network.getResponseBody"]
+    assert fetched == ["ok", "gzip"]  # over_budget se descarta sin pedirlo (40 + 60 > 80)
+    assert capture.get_response_body("ok") == "x" * 40
+    assert capture.get_response_body("gzip") is None
+    assert report["responses_finished"] == 6
+    assert report["cdp_calls"] == 2
+    assert report["cdp_calls_saved"] == 4
+    assert report["bytes_captured"] == 40
+    assert 0 < report["bytes_stored_compressed"] < 40
+    assert report["transfer_bytes_not_fetched"] == (40 + 30 + 500 + 5000 + 20 + 60) - 40
+    assert report["skipped_by_reason"] == {"deny": 1, "mime": 1, "too_large": 2, "budget": 1}
+
+
+def test_session_only_policy_skips_non_session_responses():
+    entries = (_json_response("api", "https://api.example.com/api/flights", 40, 1.0)
+               + _json_response("session", "https://api.example.com/api/session", 40, 2.0))
+    driver = FakeDriver([entries], bodies={"api": "{}", "session": '{"id": 1}'})
+    capture = NetworkCapture(driver, backend="cdp")
+
+    capture._ingest()
+
+    assert capture.session_response_bodies == {"session": '{"id": 1}'}
+    assert capture.get_body_capture_report()["skipped_by_reason"] == {"not_session": 1}
@@ -0,0 +1,110 @@
+"""
+test_network_metrics.py - Tests unitarios de utils/network_metrics.py
+
+Segmentación por página (navegaciones del frame principal), TTFB, espera del
+servidor, red ocupada y terceros sobre eventos CDP sintéticos. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+from utils.network_metrics import _busy_ms, _percentile, compute_page_metrics, site_of, summarize_pages
+
+
+# ==================== DATOS ====================
+def _request(request_id, url, start, type_="XHR", frame="main", loader="L0", priority="High", redirect=None):
+    params = {"requestId": request_id, "loaderId": loader, "frameId": frame, "type": type_, "timestamp": start,
+              "wallTime": 1767225600.0 + start, "request": {"url": url, "initialPriority": priority}}
+    if redirect:
+        params["redirectResponse"] = redirect
+    return {"method": "Network.requestWillBeSent", "params": params}
+
+
+def _response(request_id, ttfb, send_end=5.0, status=200):
+    return {"method": "Network.responseReceived", "params": {
+        "requestId": request_id, "response": {"status": status, "timing": {"sendEnd": send_end, "receiveHeadersEnd": ttfb}}}}
+
+
+def _finished(request_id, end, encoded=1000, failed=False):
+    method = "Network.loadingFailed" if failed else "Network.loadingFinished"
+    return {"method": method, "params": {"requestId": request_id, "timestamp": end, "encodedDataLength": encoded}}
+
+
+def _document(request_id, url, start):
+    return _request(request_id, url, start, type_="Document", loader=request_id)
+
+
+# ==================== UTILIDADES ====================
+def test_site_of_handles_second_level_domains():
+    assert site_of("https://www.avianca.com/es/") == "avianca.com"
+    assert site_of("https://nuxqa4.avtest.ink/") == "avtest.ink"
+    assert site_of("https://tienda.avianca.com.co/x") == "avianca.com.co"
+    assert site_of("data:image/png;base64,xx") == ""
+
+
+def test_percentile_and_busy_time():
+    assert _percentile([], 50) is None
+    assert _percentile([10.0, 20.0, 30.0, 40.0], 50) == 20.0
+    assert _percentile([10.0, 20.0, 30.0, 40.0], 95) == 40.0
+    # [0, 1] y [0.5, 2] se solapan; [3, 4] aparte -> 2s + 1s
+    assert _busy_ms([(3.0, 4.0), (0.0, 1.0), (0.5, 2.0)]) == 3000.0
+
+
+# ==================== MÉTRICAS POR PÁGINA ====================
+def test_pages_split_on_main_frame_navigations():
+    events = [
+        _document("D1", "https://www.avianca.com/", 0.0), _response("D1", 120.0), _finished("D1", 0.3, 5000),
+        _request("X1", "https://api.avianca.com/search", 0.4), _response("X1", 80.0), _finished("X1", 0.5),
+        _request("I1", "https://pay.example.com/iframe", 0.45, type_="Document", frame="payment", loader="I1"),
+        _document("D2", "https://www.avianca.com/booking", 1.0), _response("D2", 200.0), _finished("D2", 1.4),
+        _request("X2", "https://api.avianca.com/seats", 1.5), _finished("X2", 1.6, failed=True),
+    ]
+    pages = compute_page_metrics(events)
+
+    assert [p["page_url"] for p in pages] == ["https://www.avianca.com/", "https://www.avianca.com/booking"]
+    first, second = pages
+    assert first["requests"] == 3  # El iframe de pago cuenta en la página que lo contiene
+    assert first["document_ttfb_ms"] == 120.0
+    assert first["api_requests"] == 1
+    assert first["api_ttfb_p50_ms"] == 80.0
+    assert first["server_wait_ms"] == 75.0
+    assert first["network_busy_ms"] == 400.0  # Documento (0-0.3s) + API (0.4-0.5s); el iframe no terminó
+    assert second["failed_requests"] == 1
+    assert summarize_pages(pages)["requests"] == 5
+
+
+def test_redirect_keeps_original_start_and_updates_page_url():
+    events = [
+        _document("D1", "http://avianca.com/", 0.0),
+        _request("D1", "https://www.avianca.com/", 0.2, type_="Document", loader="D1", redirect={"status": 301}),
+        _finished("D1", 0.5),
+    ]
+    page = compute_page_metrics(events)[0]
+
+    assert page["page_url"] == "https://www.avianca.com/"
+    assert page["requests"] == 1
+    assert page["slowest_requests"][0]["duration_ms"] == 500.0
+
+
+def test_third_party_domains_and_blocking_scripts():
+    events = [
+        _document("D1", "https://www.avianca.com/", 0.0), _finished("D1", 0.1),
+        _request("T1", "https://www.googletagmanager.com/gtm.js", 0.1, type_="Script", priority="High"),
+        _finished("T1", 0.4, encoded=3000),
+        _request("T2", "https://cdn.analytics.example/pixel", 0.2, type_="Image", priority="Low"),
+        _finished("T2", 0.25, encoded=100),
+    ]
+    page = compute_page_metrics(events, slowest_n=1, third_party_n=1)[0]
+
+    assert page["third_party_requests"] == 2
+    assert page["third_party_bytes"] == 3100
+    assert page["third_party_domains"] == [
+        {"domain": "googletagmanager.com", "requests": 1, "bytes": 3000, "time_ms": 300.0, "blocking": 1}
+    ]
+    assert [s["url"] for s in page["slowest_requests"]] == ["https://www.googletagmanager.com/gtm.js"]
+
+
+def test_requests_before_first_navigation_go_to_initial_page():
+    events = [_request("X0", "https://api.avianca.com/warmup", 0.0), _finished("X0", 0.1)]
+    page = compute_page_metrics(events)[0]
+
+    assert page["page_url"] == "(initial)"
+    assert page["third_party_requests"] == 0  # Sin documento no hay "primera parte"
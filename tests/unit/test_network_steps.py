@@ -0,0 +1,74 @@
+"""
+test_network_steps.py - Tests unitarios de utils/network_steps.py
+
+RequestTimeIndex (peticiones por hora de inicio, llegadas fuera de orden y
+rangos) y el resumen de peticiones de un paso. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+from utils.network_steps import RequestTimeIndex, summarize_requests
+
+
+# ==================== ÍNDICE POR HORA DE INICIO ====================
+def test_between_is_inclusive_and_ordered():
+    index = RequestTimeIndex()
+    for request_id, start in [("a", 10.0), ("b", 11.0), ("c", 12.0), ("d", 13.0)]:
+        index.add(request_id, start)
+
+    assert len(index) == 4
+    assert index.between(11.0, 12.0) == ["b", "c"]
+    assert index.between(0.0, 9.9) == []
+    assert index.between(13.0, 99.0) == ["d"]
+
+
+def test_out_of_order_arrivals_are_inserted_sorted():
+    index = RequestTimeIndex()
+    for request_id, start in [("a", 10.0), ("c", 12.0), ("b", 11.0), ("z", 5.0), ("c2", 12.0)]:
+        index.add(request_id, start)
+
+    assert index.between(0.0, 99.0) == ["z", "a", "b", "c", "c2"]
+    assert index.between(12.0, 12.0) == ["c", "c2"]
+
+
+def test_clear_empties_the_index():
+    index = RequestTimeIndex()
+    index.add("a", 1.0)
+    index.clear()
+
+    assert len(index) == 0
+    assert index.between(0.0, 2.0) == []
+
+
+# ==================== RESUMEN DE PETICIONES ====================
+def test_summarize_requests_counts_and_latencies():
+    requests = {
+        "1": {"type": "XHR", "timestamp": 100.0, "request": {"url": "https://api.example.com/search"}},
+        "2": {"type": "Script", "timestamp": 100.0, "request": {"url": "https://cdn.example.com/app.js"}},
+        "3": {"type": "XHR", "timestamp": 100.1, "request": {"url": "https://api.example.com/fail"}},
+        "4": {"type": "Image", "timestamp": 100.2, "request": {"url": "https://cdn.example.com/hero.jpg"}},
+    }
+    responses = {"1": {"response": {"status": 200}}, "2": {"response": {"status": 200}}}
+    finished = {
+        "1": {"timestamp": 100.5, "encodedDataLength": 2000},
+        "2": {"timestamp": 100.1, "encodedDataLength": 500},
+        "3": {"timestamp": 100.3, "errorText": "net::ERR_FAILED"},
+    }
+    summary = summarize_requests(["1", "2", "3", "4"], requests, responses, finished, slowest_n=1)
+
+    assert summary["requests"] == 4
+    assert summary["requests_by_type"] == {"XHR": 2, "Script": 1, "Image": 1}
+    assert summary["failed"] == 1
+    assert summary["pending"] == 1
+    assert summary["transfer_bytes"] == 2500
+    assert summary["latency_p50_ms"] == 200.0
+    assert summary["latency_max_ms"] == 500.0
+    assert summary["slowest"] == [{"url": "https://api.example.com/search", "type": "XHR", "status": 200,
+                                   "duration_ms": 500.0}]
+
+
+def test_summarize_requests_without_requests():
+    summary = summarize_requests([], {}, {}, {})
+
+    assert summary["requests"] == 0
+    assert summary["latency_p50_ms"] is None
+    assert summary["slowest"] == []
@@ -0,0 +1,106 @@
+"""
+test_network_stub.py - Tests unitarios de StubStore (utils/network_stub.py)
+
+Normalización de claves (query y body opcionales), secuencia de respuestas en
+replay y persistencia record -> save -> load. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import json
+import os
+
+from utils.network_stub import StubStore
+
+
+# ==================== CLAVES ====================
+def test_key_ignores_query_and_body_by_default(tmp_path):
+    store = StubStore(str(tmp_path))
+
+    key = store.key_for("post", "https://api.example.com/v1/availability?date=2026-10-16&pax=1", '{"a": 1}')
+
+    assert key == "POST api.example.com/v1/availability"
+    assert store.key_for("POST", "https://api.example.com/v1/availability?date=2026-10-17") == key
+
+
+def test_match_query_sorts_parameters(tmp_path):
+    store = StubStore(str(tmp_path), match_query=True)
+
+    key = store.key_for("GET", "https://api.example.com/search?b=2&a=1&empty=")
+
+    assert key == "GET api.example.com/search?a=1&b=2&empty="
+    assert store.key_for("GET", "https://api.example.com/search?empty=&a=1&b=2") == key
+    assert store.key_for("GET", "https://api.example.com/search?a=1&b=3&empty=") != key
+    assert store.key_for("GET", "https://api.example.com/search") == "GET api.example.com/search"
+
+
+def test_match_body_hashes_post_data(tmp_path):
+    store = StubStore(str(tmp_path), match_body=True)
+
+    first = store.key_for("POST", "https://api.example.com/search", '{"origin": "BOG"}')
+    second = store.key_for("POST", "https://api.example.com/search", '{"origin": "MDE"}')
+
+    assert first.startswith("POST api.example.com/search #")
+    assert len(first.split(" #")[1]) == 12
+    assert first != second
+    assert store.key_for("POST", "https://api.example.com/search", '{"origin": "BOG"}') == first
+    assert store.key_for("POST", "https://api.example.com/search") == "POST api.example.com/search"
+
+
+# ==================== SECUENCIA DE RESPUESTAS ====================
+def test_next_response_serves_in_order_and_repeats_the_last(tmp_path):
+    store = StubStore(str(tmp_path))
+    key = "GET api.example.com/availability"
+    store.record(key, {"status": 200, "body": "outbound"})
+    store.record(key, {"status": 200, "body": "return"})
+
+    served = [store.next_response(key)["body"] for _ in range(4)]
+
+    assert served == ["outbound", "return", "return", "return"]
+    assert store.next_response("GET api.example.com/unknown") is None
+
+
+# ==================== PERSISTENCIA ====================
+def test_record_save_load_round_trip(tmp_path):
+    directory = str(tmp_path / "case_2")
+    store = StubStore(directory)
+    availability = "GET api.example.com/v1/availability"
+    session = "POST api.example.com/v1/session"
+    store.record(availability, {"status": 200, "headers": {"content-type": "application/json"},
+                                "body": '{"flights": []}', "base64": False})
+    store.record(availability, {"status": 200, "headers": {}, "body": "ZGF0YQ==", "base64": True})
+    store.record(session, {"status": 201, "headers": {}, "body": "", "base64": False})
+
+    assert store.save() == 2
+    assert all(name.endswith(".json") for name in os.listdir(directory))
+
+    loaded = StubStore(directory)
+    assert loaded.load() == 2
+    assert [loaded.next_response(availability)["base64"] for _ in range(2)] == [False, True]
+    assert loaded.next_response(session)["status"] == 201
+
+
+def test_recording_replaces_the_previous_sequence(tmp_path):
+    directory = str(tmp_path)
+    key = "GET api.example.com/v1/availability"
+    old = StubStore(directory)
+    old.record(key, {"status": 200, "body": "old"})
+    old.save()
+
+    store = StubStore(directory)
+    store.load()
+    store.record(key, {"status": 200, "body": "new"})
+    store.save()
+
+    reloaded = StubStore(directory)
+    reloaded.load()
+    assert reloaded.next_response(key)["body"] == "new"
+    assert reloaded.next_response(key)["body"] == "new"  # La grabación vieja no quedó en la secuencia
+
+
+def test_load_skips_invalid_files_and_missing_directory(tmp_path):
+    assert StubStore(str(tmp_path / "missing")).load() == 0
+
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "no_key.json").write_text(json.dumps({"responses": []}), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    assert StubStore(str(tmp_path)).load() == 0
@@ -0,0 +1,125 @@
+"""
+test_payload_extractor.py - Tests unitarios de utils/payload_extractor.py
+
+Rutas (compile_path / evaluate_path), tipos, specs anidadas y la búsqueda
+sobre varios bodies candidatos. No requieren navegador.
+"""
+
+# ==================== IMPORTS ====================
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.payload_extractor import (
+    ExtractionSpec, ParsedBodyCache, SESSION_JOURNEYS_SPEC, compile_path, evaluate_path,
+    extract_from_candidates, load_specs
+)
+
+# ==================== DATOS ====================
+SESSION_BODY = {
+    "result": {
+        "data": {
+            "journeys": [
+                {"origin": "BOG", "destination": "MDE", "std": "2026-01-10T08:00:00Z",
+                 "fares": [{"paxCode": "ADT", "id": "F1", "productClass": "XS"}],
+                 "segments": [{"etd": "08:00", "status": "OK", "std": "2026-01-10T08:00:00Z"}]},
+                {"origin": "MDE", "destination": "BOG", "std": "2026-01-12T18:30:00Z",
+                 "fares": [], "segments": []},
+            ]
+        }
+    }
+}
+
+
+# ==================== RUTAS ====================
+def test_compile_path_absolute_and_relative():
+    assert compile_path("$.result.data.journeys[*]") == ("result", "data", "journeys", "*")
+    assert compile_path("fares[0].id") == ("fares", 0, "id")
+    assert compile_path("segments[-1]") == ("segments", -1)
+
+
+@pytest.mark.parametrize("expression", ["$.a[", "$..a", "a[x]"])
+def test_compile_path_rejects_invalid_syntax(expression):
+    with pytest.raises(ValueError):
+        compile_path(expression)
+
+
+def test_evaluate_path_wildcards_and_missing_keys():
+    tree = {"a": [{"b": 1}, {"b": 2}, {"c": 3}], "d": {"x": 1, "y": 2}}
+    assert evaluate_path(compile_path("$.a[*].b"), tree) == [1, 2]
+    assert evaluate_path(compile_path("$.a[-1].c"), tree) == [3]
+    assert evaluate_path(compile_path("$.d[*]"), tree) == [1, 2]
+    assert evaluate_path(compile_path("$.a[5]"), tree) == []
+    assert evaluate_path(compile_path("$.missing.b"), tree) == []
+
+
+# ==================== SPECS ====================
+def test_session_spec_extracts_nested_records():
+    spec = ExtractionSpec("session_journeys", SESSION_JOURNEYS_SPEC)
+    journeys = spec.extract(SESSION_BODY)
+
+    assert [j["journey_index"] for j in journeys] == [0, 1]
+    assert journeys[0]["origin"] == "BOG"
+    assert journeys[0]["fares"] == [{"paxCode": "ADT", "id": "F1", "productClass": "XS"}]
+    assert journeys[1]["segments"] == []
+    assert journeys[1]["closingCheckInDate"] is None
+
+
+def test_field_types_are_coerced():
+    spec = ExtractionSpec("typed", {
+        "records": "$.items[*]",
+        "fields": {
+            "count": {"path": "count", "type": "int"},
+            "price": {"path": "price", "type": "float"},
+            "active": {"path": "active", "type": "bool"},
+            "when": {"path": "when", "type": "datetime"},
+            "tags": {"path": "tags[*]", "type": "list"},
+            "bad": {"path": "count_text", "type": "int"},
+        },
+    })
+    record = spec.extract({"items": [{"count": "3", "price": "9.5", "active": "true", "when": "2026-01-10T08:00:00Z",
+                                      "tags": ["a", "b"], "count_text": "three"}]})[0]
+
+    assert record == {"count": 3, "price": 9.5, "active": True,
+                      "when": datetime(2026, 1, 10, 8, 0, tzinfo=timezone.utc), "tags": ["a", "b"], "bad": None}
+
+
+def test_unknown_field_type_is_rejected():
+    with pytest.raises(ValueError):
+        ExtractionSpec("broken", {"fields": {"x": {"path": "x", "type": "decimal"}}})
+
+
+def test_first_record_path_with_results_wins():
+    spec = ExtractionSpec("journeys", SESSION_JOURNEYS_SPEC)
+    assert len(spec.extract({"journeys": [{"origin": "BOG"}]})) == 1
+    assert spec.extract({"other": []}) is None
+
+
+# ==================== CANDIDATOS ====================
+def test_extract_from_candidates_parses_each_body_once():
+    cache = ParsedBodyCache()
+    specs = load_specs({"session_journeys": SESSION_JOURNEYS_SPEC, "first_origin": {"records": "$.result.data.journeys[0]",
+                                                                                      "fields": {"origin": "origin"}}})
+    candidates = [("r1", lambda: "not json"), ("r2", lambda: json.dumps(SESSION_BODY))]
+
+    results = extract_from_candidates(specs, candidates, cache)
+    extract_from_candidates(specs, candidates, cache)
+
+    assert results["session_journeys"]["requestId"] == "r2"
+    assert results["session_journeys"]["complete"] is True
+    assert results["first_origin"]["first_origin"] == [{"origin": "BOG"}]
+    assert cache.parses == 2  # r1 (inválido, recordado como None) y r2
+
+
+def test_extract_from_candidates_falls_back_to_best_body():
+    cache = ParsedBodyCache()
+    specs = load_specs({"session_journeys": SESSION_JOURNEYS_SPEC})
+    single = {"journeys": [{"origin": "BOG"}]}
+    candidates = [("r1", lambda: None), ("r2", lambda: json.dumps(single))]
+
+    results = extract_from_candidates(specs, candidates, cache)
+
+    assert results["session_journeys"]["requestId"] == "r2"
+    assert results["session_journeys"]["complete"] is False
+    assert len(results["session_journeys"]["journeys"]) == 1
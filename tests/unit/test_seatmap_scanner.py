@@ -0,0 +1,118 @@
+"""
+test_seatmap_scanner.py - Tests unitarios de utils/seatmap_scanner.py
+
+Snapshot, detección de pasillos por huecos horizontales y estrategias de
+asignación sobre filas sintéticas (sin navegador).
+"""
+
+# ==================== IMPORTS ====================
+import pytest
+
+from utils.seatmap_scanner import (
+    SEAT_STRATEGIES, SeatmapSnapshot, economy_seat, get_seat_strategy, scan_seatmap
+)
+
+# ==================== DATOS ====================
+# Fila de 3-3 (A B C | D E K): asientos cada 40px, pasillo de 100px entre C y D
+LETTER_X = {"A": 0, "B": 40, "C": 80, "D": 180, "E": 220, "K": 260}
+SELECTED, UNAVAILABLE, OCCUPIED, UPFRONT, XLARGE = 1, 2, 4, 8, 16
+
+
+def _row(row, flags=None, cabin="ECONOMY", extra_flags=0):
+    """Filas [id, fila, letra, cabina, x, flags, elemento] como las devuelve _SCAN_JS."""
+    flags = flags or {}
+    seats = []
+    for letter, x in LETTER_X.items():
+        seat_flags = flags.get(letter, 0) | extra_flags
+        element = None if seat_flags & 7 else f"element-{row}{letter}"
+        seats.append([f"{row}{letter}_{cabin}", row, letter, cabin, x, seat_flags, element])
+    return seats
+
+
+def _ids(seats):
+    return [seat.id for seat in seats]
+
+
+# ==================== SNAPSHOT ====================
+def test_snapshot_orders_seats_and_filters_available():
+    rows = _row(16, {"A": OCCUPIED}) + _row(15, {"B": SELECTED, "C": UNAVAILABLE})
+    snapshot = SeatmapSnapshot(list(reversed(rows)))
+
+    assert _ids(snapshot.seats)[:3] == ["15A_ECONOMY", "15B_ECONOMY", "15C_ECONOMY"]
+    assert _ids(snapshot.candidates())[:3] == ["15A_ECONOMY", "15D_ECONOMY", "15E_ECONOMY"]
+    assert "16A_ECONOMY" not in _ids(snapshot.candidates())
+    assert snapshot.get("15B_ECONOMY").selected
+    assert snapshot.get("99A_ECONOMY") is None
+
+
+def test_economy_filter_excludes_plus_and_premium():
+    snapshot = SeatmapSnapshot(_row(4, extra_flags=UPFRONT) + _row(11, extra_flags=XLARGE) + _row(15))
+
+    assert {seat.row for seat in snapshot.candidates(economy_seat)} == {15}
+    assert snapshot.get("4A_ECONOMY").seat_type == "Premium"
+    assert snapshot.get("11A_ECONOMY").seat_type == "Plus"
+
+
+# ==================== PASILLOS ====================
+def test_aisle_detected_from_horizontal_gap():
+    snapshot = SeatmapSnapshot(_row(15))
+
+    assert [[seat.letter for seat in block] for block in snapshot.blocks(15)] == [["A", "B", "C"], ["D", "E", "K"]]
+    assert [seat.letter for seat in snapshot.seats if snapshot.is_aisle(seat)] == ["C", "D"]
+    assert [seat.letter for seat in snapshot.seats if snapshot.is_window(seat)] == ["A", "K"]
+
+
+def test_row_without_layout_is_a_single_block():
+    rows = [row[:4] + [0] + row[5:] for row in _row(15)]  # Página sin layout: x = 0
+    snapshot = SeatmapSnapshot(rows)
+
+    assert len(snapshot.blocks(15)) == 1
+    assert not any(snapshot.is_aisle(seat) for seat in snapshot.seats)
+
+
+# ==================== ESTRATEGIAS ====================
+def test_first_available_keeps_row_order():
+    snapshot = SeatmapSnapshot(_row(15, {"A": OCCUPIED}) + _row(16))
+    assert _ids(get_seat_strategy("first_available")(snapshot, 3))[:2] == ["15B_ECONOMY", "15C_ECONOMY"]
+
+
+def test_adjacent_picks_block_without_crossing_aisle():
+    # Fila 15: solo C y D libres (separados por el pasillo); fila 16: D E K libres
+    rows = _row(15, {"A": OCCUPIED, "B": OCCUPIED, "E": OCCUPIED, "K": OCCUPIED}) + \
+        _row(16, {"A": OCCUPIED, "B": OCCUPIED, "C": OCCUPIED})
+    ranked = get_seat_strategy("adjacent")(SeatmapSnapshot(rows), 3)
+
+    assert _ids(ranked[:3]) == ["16D_ECONOMY", "16E_ECONOMY", "16K_ECONOMY"]
+    assert set(_ids(ranked[3:])) == {"15C_ECONOMY", "15D_ECONOMY"}
+
+
+def test_adjacent_falls_back_to_first_available():
+    rows = _row(15, {"B": OCCUPIED, "E": OCCUPIED})
+    snapshot = SeatmapSnapshot(rows)
+    assert _ids(get_seat_strategy("adjacent")(snapshot, 3)) == _ids(snapshot.candidates())
+
+
+def test_window_and_aisle_preferences():
+    snapshot = SeatmapSnapshot(_row(15))
+
+    assert [seat.letter for seat in get_seat_strategy("window")(snapshot, 2)[:2]] == ["A", "K"]
+    assert [seat.letter for seat in get_seat_strategy("aisle")(snapshot, 2)[:2]] == ["C", "D"]
+
+
+def test_unknown_strategy_is_rejected():
+    assert set(SEAT_STRATEGIES) == {"first_available", "adjacent", "window", "aisle"}
+    with pytest.raises(ValueError):
+        get_seat_strategy("middle")
+
+
+def test_scan_seatmap_uses_one_script_call():
+    class FakeDriver:
+        calls = 0
+
+        def execute_script(self, script, *args):
+            FakeDriver.calls += 1
+            return _row(15)
+
+    snapshot = scan_seatmap(FakeDriver())
+    assert FakeDriver.calls == 1
+    assert len(snapshot) == 6
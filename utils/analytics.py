@@ -0,0 +1,460 @@
+"""
+analytics.py - Agregados por ejecución y análisis de flakiness sobre la BD de resultados
+
+La BD (utils/database.py) guarda una fila por test ejecutado, pero no calcula
+tendencias. Este módulo materializa agregados en tablas de resumen que se
+actualizan de forma INCREMENTAL: cada refresh solo procesa las ejecuciones
+nuevas (id mayor a la marca de agua guardada), así los dashboards consultan
+valores precalculados en lugar de recorrer todo el historial.
+
+Agregados por grupo (case_number, browser, environment, language):
+- runs, passed, failed, skipped y pass rate
+- p50 / p95 / p99 de execution_time (aproximados con histograma logarítmico)
+
+Agregados por parametrización (test_name + grupo):
+- Los mismos conteos y percentiles
+- flips: cantidad de cambios PASSED <-> FAILED entre ejecuciones consecutivas
+  (orden cronológico: timestamp y luego id; con xdist los ids siguen el orden
+  de flush de cada worker, no el de ejecución)
+- flakiness = flips / (runs - 1): 0 = estable, 1 = alterna en cada ejecución
+
+Resultado de cada ejecución:
+- FAILED si status = FAILED o validation_result = FAILED
+- SKIPPED si status = SKIPPED
+- PASSED en cualquier otro caso
+
+Uso por CLI:
+    python -m utils.analytics                 # Refresca y muestra top 10
+    python -m utils.analytics --top 20 --min-runs 3
+    python -m utils.analytics --rebuild       # Recalcula todo desde cero
+"""
+
+# ==================== IMPORTS ====================
+import argparse
+import json
+import logging
+import math
+import sys
+
+from utils.database import TestDatabase
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURACIÓN ====================
+# Histograma logarítmico: cada bucket cubre un 5% más que el anterior
+# (error máximo de los percentiles ~2.5%, sin guardar cada tiempo individual)
+HISTOGRAM_BASE = 1.05
+MIN_TRACKED_TIME = 0.001  # Tiempos menores caen en el primer bucket
+
+GROUP_KEYS = ("case_number", "browser", "environment", "language")
+PARAM_KEYS = ("test_name",) + GROUP_KEYS
+
+ANALYTICS_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS analytics_state (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_group_rollup (
+        case_number TEXT NOT NULL,
+        browser TEXT NOT NULL,
+        environment TEXT NOT NULL,
+        language TEXT NOT NULL,
+        runs INTEGER NOT NULL,
+        passed INTEGER NOT NULL,
+        failed INTEGER NOT NULL,
+        skipped INTEGER NOT NULL,
+        pass_rate REAL,
+        time_count INTEGER NOT NULL,
+        time_sum REAL NOT NULL,
+        p50 REAL,
+        p95 REAL,
+        p99 REAL,
+        histogram TEXT NOT NULL,
+        last_execution_id INTEGER,
+        PRIMARY KEY (case_number, browser, environment, language)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_param_rollup (
+        test_name TEXT NOT NULL,
+        case_number TEXT NOT NULL,
+        browser TEXT NOT NULL,
+        environment TEXT NOT NULL,
+        language TEXT NOT NULL,
+        runs INTEGER NOT NULL,
+        passed INTEGER NOT NULL,
+        failed INTEGER NOT NULL,
+        skipped INTEGER NOT NULL,
+        pass_rate REAL,
+        flips INTEGER NOT NULL,
+        flakiness REAL,
+        last_outcome TEXT,
+        time_count INTEGER NOT NULL,
+        time_sum REAL NOT NULL,
+        p50 REAL,
+        p95 REAL,
+        p99 REAL,
+        histogram TEXT NOT NULL,
+        last_execution_id INTEGER,
+        PRIMARY KEY (test_name, case_number, browser, environment, language)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_param_rollup_flakiness ON analytics_param_rollup (flakiness)",
+    "CREATE INDEX IF NOT EXISTS idx_param_rollup_p95 ON analytics_param_rollup (p95)",
+]
+
+# Ejecuciones nuevas (desde la marca de agua) con el resultado efectivo.
+# El lote se corta por id (marca de agua) y se aplica en orden (timestamp, id)
+NEW_EXECUTIONS_SQL = """
+    SELECT e.id, e.test_name, e.case_number, e.browser, e.environment, e.language,
+           e.status, d.validation_result, e.execution_time, e.timestamp
+    FROM executions e
+    LEFT JOIN execution_details d ON d.execution_id = e.id
+    WHERE e.id > ?
+    ORDER BY e.id
+    LIMIT ?
+"""
+
+
+# ==================== HISTOGRAMA ====================
+def _bucket_for(seconds):
+    """Índice de bucket logarítmico para un tiempo en segundos."""
+    return int(math.floor(math.log(max(seconds, MIN_TRACKED_TIME) / MIN_TRACKED_TIME, HISTOGRAM_BASE)))
+
+
+def _bucket_value(bucket):
+    """Valor representativo (centro geométrico) de un bucket."""
+    return MIN_TRACKED_TIME * HISTOGRAM_BASE ** (bucket + 0.5)
+
+
+def histogram_percentile(histogram, percentile):
+    """
+    Percentil aproximado a partir de un histograma {bucket: cantidad}.
+
+    Args:
+        histogram: Diccionario bucket -> cantidad de tiempos
+        percentile: Percentil entre 0 y 100
+
+    Returns:
+        float: Tiempo aproximado en segundos (None si el histograma está vacío)
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(total * percentile / 100.0))
+    cumulative = 0
+    for bucket in sorted(histogram):
+        cumulative += histogram[bucket]
+        if cumulative >= rank:
+            return round(_bucket_value(bucket), 3)
+    return round(_bucket_value(max(histogram)), 3)
+
+
+# ==================== ACUMULADOR ====================
+class _Rollup:
+    """
+    Acumulador en memoria de un grupo o parametrización durante un refresh.
+
+    Se inicializa con la fila materializada existente (si la hay) y se le
+    aplican las ejecuciones nuevas en orden cronológico (timestamp, id).
+    """
+
+    def __init__(self, row=None):
+        self.runs = self.passed = self.failed = self.skipped = 0
+        self.flips = 0
+        self.last_outcome = None
+        self.time_count = 0
+        self.time_sum = 0.0
+        self.histogram = {}
+        self.last_execution_id = None
+        if row is not None:
+            self.runs, self.passed, self.failed, self.skipped = row['runs'], row['passed'], row['failed'], row['skipped']
+            self.flips = row.get('flips', 0)
+            self.last_outcome = row.get('last_outcome')
+            self.time_count, self.time_sum = row['time_count'], row['time_sum']
+            self.histogram = {int(k): v for k, v in json.loads(row['histogram']).items()}
+            self.last_execution_id = row['last_execution_id']
+
+    def add(self, execution_id, outcome, execution_time):
+        """Aplica una ejecución nueva al acumulador."""
+        self.runs += 1
+        if outcome == "PASSED":
+            self.passed += 1
+        elif outcome == "FAILED":
+            self.failed += 1
+        else:
+            self.skipped += 1
+
+        # Flip: cambio PASSED <-> FAILED respecto de la ejecución anterior (SKIPPED no cuenta)
+        if outcome in ("PASSED", "FAILED"):
+            if self.last_outcome is not None and outcome != self.last_outcome:
+                self.flips += 1
+            self.last_outcome = outcome
+
+        if execution_time is not None:
+            self.time_count += 1
+            self.time_sum += execution_time
+            bucket = _bucket_for(execution_time)
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        self.last_execution_id = execution_id
+
+    def values(self):
+        """Columnas materializadas (conteos, tasas y percentiles)."""
+        decided = self.passed + self.failed  # Ejecuciones con resultado (sin SKIPPED)
+        return {
+            'runs': self.runs,
+            'passed': self.passed,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'pass_rate': round(self.passed / decided, 4) if decided else None,
+            'flips': self.flips,
+            'flakiness': round(self.flips / (decided - 1), 4) if decided > 1 else 0.0,
+            'last_outcome': self.last_outcome,
+            'time_count': self.time_count,
+            'time_sum': self.time_sum,
+            'p50': histogram_percentile(self.histogram, 50),
+            'p95': histogram_percentile(self.histogram, 95),
+            'p99': histogram_percentile(self.histogram, 99),
+            'histogram': json.dumps(self.histogram, separators=(",", ":")),
+            'last_execution_id': self.last_execution_id,
+        }
+
+
+# ==================== MOTOR DE ANALYTICS ====================
+class ResultsAnalytics:
+    """
+    Materializa y consulta agregados sobre la BD de resultados.
+
+    Responsabilidades:
+    - Crear las tablas de resumen (analytics_*) si no existen
+    - Refrescar incrementalmente desde la marca de agua (último id procesado)
+    - Consultar las parametrizaciones más lentas y más inestables (flaky)
+
+    Patrón: Recibe un TestDatabase ya abierto y usa su conexión
+    """
+
+    WATERMARK_KEY = "last_execution_id"
+
+    def __init__(self, database, batch_size=5000):
+        """
+        Args:
+            database: Instancia de TestDatabase
+            batch_size: Ejecuciones leídas por lote durante el refresh
+        """
+        self.database = database
+        self.connection = database.connection
+        self.batch_size = batch_size
+        with self.connection:
+            for statement in ANALYTICS_SCHEMA_SQL:
+                self.connection.execute(statement)
+
+    # ==================== MARCA DE AGUA ====================
+
+    def get_watermark(self):
+        """Último id de executions ya incluido en los agregados."""
+        row = self.connection.execute(
+            "SELECT value FROM analytics_state WHERE key = ?", (self.WATERMARK_KEY,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    # ==================== REFRESH INCREMENTAL ====================
+
+    def refresh(self):
+        """
+        Procesa las ejecuciones nuevas y actualiza las tablas de resumen.
+
+        Solo se leen y reescriben los grupos/parametrizaciones que recibieron
+        ejecuciones nuevas. Cada lote se confirma junto con la marca de agua,
+        así un refresh interrumpido no cuenta ejecuciones dos veces.
+
+        Returns:
+            int: Cantidad de ejecuciones procesadas
+        """
+        self.database.flush()  # Incluir filas aún en buffer
+        processed = 0
+        watermark = self.get_watermark()
+
+        while True:
+            rows = self.connection.execute(NEW_EXECUTIONS_SQL, (watermark, self.batch_size)).fetchall()
+            if not rows:
+                break
+
+            # Marca de agua = mayor id del lote; los flips se cuentan en orden (timestamp, id)
+            watermark = rows[-1][0]
+            rows.sort(key=lambda row: (row[9] or "", row[0]))
+
+            groups, params = {}, {}
+            for (execution_id, test_name, case_number, browser, environment, language,
+                 status, validation_result, execution_time, _timestamp) in rows:
+                group_key = tuple(v if v is not None else "" for v in (case_number, browser, environment, language))
+                param_key = (test_name,) + group_key
+                outcome = self._outcome(status, validation_result)
+
+                if group_key not in groups:
+                    groups[group_key] = _Rollup(self._load("analytics_group_rollup", GROUP_KEYS, group_key))
+                if param_key not in params:
+                    params[param_key] = _Rollup(self._load("analytics_param_rollup", PARAM_KEYS, param_key))
+                groups[group_key].add(execution_id, outcome, execution_time)
+                params[param_key].add(execution_id, outcome, execution_time)
+
+            with self.connection:
+                for key, rollup in groups.items():
+                    self._save("analytics_group_rollup", GROUP_KEYS, key, rollup, with_flips=False)
+                for key, rollup in params.items():
+                    self._save("analytics_param_rollup", PARAM_KEYS, key, rollup, with_flips=True)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO analytics_state (key, value) VALUES (?, ?)",
+                    (self.WATERMARK_KEY, watermark)
+                )
+            processed += len(rows)
+
+        if processed:
+            logger.info(f"Analytics refreshed with {processed} new executions (watermark {watermark})")
+        return processed
+
+    def rebuild(self):
+        """Borra los agregados y los recalcula desde la primera ejecución."""
+        with self.connection:
+            self.connection.execute("DELETE FROM analytics_group_rollup")
+            self.connection.execute("DELETE FROM analytics_param_rollup")
+            self.connection.execute("DELETE FROM analytics_state WHERE key = ?", (self.WATERMARK_KEY,))
+        return self.refresh()
+
+    @staticmethod
+    def _outcome(status, validation_result):
+        """Resultado efectivo de una ejecución (ver docstring del módulo)."""
+        if status == "FAILED" or validation_result == "FAILED":
+            return "FAILED"
+        if status == "SKIPPED":
+            return "SKIPPED"
+        return "PASSED"
+
+    def _load(self, table, key_columns, key):
+        """Fila materializada actual de un grupo/parametrización (o None)."""
+        where = " AND ".join(f"{c} = ?" for c in key_columns)
+        cursor = self.connection.execute(f"SELECT * FROM {table} WHERE {where}", key)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([d[0] for d in cursor.description], row))
+
+    def _save(self, table, key_columns, key, rollup, with_flips):
+        """Escribe (INSERT OR REPLACE) la fila materializada de un acumulador."""
+        values = rollup.values()
+        if not with_flips:
+            for column in ("flips", "flakiness", "last_outcome"):
+                values.pop(column)
+        columns = list(key_columns) + list(values)
+        placeholders = ", ".join("?" for _ in columns)
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            tuple(key) + tuple(values.values())
+        )
+
+    # ==================== CONSULTAS ====================
+
+    def _query(self, sql, params=()):
+        """Ejecuta una consulta y devuelve lista de diccionarios."""
+        cursor = self.connection.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def get_slowest(self, limit=10, min_runs=1):
+        """Parametrizaciones con mayor p95 de execution_time."""
+        return self._query("""
+            SELECT test_name, case_number, browser, environment, language, runs, p50, p95, p99
+            FROM analytics_param_rollup
+            WHERE runs >= ? AND p95 IS NOT NULL
+            ORDER BY p95 DESC LIMIT ?
+        """, (min_runs, limit))
+
+    def get_flakiest(self, limit=10, min_runs=2):
+        """Parametrizaciones con más cambios PASSED <-> FAILED."""
+        return self._query("""
+            SELECT test_name, case_number, browser, environment, language, runs, flips, flakiness, pass_rate
+            FROM analytics_param_rollup
+            WHERE runs >= ? AND flips > 0
+            ORDER BY flakiness DESC, flips DESC LIMIT ?
+        """, (min_runs, limit))
+
+    def get_group_summary(self):
+        """Pass rate y percentiles por (case, browser, environment, language)."""
+        return self._query("""
+            SELECT case_number, browser, environment, language, runs, pass_rate, p50, p95, p99
+            FROM analytics_group_rollup
+            ORDER BY case_number, browser, environment, language
+        """)
+
+
+# ==================== CLI ====================
+def _format_seconds(value):
+    return f"{value:.2f}s" if value is not None else "-"
+
+
+def _format_rate(value):
+    return f"{value * 100:.0f}%" if value is not None else "-"
+
+
+def _print_table(title, headers, rows):
+    """Imprime una tabla de texto simple con columnas alineadas."""
+    print(f"\n{title}")
+    if not rows:
+        print("  (no data)")
+        return
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  " + "  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  " + "  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  " + "  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
+
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.analytics"""
+    parser = argparse.ArgumentParser(description="Test results analytics: slowest and flakiest parametrizations")
+    parser.add_argument("--db", default="test_results.db", help="SQLite results database (default: test_results.db)")
+    parser.add_argument("--top", type=int, default=10, help="Rows to show per ranking (default: 10)")
+    parser.add_argument("--min-runs", type=int, default=2, help="Minimum runs to rank a parametrization (default: 2)")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all rollups from scratch")
+    parser.add_argument("--groups", action="store_true", help="Also print pass rate/percentiles per case/browser/env/language")
+    args = parser.parse_args(argv)
+
+    database = TestDatabase(args.db)
+    try:
+        analytics = ResultsAnalytics(database)
+        processed = analytics.rebuild() if args.rebuild else analytics.refresh()
+        print(f"Processed {processed} new executions (watermark: {analytics.get_watermark()})")
+
+        _print_table(
+            f"Slowest parametrizations (p95, min {args.min_runs} runs)",
+            ["test", "case", "browser", "env", "language", "runs", "p50", "p95", "p99"],
+            [(r['test_name'], r['case_number'], r['browser'], r['environment'], r['language'], r['runs'],
+              _format_seconds(r['p50']), _format_seconds(r['p95']), _format_seconds(r['p99']))
+             for r in analytics.get_slowest(args.top, args.min_runs)]
+        )
+        _print_table(
+            f"Flakiest parametrizations (pass/fail flips, min {args.min_runs} runs)",
+            ["test", "case", "browser", "env", "language", "runs", "flips", "flakiness", "pass rate"],
+            [(r['test_name'], r['case_number'], r['browser'], r['environment'], r['language'], r['runs'], r['flips'],
+              f"{r['flakiness']:.2f}", _format_rate(r['pass_rate']))
+             for r in analytics.get_flakiest(args.top, args.min_runs)]
+        )
+        if args.groups:
+            _print_table(
+                "Summary per case/browser/env/language",
+                ["case", "browser", "env", "language", "runs", "pass rate", "p50", "p95", "p99"],
+                [(r['case_number'], r['browser'], r['environment'], r['language'], r['runs'],
+                  _format_rate(r['pass_rate']), _format_seconds(r['p50']), _format_seconds(r['p95']),
+                  _format_seconds(r['p99']))
+                 for r in analytics.get_group_summary()]
+            )
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+bidi_network.py - Captura de red vía WebDriver BiDi (Firefox) con la forma de eventos CDP
+
+Firefox no soporta execute_cdp_cmd ni el performance log de Chrome, pero sí
+WebDriver BiDi: un WebSocket (capability webSocketUrl) por el que el navegador
+EMPUJA eventos network.* apenas ocurren (sin polling).
+
+Este módulo abre esa conexión en un thread propio (trio + trio-websocket, ya
+instalados como dependencias de Selenium) y traduce cada evento BiDi al mensaje
+CDP equivalente, para que NetworkCapture, el exportador HAR y las métricas
+funcionen igual en los tres navegadores:
+
+    network.beforeRequestSent  -> Network.requestWillBeSent
+    network.responseStarted    -> Network.responseReceived
+    network.responseCompleted  -> Network.loadingFinished
+    network.fetchError         -> Network.loadingFailed
+
+Bodies (best-effort):
+- Se pide network.addDataCollector al conectar; si el navegador no lo soporta
+  (Firefox anterior a network.getData) la captura sigue sin bodies
+- Los bodies se piden con network.getData de forma asíncrona y se entregan por callback
+"""
+
+# ==================== IMPORTS ====================
+import base64
+import json
+import logging
+import threading
+import trio
+from trio_websocket import open_websocket_url, ConnectionClosed
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+BIDI_NETWORK_EVENTS = [
+    "network.beforeRequestSent",
+    "network.responseStarted",
+    "network.responseCompleted",
+    "network.fetchError",
+]
+
+# request.destination / initiatorType de BiDi -> tipo de recurso del CDP
+RESOURCE_TYPES = {
+    "document": "Document",
+    "iframe": "Document",
+    "script": "Script",
+    "style": "Stylesheet",
+    "image": "Image",
+    "font": "Font",
+    "audio": "Media",
+    "video": "Media",
+    "track": "Media",
+    "manifest": "Manifest",
+    "xmlhttprequest": "XHR",
+    "fetch": "Fetch",
+    "beacon": "Ping",
+    "websocket": "WebSocket",
+}
+
+
+class BidiCommandError(Exception):
+    """Error devuelto por el navegador a un comando BiDi."""
+
+
+# ==================== TRADUCCIÓN BIDI -> CDP ====================
+def _headers_to_dict(headers):
+    """Headers BiDi [{name, value: {type, value}}] -> dict CDP (repetidos unidos con \\n)."""
+    result = {}
+    for header in headers or []:
+        value = header.get("value", {})
+        if isinstance(value, dict):
+            text = value.get("value", "")
+            if value.get("type") == "base64":
+                text = base64.b64decode(text).decode("latin-1")
+        else:
+            text = str(value)
+        name = header.get("name", "")
+        result[name] = f"{result[name]}\n{text}" if name in result else text
+    return result
+
+
+def _resource_type(params):
+    """Tipo de recurso estilo CDP a partir de un evento BiDi."""
+    request = params.get("request", {})
+    if params.get("navigation"):
+        return "Document"
+    for key in ("initiatorType", "destination"):
+        mapped = RESOURCE_TYPES.get((request.get(key) or "").lower())
+        if mapped:
+            return mapped
+    return "Other"
+
+
+def _timing(request, event_timestamp):
+    """
+    FetchTimingInfo de BiDi (ms) -> ResourceTiming del CDP (ms relativos al inicio).
+
+    requestTime (segundos epoch) se deriva del timestamp de responseStarted menos
+    el offset de responseStart, así no depende del origen de reloj de los timings.
+    """
+    timings = request.get("timings") or {}
+    base = timings.get("fetchStart") or timings.get("requestTime") or 0
+    if not base:
+        return None
+
+    def offset(key):
+        value = timings.get(key) or 0
+        return round(value - base, 3) if value > 0 else -1
+
+    send_start = offset("requestStart")
+    headers_end = offset("responseStart")
+    return {
+        "requestTime": (event_timestamp - max(headers_end, 0)) / 1000,
+        "dnsStart": offset("dnsStart"),
+        "dnsEnd": offset("dnsEnd"),
+        "connectStart": offset("connectStart"),
+        "connectEnd": offset("connectEnd"),
+        "sslStart": offset("tlsStart"),
+        "sslEnd": offset("connectEnd") if timings.get("tlsStart") else -1,
+        "sendStart": send_start,
+        "sendEnd": send_start,
+        "receiveHeadersEnd": headers_end,
+    }
+
+
+def _cdp_response(params):
+    """Objeto response estilo CDP a partir de un evento BiDi con response."""
+    response = params.get("response", {})
+    cdp = {
+        "url": response.get("url", ""),
+        "status": response.get("status", 0),
+        "statusText": response.get("statusText", ""),
+        "headers": _headers_to_dict(response.get("headers")),
+        "mimeType": response.get("mimeType", ""),
+        "protocol": response.get("protocol", ""),
+        "encodedDataLength": response.get("headersSize") or 0,
+        "fromDiskCache": bool(response.get("fromCache")),
+    }
+    timing = _timing(params.get("request", {}), params.get("timestamp") or 0)
+    if timing:
+        cdp["timing"] = timing
+    return cdp
+
+
+def translate_event(event):
+    """
+    Traduce un evento BiDi network.* al mensaje CDP equivalente.
+
+    Args:
+        event: Mensaje BiDi {"method", "params"}
+
+    Returns:
+        dict: Mensaje CDP {"method", "params"} o None si el evento no aplica
+    """
+    method = event.get("method")
+    params = event.get("params", {})
+    request = params.get("request", {})
+    request_id = request.get("request")
+    if not request_id:
+        return None
+
+    timestamp = (params.get("timestamp") or 0) / 1000  # BiDi: ms epoch -> CDP: segundos
+    common = {"requestId": request_id, "timestamp": timestamp}
+
+    if method == "network.beforeRequestSent":
+        return {"method": "Network.requestWillBeSent", "params": dict(
+            common,
+            loaderId=request_id if params.get("navigation") else "",  # CDP: navegación => loaderId == requestId
+            frameId=params.get("context"),
+            type=_resource_type(params),
+            wallTime=timestamp,
+            request={
+                "url": request.get("url", ""),
+                "method": request.get("method", "GET"),
+                "headers": _headers_to_dict(request.get("headers")),
+            },
+            redirectCount=params.get("redirectCount", 0),
+        )}
+
+    if method == "network.responseStarted":
+        return {"method": "Network.responseReceived", "params": dict(
+            common, type=_resource_type(params), frameId=params.get("context"), response=_cdp_response(params)
+        )}
+
+    if method == "network.responseCompleted":
+        response = params.get("response", {})
+        return {"method": "Network.loadingFinished", "params": dict(
+            common, encodedDataLength=response.get("bytesReceived") or 0
+        )}
+
+    if method == "network.fetchError":
+        return {"method": "Network.loadingFailed", "params": dict(
+            common, type=_resource_type(params), errorText=params.get("errorText", "")
+        )}
+    return None
+
+
+# ==================== LISTENER ====================
+class BidiNetworkListener:
+    """
+    Conexión BiDi en segundo plano que entrega eventos de red ya traducidos a CDP.
+
+    Uso:
+        listener = BidiNetworkListener(driver.capabilities["webSocketUrl"], on_message)
+        listener.start()
+        ...
+        listener.stop()
+
+    on_message(message) se llama desde el thread del listener por cada evento.
+    """
+
+    def __init__(self, websocket_url, on_message, collect_bodies=True, max_body_bytes=2 * 1024 * 1024):
+        """
+        Args:
+            websocket_url: capability webSocketUrl de la sesión (ws://...)
+            on_message: Callback que recibe cada mensaje CDP traducido
+            collect_bodies: Si True intenta habilitar la recolección de bodies
+            max_body_bytes: Tamaño máximo de body que retiene el navegador
+        """
+        self.websocket_url = websocket_url
+        self.on_message = on_message
+        self.collect_bodies = collect_bodies
+        self.max_body_bytes = max_body_bytes
+        self.bodies_supported = False
+        self.events_received = 0
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._token = None
+        self._nursery = None
+        self._stop_event = None
+        self._ws = None
+        self._next_id = 0
+        self._pending = {}  # id de comando -> [trio.Event, respuesta]
+        self._bodies_in_flight = 0
+        self._bodies_done = threading.Condition()
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self, timeout=10.0):
+        """
+        Conecta y se suscribe a los eventos de red.
+
+        Returns:
+            bool: True si la suscripción quedó activa
+        """
+        self._thread = threading.Thread(target=self._run, name="bidi-network", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error or not self._ready.is_set():
+            logger.error(f"WebDriver BiDi network listener failed to start: {self._error or 'timeout'}")
+            self.stop()
+            return False
+        logger.info(f"WebDriver BiDi network listener started (bodies: {'yes' if self.bodies_supported else 'no'})")
+        return True
+
+    def stop(self):
+        """Cierra la conexión y espera al thread (seguro de llamar varias veces)."""
+        if self._token is not None and self._stop_event is not None:
+            try:
+                self._token.run_sync_soon(self._stop_event.set)
+            except trio.RunFinishedError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        logger.info(f"WebDriver BiDi network listener stopped ({self.events_received} events received)")
+
+    def _run(self):
+        """Thread del listener: ejecuta el loop de trio."""
+        try:
+            trio.run(self._session)
+        except Exception as e:
+            self._error = str(e)[:200]
+            logger.warning(f"WebDriver BiDi network listener ended: {self._error}")
+        finally:
+            self._ready.set()
+            with self._bodies_done:
+                self._bodies_in_flight = 0
+                self._bodies_done.notify_all()
+
+    async def _session(self):
+        """Conexión WebSocket: suscripción, recolector de bodies y loop de recepción."""
+        self._token = trio.lowlevel.current_trio_token()
+        self._stop_event = trio.Event()
+        async with open_websocket_url(self.websocket_url, max_message_size=64 * 1024 * 1024) as ws:
+            self._ws = ws
+            async with trio.open_nursery() as nursery:
+                self._nursery = nursery
+                nursery.start_soon(self._receive_loop)
+
+                # Primero el recolector de bodies: los eventos pueden llegar apenas se suscribe
+                if self.collect_bodies:
+                    try:
+                        await self._command("network.addDataCollector", {
+                            "dataTypes": ["response"], "maxEncodedDataSize": self.max_body_bytes
+                        })
+                        self.bodies_supported = True
+                    except BidiCommandError as e:
+                        logger.info(f"Response bodies not available over BiDi: {str(e)[:100]}")
+                await self._command("session.subscribe", {"events": BIDI_NETWORK_EVENTS})
+
+                self._ready.set()
+                await self._stop_event.wait()
+                nursery.cancel_scope.cancel()
+
+    # ==================== PROTOCOLO ====================
+
+    async def _command(self, method, params):
+        """Envía un comando BiDi y espera su respuesta."""
+        self._next_id += 1
+        command_id = self._next_id
+        waiter = [trio.Event(), None]
+        self._pending[command_id] = waiter
+        await self._ws.send_message(json.dumps({"id": command_id, "method": method, "params": params}))
+        await waiter[0].wait()
+        response = waiter[1]
+        if "error" in response:
+            raise BidiCommandError(f"{method}: {response.get('error')} {response.get('message', '')}")
+        return response.get("result", {})
+
+    async def _receive_loop(self):
+        """Recibe mensajes: respuestas a comandos y eventos de red."""
+        try:
+            while True:
+                message = json.loads(await self._ws.get_message())
+                command_id = message.get("id")
+                if command_id is not None:
+                    waiter = self._pending.pop(command_id, None)
+                    if waiter:
+                        waiter[1] = message
+                        waiter[0].set()
+                    continue
+
+                cdp_message = translate_event(message)
+                if cdp_message is None:
+                    continue
+                self.events_received += 1
+                try:
+                    self.on_message(cdp_message)
+                except Exception as e:
+                    logger.warning(f"Error processing BiDi network event: {str(e)[:100]}")
+        except ConnectionClosed:
+            logger.info("WebDriver BiDi connection closed")
+            self._stop_event.set()
+
+    # ==================== BODIES ====================
+
+    def fetch_body(self, request_id, on_body):
+        """
+        Pide el body de una respuesta sin bloquear (thread-safe).
+
+        Args:
+            request_id: requestId (id de request BiDi)
+            on_body: Callback on_body(request_id, body_or_None) desde el thread del listener
+        """
+        if not self.bodies_supported or self._token is None:
+            on_body(request_id, None)
+            return
+        with self._bodies_done:
+            self._bodies_in_flight += 1
+        try:
+            self._token.run_sync_soon(self._nursery.start_soon, self._fetch_body, request_id, on_body)
+        except trio.RunFinishedError:
+            self._body_finished()
+            on_body(request_id, None)
+
+    async def _fetch_body(self, request_id, on_body):
+        """Tarea trio: network.getData y entrega del body decodificado."""
+        body = None
+        try:
+            result = await self._command("network.getData", {"dataType": "response", "request": request_id})
+            data = result.get("bytes", {})
+            body = data.get("value")
+            if data.get("type") == "base64" and body is not None:
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+        except Exception as e:
+            logger.debug(f"Could not get BiDi body for {request_id}: {str(e)[:100]}")
+        try:
+            on_body(request_id, body)
+        finally:
+            self._body_finished()
+
+    def _body_finished(self):
+        with self._bodies_done:
+            self._bodies_in_flight = max(0, self._bodies_in_flight - 1)
+            self._bodies_done.notify_all()
+
+    def wait_for_bodies(self, timeout=2.0):
+        """Espera (sin tomar locks de NetworkCapture) a que terminen los bodies pedidos."""
+        with self._bodies_done:
+            return self._bodies_done.wait_for(lambda: self._bodies_in_flight == 0, timeout)
@@ -0,0 +1,349 @@
+"""
+browser_pool.py - Pool de navegadores "calientes" reutilizables entre tests
+
+Lanzar un navegador (webdriver.Chrome/Edge/Firefox) tarda varios segundos y el
+fixture `driver` lo hacía para CADA test parametrizado. Este módulo mantiene un
+pool de navegadores ya lanzados, agrupados por clave (navegador + opciones), que
+el fixture "presta" (lease) a cada test y recupera al terminar.
+
+Conceptos clave:
+- Lease: préstamo de un navegador del pool a un test
+- Release: devolución del navegador al pool (se limpia el estado)
+- Health check: verificación de que la sesión WebDriver sigue viva
+- Max reuse: número máximo de tests que puede atender un navegador antes de
+  cerrarse y relanzarse (evita acumulación de memoria en el navegador)
+
+Entre préstamos el navegador se resetea:
+1. Cierra ventanas/pestañas extra (las que dejan Case 6/7)
+2. Sale de iframes (Payment deja el contexto dentro del iframe de pago)
+3. Borra cookies y el storage (localStorage, sessionStorage, IndexedDB, Cache
+   Storage, service workers) de TODOS los orígenes visitados (Chrome/Edge vía CDP
+   Storage.clearDataForOrigin; en Firefox solo el storage del origen cargado)
+4. Restaura el estado CDP que dejan los tests (URLs bloqueadas, intercepción Fetch)
+5. Navega a about:blank
+"""
+
+# ==================== IMPORTS ====================
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+
+# ==================== ENTRADA DEL POOL ====================
+class PooledBrowser:
+    """
+    Envoltorio de un navegador del pool con su información de uso.
+
+    Atributos:
+    - driver: Instancia de WebDriver
+    - key: Clave del pool (navegador + firma de opciones)
+    - uses: Cantidad de tests que ya atendió este navegador
+    - launch_time: Segundos que tardó en lanzarse
+    """
+
+    def __init__(self, driver, key, launch_time):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+        self.launch_time = launch_time
+        self.created_at = time.time()
+
+
+# ==================== CLASE DEL POOL ====================
+class BrowserPool:
+    """
+    Pool de navegadores reutilizables por clave (navegador, opciones).
+
+    Responsabilidades:
+    - Entregar un navegador disponible o lanzar uno nuevo si no hay
+    - Verificar salud de la sesión antes de prestarla
+    - Resetear el estado del navegador al devolverlo
+    - Retirar navegadores que superan max_reuse o que fallan el reset
+    - Registrar estadísticas (tiempo de lanzamiento vs tiempo de préstamo)
+
+    Patrón: Una instancia por sesión de pytest (con xdist: una por worker)
+    """
+
+    def __init__(self, max_reuse=20, max_idle_per_key=1):
+        """
+        Constructor del pool.
+
+        Args:
+            max_reuse: Tests máximos por navegador antes de relanzarlo (0 = sin reutilización)
+            max_idle_per_key: Navegadores libres máximos por clave (el resto se cierra)
+        """
+        self.max_reuse = max_reuse
+        self.max_idle_per_key = max_idle_per_key
+        self._idle = {}  # {key: [PooledBrowser, ...]} navegadores libres
+        self._leased = {}  # {id(driver): PooledBrowser} navegadores prestados
+        self._lock = threading.Lock()
+        self.stats = {
+            'launches': 0,
+            'launch_time_total': 0.0,
+            'leases': 0,
+            'reuses': 0,
+            'lease_time_total': 0.0,
+            'resets': 0,
+            'reset_time_total': 0.0,
+            'retired_max_reuse': 0,
+            'retired_unhealthy': 0,
+        }
+        logger.info(f"BrowserPool initialized (max_reuse={max_reuse})")
+
+    # ==================== PRÉSTAMO ====================
+
+    def acquire(self, key, factory):
+        """
+        Presta un navegador para la clave indicada.
+
+        Args:
+            key: Clave hashable (ej: ("chrome", "full", ...))
+            factory: Función sin argumentos que lanza un navegador nuevo
+
+        Returns:
+            WebDriver: Navegador listo para usar
+
+        Flujo:
+        1. Busca un navegador libre con la misma clave
+        2. Verifica que siga vivo (health check); si no, lo descarta
+        3. Si no hay ninguno sano, lanza uno nuevo con factory()
+        """
+        lease_start = time.perf_counter()
+        entry = None
+
+        while True:
+            with self._lock:
+                candidates = self._idle.get(key, [])
+                candidate = candidates.pop() if candidates else None
+            if candidate is None:
+                break
+            if self._is_healthy(candidate.driver):
+                entry = candidate
+                self.stats['reuses'] += 1
+                break
+            logger.warning(f"Pooled browser failed health check, discarding ({key[0]})")
+            self.stats['retired_unhealthy'] += 1
+            self._quit(candidate.driver)
+
+        if entry is None:
+            launch_start = time.perf_counter()
+            driver = factory()
+            launch_time = time.perf_counter() - launch_start
+            entry = PooledBrowser(driver, key, launch_time)
+            self.stats['launches'] += 1
+            self.stats['launch_time_total'] += launch_time
+            logger.info(f"Launched new {key[0]} browser in {launch_time:.2f}s")
+
+        entry.uses += 1
+        with self._lock:
+            self._leased[id(entry.driver)] = entry
+
+        lease_time = time.perf_counter() - lease_start
+        self.stats['leases'] += 1
+        self.stats['lease_time_total'] += lease_time
+        logger.info(f"Leased {key[0]} browser (use {entry.uses}/{self.max_reuse or 1}, lease {lease_time:.2f}s)")
+        return entry.driver
+
+    def release(self, driver):
+        """
+        Devuelve un navegador al pool.
+
+        Si el navegador superó max_reuse, o el reset falla, se cierra (driver.quit())
+        en lugar de volver al pool.
+
+        Args:
+            driver: Navegador obtenido con acquire()
+        """
+        with self._lock:
+            entry = self._leased.pop(id(driver), None)
+
+        if entry is None:
+            # No pertenece al pool: cerrarlo como antes
+            self._quit(driver)
+            return
+
+        if self.max_reuse <= 0 or entry.uses >= self.max_reuse:
+            logger.info(f"Retiring {entry.key[0]} browser after {entry.uses} uses")
+            self.stats['retired_max_reuse'] += 1
+            self._quit(driver)
+            return
+
+        reset_start = time.perf_counter()
+        reset_ok = self._reset(driver)
+        self.stats['resets'] += 1
+        self.stats['reset_time_total'] += time.perf_counter() - reset_start
+
+        if not reset_ok:
+            self.stats['retired_unhealthy'] += 1
+            self._quit(driver)
+            return
+
+        with self._lock:
+            idle = self._idle.setdefault(entry.key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append(entry)
+                return
+
+        # Ya hay suficientes navegadores libres para esta clave
+        self._quit(driver)
+
+    def discard(self, driver):
+        """
+        Cierra un navegador prestado sin devolverlo al pool.
+
+        Útil cuando el test dejó el navegador en un estado irrecuperable.
+        """
+        with self._lock:
+            self._leased.pop(id(driver), None)
+        self.stats['retired_unhealthy'] += 1
+        self._quit(driver)
+
+    # ==================== SALUD Y RESET ====================
+
+    def _is_healthy(self, driver):
+        """
+        Health check barato: una consulta a la sesión WebDriver.
+
+        Returns:
+            bool: True si la sesión responde y tiene al menos una ventana
+        """
+        try:
+            return len(driver.window_handles) > 0
+        except Exception as e:
+            logger.debug(f"Health check failed: {str(e)[:100]}")
+            return False
+
+    @staticmethod
+    def _visited_origins(driver):
+        """
+        Orígenes http(s) de la pestaña actual vía CDP: historial de navegación
+        (Page.getNavigationHistory) y frames cargados (Page.getFrameTree, ej: iframe de pago).
+
+        Returns:
+            set: Orígenes "esquema://host[:puerto]"
+        """
+        urls = [entry.get('url', '') for entry in
+                driver.execute_cdp_cmd('Page.getNavigationHistory', {}).get('entries', [])]
+        pending = [driver.execute_cdp_cmd('Page.getFrameTree', {}).get('frameTree', {})]
+        while pending:
+            node = pending.pop()
+            urls.append(node.get('frame', {}).get('url', ''))
+            pending.extend(node.get('childFrames', []))
+
+        origins = set()
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme in ('http', 'https') and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+
+    def _reset(self, driver):
+        """
+        Limpia el estado del navegador entre tests.
+
+        Returns:
+            bool: True si el navegador quedó limpio y reutilizable
+        """
+        try:
+            is_chromium = driver.capabilities.get('browserName', '').lower() in ('chrome', 'msedge', 'microsoftedge')
+            origins = set()
+
+            # PASO 1: Cerrar pestañas extra (mismo criterio que HomePage.close_extra_tabs_and_return_to_main)
+            # En Chrome/Edge se anotan antes los orígenes que visitó cada pestaña
+            handles = driver.window_handles
+            main_window = handles[0]
+            for window in handles[1:]:
+                driver.switch_to.window(window)
+                if is_chromium:
+                    origins |= self._visited_origins(driver)
+                driver.close()
+            driver.switch_to.window(main_window)
+            if is_chromium:
+                origins |= self._visited_origins(driver)
+
+            # PASO 2: Salir de cualquier iframe (PaymentPage deja el contexto en el iframe)
+            driver.switch_to.default_content()
+
+            # PASO 3: Borrar storage (Chrome/Edge: todos los orígenes visitados, incluido IndexedDB)
+            if is_chromium:
+                for origin in origins:
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            else:
+                try:
+                    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+                except WebDriverException:
+                    pass  # about:blank o páginas sin storage
+
+            # PASO 4: Borrar cookies (CDP borra TODAS, no solo las del dominio actual) y restaurar
+            # el estado CDP que deja el test (URLs bloqueadas del perfil lean, stubs con Fetch.enable)
+            if is_chromium:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+                driver.execute_cdp_cmd('Fetch.disable', {})
+                # Vaciar el buffer de performance log para que el siguiente test no reciba eventos viejos
+                try:
+                    driver.get_log('performance')
+                except WebDriverException:
+                    pass
+            driver.delete_all_cookies()
+
+            # PASO 5: Restaurar esperas y navegar a página vacía
+            driver.implicitly_wait(10)
+            driver.get("about:blank")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Browser reset failed, browser will be retired: {str(e)[:150]}")
+            return False
+
+    def _quit(self, driver):
+        """Cierra un navegador ignorando errores (sesión ya muerta, etc.)."""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting browser: {str(e)[:100]}")
+
+    # ==================== CIERRE Y ESTADÍSTICAS ====================
+
+    def shutdown(self):
+        """
+        Cierra TODOS los navegadores del pool (libres y prestados).
+
+        Debe llamarse al final de la sesión de pytest.
+        """
+        with self._lock:
+            entries = [e for idle in self._idle.values() for e in idle]
+            entries.extend(self._leased.values())
+            self._idle.clear()
+            self._leased.clear()
+
+        for entry in entries:
+            self._quit(entry.driver)
+        logger.info(f"BrowserPool shut down ({len(entries)} browsers closed)")
+
+    def get_stats_summary(self):
+        """
+        Genera un resumen legible de las estadísticas del pool.
+
+        Returns:
+            str: Resumen con lanzamientos, préstamos y tiempos promedio
+        """
+        s = self.stats
+        avg_launch = s['launch_time_total'] / s['launches'] if s['launches'] else 0.0
+        avg_lease = s['lease_time_total'] / s['leases'] if s['leases'] else 0.0
+        avg_reset = s['reset_time_total'] / s['resets'] if s['resets'] else 0.0
+        saved = max(0.0, s['reuses'] * avg_launch - s['reset_time_total'])
+
+        return (
+            f"Browser launches: {s['launches']} (avg {avg_launch:.2f}s, total {s['launch_time_total']:.1f}s)\n"
+            f"Leases: {s['leases']} (avg {avg_lease:.2f}s) | Reuses: {s['reuses']}\n"
+            f"Reset between tests: avg {avg_reset:.2f}s\n"
+            f"Retired: {s['retired_max_reuse']} (max reuse) | {s['retired_unhealthy']} (unhealthy)\n"
+            f"Estimated startup time saved: {saved:.1f}s"
+        )
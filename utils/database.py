@@ -5,12 +5,393 @@ SQLite - Base de datos ligera que:
 - Se almacena en un solo archivo (.db)
 - No requiere instalar servidor (como MySQL o PostgreSQL)
 - Perfecta para almacenar datos locales de tests
+
+Ejecución en paralelo (pytest -n N con xdist):
+- Todos los workers escriben en el MISMO archivo .db
+- Modo WAL + synchronous=NORMAL + busy_timeout evita "database is locked"
+- Modo buffered: las filas se acumulan en memoria y se insertan por lotes
+  (executemany en una sola transacción) en lugar de un commit por test
+- Cada fila se anota también en un archivo spool por proceso (.jsonl); si un
+  worker muere antes de hacer flush, el proceso principal recupera sus filas
+  (solo spools cuyo PID ya no existe: los de sesiones concurrentes no se tocan)
+
+Esquema normalizado (versión 2, PRAGMA user_version):
+- test_runs: una fila por ejecución de pytest (compartida por los workers de xdist)
+- executions: columnas comunes de cada test + índices para consultas de historial
+- execution_details: campos específicos por caso (solo si el test los reporta)
+- execution_payloads: referencia (hash) a contenidos grandes por test
+- payload_blobs: contenidos grandes (ej: session_data_json del Case 3) comprimidos
+  (zstd si está instalado, si no zlib) y deduplicados por hash SHA-256
+- test_executions: VISTA de compatibilidad con las 30 columnas originales en el
+  mismo orden; las consultas y el SELECT * existentes siguen funcionando
+- network_metrics (versión 4): métricas de red por página de cada test (TTFB,
+  bytes, espera del servidor, terceros); el detalle va en payload_blobs
 """
 
 # ==================== IMPORTS ====================
 import sqlite3  # Librería estándar de Python para trabajar con SQLite
-from datetime import datetime  # Para manejar fechas y horas
+from datetime import datetime, timezone  # Para manejar fechas y horas (UTC)
 import os  # Para operaciones del sistema operativo (rutas, archivos, etc.)
+import json  # Para el archivo spool de filas pendientes
+import time  # Para el flush por intervalo de tiempo
+import logging  # Para registrar flush y recuperación de filas
+import socket  # Para registrar el host de cada ejecución
+import uuid  # Para identificar la ejecución (run) cuando no hay xdist
+import hashlib  # Hash SHA-256 de payloads (almacenamiento por contenido)
+import zlib  # Compresión de payloads (siempre disponible)
+from collections import namedtuple  # Filas livianas con acceso por nombre
+from functools import lru_cache  # Cache de clases de fila por proyección
+
+# zstandard es opcional: comprime mejor y más rápido que zlib
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== COLUMNAS DE INSERCIÓN ====================
+# Orden de columnas usado por save_test_result, el buffer y el spool
+RESULT_COLUMNS = (
+    "case_number", "test_name", "status", "execution_time", "error_message", "timestamp",
+    "browser", "url", "language", "environment", "screenshots_mode", "video_enabled",
+    "expected_value", "actual_value", "validation_result", "initial_url", "pos",
+    "header_link", "footer_link", "link_name", "language_mode", "validation_message",
+    "origin_city", "destination_city", "departure_date", "return_date",
+    "passenger_count", "session_journey_count", "session_data_json",
+)
+
+# División de RESULT_COLUMNS en las tablas normalizadas
+EXECUTION_COLUMNS = RESULT_COLUMNS[:12]  # case_number ... video_enabled
+DETAIL_COLUMNS = RESULT_COLUMNS[12:28]  # expected_value ... session_journey_count
+PAYLOAD_COLUMNS = RESULT_COLUMNS[28:]  # session_data_json
+
+INSERT_EXECUTION_SQL = (
+    f"INSERT INTO executions (run_id, {', '.join(EXECUTION_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in EXECUTION_COLUMNS)})"
+)
+INSERT_DETAIL_SQL = (
+    f"INSERT INTO execution_details (execution_id, {', '.join(DETAIL_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in DETAIL_COLUMNS)})"
+)
+INSERT_PAYLOAD_SQL = "INSERT INTO execution_payloads (execution_id, name, blob_hash) VALUES (?, ?, ?)"
+INSERT_BLOB_SQL = (
+    "INSERT OR IGNORE INTO payload_blobs (hash, codec, raw_size, stored_size, data) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+# Prefijo de las referencias a payloads que muestra la vista test_executions
+PAYLOAD_REF_PREFIX = "sha256:"
+
+# ==================== CONSULTAS PAGINADAS ====================
+# Columnas de la vista test_executions (proyecciones válidas)
+VIEW_COLUMNS = ("id",) + RESULT_COLUMNS
+
+# Proyección por defecto de iter_results: todo menos el payload grande
+DEFAULT_QUERY_COLUMNS = tuple(c for c in VIEW_COLUMNS if c not in PAYLOAD_COLUMNS)
+
+# Filtros de igualdad soportados: parámetro -> columna de la vista
+QUERY_FILTERS = {
+    'case_number': 'case_number',
+    'status': 'status',
+    'browser': 'browser',
+    'environment': 'environment',
+    'language': 'language',
+    'pos': 'pos',
+}
+
+
+@lru_cache(maxsize=32)
+def _result_row_class(columns):
+    """Clase namedtuple para una proyección (se crea una vez por combinación de columnas)."""
+    return namedtuple("ResultRow", columns)
+
+
+def _format_db_timestamp(value):
+    """Convierte datetime a texto en el formato de la columna timestamp (UTC)."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+# ==================== PROCESOS DE LOS SPOOLS ====================
+def _process_alive(pid):
+    """
+    Indica si existe un proceso con ese PID (dueño de un spool).
+
+    En POSIX usa os.kill(pid, 0) (no envía señal); en Windows os.kill con 0 sería
+    CTRL_C_EVENT, por eso se consulta el proceso con OpenProcess.
+    """
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: existe pero es de otro usuario
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Existe pero es de otro usuario
+    return True
+
+
+def orphan_spool_paths(db_name="test_results.db"):
+    """
+    Rutas de los spools huérfanos de una base de datos (sin abrirla).
+
+    Un spool es huérfano si su proceso dueño (PID en el nombre) ya terminó; los de
+    workers vivos, sesiones concurrentes o el proceso actual quedan fuera.
+
+    Args:
+        db_name: Archivo .db al que pertenecen los spools
+
+    Returns:
+        list: Rutas ordenadas por nombre (vacía si no hay nada que recuperar)
+    """
+    directory = os.path.dirname(os.path.abspath(db_name))
+    prefix = f"{os.path.basename(db_name)}.spool-"
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if not name.startswith(prefix) or not name.endswith(".jsonl"):
+            continue
+        try:
+            pid = int(name[len(prefix):-len(".jsonl")])
+        except ValueError:
+            continue  # Nombre que no sigue el formato spool-<pid>
+        if pid == os.getpid() or _process_alive(pid):
+            continue  # Spool propio, de un worker o de una sesión concurrente todavía escribiendo
+        paths.append(os.path.join(directory, name))
+    return paths
+
+
+# ==================== ESQUEMA Y MIGRACIONES ====================
+SCHEMA_VERSION = 4
+
+# Versión 1: tabla ancha original (se crea para bases nuevas y se completa en bases viejas)
+LEGACY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS test_executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_number TEXT,
+        test_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        execution_time REAL,
+        error_message TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        browser TEXT,
+        url TEXT,
+        language TEXT,
+        environment TEXT,
+        screenshots_mode TEXT,
+        video_enabled TEXT,
+        expected_value TEXT,
+        actual_value TEXT,
+        validation_result TEXT,
+        initial_url TEXT,
+        pos TEXT,
+        header_link TEXT,
+        footer_link TEXT,
+        link_name TEXT,
+        language_mode TEXT,
+        validation_message TEXT,
+        origin_city TEXT,
+        destination_city TEXT,
+        departure_date TEXT,
+        return_date TEXT,
+        passenger_count INTEGER,
+        session_journey_count INTEGER,
+        session_data_json TEXT
+    )
+"""
+
+# Versión 2: tablas normalizadas + índices + vista de compatibilidad
+NORMALIZED_SCHEMA_SQL = [
+    """
+    CREATE TABLE test_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_uid TEXT NOT NULL UNIQUE,
+        started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        host TEXT
+    )
+    """,
+    """
+    CREATE TABLE executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER REFERENCES test_runs(id),
+        case_number TEXT,
+        test_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        execution_time REAL,
+        error_message TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        browser TEXT,
+        url TEXT,
+        language TEXT,
+        environment TEXT,
+        screenshots_mode TEXT,
+        video_enabled TEXT
+    )
+    """,
+    """
+    CREATE TABLE execution_details (
+        execution_id INTEGER PRIMARY KEY REFERENCES executions(id) ON DELETE CASCADE,
+        expected_value TEXT,
+        actual_value TEXT,
+        validation_result TEXT,
+        initial_url TEXT,
+        pos TEXT,
+        header_link TEXT,
+        footer_link TEXT,
+        link_name TEXT,
+        language_mode TEXT,
+        validation_message TEXT,
+        origin_city TEXT,
+        destination_city TEXT,
+        departure_date TEXT,
+        return_date TEXT,
+        passenger_count INTEGER,
+        session_journey_count INTEGER
+    )
+    """,
+    """
+    CREATE TABLE execution_payloads (
+        execution_id INTEGER NOT NULL REFERENCES executions(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        content TEXT,
+        PRIMARY KEY (execution_id, name)
+    )
+    """,
+    "CREATE INDEX idx_executions_case_timestamp ON executions (case_number, timestamp)",
+    "CREATE INDEX idx_executions_status_timestamp ON executions (status, timestamp)",
+    "CREATE INDEX idx_executions_browser_environment ON executions (browser, environment)",
+    "CREATE INDEX idx_executions_timestamp ON executions (timestamp)",
+    "CREATE INDEX idx_executions_run ON executions (run_id)",
+]
+
+# Versión 3: payloads fuera de la fila, comprimidos y deduplicados por hash
+PAYLOAD_BLOBS_SQL = [
+    """
+    CREATE TABLE payload_blobs (
+        hash TEXT PRIMARY KEY,
+        codec TEXT NOT NULL,
+        raw_size INTEGER NOT NULL,
+        stored_size INTEGER NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE execution_payloads_v3 (
+        execution_id INTEGER NOT NULL REFERENCES executions(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        blob_hash TEXT NOT NULL REFERENCES payload_blobs(hash),
+        PRIMARY KEY (execution_id, name)
+    )
+    """,
+]
+
+# Versión 4: métricas de red por página (utils/network_metrics.py)
+NETWORK_METRICS_COLUMNS = (
+    "timestamp", "case_number", "test_name", "browser", "page_index", "page_url",
+    "requests", "failed_requests", "transfer_bytes", "document_ttfb_ms",
+    "api_requests", "api_ttfb_p50_ms", "api_ttfb_max_ms", "server_wait_ms",
+    "network_busy_ms", "third_party_requests", "third_party_bytes", "details_hash",
+)
+
+NETWORK_METRICS_SQL = [
+    """
+    CREATE TABLE network_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER REFERENCES test_runs(id),
+        timestamp DATETIME,
+        case_number TEXT,
+        test_name TEXT NOT NULL,
+        browser TEXT,
+        page_index INTEGER NOT NULL,
+        page_url TEXT,
+        requests INTEGER,
+        failed_requests INTEGER,
+        transfer_bytes INTEGER,
+        document_ttfb_ms REAL,
+        api_requests INTEGER,
+        api_ttfb_p50_ms REAL,
+        api_ttfb_max_ms REAL,
+        server_wait_ms REAL,
+        network_busy_ms REAL,
+        third_party_requests INTEGER,
+        third_party_bytes INTEGER,
+        details_hash TEXT REFERENCES payload_blobs(hash)
+    )
+    """,
+    "CREATE INDEX idx_network_metrics_test_timestamp ON network_metrics (test_name, timestamp)",
+    "CREATE INDEX idx_network_metrics_run ON network_metrics (run_id)",
+]
+
+INSERT_NETWORK_METRICS_SQL = (
+    f"INSERT INTO network_metrics (run_id, {', '.join(NETWORK_METRICS_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in NETWORK_METRICS_COLUMNS)})"
+)
+
+# Vista con las 30 columnas originales en el mismo orden (SELECT * compatible)
+# session_data_json muestra la referencia "sha256:<hash>"; el contenido se obtiene
+# con TestDatabase.get_payload() o con la función SQL payload_text(referencia)
+COMPAT_VIEW_SQL = f"""
+    CREATE VIEW test_executions AS
+    SELECT e.id, {', '.join('e.' + c for c in EXECUTION_COLUMNS)},
+           {', '.join('d.' + c for c in DETAIL_COLUMNS)},
+           '{PAYLOAD_REF_PREFIX}' || p.blob_hash AS session_data_json
+    FROM executions e
+    LEFT JOIN execution_details d ON d.execution_id = e.id
+    LEFT JOIN execution_payloads p ON p.execution_id = e.id AND p.name = 'session_data_json'
+"""
+
+
+# ==================== COMPRESIÓN DE PAYLOADS ====================
+def compress_payload(content):
+    """
+    Comprime un payload de texto.
+
+    Args:
+        content: Texto (ej: JSON) a comprimir
+
+    Returns:
+        tuple: (hash_sha256, codec, raw_size, data_comprimida)
+
+    Codecs: "zstd" (si zstandard está instalado), "zlib", o "raw" si comprimir
+    no reduce el tamaño (payloads muy pequeños).
+    """
+    raw = content.encode("utf-8")
+    blob_hash = hashlib.sha256(raw).hexdigest()
+    if zstandard is not None:
+        codec, data = "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    else:
+        codec, data = "zlib", zlib.compress(raw, 6)
+    if len(data) >= len(raw):
+        codec, data = "raw", raw
+    return blob_hash, codec, len(raw), data
+
+
+def decompress_payload(codec, data):
+    """
+    Descomprime un payload guardado con compress_payload().
+
+    Returns:
+        str: Texto original
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Payload is zstd-compressed but the 'zstandard' package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raw = bytes(data)
+    return raw.decode("utf-8")
 
 
 # ==================== CLASE DE BASE DE DATOS ====================
@@ -26,12 +407,15 @@ class TestDatabase:
     Patrón: Una sola instancia para toda la sesión de tests (singleton implícito)
     """
 
-    def __init__(self, db_name="test_results.db"):
+    def __init__(self, db_name="test_results.db", buffered=False, batch_size=50, flush_interval=10.0):
         """
         Constructor: Inicializa la conexión a la base de datos.
 
         Parámetros:
         - db_name: Nombre del archivo de BD (por defecto: "test_results.db")
+        - buffered: Si True, save_test_result acumula filas y las inserta por lotes
+        - batch_size: Filas acumuladas que disparan un flush
+        - flush_interval: Segundos desde el último flush que disparan otro
 
         Flujo:
         1. Guarda el nombre del archivo .db
@@ -40,17 +424,55 @@ class TestDatabase:
         """
         self.db_name = db_name  # Nombre del archivo .db
         self.connection = None  # Almacenará el objeto de conexión sqlite3
+        self.buffered = buffered
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending_rows = []  # Filas aún no insertadas (modo buffered)
+        self._pending_metrics = []  # Métricas de red aún no insertadas (modo buffered)
+        self._last_flush = time.monotonic()
+        self._spool_file = None  # Archivo spool abierto bajo demanda
+        # Ejecución actual: con xdist todos los workers comparten PYTEST_XDIST_TESTRUNUID
+        self.run_uid = os.environ.get("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+        self._run_id = None
         self.create_tables()  # Crea tabla si no existe (método definido abajo)
 
+    # ==================== CONEXIÓN ====================
+
+    def _connect(self):
+        """
+        Abre la conexión con la configuración para escritura concurrente.
+
+        - timeout / busy_timeout: espera hasta 30s si otro worker tiene el lock
+        - journal_mode=WAL: lectores y un escritor no se bloquean entre sí
+        - synchronous=NORMAL: en WAL es seguro ante caídas del proceso y evita
+          un fsync por cada commit
+        """
+        connection = sqlite3.connect(self.db_name, timeout=30)
+        connection.execute("PRAGMA busy_timeout = 30000")
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError as e:
+            # Otro proceso puede estar cambiando el modo al mismo tiempo; WAL es persistente
+            logger.warning(f"Could not enable WAL mode: {e}")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        # payload_text('sha256:...'): contenido descomprimido desde SQL (solo bajo demanda)
+        connection.create_function("payload_text", 1, self._payload_text, deterministic=True)
+        return connection
+
+    @property
+    def spool_path(self):
+        """Ruta del archivo spool de este proceso (filas pendientes de flush)."""
+        return f"{self.db_name}.spool-{os.getpid()}.jsonl"
+
     def create_tables(self):
         """
-        Crea la tabla test_executions si no existe.
+        Crea las tablas si no existen y migra bases de datos viejas.
 
-        IF NOT EXISTS:
-        - La primera vez: crea la tabla
+        - La primera vez: crea el esquema completo
         - Siguientes veces: no hace nada (preserva datos existentes)
+        - BD con la tabla ancha original: migra los datos al esquema normalizado
 
-        Estructura de la tabla:
+        Columnas de la vista test_executions (mismo orden que la tabla original):
         - id: Identificador único autoincremental
         - case_number: Número del caso de prueba (4, 5, 6, 7)
         - test_name: Nombre del test (ej: "test_cambiar_idioma")
@@ -88,51 +510,250 @@ class TestDatabase:
         - session_journey_count: Número de journeys capturados del Session JSON
         - session_data_json: JSON completo del Session extraído (formato TEXT)
         """
-        # Crea o abre conexión al archivo de base de datos
-        self.connection = sqlite3.connect(self.db_name)
+        # Crea o abre conexión al archivo de base de datos (WAL, busy timeout)
+        self.connection = self._connect()
+        self.connection.execute("PRAGMA foreign_keys = ON")
 
-        # Cursor: Objeto que ejecuta comandos SQL en la BD
-        cursor = self.connection.cursor()
+        # Aplica las migraciones pendientes hasta SCHEMA_VERSION
+        self._migrate()
 
-        # Ejecuta SQL para crear la tabla
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS test_executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_number TEXT,
-                test_name TEXT NOT NULL,
-                status TEXT NOT NULL,
-                execution_time REAL,
-                error_message TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                browser TEXT,
-                url TEXT,
-                language TEXT,
-                environment TEXT,
-                screenshots_mode TEXT,
-                video_enabled TEXT,
-                expected_value TEXT,
-                actual_value TEXT,
-                validation_result TEXT,
-                initial_url TEXT,
-                pos TEXT,
-                header_link TEXT,
-                footer_link TEXT,
-                link_name TEXT,
-                language_mode TEXT,
-                validation_message TEXT,
-                origin_city TEXT,
-                destination_city TEXT,
-                departure_date TEXT,
-                return_date TEXT,
-                passenger_count INTEGER,
-                session_journey_count INTEGER,
-                session_data_json TEXT
-            )
+    # ==================== MIGRACIONES ====================
+
+    def _migrate(self):
+        """
+        Lleva la BD a SCHEMA_VERSION usando PRAGMA user_version.
+
+        - user_version 0: BD nueva o creada antes del versionado (tabla ancha)
+        - user_version 1: tabla ancha test_executions completa
+        - user_version 2: esquema normalizado + vista test_executions
+        - user_version 3: payloads comprimidos y deduplicados en payload_blobs
+        - user_version 4: tabla network_metrics
+
+        BEGIN IMMEDIATE: con xdist varios workers abren la BD a la vez; solo uno
+        migra y los demás esperan (busy_timeout) y encuentran la versión nueva.
+        """
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        # DDL en transacción explícita (sin commits implícitos de sqlite3)
+        self.connection.isolation_level = None
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._migration_1_legacy_table()
+            if version < 2:
+                self._migration_2_normalized_schema()
+            if version < 3:
+                self._migration_3_payload_blobs()
+            if version < 4:
+                self._migration_4_network_metrics()
+            # La vista de compatibilidad se recrea con la definición actual
+            self.connection.execute("DROP VIEW IF EXISTS test_executions")
+            self.connection.execute(COMPAT_VIEW_SQL)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.connection.execute("COMMIT")
+            if version < SCHEMA_VERSION:
+                logger.info(f"Migrated {self.db_name} schema from version {version} to {SCHEMA_VERSION}")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        finally:
+            self.connection.isolation_level = ""  # Volver al modo por defecto de sqlite3
+
+    def _migration_1_legacy_table(self):
+        """
+        Versión 1: tabla ancha original.
+
+        Crea la tabla si no existe y agrega columnas faltantes en BDs creadas con
+        versiones anteriores del proyecto (ej: sin columnas del Case 3).
+        """
+        self.connection.execute(LEGACY_TABLE_SQL)
+        existing = {row[1] for row in self.connection.execute("PRAGMA table_info(test_executions)")}
+        for line in LEGACY_TABLE_SQL.strip().splitlines()[2:-1]:
+            column, column_type = line.strip().rstrip(",").split()[:2]
+            if column not in existing:
+                self.connection.execute(f"ALTER TABLE test_executions ADD COLUMN {column} {column_type}")
+
+    def _migration_2_normalized_schema(self):
+        """
+        Versión 2: mueve la tabla ancha a tablas normalizadas con índices.
+
+        Los ids originales se conservan; las filas migradas quedan asociadas a un
+        run "legacy". Al final la tabla vieja se reemplaza por la vista de
+        compatibilidad test_executions.
+        """
+        conn = self.connection
+        conn.execute("ALTER TABLE test_executions RENAME TO test_executions_v1")
+        for statement in NORMALIZED_SCHEMA_SQL:
+            conn.execute(statement)
+
+        conn.execute("""
+            INSERT INTO test_runs (run_uid, started_at)
+            SELECT 'legacy', MIN(timestamp) FROM test_executions_v1 HAVING COUNT(*) > 0
+        """)
+        conn.execute(f"""
+            INSERT INTO executions (id, run_id, {', '.join(EXECUTION_COLUMNS)})
+            SELECT id, (SELECT id FROM test_runs WHERE run_uid = 'legacy'), {', '.join(EXECUTION_COLUMNS)}
+            FROM test_executions_v1
+        """)
+        conn.execute(f"""
+            INSERT INTO execution_details (execution_id, {', '.join(DETAIL_COLUMNS)})
+            SELECT id, {', '.join(DETAIL_COLUMNS)} FROM test_executions_v1
+            WHERE COALESCE({', '.join(DETAIL_COLUMNS)}) IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT INTO execution_payloads (execution_id, name, content)
+            SELECT id, 'session_data_json', session_data_json FROM test_executions_v1
+            WHERE session_data_json IS NOT NULL
         """)
+        conn.execute("DROP TABLE test_executions_v1")
 
-        # commit() guarda los cambios en el archivo .db del disco
-        # IMPORTANTE: Sin commit(), los cambios quedan solo en memoria y se pierden
-        self.connection.commit()
+    def _migration_3_payload_blobs(self):
+        """
+        Versión 3: mueve el contenido de execution_payloads a payload_blobs.
+
+        Cada contenido se comprime y se guarda una sola vez por hash; la tabla
+        execution_payloads queda solo con la referencia (blob_hash).
+        """
+        conn = self.connection
+        conn.execute("DROP VIEW IF EXISTS test_executions")  # Depende de execution_payloads
+        for statement in PAYLOAD_BLOBS_SQL:
+            conn.execute(statement)
+
+        rows = conn.execute("SELECT execution_id, name, content FROM execution_payloads WHERE content IS NOT NULL")
+        for execution_id, name, content in rows.fetchall():
+            blob_hash = self._store_payload(content)
+            conn.execute(
+                "INSERT INTO execution_payloads_v3 (execution_id, name, blob_hash) VALUES (?, ?, ?)",
+                (execution_id, name, blob_hash)
+            )
+
+        conn.execute("DROP TABLE execution_payloads")
+        conn.execute("ALTER TABLE execution_payloads_v3 RENAME TO execution_payloads")
+        conn.execute("CREATE INDEX idx_execution_payloads_blob ON execution_payloads (blob_hash)")
+
+    def _migration_4_network_metrics(self):
+        """Versión 4: tabla de métricas de red por página."""
+        for statement in NETWORK_METRICS_SQL:
+            self.connection.execute(statement)
+
+    # ==================== PAYLOADS ====================
+
+    def _store_payload(self, content):
+        """
+        Guarda un payload comprimido (si no existía ya) y devuelve su hash.
+
+        Payloads idénticos (ej: la misma sesión capturada en varios runs) se
+        guardan una sola vez.
+        """
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        blob_hash, codec, raw_size, data = compress_payload(content)
+        self.connection.execute(INSERT_BLOB_SQL, (blob_hash, codec, raw_size, len(data), data))
+        return blob_hash
+
+    def _payload_text(self, reference):
+        """Función SQL payload_text(): descomprime el payload de una referencia."""
+        if reference is None:
+            return None
+        return self.get_payload_by_hash(reference)
+
+    def get_payload_by_hash(self, reference):
+        """
+        Obtiene el contenido descomprimido de un payload.
+
+        Args:
+            reference: Hash SHA-256 o referencia "sha256:<hash>" (como en test_executions)
+
+        Returns:
+            str: Contenido original, o None si no existe
+        """
+        blob_hash = reference[len(PAYLOAD_REF_PREFIX):] if reference.startswith(PAYLOAD_REF_PREFIX) else reference
+        row = self.connection.execute(
+            "SELECT codec, data FROM payload_blobs WHERE hash = ?", (blob_hash,)
+        ).fetchone()
+        return decompress_payload(*row) if row else None
+
+    def get_payload(self, execution_id, name="session_data_json"):
+        """
+        Obtiene (y descomprime) un payload de una ejecución.
+
+        Las consultas de listado solo devuelven la referencia; el contenido se
+        descomprime únicamente cuando se pide con este método.
+
+        Args:
+            execution_id: id del test en test_executions
+            name: Nombre del payload (por defecto: "session_data_json")
+
+        Returns:
+            str: Contenido original, o None si el test no tiene ese payload
+        """
+        self.flush()  # Incluir filas aún en buffer
+        row = self.connection.execute(
+            "SELECT blob_hash FROM execution_payloads WHERE execution_id = ? AND name = ?",
+            (execution_id, name)
+        ).fetchone()
+        return self.get_payload_by_hash(row[0]) if row else None
+
+    def get_payload_storage_stats(self):
+        """
+        Resume el ahorro del almacenamiento de payloads.
+
+        Returns:
+            dict: references, unique_blobs, raw_bytes (sin dedup ni compresión), stored_bytes
+        """
+        references, raw_bytes = self.connection.execute("""
+            SELECT COUNT(*), COALESCE(SUM(b.raw_size), 0)
+            FROM execution_payloads p JOIN payload_blobs b ON b.hash = p.blob_hash
+        """).fetchone()
+        unique_blobs, stored_bytes = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM payload_blobs"
+        ).fetchone()
+        return {
+            'references': references,
+            'unique_blobs': unique_blobs,
+            'raw_bytes': raw_bytes,
+            'stored_bytes': stored_bytes,
+        }
+
+    # ==================== INSERCIÓN NORMALIZADA ====================
+
+    def _get_run_id(self, run_uid):
+        """Devuelve el id de test_runs para run_uid (lo crea si no existe)."""
+        if run_uid == self.run_uid and self._run_id is not None:
+            return self._run_id
+        self.connection.execute(
+            "INSERT OR IGNORE INTO test_runs (run_uid, host) VALUES (?, ?)",
+            (run_uid, socket.gethostname())
+        )
+        run_id = self.connection.execute(
+            "SELECT id FROM test_runs WHERE run_uid = ?", (run_uid,)
+        ).fetchone()[0]
+        if run_uid == self.run_uid:
+            self._run_id = run_id
+        return run_id
+
+    def _insert_rows(self, rows, run_uid=None):
+        """
+        Inserta filas (en orden RESULT_COLUMNS) en las tablas normalizadas.
+
+        No hace commit: el llamador define la transacción (una por lote).
+        - executions: siempre
+        - execution_details: solo si el test reportó algún campo específico
+        - execution_payloads + payload_blobs: solo si hay session_data_json
+        """
+        run_id = self._get_run_id(run_uid or self.run_uid)
+        cursor = self.connection.cursor()
+        for row in rows:
+            cursor.execute(INSERT_EXECUTION_SQL, (run_id,) + tuple(row[:12]))
+            execution_id = cursor.lastrowid
+            details = tuple(row[12:28])
+            if any(value is not None for value in details):
+                cursor.execute(INSERT_DETAIL_SQL, (execution_id,) + details)
+            if row[28] is not None:
+                blob_hash = self._store_payload(row[28])
+                cursor.execute(INSERT_PAYLOAD_SQL, (execution_id, "session_data_json", blob_hash))
 
     def save_test_result(self, test_name, status, execution_time=None,
                         error_message=None, browser="chrome", url=None, language=None, case_number=None,
@@ -184,24 +805,174 @@ class TestDatabase:
         - Previenen SQL injection (inyección de código malicioso)
         - sqlite3 reemplaza cada ? con los valores de la tupla en orden
         """
-        cursor = self.connection.cursor()  # Obtiene el cursor
-
-        # INSERT: Agrega nuevo registro a la tabla con TODOS los campos
-        cursor.execute("""
-            INSERT INTO test_executions
-            (case_number, test_name, status, execution_time, error_message, browser, url, language,
-             environment, screenshots_mode, video_enabled, expected_value, actual_value,
-             validation_result, initial_url, pos, header_link, footer_link, link_name,
-             language_mode, validation_message, origin_city, destination_city, departure_date,
-             return_date, passenger_count, session_journey_count, session_data_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (case_number, test_name, status, execution_time, error_message, browser, url, language,
-              environment, screenshots_mode, video_enabled, expected_value, actual_value,
-              validation_result, initial_url, pos, header_link, footer_link, link_name,
-              language_mode, validation_message, origin_city, destination_city, departure_date,
-              return_date, passenger_count, session_journey_count, session_data_json))
-
-        self.connection.commit()  # Guarda cambios en disco
+        # timestamp se fija al guardar (no al hacer flush) en formato de CURRENT_TIMESTAMP (UTC)
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        row = (case_number, test_name, status, execution_time, error_message, timestamp,
+               browser, url, language, environment, screenshots_mode, video_enabled,
+               expected_value, actual_value, validation_result, initial_url, pos,
+               header_link, footer_link, link_name, language_mode, validation_message,
+               origin_city, destination_city, departure_date, return_date,
+               passenger_count, session_journey_count, session_data_json)
+
+        if not self.buffered:
+            # INSERT: Agrega el registro en las tablas normalizadas
+            with self.connection:  # Guarda cambios en disco (commit)
+                self._insert_rows([row])
+            return
+
+        # Modo buffered: anotar en spool (sobrevive a la caída del worker) y acumular
+        self._append_to_spool(row)
+        self._pending_rows.append(row)
+
+        if (len(self._pending_rows) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    # ==================== MÉTRICAS DE RED ====================
+
+    def save_network_metrics(self, test_name, pages, case_number=None, browser=None):
+        """
+        Guarda las métricas de red por página de un test (una fila por página).
+
+        Args:
+            test_name: Nombre del test
+            pages: Lista de dicts de utils.network_metrics.compute_page_metrics
+            case_number: Número del caso ("1", "2", ...)
+            browser: Navegador usado
+
+        En modo buffered se insertan en el siguiente flush() junto con los resultados
+        (no pasan por el spool: son datos de diagnóstico, no resultados del test).
+        """
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for page in pages:
+            details = {key: page[key] for key in ('requests_by_type', 'slowest_requests', 'third_party_domains', 'api_ttfb_p95_ms')}
+            rows.append((timestamp, case_number, test_name, browser, page['page_index'], page['page_url'],
+                         page['requests'], page['failed_requests'], page['transfer_bytes'], page['document_ttfb_ms'],
+                         page['api_requests'], page['api_ttfb_p50_ms'], page['api_ttfb_max_ms'], page['server_wait_ms'],
+                         page['network_busy_ms'], page['third_party_requests'], page['third_party_bytes'], details))
+
+        if not self.buffered:
+            with self.connection:
+                self._insert_network_metrics(rows)
+            return
+
+        self._pending_metrics.extend(rows)
+
+    def _insert_network_metrics(self, rows):
+        """Inserta filas de métricas (el detalle JSON va a payload_blobs). No hace commit."""
+        run_id = self._get_run_id(self.run_uid)
+        for row in rows:
+            details_hash = self._store_payload(row[-1])
+            self.connection.execute(INSERT_NETWORK_METRICS_SQL, (run_id,) + tuple(row[:-1]) + (details_hash,))
+
+    def get_network_metrics(self, test_name=None, limit=50):
+        """
+        Consulta las métricas de red más recientes (con el detalle JSON descomprimido).
+
+        Args:
+            test_name: Filtra por nombre de test (None = todos)
+            limit: Cantidad máxima de filas
+
+        Returns:
+            list: Dicts con las columnas de network_metrics + "details"
+        """
+        sql = f"SELECT {', '.join(NETWORK_METRICS_COLUMNS)} FROM network_metrics"
+        params = []
+        if test_name is not None:
+            sql += " WHERE test_name = ?"
+            params.append(test_name)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.connection.execute(sql, params):
+            record = dict(zip(NETWORK_METRICS_COLUMNS, row))
+            details = self.get_payload_by_hash(record.pop('details_hash'))
+            record['details'] = json.loads(details) if details else None
+            results.append(record)
+        return results
+
+    # ==================== BUFFER Y SPOOL ====================
+
+    def _append_to_spool(self, row):
+        """
+        Anota una fila en el spool del proceso.
+
+        flush() del archivo (sin fsync): la fila queda en el sistema operativo y
+        sobrevive a la caída del proceso del worker sin costo de disco por test.
+        """
+        try:
+            if self._spool_file is None:
+                self._spool_file = open(self.spool_path, "a", encoding="utf-8")
+            record = {"run_uid": self.run_uid, "row": row}
+            self._spool_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._spool_file.flush()
+        except OSError as e:
+            logger.warning(f"Could not write result spool, row kept only in memory: {e}")
+
+    def flush(self):
+        """
+        Inserta las filas acumuladas en UNA transacción (executemany).
+
+        Después del commit vacía el spool del proceso. Si el proceso cae entre
+        el commit y el vaciado, la recuperación puede duplicar ese lote (se
+        prefiere duplicar a perder resultados).
+
+        Returns:
+            int: Cantidad de filas insertadas
+        """
+        if not self._pending_rows and not self._pending_metrics:
+            self._last_flush = time.monotonic()
+            return 0
+
+        rows = self._pending_rows
+        with self.connection:  # BEGIN ... COMMIT (ROLLBACK si falla)
+            self._insert_rows(rows)
+            self._insert_network_metrics(self._pending_metrics)
+
+        self._pending_rows = []
+        self._pending_metrics = []
+        self._last_flush = time.monotonic()
+        if self._spool_file is not None:
+            self._spool_file.seek(0)
+            self._spool_file.truncate()
+        logger.info(f"Flushed {len(rows)} test results to {self.db_name}")
+        return len(rows)
+
+    def recover_spooled_results(self):
+        """
+        Inserta filas de spools huérfanos (workers que cayeron antes del flush).
+
+        Se llama en el proceso principal de pytest al inicio y al final de la sesión.
+        Solo se adoptan spools cuyo proceso dueño (PID en el nombre) ya terminó:
+        los de workers vivos o de otras sesiones concurrentes sobre el mismo .db
+        no se tocan. El spool del proceso actual tampoco.
+
+        Returns:
+            int: Cantidad de filas recuperadas
+        """
+        recovered = 0
+
+        for path in orphan_spool_paths(self.db_name):
+            rows_by_run = {}
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Última línea cortada por la caída
+                    if len(record.get("row", ())) == len(RESULT_COLUMNS):
+                        rows_by_run.setdefault(record.get("run_uid"), []).append(tuple(record["row"]))
+            with self.connection:
+                for run_uid, rows in rows_by_run.items():
+                    self._insert_rows(rows, run_uid=run_uid)
+                    recovered += len(rows)
+            os.remove(path)
+
+        if recovered:
+            logger.warning(f"Recovered {recovered} unflushed test results from worker spools")
+        return recovered
 
     def get_all_results(self):
         """
@@ -217,6 +988,7 @@ class TestDatabase:
             (2, "test_logout", "FAILED", 1.2, "Element not found", "2024-01-01 10:05:00", "chrome", "https://...")
         ]
         """
+        self.flush()  # Incluir filas aún en buffer
         cursor = self.connection.cursor()
 
         # SELECT: Consulta los datos
@@ -226,6 +998,100 @@ class TestDatabase:
         # fetchall(): Trae TODOS los registros y los retorna como lista de tuplas
         return cursor.fetchall()
 
+    def get_results_page(self, page_size=100, cursor=None, columns=None, descending=True,
+                         since=None, until=None, **filters):
+        """
+        Obtiene UNA página de resultados con paginación por keyset (timestamp, id).
+
+        A diferencia de LIMIT/OFFSET, el costo de cada página no crece con el número
+        de página: la consulta continúa desde el último (timestamp, id) entregado
+        usando el índice de timestamp.
+
+        Args:
+            page_size: Filas por página
+            cursor: None para la primera página, o el next_cursor de la página anterior
+            columns: Columnas a traer (por defecto todas menos session_data_json).
+                     id y timestamp se agregan siempre (los necesita el cursor)
+            descending: True = más recientes primero
+            since / until: Rango de fechas (datetime o texto "YYYY-MM-DD HH:MM:SS", UTC)
+            **filters: case_number, status, browser, environment, language, pos
+
+        Returns:
+            tuple: (filas, next_cursor); next_cursor es None en la última página
+
+        Ejemplo:
+            rows, cursor = db.get_results_page(50, case_number="3", status="FAILED")
+            while cursor:
+                rows, cursor = db.get_results_page(50, cursor, case_number="3", status="FAILED")
+        """
+        columns = tuple(columns) if columns else DEFAULT_QUERY_COLUMNS
+        unknown = [c for c in columns if c not in VIEW_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown result columns: {unknown}. Valid columns: {VIEW_COLUMNS}")
+        unknown = [f for f in filters if f not in QUERY_FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown result filters: {unknown}. Valid filters: {tuple(QUERY_FILTERS)}")
+
+        # id y timestamp siempre presentes para construir el siguiente cursor
+        for required in ("timestamp", "id"):
+            if required not in columns:
+                columns = (required,) + columns
+
+        conditions, params = [], []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            conditions.append(f"{QUERY_FILTERS[name]} = ?")
+            params.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(_format_db_timestamp(since))
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(_format_db_timestamp(until))
+        if cursor is not None:
+            # Keyset: continuar estrictamente después del último (timestamp, id) entregado
+            conditions.append(f"(timestamp, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(cursor)
+
+        order = "DESC" if descending else "ASC"
+        sql = f"SELECT {', '.join(columns)} FROM test_executions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY timestamp {order}, id {order} LIMIT ?"
+        params.append(page_size)
+
+        row_class = _result_row_class(columns)
+        ts_index, id_index = columns.index("timestamp"), columns.index("id")
+        rows = [row_class._make(row) for row in self.connection.execute(sql, params)]
+
+        next_cursor = None
+        if len(rows) == page_size:
+            next_cursor = (rows[-1][ts_index], rows[-1][id_index])
+        return rows, next_cursor
+
+    def iter_results(self, page_size=500, columns=None, descending=True, since=None, until=None, **filters):
+        """
+        Recorre resultados como iterador, página por página (memoria constante).
+
+        Acepta los mismos filtros y proyección que get_results_page(). Solo una
+        página (page_size filas) está en memoria a la vez, sin importar el total.
+
+        Yields:
+            ResultRow: namedtuple con las columnas pedidas (row.status, row.browser, ...)
+
+        Ejemplo:
+            for row in db.iter_results(browser="chrome", status="FAILED", columns=("test_name", "error_message")):
+                print(row.timestamp, row.test_name, row.error_message)
+        """
+        self.flush()  # Incluir filas aún en buffer
+        cursor = None
+        while True:
+            rows, cursor = self.get_results_page(page_size, cursor, columns, descending, since, until, **filters)
+            yield from rows
+            if cursor is None:
+                return
+
     def get_latest_results(self, limit=10):
         """
         Obtiene los últimos N resultados (más recientes).
@@ -242,6 +1108,7 @@ class TestDatabase:
         - (limit,) con coma = tupla de 1 elemento
         - (limit) sin coma = solo un número entre paréntesis (NO es tupla)
         """
+        self.flush()  # Incluir filas aún en buffer
         cursor = self.connection.cursor()
 
         cursor.execute(
@@ -266,4 +1133,15 @@ class TestDatabase:
         - Previene errores si close() se llama múltiples veces
         """
         if self.connection:  # Solo si hay una conexión activa
+            self.flush()  # Inserta filas pendientes del buffer
             self.connection.close()  # Cierra la conexión
+            self.connection = None
+
+        # Con el buffer ya insertado, el spool de este proceso sobra
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+            try:
+                os.remove(self.spool_path)
+            except OSError:
+                pass
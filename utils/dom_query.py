@@ -0,0 +1,241 @@
+"""
+dom_query.py - Búsquedas de elementos sin la penalización del implicit wait
+
+El fixture driver configura implicitly_wait(10): cada find_element de un elemento
+que NO existe espera 10 segundos antes de fallar. En los bucles que "prueban"
+muchos candidatos (IDs de asientos, selectores de cierre de modal, iframes de
+cookies) casi todas las búsquedas son negativas y el costo se multiplica.
+
+Este módulo agrega:
+- no_implicit_wait(driver): context manager que pone el implicit wait en 0 y lo
+  restaura al salir (las búsquedas negativas fallan al instante)
+- existing_ids / find_by_ids: qué IDs existen (y sus elementos) en UNA sola
+  llamada execute_script, en lugar de un find_element por ID
+- find_present: de una lista de locators (CSS/XPath), cuáles están presentes,
+  también en una sola llamada
+- benchmark_seat_lookup: compara la búsqueda de asientos uno a uno (con implicit
+  wait) contra la búsqueda en lote sobre una página de seatmap grabada
+
+Benchmark (sobre el HTML que SeatmapPage guarda en reports/debug_seatmap_page.html
+cuando el test corre con SEATMAP_RECORD_PAGE=1):
+    SEATMAP_RECORD_PAGE=1 pytest tests/nuxqa/test_oneway_booking_Case1.py --browser=chrome --language=Español
+    python -m utils.dom_query --page reports/debug_seatmap_page.html
+"""
+
+# ==================== IMPORTS ====================
+import argparse
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+DEFAULT_IMPLICIT_WAIT = 10  # El que configura el fixture driver (conftest.py)
+
+_EXISTING_IDS_JS = """
+var found = [];
+for (var i = 0; i < arguments[0].length; i++) {
+    var element = document.getElementById(arguments[0][i]);
+    if (element !== null) { found.push([arguments[0][i], element]); }
+}
+return found;
+"""
+
+# Locators como [by, value]; devuelve [[índice, elemento], ...] de los presentes (solo CSS/XPath)
+_FIND_PRESENT_JS = """
+var root = arguments[1] || document;
+var found = [];
+for (var i = 0; i < arguments[0].length; i++) {
+    var by = arguments[0][i][0], value = arguments[0][i][1], element = null;
+    try {
+        if (by === 'xpath') {
+            element = document.evaluate(value, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (by === 'css selector') {
+            element = root.querySelector(value);
+        } else if (by === 'id') {
+            element = document.getElementById(value);
+        }
+    } catch (e) { element = null; }
+    if (element !== null) {
+        found.push([i, element]);
+        if (arguments[2]) { break; }
+    }
+}
+return found;
+"""
+
+
+# ==================== IMPLICIT WAIT ====================
+@contextmanager
+def no_implicit_wait(driver):
+    """
+    Desactiva el implicit wait dentro del bloque y lo restaura al salir.
+
+    Reentrante: un bloque anidado no vuelve a leer/restaurar el timeout.
+
+    Uso:
+        with no_implicit_wait(self.driver):
+            modals = self.driver.find_elements(By.CSS_SELECTOR, "ngb-modal-window.modal-alert")
+    """
+    depth = getattr(driver, '_no_implicit_wait_depth', 0)
+    if depth:
+        driver._no_implicit_wait_depth = depth + 1
+        try:
+            yield driver
+        finally:
+            driver._no_implicit_wait_depth = depth
+        return
+
+    try:
+        previous = driver.timeouts.implicit_wait
+    except Exception:
+        previous = DEFAULT_IMPLICIT_WAIT
+    driver.implicitly_wait(0)
+    driver._no_implicit_wait_depth = 1
+    try:
+        yield driver
+    finally:
+        driver._no_implicit_wait_depth = 0
+        try:
+            driver.implicitly_wait(previous)
+        except WebDriverException as e:
+            logger.warning(f"Could not restore implicit wait: {str(e)[:100]}")
+
+
+# ==================== BÚSQUEDAS EN LOTE ====================
+def find_by_ids(driver, ids):
+    """
+    Busca muchos IDs en una sola llamada (los ausentes no cuestan nada).
+
+    Args:
+        driver: Instancia de Selenium WebDriver
+        ids: Lista de IDs de elementos
+
+    Returns:
+        dict: {id: WebElement} solo de los IDs presentes, en el orden de `ids`
+    """
+    return {element_id: element for element_id, element in driver.execute_script(_EXISTING_IDS_JS, list(ids))}
+
+
+def existing_ids(driver, ids):
+    """
+    IDs presentes en el DOM (en el orden recibido).
+
+    Returns:
+        list: Subconjunto de `ids` que existe en la página
+    """
+    return list(find_by_ids(driver, ids))
+
+
+def find_present(driver, locators, first_only=False, root=None):
+    """
+    De una lista de locators, devuelve los que están presentes (una sola llamada).
+
+    Args:
+        driver: Instancia de Selenium WebDriver
+        locators: Lista de tuplas (By.CSS_SELECTOR | By.XPATH | By.ID, valor)
+        first_only: Si True se detiene en el primero presente
+        root: WebElement desde el que buscar (None = documento completo)
+
+    Returns:
+        list: [(índice del locator, WebElement), ...] en el orden de `locators`
+    """
+    unsupported = [by for by, _ in locators if by not in (By.CSS_SELECTOR, By.XPATH, By.ID)]
+    if unsupported:
+        raise ValueError(f"Unsupported locator strategies for find_present: {unsupported}")
+    found = driver.execute_script(_FIND_PRESENT_JS, [list(locator) for locator in locators], root, first_only)
+    return [(index, element) for index, element in found]
+
+
+def selector_locator(selector):
+    """Convierte un selector suelto ("//..." = XPath, si no CSS) en locator."""
+    return (By.XPATH, selector) if selector.startswith(("/", "(")) else (By.CSS_SELECTOR, selector)
+
+
+# ==================== BENCHMARK ====================
+def benchmark_seat_lookup(driver, seat_ids, implicit_wait=DEFAULT_IMPLICIT_WAIT):
+    """
+    Compara la búsqueda de asientos ANTES (find_element por ID con implicit wait)
+    y DESPUÉS (find_by_ids en lote) sobre la página cargada en el driver.
+
+    Args:
+        driver: Driver con una página de seatmap cargada (grabada o real)
+        seat_ids: IDs a buscar (ej: SeatmapPage.ECONOMY_SEAT_IDS)
+        implicit_wait: Implicit wait del escenario "antes" (el del fixture: 10s)
+
+    Returns:
+        dict: Tiempos y conteos de ambas estrategias
+    """
+    driver.implicitly_wait(implicit_wait)
+    start = time.perf_counter()
+    legacy = {}
+    for seat_id in seat_ids:
+        try:
+            legacy[seat_id] = driver.find_element(By.ID, seat_id)
+        except WebDriverException:
+            pass
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = find_by_ids(driver, seat_ids)
+    batch_s = time.perf_counter() - start
+
+    if list(legacy) != list(batch):
+        logger.warning(f"Lookup mismatch: legacy found {len(legacy)}, batch found {len(batch)}")
+    return {
+        'seat_ids': len(seat_ids),
+        'present': len(batch),
+        'missing': len(seat_ids) - len(batch),
+        'implicit_wait_s': implicit_wait,
+        'legacy_s': round(legacy_s, 3),
+        'batch_s': round(batch_s, 3),
+        'speedup': round(legacy_s / batch_s, 1) if batch_s else None,
+    }
+
+
+def main(argv=None):
+    """Punto de entrada: python -m utils.dom_query --page reports/debug_seatmap_page.html"""
+    parser = argparse.ArgumentParser(description="Seat lookup benchmark: per-id find_element vs one batch query")
+    parser.add_argument("--page", default="reports/debug_seatmap_page.html",
+                        help="Recorded seatmap HTML file or URL (default: reports/debug_seatmap_page.html)")
+    parser.add_argument("--implicit-wait", type=float, default=DEFAULT_IMPLICIT_WAIT,
+                        help="Implicit wait for the per-id lookup, seconds (default: 10, same as the driver fixture)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args(argv)
+
+    from selenium import webdriver
+    from pages.nuxqa.seatmap_page import SeatmapPage
+
+    page = args.page
+    if "://" not in page:
+        path = Path(page)
+        if not path.exists():
+            print(f"Recorded page not found: {page} (run Case 1/2 once to record it)")
+            return 1
+        page = path.resolve().as_uri()
+
+    options = webdriver.ChromeOptions()
+    if not args.headed:
+        options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(page)
+        result = benchmark_seat_lookup(driver, SeatmapPage.ECONOMY_SEAT_IDS, args.implicit_wait)
+    finally:
+        driver.quit()
+
+    print(f"Seat ids: {result['seat_ids']} (present: {result['present']}, missing: {result['missing']})")
+    print(f"Before (find_element per id, implicit wait {result['implicit_wait_s']}s): {result['legacy_s']:.3f}s")
+    print(f"After  (find_by_ids, one execute_script):            {result['batch_s']:.3f}s")
+    print(f"Speedup: {result['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
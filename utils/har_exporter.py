@@ -0,0 +1,319 @@
+"""
+har_exporter.py - Exportación del tráfico capturado a HAR 1.2 (HTTP Archive)
+
+NetworkCapture guarda eventos crudos del CDP (Network.*). Este módulo los
+convierte a HAR 1.2, el formato que entienden las DevTools de Chrome/Firefox,
+Charles, Fiddler y los visores de "waterfall".
+
+Conceptos clave:
+- Entry: una petición HTTP completa (request + response + timings)
+- Emparejado por requestId: requestWillBeSent + responseReceived + dataReceived
+  + loadingFinished/loadingFailed forman una entry
+- Redirects: cada salto (requestWillBeSent con redirectResponse) es una entry propia
+- Timings: se calculan desde response.timing (ResourceTiming del CDP, ms relativos
+  a requestTime)
+
+Escritura en streaming:
+- Los eventos se recorren UNA vez; cada entry se escribe al disco apenas se
+  completa y se olvida (solo quedan en memoria las peticiones en curso)
+- Salida opcional comprimida con gzip (.har.gz)
+"""
+
+# ==================== IMPORTS ====================
+import gzip
+import json
+import logging
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qsl
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+HAR_VERSION = "1.2"
+HAR_CREATOR = {"name": "selenium-technical-test", "version": "1.0"}
+
+# response.protocol del CDP -> httpVersion de HAR
+PROTOCOL_VERSIONS = {
+    "http/0.9": "HTTP/0.9",
+    "http/1.0": "HTTP/1.0",
+    "http/1.1": "HTTP/1.1",
+    "h2": "HTTP/2",
+    "h3": "HTTP/3",
+    "h3-29": "HTTP/3",
+}
+
+
+# ==================== ESCRITOR ====================
+class HarWriter:
+    """
+    Escritor incremental de archivos HAR.
+
+    Escribe la cabecera al abrir, una entry por llamada a write_entry() y
+    cierra el JSON al terminar. Nunca arma la lista completa de entries.
+
+    Uso:
+        with HarWriter("reports/case3.har") as writer:
+            writer.write_entry(entry)
+    """
+
+    def __init__(self, filename, compress=False, pages=None, comment=None):
+        """
+        Args:
+            filename: Ruta del archivo de salida
+            compress: Si True escribe con gzip (se recomienda extensión .har.gz)
+            pages: Lista opcional de páginas HAR ({"id", "title", "startedDateTime", ...})
+            comment: Comentario opcional del log HAR (ej: eventos descartados por el buffer)
+        """
+        self.filename = filename
+        self.compress = compress
+        self.pages = pages or []
+        self.comment = comment
+        self.entries_written = 0
+        self._file = None
+
+    def open(self):
+        """Abre el archivo y escribe la cabecera del log HAR."""
+        if self.compress:
+            self._file = gzip.open(self.filename, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self.filename, 'w', encoding='utf-8')
+        header = {"version": HAR_VERSION, "creator": HAR_CREATOR, "pages": self.pages}
+        if self.comment:
+            header["comment"] = self.comment
+        # Cabecera sin cerrar: '{"log": {..., "entries": ['
+        self._file.write('{"log": ' + json.dumps(header, ensure_ascii=False)[:-1] + ', "entries": [\n')
+        return self
+
+    def write_entry(self, entry):
+        """Escribe una entry (separada por coma de la anterior)."""
+        if self.entries_written:
+            self._file.write(',\n')
+        self._file.write(json.dumps(entry, ensure_ascii=False))
+        self.entries_written += 1
+
+    def close(self):
+        """Cierra la lista de entries y el archivo."""
+        if self._file is None:
+            return
+        self._file.write('\n]}}\n')
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ==================== CONVERSIÓN CDP -> HAR ====================
+def _headers_to_list(headers):
+    """Convierte el dict de headers del CDP a la lista de HAR (valores multi-línea = varios headers)."""
+    result = []
+    for name, value in (headers or {}).items():
+        for line in str(value).split('\n'):
+            result.append({"name": name, "value": line})
+    return result
+
+
+def _header_value(headers, name):
+    """Busca un header sin distinguir mayúsculas."""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _iso_time(wall_time):
+    """Convierte wallTime (segundos epoch) a ISO 8601."""
+    if not wall_time:
+        return datetime.fromtimestamp(0, tz=timezone.utc).isoformat()
+    return datetime.fromtimestamp(wall_time, tz=timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _build_timings(response, end_timestamp):
+    """
+    Calcula los timings HAR desde response.timing (ms relativos a requestTime).
+
+    Returns:
+        dict: blocked, dns, connect, ssl, send, wait, receive (-1 = no aplica)
+    """
+    timing = (response or {}).get('timing')
+    if not timing:
+        return {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 0, "wait": 0, "receive": 0}
+
+    def span(start_key, end_key):
+        start, end = timing.get(start_key, -1), timing.get(end_key, -1)
+        return round(end - start, 3) if start >= 0 and end >= 0 else -1
+
+    send_start = timing.get('sendStart', 0)
+    send_end = timing.get('sendEnd', send_start)
+    headers_end = timing.get('receiveHeadersEnd', send_end)
+
+    # Tiempo en cola: hasta el primer hito (DNS, conexión o envío)
+    first = next((timing[k] for k in ('dnsStart', 'connectStart', 'sendStart') if timing.get(k, -1) >= 0), 0)
+    receive = 0
+    if end_timestamp:
+        receive = max(0.0, (end_timestamp - timing.get('requestTime', end_timestamp)) * 1000 - headers_end)
+
+    return {
+        "blocked": round(first, 3),
+        "dns": span('dnsStart', 'dnsEnd'),
+        "connect": span('connectStart', 'connectEnd'),
+        "ssl": span('sslStart', 'sslEnd'),
+        "send": round(max(0.0, send_end - send_start), 3),
+        "wait": round(max(0.0, headers_end - send_end), 3),
+        "receive": round(receive, 3),
+    }
+
+
+def build_har_entry(request_params, response=None, finished=None, data_length=0, body=None):
+    """
+    Arma una entry HAR a partir de los eventos CDP de una petición.
+
+    Args:
+        request_params: params de Network.requestWillBeSent
+        response: objeto response del CDP (de responseReceived o redirectResponse)
+        finished: params de Network.loadingFinished / loadingFailed (o None)
+        data_length: Bytes decodificados recibidos (suma de dataReceived)
+        body: Body de la respuesta si fue capturado (str)
+
+    Returns:
+        dict: Entry HAR 1.2
+    """
+    request = request_params.get('request', {})
+    response = response or {}
+    finished = finished or {}
+    url = request.get('url', '')
+
+    start_ts = request_params.get('timestamp')
+    end_ts = finished.get('timestamp')
+    total_ms = round((end_ts - start_ts) * 1000, 3) if start_ts and end_ts else -1
+
+    post_data = None
+    if request.get('postData') is not None:
+        post_data = {
+            "mimeType": _header_value(request.get('headers'), 'content-type') or "",
+            "text": request.get('postData'),
+        }
+
+    http_version = PROTOCOL_VERSIONS.get((response.get('protocol') or '').lower(), "HTTP/1.1")
+    encoded_total = finished.get('encodedDataLength')
+    headers_size = response.get('encodedDataLength', -1)
+    body_size = -1
+    if encoded_total is not None:
+        body_size = max(0, int(encoded_total - max(headers_size, 0)))
+
+    content = {
+        "size": int(data_length),
+        "mimeType": response.get('mimeType', ''),
+    }
+    if body is not None:
+        content["text"] = body
+
+    entry = {
+        "startedDateTime": _iso_time(request_params.get('wallTime')),
+        "time": total_ms,
+        "request": {
+            "method": request.get('method', 'GET'),
+            "url": url,
+            "httpVersion": http_version,
+            "cookies": [],
+            "headers": _headers_to_list(request.get('headers')),
+            "queryString": [{"name": k, "value": v} for k, v in parse_qsl(urlsplit(url).query, keep_blank_values=True)],
+            "headersSize": -1,
+            "bodySize": len(request.get('postData') or ''),
+        },
+        "response": {
+            "status": response.get('status', 0),
+            "statusText": response.get('statusText', ''),
+            "httpVersion": http_version,
+            "cookies": [],
+            "headers": _headers_to_list(response.get('headers')),
+            "content": content,
+            "redirectURL": _header_value(response.get('headers'), 'location') or "",
+            "headersSize": headers_size if headers_size is not None else -1,
+            "bodySize": body_size,
+            "_transferSize": encoded_total if encoded_total is not None else -1,
+        },
+        "cache": {},
+        "timings": _build_timings(response, end_ts),
+        "_requestId": request_params.get('requestId'),
+        "_resourceType": request_params.get('type', ''),
+    }
+    if post_data:
+        entry["request"]["postData"] = post_data
+    if response.get('remoteIPAddress'):
+        entry["serverIPAddress"] = response['remoteIPAddress']
+    if finished.get('errorText'):
+        entry["response"]["_error"] = finished['errorText']
+    return entry
+
+
+def iter_har_entries(events, get_body=None):
+    """
+    Recorre eventos CDP (en orden) y genera entries HAR a medida que se completan.
+
+    Args:
+        events: Iterable de mensajes CDP {"method", "params"}
+        get_body: Función opcional requestId -> body (str o None)
+
+    Yields:
+        dict: Entry HAR (al completarse la petición; las incompletas al final)
+    """
+    in_flight = {}  # requestId -> {"request", "response", "data_length"}
+
+    for event in events:
+        method = event.get('method', '')
+        params = event.get('params', {})
+        request_id = params.get('requestId')
+        if not request_id:
+            continue
+
+        if method == 'Network.requestWillBeSent':
+            # Redirect: el salto anterior termina con redirectResponse
+            previous = in_flight.pop(request_id, None)
+            if previous and params.get('redirectResponse'):
+                yield build_har_entry(previous['request'], params['redirectResponse'],
+                                      {'timestamp': params.get('timestamp')}, previous['data_length'])
+            in_flight[request_id] = {'request': params, 'response': None, 'data_length': 0}
+
+        elif method == 'Network.responseReceived' and request_id in in_flight:
+            in_flight[request_id]['response'] = params.get('response')
+
+        elif method == 'Network.dataReceived' and request_id in in_flight:
+            in_flight[request_id]['data_length'] += params.get('dataLength', 0)
+
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed') and request_id in in_flight:
+            pending = in_flight.pop(request_id)
+            body = get_body(request_id) if get_body else None
+            yield build_har_entry(pending['request'], pending['response'], params, pending['data_length'], body)
+
+    # Peticiones sin loadingFinished (test terminó antes o el buffer las descartó)
+    for pending in in_flight.values():
+        yield build_har_entry(pending['request'], pending['response'], None, pending['data_length'])
+
+
+def export_har(events, filename, get_body=None, compress=False, pages=None, comment=None):
+    """
+    Exporta eventos CDP a un archivo HAR en streaming.
+
+    Args:
+        events: Iterable de mensajes CDP (ej: NetworkCapture.network_events)
+        filename: Ruta de salida (.har o .har.gz)
+        get_body: Función opcional requestId -> body
+        compress: Si True escribe con gzip
+        pages: Lista opcional de páginas HAR
+        comment: Comentario opcional del log HAR
+
+    Returns:
+        int: Número de entries escritas
+    """
+    with HarWriter(filename, compress=compress, pages=pages, comment=comment) as writer:
+        for entry in iter_har_entries(events, get_body):
+            writer.write_entry(entry)
+    logger.info(f"HAR saved to {filename} ({writer.entries_written} entries)")
+    return writer.entries_written
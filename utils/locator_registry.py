@@ -0,0 +1,328 @@
+"""
+locator_registry.py - Registro de locators por página con caché por época y telemetría
+
+Los locators estaban como constantes sueltas (HomePage.SUBMENU_FLIGHT_OFFERS,
+FOOTER_*) y XPaths armados con f-strings en cada llamada (select_language,
+select_pos). Muchos son contains(@class, ...) o cadenas de "or" que el navegador
+evalúa lento en un DOM Angular grande. Este módulo agrega:
+
+- Locator: un elemento lógico con estrategias equivalentes (id > css > xpath).
+  Se intenta primero la más rápida; la que funciona se recuerda (preferred) y
+  pasa a ser la primera en las siguientes búsquedas. Los valores pueden tener
+  campos {} (ej: texto del idioma): las estrategias completadas se memorizan
+- LocatorRegistry: resuelve un locator en UNA llamada execute_script (todas las
+  estrategias en orden, sin implicit wait, midiendo cada una con performance.now())
+  y cachea el WebElement dentro de la "época" de la página. new_epoch() invalida
+  la caché (navegación, recarga, cambio de pestaña); un elemento cacheado que
+  quedó obsoleto se vuelve a resolver una vez
+- LocatorStats: evaluaciones, hits/misses y tiempo en el navegador por selector;
+  el fixture driver adjunta a Allure ("Locators") el ranking de los más lentos
+
+Si ninguna estrategia está presente todavía se usa find_element con el implicit
+wait del driver, igual que antes (la página puede seguir cargando).
+
+Uso en un page object:
+    LOCATORS = {"pos_button": Locator((By.ID, "pointOfSaleSelectorId"))}
+    self.locators = LocatorRegistry(driver, "Home", self.LOCATORS)
+    self.locators.click("pos_button")
+    self.waits.until(self.locators.visible("footer_news"), "footer link visible")
+"""
+
+# ==================== IMPORTS ====================
+import logging
+import time
+from selenium.common.exceptions import (
+    ElementNotInteractableException, StaleElementReferenceException, WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+STRATEGY_RANK = {By.ID: 0, By.CSS_SELECTOR: 1, By.XPATH: 2}  # Orden de intento por defecto (más rápida primero)
+
+# Estrategias como [by, valor]; devuelve [índice de la que encontró (-1 = ninguna), elemento, ms por estrategia]
+_RESOLVE_JS = """
+var strategies = arguments[0], timings = [];
+for (var i = 0; i < strategies.length; i++) {
+    var by = strategies[i][0], value = strategies[i][1], element = null, start = performance.now();
+    try {
+        if (by === 'id') {
+            element = document.getElementById(value);
+        } else if (by === 'css selector') {
+            element = document.querySelector(value);
+        } else if (by === 'xpath') {
+            element = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+    } catch (e) { element = null; }
+    timings.push(performance.now() - start);
+    if (element !== null) { return [i, element, timings]; }
+}
+return [-1, null, timings];
+"""
+
+
+# ==================== LOCATOR ====================
+class Locator:
+    """
+    Elemento lógico con una o más estrategias equivalentes.
+
+    La estrategia que funciona se guarda en el propio Locator: como los LOCATORS
+    son atributos de clase de la página, lo aprendido vale para todo el proceso.
+    """
+
+    def __init__(self, *strategies, cache=True):
+        """
+        Args:
+            *strategies: Tuplas (By.ID | By.CSS_SELECTOR | By.XPATH, valor); el valor
+                         puede tener campos {} que se completan en cada búsqueda
+            cache: False para elementos efímeros (opciones de un dropdown)
+        """
+        unsupported = [by for by, _ in strategies if by not in STRATEGY_RANK]
+        if not strategies or unsupported:
+            raise ValueError(f"Locator needs id/css/xpath strategies, got: {unsupported or 'none'}")
+        self.strategies = tuple(sorted(strategies, key=lambda strategy: STRATEGY_RANK[strategy[0]]))
+        self.cache = cache
+        self.preferred = None  # Índice de la estrategia que ya funcionó
+        self._compiled = {}
+
+    def compile(self, args=()):
+        """
+        Estrategias en orden de intento con los campos {} completados (memorizado).
+
+        Returns:
+            list: [(índice, by, valor), ...] con la preferida primero
+        """
+        key = (self.preferred, args)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            order = list(range(len(self.strategies)))
+            if self.preferred is not None:
+                order.remove(self.preferred)
+                order.insert(0, self.preferred)
+            compiled = []
+            for index in order:
+                by, value = self.strategies[index]
+                compiled.append((index, by, value.format(*args) if args else value))
+            self._compiled[key] = compiled
+        return compiled
+
+
+# ==================== TELEMETRÍA ====================
+class LocatorStats:
+    """
+    Telemetría de resolución de locators de un driver.
+
+    Atributos:
+    - selectors: (página, nombre, índice) -> {by, value, evaluations, hits, misses, eval_ms, max_ms}
+    - lookups / cache_hits / stale / fallbacks: Contadores globales
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.selectors = {}
+        self.lookups = 0
+        self.cache_hits = 0
+        self.stale = 0
+        self.fallbacks = 0
+        self.fallback_s = 0.0
+
+    def record_probe(self, page, name, locator, tried, timings, hit):
+        """Registra una resolución por JS: tried = índices evaluados, hit = posición que encontró (-1 = ninguna)."""
+        self.lookups += 1
+        for position, (index, elapsed) in enumerate(zip(tried, timings)):
+            by, value = locator.strategies[index]
+            entry = self.selectors.setdefault((page, name, index), {
+                'by': by, 'value': value, 'evaluations': 0, 'hits': 0, 'misses': 0, 'eval_ms': 0.0, 'max_ms': 0.0,
+            })
+            entry['evaluations'] += 1
+            entry['eval_ms'] += elapsed
+            entry['max_ms'] = max(entry['max_ms'], elapsed)
+            if position == hit:
+                entry['hits'] += 1
+            else:
+                entry['misses'] += 1
+
+    def record_cache_hit(self):
+        self.lookups += 1
+        self.cache_hits += 1
+
+    def record_stale(self):
+        self.stale += 1
+
+    def record_fallback(self, waited):
+        self.fallbacks += 1
+        self.fallback_s += waited
+
+    def slowest(self, top=10):
+        """
+        Selectores ordenados por tiempo promedio de evaluación en el navegador.
+
+        Returns:
+            list: [(página.nombre, entry), ...] del más lento al más rápido
+        """
+        ranked = sorted(self.selectors.items(),
+                        key=lambda item: item[1]['eval_ms'] / item[1]['evaluations'], reverse=True)
+        return [(f"{page}.{name}", entry) for (page, name, _), entry in ranked[:top]]
+
+    def get_summary(self, top=10):
+        """
+        Ranking de los selectores más lentos y contadores de la caché.
+
+        Returns:
+            str: Reporte en texto (vacío si no hubo búsquedas)
+        """
+        if not self.lookups:
+            return ""
+        eval_ms = sum(entry['eval_ms'] for entry in self.selectors.values())
+        lines = [f"Locator lookups: {self.lookups} | cache hits: {self.cache_hits} | stale: {self.stale} | "
+                 f"implicit-wait fallbacks: {self.fallbacks} ({self.fallback_s:.2f}s) | in-page selector time: {eval_ms:.1f}ms", ""]
+        lines.append(f"{'locator':<36} {'by':<12} {'evals':>5} {'hits':>5} {'misses':>6} {'avg_ms':>7} {'max_ms':>7}  selector")
+        for label, entry in self.slowest(top):
+            avg = entry['eval_ms'] / entry['evaluations']
+            lines.append(f"{label[:36]:<36} {entry['by']:<12} {entry['evaluations']:>5} {entry['hits']:>5} "
+                         f"{entry['misses']:>6} {avg:>7.2f} {entry['max_ms']:>7.2f}  {entry['value'][:80]}")
+        return "\n".join(lines)
+
+
+def get_locator_stats(driver):
+    """
+    Telemetría de locators asociada a un driver (se crea la primera vez).
+
+    Se guarda en el propio driver para que todos los page objects del test
+    compartan el mismo registro.
+    """
+    stats = getattr(driver, '_locator_stats', None)
+    if stats is None:
+        stats = LocatorStats()
+        try:
+            driver._locator_stats = stats
+        except AttributeError:
+            pass  # Drivers sin atributos dinámicos: telemetría solo local
+    return stats
+
+
+# ==================== REGISTRO ====================
+class LocatorRegistry:
+    """
+    Resuelve los locators de una página con caché por época.
+
+    - find(): elemento (caché → JS en una llamada → find_element con implicit wait)
+    - click() / text(): como find() + acción, reintentando una vez si el elemento cacheado quedó obsoleto
+    - visible(): predicado para WaitEngine.until (sin implicit wait)
+    - new_epoch(): invalida la caché después de navegar
+    """
+
+    def __init__(self, driver, page, locators):
+        """
+        Args:
+            driver: Instancia de Selenium WebDriver
+            page: Nombre de la página para el reporte (ej: "Home")
+            locators: dict {nombre: Locator} (normalmente el atributo LOCATORS de la página)
+        """
+        self.driver = driver
+        self.page = page
+        self.locators = locators
+        self.stats = get_locator_stats(driver)
+        self.epoch = 0
+        self._cache = {}
+
+    def new_epoch(self, reason=""):
+        """Invalida los elementos cacheados (la página navegó, recargó o cambió de pestaña)."""
+        self.epoch += 1
+        self._cache.clear()
+        logger.debug(f"Locator cache invalidated ({self.page} epoch {self.epoch}): {reason}")
+
+    def _probe(self, name, args):
+        """
+        Resuelve en UNA llamada execute_script, sin implicit wait.
+
+        Returns:
+            WebElement o None si ninguna estrategia está presente
+        """
+        locator = self.locators[name]
+        compiled = locator.compile(args)
+        try:
+            hit, element, timings = self.driver.execute_script(_RESOLVE_JS, [[by, value] for _, by, value in compiled])
+        except WebDriverException as e:
+            logger.debug(f"Locator probe failed for {self.page}.{name}: {str(e)[:100]}")
+            return None
+        self.stats.record_probe(self.page, name, locator, [index for index, _, _ in compiled], timings, hit)
+        if hit < 0:
+            return None
+
+        index, by, _ = compiled[hit]
+        if locator.preferred != index:
+            if locator.preferred is not None:
+                logger.info(f"Locator {self.page}.{name}: preferred strategy is now {by}")
+            locator.preferred = index
+        if locator.cache:
+            self._cache[(name, args)] = element
+        return element
+
+    def find(self, name, *args):
+        """
+        Elemento del locator `name` (args completan los campos {} del valor).
+
+        Raises:
+            NoSuchElementException: Si no aparece dentro del implicit wait del driver
+        """
+        cached = self._cache.get((name, args))
+        if cached is not None:
+            self.stats.record_cache_hit()
+            return cached
+
+        element = self._probe(name, args)
+        if element is not None:
+            return element
+
+        # Aún no está en la página: misma espera que antes (find_element con el implicit wait del driver)
+        _, by, value = self.locators[name].compile(args)[0]
+        start = time.perf_counter()
+        try:
+            element = self.driver.find_element(by, value)
+        finally:
+            self.stats.record_fallback(time.perf_counter() - start)
+        if self.locators[name].cache:
+            self._cache[(name, args)] = element
+        return element
+
+    def _act(self, name, args, action):
+        """Ejecuta action(elemento); si el elemento venía de la caché y quedó obsoleto, lo resuelve otra vez."""
+        from_cache = (name, args) in self._cache
+        element = self.find(name, *args)
+        try:
+            return action(element)
+        except (StaleElementReferenceException, ElementNotInteractableException):
+            if not from_cache:
+                raise
+            self.stats.record_stale()
+            self._cache.pop((name, args), None)
+            return action(self.find(name, *args))
+
+    def click(self, name, *args):
+        """Click nativo en el elemento del locator."""
+        self._act(name, args, lambda element: element.click())
+
+    def text(self, name, *args):
+        """Texto visible del elemento del locator."""
+        return self._act(name, args, lambda element: element.text)
+
+    def visible(self, name, *args):
+        """
+        Predicado para WaitEngine.until: el elemento cuando está presente Y visible.
+
+        Cada consulta es una sola llamada JS (sin implicit wait) más is_displayed().
+        """
+        def predicate(driver):
+            element = self._cache.get((name, args)) or self._probe(name, args)
+            try:
+                return element if element is not None and element.is_displayed() else False
+            except StaleElementReferenceException:
+                self._cache.pop((name, args), None)
+                return False
+        predicate.label = f"{self.page}.{name} visible"
+        return predicate
@@ -1,5 +1,6 @@
 """
 network_capture.py - Utilidad para capturar tráfico de red usando Chrome DevTools Protocol
+(Chrome/Edge) o WebDriver BiDi (Firefox, ver utils/bidi_network.py)
 
 Este módulo proporciona funcionalidad para capturar eventos de red durante la ejecución de tests.
 Utiliza el Chrome DevTools Protocol (CDP) disponible en Selenium 4.
@@ -10,17 +11,137 @@ Conceptos clave:
 - CDP (Chrome DevTools Protocol): API para controlar Chrome a bajo nivel
 - Network Domain: Área del CDP que maneja eventos de red
 - Request/Response: Eventos que se disparan en cada petición HTTP
+
+Ingesta incremental:
+- Cada llamada a get_log('performance') devuelve solo entradas nuevas; cada entrada
+  se parsea y clasifica UNA vez (_ingest) y avanza el cursor de ingesta
+- Eventos deduplicados por (requestId, method, timestamp): reingestar el mismo
+  evento no lo duplica, pero se conservan los repetidos legítimos (redirects,
+  dataReceived)
+- Índices por requestId (requests, responses, loadingFinished) para búsquedas O(1)
+
+Colector en segundo plano (opcional, start_background_collection):
+- Un thread drena el performance log cada pocos cientos de ms, para que el buffer
+  del navegador no crezca ni descarte entradas en tests largos
+- Los eventos se guardan en un ring buffer acotado (deque con maxlen)
+- Los bodies de sesión se piden apenas llega Network.loadingFinished, antes de
+  que el navegador los descarte
+- Un lock serializa el uso del driver entre el colector y los métodos públicos
+
+Captura de bodies (BodyCapturePolicy):
+- Solo se pide Network.getResponseBody para respuestas que pasan la política
+  (URL allow/deny con glob o regex, mime types, tamaño máximo, presupuesto total)
+- El body se pide después de Network.loadingFinished y se guarda comprimido (zlib)
+- get_body_capture_report() compara contra capturar todos los bodies
+
+Exportación HAR 1.2: save_har_file() (ver utils/har_exporter.py)
+Métricas por página (TTFB, bytes, terceros): get_page_metrics() (ver utils/network_metrics.py)
+Extracción declarativa de campos de los bodies: extract_payloads() (ver utils/payload_extractor.py)
+Peticiones por paso de Allure y por ventana de tiempo: track_allure_steps(),
+get_requests_between() (ver utils/network_steps.py)
 """
 
 # ==================== IMPORTS ====================
 import logging
 import json
+import threading
+import time
+import re
+import zlib
+from fnmatch import fnmatch
+from collections import deque
+from contextlib import contextmanager
 from selenium.webdriver.common.log import Log
 from selenium.common.exceptions import WebDriverException
+from utils.bidi_network import BidiNetworkListener
+from utils.har_exporter import export_har
+from utils.network_metrics import compute_page_metrics
+from utils.network_steps import RequestTimeIndex, AllureStepTracker, summarize_requests
+from utils.payload_extractor import ExtractionSpec, ParsedBodyCache, SESSION_JOURNEYS_SPEC, extract_from_candidates, load_specs
 
 # ==================== LOGGER ====================
 logger = logging.getLogger(__name__)
 
+# ==================== POLÍTICA DE CAPTURA DE BODIES ====================
+class BodyCapturePolicy:
+    """
+    Decide qué response bodies se piden al navegador.
+
+    Patrones de URL (allow / deny):
+    - Glob por defecto: "*session*", "https://*.avianca.com/api/*"
+    - Regex con prefijo "re:": "re:/api/v\\d+/session"
+
+    Orden de evaluación:
+    1. deny: si la URL coincide, no se captura
+    2. allow: si hay lista allow, la URL debe coincidir con alguno
+    3. mime_types: el mimeType debe contener alguno (ej: "application/json")
+    4. max_body_bytes: tamaño del body (encodedDataLength antes de pedirlo, real después)
+    5. max_total_bytes: presupuesto total de bytes capturados por test
+
+    session_only=True (por defecto) mantiene el comportamiento histórico:
+    solo se consideran respuestas clasificadas como "Session".
+    """
+
+    def __init__(self, allow=None, deny=None, mime_types=("application/json",),
+                 max_body_bytes=2 * 1024 * 1024, max_total_bytes=20 * 1024 * 1024, session_only=True):
+        """
+        Args:
+            allow: Patrones de URL permitidos (None = todas)
+            deny: Patrones de URL excluidos
+            mime_types: Fragmentos de mimeType aceptados (None = todos)
+            max_body_bytes: Tamaño máximo de un body (None = sin límite)
+            max_total_bytes: Bytes máximos capturados por test (None = sin límite)
+            session_only: Si True solo captura respuestas de sesión
+        """
+        self.allow = [self._compile(p) for p in (allow or [])]
+        self.deny = [self._compile(p) for p in (deny or [])]
+        self.mime_types = [m.lower() for m in mime_types] if mime_types else None
+        self.max_body_bytes = max_body_bytes
+        self.max_total_bytes = max_total_bytes
+        self.session_only = session_only
+
+    @staticmethod
+    def _compile(pattern):
+        """Convierte un patrón glob o "re:" en una función url -> bool."""
+        if pattern.startswith("re:"):
+            regex = re.compile(pattern[3:], re.IGNORECASE)
+            return lambda url: regex.search(url) is not None
+        lowered = pattern.lower()
+        return lambda url: fnmatch(url.lower(), lowered)
+
+    def check(self, url, mime_type, size, total_captured):
+        """
+        Evalúa una respuesta contra la política.
+
+        Returns:
+            str: None si se debe capturar, o el motivo del descarte
+                 ("deny", "not_allowed", "mime", "too_large", "budget")
+        """
+        url = url or ""
+        if any(match(url) for match in self.deny):
+            return "deny"
+        if self.allow and not any(match(url) for match in self.allow):
+            return "not_allowed"
+        if self.mime_types is not None and not any(m in (mime_type or "").lower() for m in self.mime_types):
+            return "mime"
+        return self.check_size(size, total_captured)
+
+    def check_size(self, size, total_captured):
+        """
+        Evalúa solo los límites de tamaño (se repite con el tamaño real del body).
+
+        Returns:
+            str: None si cabe, "too_large" o "budget"
+        """
+        if size is None:
+            return None
+        if self.max_body_bytes is not None and size > self.max_body_bytes:
+            return "too_large"
+        if self.max_total_bytes is not None and total_captured + size > self.max_total_bytes:
+            return "budget"
+        return None
+
+
 # ==================== CLASE ====================
 class NetworkCapture:
     """
@@ -33,34 +154,77 @@ class NetworkCapture:
     - Almacenar los datos capturados para análisis
     """
 
-    def __init__(self, driver):
+    def __init__(self, driver, body_policy=None, backend="auto"):
         """
         Constructor: Inicializa el capturador de red.
 
         Args:
-            driver: Instancia de Selenium WebDriver (debe ser Chrome)
+            driver: Instancia de Selenium WebDriver (Chrome/Edge vía CDP, Firefox vía BiDi)
+            body_policy: BodyCapturePolicy (por defecto: solo JSON de sesión, 2MB por body, 20MB total)
+            backend: "auto" (CDP en Chromium, BiDi en Firefox), "cdp" o "bidi"
 
-        Nota: CDP solo funciona con Chrome/Edge (navegadores Chromium)
+        Nota: BiDi requiere la capability webSocketUrl (la activa _create_driver en Firefox)
         """
         self.driver = driver
-        self.network_events = []  # Lista para almacenar todos los eventos capturados
+        self.backend = self._resolve_backend(driver, backend)
+        self._bidi = None  # BidiNetworkListener activo (backend "bidi")
+        self.network_events = deque()  # Eventos capturados (ring buffer acotado con el colector)
         self.session_events = []  # Lista específica para eventos "Session"
-        self.session_response_bodies = {}  # Dict para guardar response bodies de session events (key: requestId, value: body)
+        self.body_policy = body_policy or BodyCapturePolicy()
+        self._bodies = {}  # requestId -> body comprimido con zlib (ver get_response_body)
+        self.body_stats = self._new_body_stats()
+        self._parsed_bodies = ParsedBodyCache()  # Árboles JSON por requestId (extract_payloads)
         self.enabled = False
+
+        # Estado de ingesta incremental
+        self.cursor = 0  # Entradas del performance log ya procesadas
+        self._seen_keys = set()  # (requestId, method, timestamp) ya ingeridos
+        self.requests = {}  # requestId -> params de Network.requestWillBeSent (último)
+        self.responses = {}  # requestId -> params de Network.responseReceived
+        self.finished = {}  # requestId -> params de Network.loadingFinished / loadingFailed
+        self.redirect_hops = {}  # requestId -> params de los saltos anteriores de un redirect
+        self.data_lengths = {}  # requestId -> bytes decodificados (suma de Network.dataReceived)
+        self.dropped_events = 0  # Eventos que el ring buffer descartó (siguen en los índices)
+        self.session_response_ids = []  # requestIds de respuestas de sesión (en orden)
+        self.method_counts = {}  # method -> cantidad de eventos (para el resumen)
+        self._seen_order = None  # deque acotada que limita _seen_keys con el colector
+        self._pending_bodies = set()  # requestIds de sesión sin loadingFinished aún
+
+        # Correlación con pasos de Allure
+        self.request_index = RequestTimeIndex()  # Peticiones ordenadas por wallTime de inicio
+        self.step_markers = []  # {"uuid", "title", "start", "end", "depth"} en orden de inicio
+        self._open_steps = {}  # uuid -> marca de un paso aún abierto
+        self._step_tracker = None  # AllureStepTracker registrado (track_allure_steps)
+
+        # Colector en segundo plano
+        self._lock = threading.RLock()  # Serializa ingesta/consultas entre threads
+        self._collector_thread = None
+        self._collector_stop = threading.Event()
+        self._collector_paused = threading.Event()
         logger.info("NetworkCapture object initialized")
 
+    @staticmethod
+    def _resolve_backend(driver, backend):
+        """Elige el backend de captura según el navegador ("auto")."""
+        if backend != "auto":
+            return backend
+        capabilities = getattr(driver, 'capabilities', None) or {}
+        return 'bidi' if capabilities.get('browserName', '').lower() == 'firefox' else 'cdp'
+
     def enable_network_tracking(self):
         """
-        Habilita el rastreo de red usando CDP.
+        Habilita el rastreo de red usando CDP (Chrome/Edge) o WebDriver BiDi (Firefox).
 
         Proceso:
-        1. Ejecuta comando CDP para habilitar Network domain
+        1. CDP: ejecuta Network.enable / BiDi: conecta y se suscribe a network.*
         2. Marca como habilitado para futuras operaciones
 
         Importante:
         - Debe llamarse ANTES de navegar a la página
-        - Solo funciona con Chrome/Edge
         """
+        if self.backend == 'bidi':
+            self._enable_bidi()
+            return
         try:
             # Ejecuta comando CDP: Network.enable
             # Esto activa el monitoreo de todas las peticiones de red
@@ -72,14 +236,43 @@ class NetworkCapture:
             logger.error("CDP may not be supported by this browser (use Chrome or Edge)")
             raise
 
+    def _enable_bidi(self):
+        """Conecta el listener BiDi (eventos push, sin polling)."""
+        websocket_url = (self.driver.capabilities or {}).get('webSocketUrl')
+        if not isinstance(websocket_url, str):
+            logger.error("WebDriver BiDi is not enabled for this session (missing webSocketUrl capability)")
+            raise WebDriverException("WebDriver BiDi not available: launch the browser with webSocketUrl=True")
+
+        # Se asigna antes de start(): los primeros eventos ya pueden pedir bodies
+        self._bidi = BidiNetworkListener(
+            websocket_url, self._on_bidi_message, max_body_bytes=self.body_policy.max_body_bytes or 2 * 1024 * 1024
+        )
+        if not self._bidi.start():
+            self._bidi = None
+            raise WebDriverException("Could not start WebDriver BiDi network listener")
+        self.enabled = True
+        logger.info("Network tracking enabled via WebDriver BiDi")
+
+    def _on_bidi_message(self, message):
+        """Callback del listener BiDi: procesa cada evento apenas llega."""
+        with self._lock:
+            self._process_message(message)
+
+    def _wait_for_bodies(self, timeout=2.0):
+        """BiDi: espera a que lleguen los bodies pedidos (CDP los obtiene de forma síncrona)."""
+        if self._bidi is not None:
+            self._bidi.wait_for_bodies(timeout)
+
     def disable_network_tracking(self):
         """
         Deshabilita el rastreo de red.
 
         Debe llamarse al finalizar la captura para liberar recursos.
+        También detiene el colector en segundo plano si está activo.
         """
+        self.stop_background_collection()
         try:
-            if self.enabled:
+            if self.enabled and self.backend == 'cdp':
                 self.driver.execute_cdp_cmd('Network.disable', {})
                 self.enabled = False
                 logger.info("Network tracking disabled")
@@ -95,56 +288,339 @@ class NetworkCapture:
 
         Proceso:
         - Lee los logs del tipo 'performance' que contienen eventos de red
-        - Filtra solo eventos relacionados con Network
+        - Procesa solo las entradas nuevas (las anteriores ya están indexadas)
+        """
+        self._ingest()
+        return self.network_events
+
+    # ==================== COLECTOR EN SEGUNDO PLANO ====================
+
+    def start_background_collection(self, interval=0.5, max_events=5000):
+        """
+        Inicia un thread que drena el performance log periódicamente.
+
+        Args:
+            interval: Segundos entre drenados
+            max_events: Tamaño del ring buffer de network_events (los más viejos se descartan)
+
+        Los eventos de sesión, sus bodies y los índices por requestId no se
+        descartan: el ring buffer solo acota la lista completa de eventos.
+        """
+        if self._collector_thread is not None:
+            return
+        with self._lock:
+            self.network_events = deque(self.network_events, maxlen=max_events)
+            self._seen_order = deque(maxlen=max_events * 2)
+        if self.backend == 'bidi':
+            # BiDi ya entrega los eventos en segundo plano: solo se acota el buffer
+            logger.info(f"Network events are pushed over BiDi (buffer {max_events} events)")
+            return
+        self._collector_stop.clear()
+        self._collector_paused.clear()
+        self._collector_thread = threading.Thread(
+            target=self._collector_loop, args=(interval,), name="network-collector", daemon=True
+        )
+        self._collector_thread.start()
+        logger.info(f"Background network collector started (interval {interval}s, buffer {max_events} events)")
+
+    def stop_background_collection(self):
+        """
+        Detiene el colector (drena una última vez). Seguro de llamar varias veces.
+
+        Con BiDi cierra el listener (la conexión WebSocket no debe quedar abierta
+        cuando el navegador vuelve al pool).
+        """
+        if self._bidi is not None:
+            self._wait_for_bodies()
+            self._bidi.stop()
+            self._bidi = None
+            return
+        thread = self._collector_thread
+        if thread is None:
+            return
+        self._collector_stop.set()
+        thread.join(timeout=5.0)
+        self._collector_thread = None
+        self._ingest()  # Última pasada desde el thread del test
+        logger.info(f"Background network collector stopped ({len(self.network_events)} events buffered)")
+
+    @contextmanager
+    def pause_collection(self):
+        """
+        Pausa el colector mientras dura el bloque (ej: secciones sensibles del test).
+
+        Uso:
+            with network_capture.pause_collection():
+                driver.switch_to.frame(...)
         """
+        self._collector_paused.set()
+        try:
+            with self._lock:  # Espera a que termine un drenado en curso
+                pass
+            yield
+        finally:
+            self._collector_paused.clear()
+
+    def _collector_loop(self, interval):
+        """Loop del thread colector: drena hasta que se pida detenerlo."""
+        while not self._collector_stop.wait(interval):
+            if self._collector_paused.is_set():
+                continue
+            try:
+                self._ingest(raise_errors=True)
+            except Exception as e:
+                # Sesión cerrada u otro error irrecuperable: terminar el colector
+                logger.warning(f"Background network collector stopped on error: {str(e)[:100]}")
+                return
+
+    # ==================== INGESTA ====================
+
+    def _ingest(self, raise_errors=False):
+        """
+        Drena el performance log y procesa cada entrada nueva una sola vez.
+
+        Por cada evento Network.* nuevo:
+        1. Deduplica por (requestId, method, timestamp)
+        2. Lo agrega a network_events y actualiza los índices por requestId
+        3. Si es de sesión, lo agrega a session_events y captura el body JSON
+
+        Args:
+            raise_errors: Si True, un error de get_log se propaga en lugar de
+                registrarse (el thread colector lo usa para terminar con la sesión)
+
+        Returns:
+            int: Cantidad de eventos nuevos ingeridos
+        """
+        with self._lock:
+            return self._ingest_locked(raise_errors)
+
+    def _ingest_locked(self, raise_errors=False):
+        """Cuerpo de _ingest(); se ejecuta con self._lock tomado."""
+        if self.backend == 'bidi':
+            return 0  # BiDi empuja los eventos (_on_bidi_message): no hay log que drenar
         try:
             # Obtiene logs de performance (contiene eventos de red)
             logs = self.driver.get_log('performance')
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error getting network logs: {str(e)}")
+            return 0
 
-            for log_entry in logs:
-                try:
-                    # Parsea el mensaje JSON del log
-                    log_message = json.loads(log_entry['message'])
-
-                    # Solo nos interesan eventos de Network
-                    if 'message' in log_message:
-                        message = log_message['message']
-                        if 'method' in message and message['method'].startswith('Network'):
-                            self.network_events.append(message)
-
-                            # Si el evento es relevante para "Session", lo guardamos aparte
-                            if self._is_session_event(message):
-                                self.session_events.append(message)
-                                logger.info(f"Session event captured: {message['method']}")
-
-                                # Si es una respuesta JSON, intentar capturar el body INMEDIATAMENTE
-                                if message['method'] == 'Network.responseReceived':
-                                    request_id = message.get('params', {}).get('requestId')
-                                    response = message.get('params', {}).get('response', {})
-                                    mime_type = response.get('mimeType', '')
-
-                                    # Solo intentar con respuestas JSON
-                                    if request_id and 'application/json' in mime_type:
-                                        try:
-                                            response_body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
-                                            body_content = response_body.get('body', '')
-                                            if body_content:
-                                                self.session_response_bodies[request_id] = body_content
-                                                logger.info(f"✓ Response body captured for requestId: {request_id}")
-                                        except Exception as e:
-                                            logger.warning(f"Could not capture body for requestId {request_id}: {str(e)[:100]}")
-
-                except json.JSONDecodeError:
-                    continue  # Ignora logs que no sean JSON válido
-
-            logger.info(f"Total network events captured: {len(self.network_events)}")
+        new_events = 0
+        new_session_events = 0
+        for log_entry in logs:
+            self.cursor += 1
+            try:
+                # Parsea el mensaje JSON del log
+                message = json.loads(log_entry['message']).get('message', {})
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                continue  # Ignora logs que no sean JSON válido
+
+            is_new, is_session = self._process_message(message)
+            new_events += is_new
+            new_session_events += is_session
+
+        if new_events:
+            logger.info(f"Network events ingested: +{new_events} (total {len(self.network_events)}, cursor {self.cursor})")
+        if new_session_events:
             logger.info(f"Total session events captured: {len(self.session_events)}")
+        return new_events
+
+    def _process_message(self, message):
+        """
+        Procesa UN mensaje CDP (del performance log o traducido desde BiDi).
+
+        Se ejecuta con self._lock tomado.
 
-            return self.network_events
+        Returns:
+            tuple: (es_nuevo, es_de_sesión)
+        """
+        # Solo nos interesan eventos de Network
+        method = message.get('method', '')
+        if not method.startswith('Network'):
+            return False, False
+
+        params = message.get('params', {})
+        request_id = params.get('requestId')
+        key = (request_id, method, params.get('timestamp'))
+        if key in self._seen_keys:
+            return False, False
+        self._remember_key(key)
+
+        if self.network_events.maxlen is not None and len(self.network_events) == self.network_events.maxlen:
+            self.dropped_events += 1  # El append descarta el más viejo
+        self.network_events.append(message)
+        self.method_counts[method] = self.method_counts.get(method, 0) + 1
+        self._index_event(method, request_id, params)
+
+        # Si el evento es relevante para "Session", lo guardamos aparte
+        is_session = self._is_session_event(message)
+        if is_session:
+            self.session_events.append(message)
+            logger.info(f"Session event captured: {method}")
+            if method == 'Network.responseReceived':
+                self.session_response_ids.append(request_id)
+                # El body se pide al llegar loadingFinished (body completo)
+                if request_id and request_id not in self.finished:
+                    self._pending_bodies.add(request_id)
+
+        # Body listo: evaluar la política y pedirlo antes de que el navegador lo descarte
+        if method == 'Network.loadingFinished' and request_id in self.responses:
+            self.body_stats['finished_responses'] += 1
+            self.body_stats['finished_bytes'] += int(params.get('encodedDataLength') or 0)
+            self._maybe_capture_body(request_id, params.get('encodedDataLength'))
+        return True, is_session
+
+    def _remember_key(self, key):
+        """Registra una clave de deduplicación (acotada cuando hay ring buffer)."""
+        if self._seen_order is not None:
+            if len(self._seen_order) == self._seen_order.maxlen:
+                self._seen_keys.discard(self._seen_order[0])
+            self._seen_order.append(key)
+        self._seen_keys.add(key)
+
+    def _index_event(self, method, request_id, params):
+        """Actualiza los índices por requestId con un evento nuevo."""
+        if not request_id:
+            return
+        if method == 'Network.requestWillBeSent':
+            if request_id not in self.requests and params.get('wallTime') is not None:
+                self.request_index.add(request_id, params['wallTime'])  # Inicio del primer salto
+            elif request_id in self.requests and params.get('redirectResponse'):
+                self.redirect_hops.setdefault(request_id, []).append(self.requests[request_id])
+            self.requests[request_id] = params  # En redirects queda el último salto
+        elif method == 'Network.responseReceived':
+            self.responses[request_id] = params
+        elif method == 'Network.dataReceived':
+            self.data_lengths[request_id] = self.data_lengths.get(request_id, 0) + params.get('dataLength', 0)
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+            self.finished[request_id] = params
+
+    # ==================== CAPTURA DE BODIES ====================
+
+    @staticmethod
+    def _new_body_stats():
+        """Contadores de captura de bodies (ver get_body_capture_report)."""
+        return {
+            'finished_responses': 0,  # Respuestas completas (capturar todo = 1 llamada CDP c/u)
+            'finished_bytes': 0,  # Bytes transferidos de esas respuestas
+            'cdp_calls': 0,  # Network.getResponseBody ejecutados
+            'bytes_captured': 0,  # Bytes de bodies capturados (sin comprimir)
+            'bytes_stored': 0,  # Bytes guardados (comprimidos)
+            'skipped': {},  # motivo -> cantidad
+        }
 
+    def _maybe_capture_body(self, request_id, size=None):
+        """Aplica la política y, si corresponde, captura el body (una sola vez)."""
+        self._pending_bodies.discard(request_id)
+        if request_id in self._bodies:
+            return
+        if self.body_policy.session_only and request_id not in self.session_response_ids:
+            skipped = self.body_stats['skipped']
+            skipped['not_session'] = skipped.get('not_session', 0) + 1
+            return
+
+        response = self.responses.get(request_id, {}).get('response', {})
+        reason = self.body_policy.check(
+            response.get('url'), response.get('mimeType'),
+            int(size) if size is not None else None, self.body_stats['bytes_captured']
+        )
+        if reason:
+            skipped = self.body_stats['skipped']
+            skipped[reason] = skipped.get(reason, 0) + 1
+            logger.info(f"Response body skipped ({reason}) for requestId: {request_id}")
+            return
+        self._capture_body(request_id)
+
+    def _capture_body(self, request_id):
+        """Pide el body (CDP síncrono o BiDi asíncrono) y lo guarda con _store_body."""
+        self.body_stats['cdp_calls'] += 1
+        if self._bidi is not None:
+            self._bidi.fetch_body(request_id, self._on_bidi_body)
+            return
+        try:
+            response_body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            self._store_body(request_id, response_body.get('body', ''))
         except Exception as e:
-            logger.error(f"Error getting network logs: {str(e)}")
-            return []
+            logger.warning(f"Could not capture body for requestId {request_id}: {str(e)[:100]}")
+
+    def _on_bidi_body(self, request_id, body_content):
+        """Callback del listener BiDi con el body pedido (o None)."""
+        with self._lock:
+            self._store_body(request_id, body_content)
+
+    def _store_body(self, request_id, body_content):
+        """Verifica el tamaño real del body y lo guarda comprimido."""
+        try:
+            if not body_content:
+                return
+
+            raw = body_content.encode('utf-8')
+            # Tamaño real (encodedDataLength puede ser el tamaño comprimido por gzip)
+            reason = self.body_policy.check_size(len(raw), self.body_stats['bytes_captured'])
+            if reason:
+                skipped = self.body_stats['skipped']
+                skipped[reason] = skipped.get(reason, 0) + 1
+                logger.info(f"Response body discarded after fetch ({reason}, {len(raw)} bytes) for requestId: {request_id}")
+                return
+
+            compressed = zlib.compress(raw, 6)
+            self._bodies[request_id] = compressed
+            self.body_stats['bytes_captured'] += len(raw)
+            self.body_stats['bytes_stored'] += len(compressed)
+            logger.info(f"✓ Response body captured for requestId: {request_id} ({len(raw)} bytes)")
+        except Exception as e:
+            logger.warning(f"Could not capture body for requestId {request_id}: {str(e)[:100]}")
+
+    def get_response_body(self, request_id):
+        """
+        Obtiene (descomprimido) el body capturado de una respuesta.
+
+        Returns:
+            str: Body original, o None si no se capturó
+        """
+        compressed = self._bodies.get(request_id)
+        return zlib.decompress(compressed).decode('utf-8') if compressed is not None else None
+
+    @property
+    def session_response_bodies(self):
+        """Bodies capturados de respuestas de sesión {requestId: body} (descomprimidos)."""
+        return {rid: self.get_response_body(rid) for rid in self.session_response_ids if rid in self._bodies}
+
+    def get_body_capture_report(self):
+        """
+        Resume la captura de bodies contra "capturar todo".
+
+        Returns:
+            dict: Llamadas CDP y bytes realizados vs los de capturar cada respuesta
+        """
+        stats = self.body_stats
+        return {
+            'responses_finished': stats['finished_responses'],
+            'cdp_calls': stats['cdp_calls'],
+            'cdp_calls_saved': max(0, stats['finished_responses'] - stats['cdp_calls']),
+            'bytes_captured': stats['bytes_captured'],
+            'bytes_stored_compressed': stats['bytes_stored'],
+            'transfer_bytes_not_fetched': max(0, stats['finished_bytes'] - stats['bytes_captured']),
+            'skipped_by_reason': dict(stats['skipped']),
+        }
+
+    def get_request_details(self, request_id):
+        """
+        Combina request, response y fin de carga de un requestId (búsqueda O(1)).
+
+        Args:
+            request_id: requestId del CDP
+
+        Returns:
+            dict: {'request', 'response', 'finished'} (None en los que no existan)
+        """
+        return {
+            'request': self.requests.get(request_id),
+            'response': self.responses.get(request_id),
+            'finished': self.finished.get(request_id),
+        }
 
     def _is_session_event(self, event):
         """
@@ -215,8 +691,8 @@ class NetworkCapture:
         Returns:
             list: Lista de eventos de sesión capturados
         """
-        # Asegura que tenemos los logs más recientes
-        self.get_network_logs()
+        # Asegura que tenemos los logs más recientes (solo procesa entradas nuevas)
+        self._ingest()
         return self.session_events
 
     def find_session_event_details(self):
@@ -279,13 +755,91 @@ class NetworkCapture:
         - Documentación de evidencia
         """
         try:
+            with self._lock:
+                events = list(self.network_events)
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.network_events, f, indent=2, ensure_ascii=False)
+                json.dump(events, f, indent=2, ensure_ascii=False)
             logger.info(f"Network logs saved to {filename}")
             logger.info(f"Total events saved: {len(self.network_events)}")
         except Exception as e:
             logger.error(f"Error saving network logs: {str(e)}")
 
+    def _indexed_events(self):
+        """
+        Reconstruye la secuencia de eventos por petición desde los índices por requestId.
+
+        Los índices no se acotan: sirven cuando el ring buffer ya descartó eventos.
+        Por petición (en orden de inicio) se generan los saltos de redirect,
+        requestWillBeSent, un dataReceived con el total, responseReceived y el fin.
+
+        Yields:
+            dict: Mensajes CDP {"method", "params"}
+        """
+        for request_id, request in self.requests.items():
+            for hop in self.redirect_hops.get(request_id, ()):
+                yield {'method': 'Network.requestWillBeSent', 'params': hop}
+            yield {'method': 'Network.requestWillBeSent', 'params': request}
+            if request_id in self.responses:
+                yield {'method': 'Network.responseReceived', 'params': self.responses[request_id]}
+            if self.data_lengths.get(request_id):
+                yield {'method': 'Network.dataReceived',
+                       'params': {'requestId': request_id, 'dataLength': self.data_lengths[request_id]}}
+            finished = self.finished.get(request_id)
+            if finished is not None:
+                failed = 'errorText' in finished
+                yield {'method': 'Network.loadingFailed' if failed else 'Network.loadingFinished', 'params': finished}
+
+    def _report_events(self):
+        """
+        Eventos para el HAR y las métricas: el buffer completo si no descartó nada,
+        si no la secuencia reconstruida desde los índices (ver _indexed_events).
+        """
+        if not self.dropped_events:
+            return list(self.network_events)
+        return list(self._indexed_events())
+
+    def save_har_file(self, filename="network_logs.har", compress=False):
+        """
+        Exporta el tráfico capturado a HAR 1.2 (escritura en streaming).
+
+        Args:
+            filename: Ruta de salida (.har, o .har.gz si compress=True)
+            compress: Si True comprime con gzip
+
+        Returns:
+            int: Número de entries escritas (0 si falló)
+
+        El HAR se abre en DevTools (Network > Import HAR) o cualquier visor de waterfall.
+        Incluye los bodies capturados según la BodyCapturePolicy. Si el ring buffer
+        descartó eventos, las entries salen de los índices por requestId y el
+        comentario del log indica cuántos eventos se descartaron.
+        """
+        try:
+            with self._lock:
+                comment = None
+                if self.dropped_events:
+                    comment = (f"{self.dropped_events} network events dropped by the capture buffer; "
+                               f"entries rebuilt from the per-request indexes")
+                return export_har(self._report_events(), filename, get_body=self.get_response_body,
+                                  compress=compress, comment=comment)
+        except Exception as e:
+            logger.error(f"Error saving HAR file: {str(e)}")
+            return 0
+
+    def get_page_metrics(self, slowest_n=5):
+        """
+        Calcula métricas de rendimiento de red por página (ver utils/network_metrics.py).
+
+        Args:
+            slowest_n: Peticiones más lentas a reportar por página
+
+        Returns:
+            list: Un dict por página (TTFB, bytes, peticiones por tipo, más lentas, terceros)
+        """
+        with self._lock:
+            self._ingest_locked()
+            return compute_page_metrics(self._report_events(), slowest_n=slowest_n)
+
     def get_network_summary(self):
         """
         Genera un resumen de la actividad de red capturada.
@@ -294,162 +848,224 @@ class NetworkCapture:
             dict: Resumen con estadísticas de red
 
         Información incluida:
-        - Total de eventos
+        - Total de eventos (incluye los que el ring buffer descartó)
+        - Eventos en el buffer y descartados
         - Total de requests
         - Total de responses
         - Eventos de sesión
         """
-        total_events = len(self.network_events)
-        requests = sum(1 for e in self.network_events if e.get('method') == 'Network.requestWillBeSent')
-        responses = sum(1 for e in self.network_events if e.get('method') == 'Network.responseReceived')
+        total_events = sum(self.method_counts.values())
+        requests = self.method_counts.get('Network.requestWillBeSent', 0)
+        responses = self.method_counts.get('Network.responseReceived', 0)
         session_count = len(self.session_events)
 
         summary = {
             'total_events': total_events,
+            'buffered_events': len(self.network_events),
+            'dropped_events': self.dropped_events,
             'total_requests': requests,
             'total_responses': responses,
             'session_events': session_count,
-            'has_session_data': session_count > 0
+            'has_session_data': session_count > 0,
+            'body_capture': self.get_body_capture_report()
         }
 
         logger.info(f"Network summary: {summary}")
         return summary
 
-    def extract_session_fields(self):
+    def extract_payloads(self, specs, request_ids=None):
+        """
+        Extrae campos de los bodies capturados según specs declarativas.
+
+        Args:
+            specs: Dict {nombre: spec} (ej: case_mappings["case_3"]["extraction_specs"])
+                   o lista de ExtractionSpec ya compiladas
+            request_ids: requestIds candidatos en orden (por defecto: respuestas de
+                         sesión y luego el resto de bodies capturados)
+
+        Returns:
+            dict: {nombre_spec: {output: [registros], "requestId": id, "complete": bool}}
+
+        Cada body se parsea una sola vez (cache por requestId) aunque se apliquen
+        varias specs o se llame varias veces. Ver utils/payload_extractor.py.
+        """
+        compiled = load_specs(specs) if isinstance(specs, dict) else list(specs)
+        self._wait_for_bodies()
+        if request_ids is None:
+            request_ids = list(dict.fromkeys(list(self.session_response_ids) + list(self._bodies)))
+
+        candidates = [(rid, self._body_loader(rid)) for rid in request_ids if rid]
+        return extract_from_candidates(compiled, candidates, self._parsed_bodies)
+
+    def _body_loader(self, request_id):
+        """Función que obtiene el body de un requestId (lo pide si sigue pendiente)."""
+        def load():
+            # Body aún pendiente (loadingFinished no llegó al drenar): pedirlo ahora
+            if request_id in self._pending_bodies:
+                with self._lock:
+                    self._maybe_capture_body(request_id)
+                self._wait_for_bodies()
+            return self.get_response_body(request_id)
+        return load
+
+    def extract_session_fields(self, spec=None):
         """
         Extrae los 4 campos específicos del JSON del evento Session.
 
+        Args:
+            spec: Spec de extracción (por defecto SESSION_JOURNEYS_SPEC, la misma
+                  de case_mappings.json -> case_3 -> extraction_specs.session_journeys)
+
         Returns:
-            dict: Diccionario con los campos extraídos o None si no se encuentran
+            dict: {"journeys": [...], "requestId": id} o None si no se encuentran
 
-        Campos extraídos:
+        Campos extraídos (por journey):
         1. closingCheckInDate
-        2. fares[].paxCode y fares[].id (primer elemento)
+        2. fares[].paxCode, fares[].id y fares[].productClass
         3. openingCheckInDate
-        4. segments[].etd, segments[].status, segments[].std (todos los segmentos)
-        """
-        session_events = self.get_session_events()
+        4. segments[].etd, segments[].status, segments[].std
 
-        if not session_events:
+        Se prefiere el primer body con ida y vuelta (min_records journeys); si
+        ninguno los tiene se usa el body con más journeys.
+        """
+        if not self.get_session_events():
             logger.warning("No session events found for field extraction")
             return None
 
-        # Buscar eventos de respuesta (Network.responseReceived) que contengan datos de sesión
-        response_events = [e for e in session_events if e.get('method') == 'Network.responseReceived']
-
-        if not response_events:
+        # Respuestas de sesión (Network.responseReceived), ya indexadas durante la ingesta
+        if not self.session_response_ids:
             logger.warning("No responseReceived events found in session events")
             return None
 
-        # Intentar con cada evento de respuesta hasta encontrar uno con body capturado
-        for event in response_events:
-            try:
-                # Obtener el requestId del evento
-                request_id = event.get('params', {}).get('requestId')
-                if not request_id:
-                    continue
-
-                # Buscar el body en el diccionario de bodies capturados
-                body_content = self.session_response_bodies.get(request_id)
-
-                if not body_content:
-                    logger.info(f"No captured body for requestId: {request_id}")
-                    continue
-
-                logger.info(f"Using captured response body for requestId: {request_id}")
-
-                # Parsear el JSON
-                response_json = json.loads(body_content)
-
-                # Muchas APIs envuelven los datos en un campo 'result' o 'data'
-                # Verificar si hay un campo 'result' que contenga los datos
-                session_data = response_json
-                if 'result' in response_json:
-                    session_data = response_json['result']
-                    if isinstance(session_data, dict):
-                        # Si 'result' contiene 'data', usar ese campo
-                        if 'data' in session_data and isinstance(session_data['data'], dict):
-                            session_data = session_data['data']
-
-                # Los campos están dentro de 'journeys' array
-                journeys = session_data.get('journeys', [])
-
-                if not journeys:
-                    logger.info(f"Body for requestId {request_id} does not contain 'journeys' array, trying next...")
-                    continue
-
-                logger.info(f"✓ Found body with journeys array ({len(journeys)} journeys) for requestId: {request_id}")
-
-                # Si solo hay 1 journey y hay más response bodies, intentar con el siguiente
-                # (el primer body puede tener solo el vuelo de ida, el segundo ambos vuelos)
-                if len(journeys) == 1:
-                    logger.info(f"Only 1 journey found, will try next response body if available...")
-
-                # Extraer los 4 campos específicos de TODOS los journeys
-                extracted_fields = {
-                    'journeys': [],
-                    'requestId': request_id
-                }
-
-                for journey_idx, journey in enumerate(journeys):
-                    journey_data = {
-                        'journey_index': journey_idx,
-                        'origin': journey.get('origin'),
-                        'destination': journey.get('destination'),
-                        'std': journey.get('std'),
-                        'closingCheckInDate': journey.get('closingCheckInDate'),
-                        'openingCheckInDate': journey.get('openingCheckInDate'),
-                        'fares': [],
-                        'segments': []
-                    }
-
-                    # Extraer fares (paxCode, id, productClass)
-                    fares_array = journey.get('fares', [])
-                    for fare in fares_array:
-                        journey_data['fares'].append({
-                            'paxCode': fare.get('paxCode'),
-                            'id': fare.get('id'),
-                            'productClass': fare.get('productClass')
-                        })
-
-                    # Extraer segments (etd, status, std)
-                    segments_array = journey.get('segments', [])
-                    for segment in segments_array:
-                        journey_data['segments'].append({
-                            'etd': segment.get('etd'),
-                            'status': segment.get('status'),
-                            'std': segment.get('std')
-                        })
-
-                    extracted_fields['journeys'].append(journey_data)
-
-                logger.info(f"✓ Session fields extracted successfully")
-                logger.info(f"  - Total journeys: {len(extracted_fields['journeys'])}")
-                for idx, journey in enumerate(extracted_fields['journeys']):
-                    logger.info(f"  - Journey [{idx}]: {journey['origin']} → {journey['destination']}")
-                    logger.info(f"    - closingCheckInDate: {journey['closingCheckInDate']}")
-                    logger.info(f"    - openingCheckInDate: {journey['openingCheckInDate']}")
-                    logger.info(f"    - std: {journey['std']}")
-                    logger.info(f"    - fares count: {len(journey['fares'])}")
-                    logger.info(f"    - segments count: {len(journey['segments'])}")
-
-                # Si solo hay 1 journey, continuar buscando uno con 2 journeys
-                if len(extracted_fields['journeys']) == 1:
-                    logger.info("Only 1 journey extracted, continuing to search for complete session with 2 journeys...")
-                    continue
-
-                # Si llegamos aquí, tenemos 2+ journeys (ida y vuelta completos)
-                return extracted_fields
-
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse JSON for requestId {request_id}: {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Error extracting fields for requestId {request_id}: {e}")
-                continue
+        session_spec = ExtractionSpec("session_journeys", spec or SESSION_JOURNEYS_SPEC)
+        result = self.extract_payloads([session_spec], request_ids=self.session_response_ids).get(session_spec.name)
+        if not result:
+            logger.error("Could not extract session fields from any response event")
+            return None
 
-        logger.error("Could not extract session fields from any response event")
-        return None
+        journeys = result[session_spec.output]
+        logger.info(f"✓ Session fields extracted successfully from requestId: {result['requestId']}")
+        logger.info(f"  - Total journeys: {len(journeys)} (bodies parsed: {self._parsed_bodies.parses})")
+        for idx, journey in enumerate(journeys):
+            logger.info(f"  - Journey [{idx}]: {journey.get('origin')} → {journey.get('destination')}")
+
+        return {session_spec.output: journeys, 'requestId': result['requestId']}
+
+    # ==================== CORRELACIÓN POR TIEMPO Y PASOS ====================
+
+    def get_requests_between(self, start, end=None):
+        """
+        Peticiones que empezaron entre dos instantes (búsqueda binaria en el índice).
+
+        Args:
+            start: Segundos epoch (time.time())
+            end: Segundos epoch (None = ahora)
+
+        Returns:
+            list: requestIds en orden de inicio
+        """
+        self._ingest()
+        with self._lock:
+            return self.request_index.between(start, time.time() if end is None else end)
+
+    def get_requests_in_last(self, milliseconds):
+        """
+        Peticiones que empezaron en los últimos N milisegundos.
+
+        Returns:
+            list: requestIds en orden de inicio
+        """
+        now = time.time()
+        return self.get_requests_between(now - milliseconds / 1000, now)
+
+    def summarize_requests(self, request_ids):
+        """
+        Conteos, bytes y latencias de un grupo de peticiones (ver utils/network_steps.py).
+
+        Returns:
+            dict: Resumen del grupo
+        """
+        with self._lock:
+            return summarize_requests(request_ids, self.requests, self.responses, self.finished)
+
+    def mark_step_start(self, uuid, title):
+        """Registra el inicio de un paso (lo llama AllureStepTracker en start_step)."""
+        marker = {'uuid': uuid, 'title': title, 'start': time.time(), 'end': None, 'depth': len(self._open_steps)}
+        self._open_steps[uuid] = marker
+        self.step_markers.append(marker)
+
+    def mark_step_end(self, uuid):
+        """
+        Registra el fin de un paso y resume las peticiones que empezaron durante él.
+
+        Returns:
+            dict: Resumen del paso o None si el paso empezó antes del tracking
+        """
+        marker = self._open_steps.pop(uuid, None)
+        if marker is None:
+            return None
+        marker['end'] = time.time()
+        return self.get_step_summary(marker)
+
+    def get_step_summary(self, step):
+        """
+        Resumen de red de un paso.
+
+        Args:
+            step: Marca de paso, uuid o título (si se repite se usa el último)
+
+        Returns:
+            dict: Título, duración y resumen de peticiones (None si no existe el paso)
+        """
+        marker = step if isinstance(step, dict) else next(
+            (m for m in reversed(self.step_markers) if step in (m['uuid'], m['title'])), None
+        )
+        if marker is None:
+            return None
+        self._ingest()
+        with self._lock:
+            return self._step_summary_locked(marker)
+
+    def _step_summary_locked(self, marker):
+        """Resume un paso con el índice ya actualizado (con self._lock tomado)."""
+        end = marker['end'] if marker['end'] is not None else time.time()
+        request_ids = self.request_index.between(marker['start'], end)
+        return dict({'step': marker['title'], 'depth': marker['depth'],
+                     'step_duration_ms': round((end - marker['start']) * 1000, 1)},
+                    **summarize_requests(request_ids, self.requests, self.responses, self.finished))
+
+    def get_step_network_report(self):
+        """
+        Resumen de red de TODOS los pasos registrados (al final del test las
+        peticiones que estaban en curso ya terminaron).
+
+        Returns:
+            list: Un resumen por paso en orden de inicio
+        """
+        self._ingest()
+        with self._lock:
+            return [self._step_summary_locked(marker) for marker in self.step_markers]
+
+    def track_allure_steps(self, attach=True):
+        """
+        Registra el plugin que marca cada allure.step y le adjunta sus peticiones.
+
+        Args:
+            attach: Si True adjunta "Network (step)" a cada paso con peticiones
+
+        Returns:
+            AllureStepTracker: Plugin registrado (ver untrack_allure_steps)
+        """
+        if self._step_tracker is None:
+            self._step_tracker = AllureStepTracker(self, attach=attach).register()
+        return self._step_tracker
+
+    def untrack_allure_steps(self):
+        """Quita el plugin de pasos de Allure (seguro de llamar varias veces)."""
+        if self._step_tracker is not None:
+            self._step_tracker.unregister()
+            self._step_tracker = None
+        self._open_steps.clear()
 
     def clear_events(self):
         """
@@ -459,7 +1075,23 @@ class NetworkCapture:
         - Iniciar captura limpia para un nuevo test
         - Evitar mezclar eventos de diferentes acciones
         """
-        self.network_events.clear()
-        self.session_events.clear()
-        self.session_response_bodies.clear()
+        with self._lock:
+            self.network_events.clear()
+            self.session_events.clear()
+            self._bodies.clear()
+            self.body_stats = self._new_body_stats()
+            self._parsed_bodies.clear()
+            self._seen_keys.clear()
+            if self._seen_order is not None:
+                self._seen_order.clear()
+            self._pending_bodies.clear()
+            self.requests.clear()
+            self.responses.clear()
+            self.finished.clear()
+            self.redirect_hops.clear()
+            self.data_lengths.clear()
+            self.dropped_events = 0
+            self.session_response_ids.clear()
+            self.method_counts.clear()
+            self.request_index.clear()
         logger.info("All captured events cleared")
@@ -0,0 +1,252 @@
+"""
+network_metrics.py - Métricas de rendimiento de red por página a partir de eventos CDP
+
+Los eventos Network.responseReceived traen response.timing (ResourceTiming del CDP:
+DNS, conexión, SSL, envío, espera del servidor). Este módulo los convierte en
+métricas por página para distinguir si un test lento fue por la automatización
+o por un backend lento.
+
+Conceptos clave:
+- Página: segmento de eventos entre dos navegaciones del frame principal
+  (requestWillBeSent de tipo Document con requestId == loaderId). Los iframes
+  (ej: pasarela de pago) se cuentan dentro de la página que los contiene
+- TTFB (time to first byte): ms desde el inicio de la petición hasta recibir
+  los headers (timing.receiveHeadersEnd)
+- Espera del servidor: ms entre enviar la petición y recibir los headers
+  (receiveHeadersEnd - sendEnd); es el tiempo "del backend"
+- Red ocupada (network_busy_ms): tiempo en que hubo al menos una petición en curso
+- Terceros: dominios distintos al sitio de la página (analytics, tag managers, etc.)
+  "Bloqueantes" = scripts/hojas de estilo de prioridad alta (frenan el render)
+
+Todo se calcula en UNA pasada por los eventos.
+"""
+
+# ==================== IMPORTS ====================
+import heapq
+import logging
+from urllib.parse import urlsplit
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+API_TYPES = ("XHR", "Fetch")  # Peticiones al backend (APIs de búsqueda, disponibilidad, etc.)
+BLOCKING_TYPES = ("Script", "Stylesheet")
+BLOCKING_PRIORITIES = ("VeryHigh", "High")
+SECOND_LEVEL_LABELS = ("co", "com", "org", "net", "gov", "edu", "ac")  # ej: avianca.com.co
+
+
+# ==================== UTILIDADES ====================
+def site_of(url):
+    """
+    Dominio "registrable" aproximado de una URL (ej: www.avianca.com -> avianca.com).
+
+    Returns:
+        str: Dominio base en minúsculas ("" si la URL no tiene host)
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    labels = host.split('.')
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def _percentile(sorted_values, percent):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return round(sorted_values[index], 1)
+
+
+def _busy_ms(intervals):
+    """Suma de la unión de intervalos (inicio, fin) en segundos -> ms."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return round(total * 1000, 1)
+
+
+# ==================== CÁLCULO ====================
+def compute_page_metrics(events, slowest_n=5, third_party_n=10):
+    """
+    Calcula métricas de red por página a partir de eventos CDP en orden.
+
+    Args:
+        events: Iterable de mensajes CDP {"method", "params"} (ej: NetworkCapture.network_events)
+        slowest_n: Cantidad de peticiones más lentas a reportar por página
+        third_party_n: Cantidad de dominios de terceros a reportar por página
+
+    Returns:
+        list: Un dict por página (ver _summarize_page)
+    """
+    pages = []
+    requests = {}  # requestId -> estado de la petición
+    main_frame = None
+
+    for event in events:
+        method = event.get('method', '')
+        params = event.get('params', {})
+        request_id = params.get('requestId')
+        if not request_id:
+            continue
+
+        if method == 'Network.requestWillBeSent':
+            request = params.get('request', {})
+            url = request.get('url', '')
+            is_navigation = params.get('type') == 'Document' and request_id == params.get('loaderId')
+            if is_navigation and main_frame is None:
+                main_frame = params.get('frameId')
+
+            if request_id in requests and params.get('redirectResponse'):
+                # Redirect: misma petición, nuevo salto (se conserva el inicio original)
+                requests[request_id]['url'] = url
+                if is_navigation and pages and pages[-1]['document_id'] == request_id:
+                    pages[-1]['url'] = url
+                continue
+
+            if is_navigation and params.get('frameId') == main_frame:
+                pages.append({'url': url, 'document_id': request_id, 'wall_time': params.get('wallTime')})
+            elif not pages:
+                pages.append({'url': '(initial)', 'document_id': None, 'wall_time': params.get('wallTime')})
+
+            requests[request_id] = {
+                'request_id': request_id,
+                'page': len(pages) - 1,
+                'url': url,
+                'type': params.get('type', 'Other'),
+                'priority': request.get('initialPriority', ''),
+                'start': params.get('timestamp'),
+                'end': None,
+                'status': None,
+                'ttfb': None,
+                'wait': None,
+                'bytes': 0,
+                'failed': False,
+            }
+
+        elif method == 'Network.responseReceived' and request_id in requests:
+            response = params.get('response', {})
+            state = requests[request_id]
+            state['status'] = response.get('status')
+            timing = response.get('timing')
+            if timing and timing.get('receiveHeadersEnd', -1) >= 0:
+                state['ttfb'] = timing['receiveHeadersEnd']
+                state['wait'] = max(0.0, timing['receiveHeadersEnd'] - max(timing.get('sendEnd', 0), 0))
+
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed') and request_id in requests:
+            state = requests[request_id]
+            state['end'] = params.get('timestamp')
+            state['bytes'] = int(params.get('encodedDataLength') or 0)
+            state['failed'] = method == 'Network.loadingFailed'
+
+    by_page = [[] for _ in pages]
+    for state in requests.values():
+        by_page[state['page']].append(state)
+
+    return [
+        _summarize_page(index, page, by_page[index], slowest_n, third_party_n)
+        for index, page in enumerate(pages)
+    ]
+
+
+def _summarize_page(index, page, page_requests, slowest_n, third_party_n):
+    """Resume las peticiones de una página en un dict de métricas."""
+    first_party = site_of(page['url']) if page['document_id'] else None
+    by_type = {}
+    api_ttfb = []
+    intervals = []
+    third_party = {}
+    transfer_bytes = failed = server_wait = 0
+    document_ttfb = None
+
+    for state in page_requests:
+        by_type[state['type']] = by_type.get(state['type'], 0) + 1
+        transfer_bytes += state['bytes']
+        failed += state['failed']
+        duration = None
+        if state['start'] is not None and state['end'] is not None:
+            intervals.append((state['start'], state['end']))
+            duration = (state['end'] - state['start']) * 1000
+        state['duration'] = duration
+
+        if state['request_id'] == page['document_id'] and state['ttfb'] is not None:
+            document_ttfb = round(state['ttfb'], 1)
+        if state['type'] in API_TYPES and state['ttfb'] is not None:
+            api_ttfb.append(state['ttfb'])
+            server_wait += state['wait'] or 0
+
+        site = site_of(state['url'])
+        if first_party and site and site != first_party and not state['url'].startswith('data:'):
+            domain = third_party.setdefault(site, {'domain': site, 'requests': 0, 'bytes': 0, 'time_ms': 0.0, 'blocking': 0})
+            domain['requests'] += 1
+            domain['bytes'] += state['bytes']
+            domain['time_ms'] += duration or 0
+            if state['type'] in BLOCKING_TYPES and state['priority'] in BLOCKING_PRIORITIES:
+                domain['blocking'] += 1
+
+    api_ttfb.sort()
+    slowest = heapq.nlargest(slowest_n, (s for s in page_requests if s['duration'] is not None),
+                             key=lambda s: s['duration'])
+    third_party_list = sorted(third_party.values(), key=lambda d: (d['blocking'], d['time_ms']), reverse=True)
+    for domain in third_party_list:
+        domain['time_ms'] = round(domain['time_ms'], 1)
+
+    return {
+        'page_index': index,
+        'page_url': page['url'],
+        'wall_time': page['wall_time'],
+        'requests': len(page_requests),
+        'failed_requests': failed,
+        'requests_by_type': by_type,
+        'transfer_bytes': transfer_bytes,
+        'document_ttfb_ms': document_ttfb,
+        'api_requests': len(api_ttfb),
+        'api_ttfb_p50_ms': _percentile(api_ttfb, 50),
+        'api_ttfb_p95_ms': _percentile(api_ttfb, 95),
+        'api_ttfb_max_ms': round(api_ttfb[-1], 1) if api_ttfb else None,
+        'server_wait_ms': round(server_wait, 1),
+        'network_busy_ms': _busy_ms(intervals),
+        'slowest_requests': [
+            {
+                'url': s['url'][:200],
+                'type': s['type'],
+                'status': s['status'],
+                'duration_ms': round(s['duration'], 1),
+                'ttfb_ms': round(s['ttfb'], 1) if s['ttfb'] is not None else None,
+                'bytes': s['bytes'],
+            }
+            for s in slowest
+        ],
+        'third_party_requests': sum(d['requests'] for d in third_party_list),
+        'third_party_bytes': sum(d['bytes'] for d in third_party_list),
+        'third_party_domains': third_party_list[:third_party_n],
+    }
+
+
+def summarize_pages(pages):
+    """
+    Totales de un test a partir de las métricas por página.
+
+    Returns:
+        dict: Peticiones, bytes, espera del servidor y red ocupada totales
+    """
+    return {
+        'pages': len(pages),
+        'requests': sum(p['requests'] for p in pages),
+        'failed_requests': sum(p['failed_requests'] for p in pages),
+        'transfer_bytes': sum(p['transfer_bytes'] for p in pages),
+        'api_requests': sum(p['api_requests'] for p in pages),
+        'server_wait_ms': round(sum(p['server_wait_ms'] for p in pages), 1),
+        'network_busy_ms': round(sum(p['network_busy_ms'] for p in pages), 1),
+        'third_party_requests': sum(p['third_party_requests'] for p in pages),
+        'third_party_bytes': sum(p['third_party_bytes'] for p in pages),
+    }
@@ -0,0 +1,180 @@
+"""
+network_steps.py - Correlación de peticiones de red con los pasos de Allure
+
+Los tests agrupan sus acciones en `with allure.step(...)`, pero los eventos de
+red capturados no sabían qué paso los disparó. Este módulo agrega:
+
+- RequestTimeIndex: arreglos ordenados por hora de inicio (wallTime) de cada
+  petición; "qué peticiones empezaron entre t0 y t1" se responde con dos
+  búsquedas binarias (bisect), O(log n) + resultados
+- summarize_requests: conteos, latencias y las más lentas de un grupo de peticiones
+- AllureStepTracker: plugin de allure_commons (hooks start_step/stop_step) que
+  marca el inicio/fin de cada paso en NetworkCapture y adjunta al paso, al
+  cerrarse, las peticiones que empezaron durante él
+
+Importante:
+- Las marcas de paso usan time.time() del proceso de tests y las peticiones el
+  wallTime del navegador: ambos relojes coinciden en ejecución local (en un grid
+  remoto puede haber desfase)
+- Una petición se asigna al paso en el que EMPEZÓ; las que siguen en curso al
+  cerrar el paso se reportan como "pending"
+"""
+
+# ==================== IMPORTS ====================
+import json
+import logging
+from bisect import bisect_left, bisect_right
+import allure
+import allure_commons
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+
+# ==================== ÍNDICE POR TIEMPO ====================
+class RequestTimeIndex:
+    """
+    Índice de peticiones ordenado por hora de inicio (segundos epoch).
+
+    Los eventos llegan casi siempre en orden: agregar al final es O(1) y solo
+    las llegadas fuera de orden pagan la inserción ordenada.
+    """
+
+    def __init__(self):
+        self._starts = []  # Horas de inicio ordenadas
+        self._ids = []  # requestId en la misma posición que _starts
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, request_id, start):
+        """Indexa una petición por su hora de inicio."""
+        if not self._starts or start >= self._starts[-1]:
+            self._starts.append(start)
+            self._ids.append(request_id)
+            return
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._ids.insert(position, request_id)
+
+    def between(self, start, end):
+        """
+        Peticiones que empezaron en [start, end].
+
+        Returns:
+            list: requestIds en orden de inicio
+        """
+        return self._ids[bisect_left(self._starts, start):bisect_right(self._starts, end)]
+
+    def clear(self):
+        """Vacía el índice."""
+        self._starts.clear()
+        self._ids.clear()
+
+
+# ==================== RESUMEN DE PETICIONES ====================
+def summarize_requests(request_ids, requests, responses, finished, slowest_n=3):
+    """
+    Resume un grupo de peticiones (ej: las de un paso).
+
+    Args:
+        request_ids: requestIds a resumir
+        requests: requestId -> params de Network.requestWillBeSent
+        responses: requestId -> params de Network.responseReceived
+        finished: requestId -> params de Network.loadingFinished / loadingFailed
+        slowest_n: Cantidad de peticiones más lentas a incluir
+
+    Returns:
+        dict: Conteos por tipo, fallidas, en curso, bytes y latencias (ms)
+    """
+    by_type = {}
+    durations = []
+    failed = pending = transfer_bytes = 0
+    for request_id in request_ids:
+        params = requests.get(request_id, {})
+        resource_type = params.get('type', 'Other')
+        by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        end = finished.get(request_id)
+        if end is None:
+            pending += 1
+            continue
+        failed += 'errorText' in end
+        transfer_bytes += int(end.get('encodedDataLength') or 0)
+        if params.get('timestamp') is not None and end.get('timestamp') is not None:
+            response = responses.get(request_id, {}).get('response', {})
+            durations.append((
+                (end['timestamp'] - params['timestamp']) * 1000,
+                params.get('request', {}).get('url', '')[:200],
+                resource_type,
+                response.get('status'),
+            ))
+
+    durations.sort(reverse=True)
+    latencies = sorted(d[0] for d in durations)
+    return {
+        'requests': len(request_ids),
+        'requests_by_type': by_type,
+        'failed': failed,
+        'pending': pending,
+        'transfer_bytes': transfer_bytes,
+        'latency_p50_ms': round(latencies[len(latencies) // 2], 1) if latencies else None,
+        'latency_max_ms': round(latencies[-1], 1) if latencies else None,
+        'slowest': [
+            {'url': url, 'type': resource_type, 'status': status, 'duration_ms': round(duration, 1)}
+            for duration, url, resource_type, status in durations[:slowest_n]
+        ],
+    }
+
+
+# ==================== PLUGIN DE ALLURE ====================
+class AllureStepTracker:
+    """
+    Plugin de allure_commons que correlaciona cada allure.step con la red.
+
+    Uso (lo hace NetworkCapture.track_allure_steps()):
+        tracker = AllureStepTracker(network_capture)
+        tracker.register()
+        ...
+        tracker.unregister()
+    """
+
+    def __init__(self, capture, attach=True):
+        """
+        Args:
+            capture: NetworkCapture que recibe las marcas de paso
+            attach: Si True adjunta "Network (step)" a cada paso con peticiones
+        """
+        self.capture = capture
+        self.attach = attach
+        self.registered = False
+
+    def register(self):
+        """Registra el plugin en allure_commons (idempotente)."""
+        if not self.registered:
+            allure_commons.plugin_manager.register(self)
+            self.registered = True
+        return self
+
+    def unregister(self):
+        """Quita el plugin (seguro de llamar varias veces)."""
+        if self.registered:
+            allure_commons.plugin_manager.unregister(self)
+            self.registered = False
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self.capture.mark_step_start(uuid, title)
+
+    @allure_commons.hookimpl(tryfirst=True)
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        # tryfirst: se adjunta ANTES de que el listener de Allure cierre el paso
+        try:
+            summary = self.capture.mark_step_end(uuid)
+            if self.attach and summary and summary['requests']:
+                allure.attach(
+                    json.dumps(summary, indent=2, ensure_ascii=False),
+                    name="Network (step)",
+                    attachment_type=allure.attachment_type.JSON
+                )
+        except Exception as e:
+            logger.warning(f"Could not correlate network requests with step: {str(e)[:100]}")
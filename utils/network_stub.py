@@ -0,0 +1,372 @@
+"""
+network_stub.py - Interceptación de peticiones (CDP Fetch) para grabar, reproducir o demorar APIs
+
+Los Casos 1 y 2 pasan gran parte del tiempo esperando las APIs reales de búsqueda
+y disponibilidad de nuxqa. Con Fetch.enable el navegador PAUSA cada petición que
+coincide con un patrón y espera a que el test decida qué hacer con ella.
+
+Modos:
+- replay: responde con la respuesta grabada (Fetch.fulfillRequest) sin tocar el
+  backend; si no hay grabación la petición sigue al servidor real (passthrough)
+- record: deja pasar la petición, lee el body real al recibir la respuesta
+  (Fetch.getResponseBody) y lo guarda en el store
+- latencia (--network-latency-ms): demora artificial antes de continuar/responder;
+  combinable con replay o sola (mide el cliente con un backend "lento" controlado)
+
+Store en disco (un directorio por caso):
+    network_stubs/case_1/<método>_<host>_<ruta>.json
+    {"key": ..., "responses": [{"status", "headers", "body", "base64", ...}, ...]}
+
+- La clave es método + host + ruta (sin query ni body por defecto: las fechas
+  cambian cada día y la grabación debe seguir sirviendo)
+- Un mismo endpoint llamado varias veces (ej: ida y vuelta en el Caso 2) guarda
+  una secuencia; en replay se sirven en orden y se repite la última
+
+Solo Chrome/Edge (CDP). La sesión CDP corre en un thread propio con trio sobre
+driver.bidi_connection(), igual que el screencast del VideoRecorder.
+"""
+
+# ==================== IMPORTS ====================
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+STUB_MODES = ("none", "replay", "record")
+INTERCEPTED_TYPES = ("XHR", "Fetch")  # Solo llamadas a APIs (nunca documentos ni scripts)
+# El body grabado ya viene decodificado: estos headers de la respuesta original no aplican
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+# ==================== STORE DE RESPUESTAS ====================
+class StubStore:
+    """
+    Respuestas grabadas por endpoint, persistidas como un JSON por clave.
+
+    Atributos:
+    - directory: Carpeta del store (ej: network_stubs/case_1)
+    - match_query: Si True la query string forma parte de la clave
+    - match_body: Si True un hash del postData forma parte de la clave
+    """
+
+    def __init__(self, directory, match_query=False, match_body=False):
+        """
+        Args:
+            directory: Carpeta donde se leen/escriben las grabaciones
+            match_query: Incluir la query (ordenada) en la clave
+            match_body: Incluir un hash del body de la petición en la clave
+        """
+        self.directory = directory
+        self.match_query = match_query
+        self.match_body = match_body
+        self._entries = {}  # clave -> lista de respuestas
+        self._cursors = {}  # clave -> siguiente respuesta a servir (replay)
+        self._recorded = set()  # claves grabadas en esta ejecución (se reescriben al guardar)
+        self._lock = threading.Lock()
+
+    def key_for(self, method, url, post_data=None):
+        """
+        Clave de un endpoint: "GET api.example.com/v1/availability".
+
+        Returns:
+            str: Clave normalizada
+        """
+        parts = urlsplit(url)
+        key = f"{method.upper()} {parts.hostname or ''}{parts.path}"
+        if self.match_query and parts.query:
+            key += "?" + urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        if self.match_body and post_data:
+            key += " #" + hashlib.sha1(post_data.encode("utf-8")).hexdigest()[:12]
+        return key
+
+    def _filename(self, key):
+        """Nombre de archivo legible y seguro para una clave."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", key).strip("_")[:120]
+        return os.path.join(self.directory, f"{slug}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.json")
+
+    def load(self):
+        """
+        Carga todas las grabaciones del directorio.
+
+        Returns:
+            int: Cantidad de endpoints cargados
+        """
+        if not os.path.isdir(self.directory):
+            logger.info(f"Stub store {self.directory} does not exist yet")
+            return 0
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries[data["key"]] = data["responses"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping invalid stub file {name}: {e}")
+        logger.info(f"Loaded {len(self._entries)} stubbed endpoints from {self.directory}")
+        return len(self._entries)
+
+    def next_response(self, key):
+        """
+        Siguiente respuesta grabada de un endpoint (la última se repite).
+
+        Returns:
+            dict o None si el endpoint no está grabado
+        """
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                return None
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+            return responses[min(index, len(responses) - 1)]
+
+    def record(self, key, response):
+        """Agrega una respuesta real a la secuencia del endpoint (reemplaza grabaciones anteriores)."""
+        with self._lock:
+            if key not in self._recorded:
+                self._entries[key] = []
+                self._recorded.add(key)
+            self._entries[key].append(response)
+
+    def save(self):
+        """
+        Escribe en disco los endpoints grabados en esta ejecución.
+
+        Returns:
+            int: Cantidad de archivos escritos
+        """
+        with self._lock:
+            recorded = {key: list(self._entries[key]) for key in self._recorded}
+        if not recorded:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        for key, responses in recorded.items():
+            with open(self._filename(key), "w", encoding="utf-8") as f:
+                json.dump({"key": key, "responses": responses}, f, indent=2, ensure_ascii=False)
+        logger.info(f"Saved {len(recorded)} recorded endpoints to {self.directory}")
+        return len(recorded)
+
+
+# ==================== INTERCEPTOR ====================
+class NetworkStub:
+    """
+    Interceptor CDP Fetch para un test: replay, record y/o latencia artificial.
+
+    Uso:
+        stub = NetworkStub(driver, store, endpoints=["*/api/*availability*"], mode="replay")
+        stub.start()   # ANTES de navegar
+        ...
+        stub.stop()    # record: guarda el store
+
+    Atributos de estadística (ver get_stats):
+    - intercepted, replayed, recorded, passthrough, delayed, errors
+    """
+
+    def __init__(self, driver, store, endpoints, mode="replay", latency_ms=0):
+        """
+        Args:
+            driver: WebDriver de Chrome/Edge
+            store: StubStore del caso
+            endpoints: Patrones de URL estilo CDP (* y ?) a interceptar
+            mode: "replay", "record" o "none" (solo latencia)
+            latency_ms: Demora artificial por petición interceptada (0 = sin demora)
+        """
+        if mode not in STUB_MODES:
+            raise ValueError(f"Network stub mode '{mode}' not supported. Use: {', '.join(STUB_MODES)}")
+        self.driver = driver
+        self.store = store
+        self.endpoints = list(endpoints)
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.target_id = None
+        self.is_running = False
+        self.stats = {"intercepted": 0, "replayed": 0, "recorded": 0, "passthrough": 0, "delayed": 0, "errors": 0}
+        self.served_ms = []  # Tiempo de atención de cada petición interceptada (incluye latencia)
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self, timeout=10.0):
+        """
+        Abre la sesión CDP y habilita Fetch sobre la ventana actual.
+
+        Returns:
+            bool: True si la interceptación quedó activa
+        """
+        if self.mode == "replay":
+            self.store.load()
+        self.target_id = self.driver.current_window_handle
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name="network-stub", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error or not self._ready.is_set():
+            logger.error(f"Network stub failed to start: {self._error or 'timeout'}")
+            self.stop()
+            return False
+        logger.info(f"Network stub started (mode: {self.mode}, latency: {self.latency_ms}ms, "
+                    f"endpoints: {len(self.endpoints)})")
+        return True
+
+    def stop(self):
+        """Deshabilita Fetch, cierra la sesión CDP y (record) guarda el store."""
+        self.is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        if self.mode == "record":
+            self.store.save()
+        logger.info(f"Network stub stopped: {self.stats}")
+
+    def _run(self):
+        """Thread del interceptor: ejecuta la sesión CDP async (trio)."""
+        try:
+            import trio
+            trio.run(self._fetch_session)
+        except Exception as e:
+            self._error = str(e)[:200]
+            logger.warning(f"Network stub session ended: {self._error}")
+        finally:
+            self._ready.set()
+
+    async def _fetch_session(self):
+        """
+        Escucha Fetch.requestPaused y atiende cada petición en su propia tarea.
+
+        record pausa en la etapa Response (ya con status/headers reales);
+        replay y latencia pausan en la etapa Request (antes de salir al backend).
+        """
+        import trio
+
+        async with self.driver.bidi_connection() as connection:
+            cdp, devtools = connection.cdp, connection.devtools
+            conn = cdp.get_connection_context("network_stub")
+
+            targets = await conn.execute(devtools.target.get_targets())
+            page_ids = [t.target_id for t in targets if t.type_ == "page"]
+            target_id = self.target_id if self.target_id in page_ids else page_ids[0]
+
+            async with conn.open_session(target_id) as session:
+                stage = devtools.fetch.RequestStage.RESPONSE if self.mode == "record" else devtools.fetch.RequestStage.REQUEST
+                paused = session.listen(devtools.fetch.RequestPaused)
+                await session.execute(devtools.fetch.enable(patterns=[
+                    devtools.fetch.RequestPattern(url_pattern=pattern, request_stage=stage)
+                    for pattern in self.endpoints
+                ]))
+                self._ready.set()
+
+                async with trio.open_nursery() as nursery:
+                    async def receive_paused():
+                        async for event in paused:
+                            nursery.start_soon(self._handle_paused, session, devtools, event)
+
+                    nursery.start_soon(receive_paused)
+                    while self.is_running:
+                        await trio.sleep(0.1)
+                    try:
+                        await session.execute(devtools.fetch.disable())
+                    except Exception:
+                        pass  # La ventana pudo cerrarse al final del test
+                    nursery.cancel_scope.cancel()
+
+    # ==================== ATENCIÓN DE PETICIONES ====================
+
+    async def _handle_paused(self, session, devtools, event):
+        """Decide qué hacer con una petición pausada (nunca la deja colgada)."""
+        import trio
+
+        fetch = devtools.fetch
+        started = None
+        try:
+            if str(event.resource_type.value) not in INTERCEPTED_TYPES:
+                await session.execute(fetch.continue_request(event.request_id))
+                return
+
+            self.stats["intercepted"] += 1
+            started = time.perf_counter()
+            request = event.request
+            key = self.store.key_for(request.method, request.url, request.post_data)
+
+            if self.latency_ms:
+                self.stats["delayed"] += 1
+                await trio.sleep(self.latency_ms / 1000)
+
+            if self.mode == "record" and event.response_status_code is not None:
+                body, is_base64 = await session.execute(fetch.get_response_body(event.request_id))
+                self.store.record(key, {
+                    "url": request.url,
+                    "status": event.response_status_code,
+                    "status_text": event.response_status_text or "",
+                    "headers": [{"name": h.name, "value": h.value} for h in (event.response_headers or [])],
+                    "body": body,
+                    "base64": is_base64,
+                    "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                })
+                self.stats["recorded"] += 1
+                await session.execute(fetch.continue_request(event.request_id))
+
+            elif self.mode == "replay":
+                recorded = self.store.next_response(key)
+                if recorded is None:
+                    logger.info(f"No recorded response for {key}, passing through")
+                    self.stats["passthrough"] += 1
+                    await session.execute(fetch.continue_request(event.request_id))
+                else:
+                    await session.execute(fetch.fulfill_request(
+                        event.request_id,
+                        response_code=recorded["status"],
+                        response_headers=[
+                            fetch.HeaderEntry(name=h["name"], value=h["value"])
+                            for h in recorded["headers"] if h["name"].lower() not in DROPPED_HEADERS
+                        ],
+                        body=recorded["body"] if recorded.get("base64") else
+                        base64.b64encode(recorded["body"].encode("utf-8")).decode("ascii"),
+                        response_phrase=recorded.get("status_text") or None,
+                    ))
+                    self.stats["replayed"] += 1
+
+            else:
+                await session.execute(fetch.continue_request(event.request_id))
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Error handling intercepted request: {str(e)[:150]}")
+            try:
+                await session.execute(fetch.continue_request(event.request_id))
+            except Exception:
+                pass  # Ya atendida o la ventana se cerró
+        finally:
+            if started is not None:
+                self.served_ms.append((time.perf_counter() - started) * 1000)
+
+    # ==================== REPORTES ====================
+
+    def get_stats(self):
+        """
+        Estadísticas del interceptor para adjuntar al reporte.
+
+        Returns:
+            dict: Modo, latencia, contadores y tiempo promedio de atención
+        """
+        served = sorted(self.served_ms)
+        return dict(
+            self.stats,
+            mode=self.mode,
+            latency_ms=self.latency_ms,
+            endpoints=self.endpoints,
+            store=self.store.directory,
+            avg_served_ms=round(sum(served) / len(served), 1) if served else None,
+            max_served_ms=round(served[-1], 1) if served else None,
+        )
@@ -0,0 +1,324 @@
+"""
+payload_extractor.py - Extracción declarativa de campos desde bodies JSON capturados
+
+En lugar de recorrer el JSON a mano en código (ej: result.data.journeys[...]),
+los campos a extraer se describen con una especificación (spec) en los archivos
+de configuración (ide_test/config/case_mappings.json -> "extraction_specs").
+
+Sintaxis de rutas (subconjunto de JSONPath):
+- $            raíz del documento
+- .campo       clave de un objeto
+- [n]          elemento n de una lista (acepta negativos: [-1])
+- [*]          todos los elementos de una lista (o valores de un objeto)
+- $index       (solo en fields) posición del registro en la lista
+
+Estructura de una spec:
+    {
+      "records": ["$.result.data.journeys[*]", "$.journeys[*]"],  # primera ruta con resultados
+      "output": "journeys",          # clave del resultado (por defecto: nombre de la spec)
+      "min_records": 2,              # registros mínimos para aceptar un body
+      "fields": {
+        "origin": "origin",                                   # ruta relativa al registro
+        "journey_index": "$index",
+        "std": {"path": "std", "type": "str"},                # con tipo
+        "fares": {"path": "fares[*]", "fields": {"id": "id"}} # lista anidada
+      }
+    }
+
+Tipos soportados: str, int, float, bool, datetime (ISO 8601), list (todos los valores).
+Un campo sin "type" toma el primer valor encontrado tal cual (o None).
+
+Rendimiento:
+- Cada body se parsea UNA vez y el árbol se cachea por requestId (ParsedBodyCache)
+- Las rutas se compilan una vez (lru_cache)
+- La búsqueda se detiene en el primer body que cumple min_records; si ninguno
+  lo cumple se devuelve el mejor (el de más registros)
+"""
+
+# ==================== IMPORTS ====================
+import json
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+INDEX_FIELD = "$index"
+FIELD_TYPES = ("str", "int", "float", "bool", "datetime", "list")
+_TOKEN_PATTERN = re.compile(r"\.([^.\[\]]+)|\[(\*|-?\d+)\]")
+
+# Spec por defecto del Case 3 (la misma que ide_test/config/case_mappings.json)
+SESSION_JOURNEYS_SPEC = {
+    "records": ["$.result.data.journeys[*]", "$.result.journeys[*]", "$.journeys[*]"],
+    "output": "journeys",
+    "min_records": 2,
+    "fields": {
+        "journey_index": "$index",
+        "origin": "origin",
+        "destination": "destination",
+        "std": "std",
+        "closingCheckInDate": "closingCheckInDate",
+        "openingCheckInDate": "openingCheckInDate",
+        "fares": {"path": "fares[*]", "fields": {"paxCode": "paxCode", "id": "id", "productClass": "productClass"}},
+        "segments": {"path": "segments[*]", "fields": {"etd": "etd", "status": "status", "std": "std"}},
+    },
+}
+
+
+# ==================== RUTAS ====================
+@lru_cache(maxsize=256)
+def compile_path(expression):
+    """
+    Compila una ruta ("$.a.b[*].c" o relativa "a.b[0]") a una tupla de pasos.
+
+    Returns:
+        tuple: Pasos (str = clave, int = índice, "*" = comodín)
+
+    Raises:
+        ValueError: Si la ruta tiene sintaxis inválida
+    """
+    text = expression.strip()
+    if text.startswith("$"):
+        text = text[1:]
+    if text and not text.startswith((".", "[")):
+        text = "." + text
+
+    steps = []
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        if match.start() != position:
+            raise ValueError(f"Invalid path expression: {expression}")
+        key, index = match.groups()
+        if key is not None:
+            steps.append(key)
+        elif index == "*":
+            steps.append("*")
+        else:
+            steps.append(int(index))
+        position = match.end()
+    if position != len(text):
+        raise ValueError(f"Invalid path expression: {expression}")
+    return tuple(steps)
+
+
+def evaluate_path(steps, node):
+    """
+    Evalúa una ruta compilada sobre un árbol JSON.
+
+    Returns:
+        list: Valores encontrados (vacía si la ruta no existe)
+    """
+    current = [node]
+    for step in steps:
+        following = []
+        for value in current:
+            if step == "*":
+                if isinstance(value, list):
+                    following.extend(value)
+                elif isinstance(value, dict):
+                    following.extend(value.values())
+            elif isinstance(step, int):
+                if isinstance(value, list) and -len(value) <= step < len(value):
+                    following.append(value[step])
+            elif isinstance(value, dict) and step in value:
+                following.append(value[step])
+        current = following
+        if not current:
+            break
+    return current
+
+
+# ==================== TIPOS ====================
+def _coerce(value, type_name):
+    """Convierte un valor al tipo declarado (None si no se puede)."""
+    if value is None:
+        return None
+    try:
+        if type_name == "str":
+            if isinstance(value, (dict, list)):
+                return json.dumps(value, ensure_ascii=False)
+            return str(value)
+        if type_name == "int":
+            return int(value)
+        if type_name == "float":
+            return float(value)
+        if type_name == "bool":
+            if isinstance(value, str):
+                return value.strip().lower() in ("true", "1", "yes")
+            return bool(value)
+        if type_name == "datetime":
+            return value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        logger.debug(f"Could not coerce {value!r} to {type_name}")
+        return None
+    return value
+
+
+# ==================== SPECS ====================
+class ExtractionSpec:
+    """
+    Especificación compilada: rutas de registros + campos (con tipos y anidados).
+
+    Atributos:
+    - name: Nombre de la spec
+    - output: Clave bajo la que se devuelven los registros
+    - min_records: Registros mínimos para aceptar un body
+    """
+
+    def __init__(self, name, spec):
+        """
+        Args:
+            name: Nombre de la spec (ej: "session_journeys")
+            spec: Dict con records, fields, output y min_records (ver docstring del módulo)
+        """
+        self.name = name
+        records = spec.get("records", "$")
+        self.record_paths = [compile_path(p) for p in ([records] if isinstance(records, str) else records)]
+        self.output = spec.get("output", name)
+        self.min_records = int(spec.get("min_records", 1))
+        self.fields = self._compile_fields(spec.get("fields", {}))
+
+    @classmethod
+    def _compile_fields(cls, fields):
+        """Compila {nombre: ruta | {path, type, fields}} a una lista de tuplas."""
+        compiled = []
+        for name, field in fields.items():
+            if isinstance(field, str):
+                field = {"path": field}
+            path = field.get("path", name)
+            if field.get("type") is not None and field["type"] not in FIELD_TYPES:
+                raise ValueError(f"Unsupported field type for '{name}': {field['type']}")
+            steps = None if path == INDEX_FIELD else compile_path(path)
+            nested = cls._compile_fields(field["fields"]) if "fields" in field else None
+            compiled.append((name, steps, field.get("type"), nested))
+        return compiled
+
+    @classmethod
+    def _build_record(cls, node, fields, index):
+        """Arma un registro a partir de un nodo del árbol."""
+        record = {}
+        for name, steps, type_name, nested in fields:
+            if steps is None:
+                record[name] = index
+                continue
+            values = evaluate_path(steps, node)
+            if nested is not None:
+                record[name] = [cls._build_record(v, nested, i) for i, v in enumerate(values)]
+            elif type_name == "list":
+                record[name] = values
+            else:
+                value = values[0] if values else None
+                record[name] = _coerce(value, type_name) if type_name else value
+        return record
+
+    def extract(self, tree):
+        """
+        Extrae los registros de un árbol JSON.
+
+        Returns:
+            list: Registros (None si ninguna ruta de records existe en el árbol)
+        """
+        for steps in self.record_paths:
+            nodes = evaluate_path(steps, tree)
+            if nodes:
+                return [self._build_record(node, self.fields, i) for i, node in enumerate(nodes)]
+        return None
+
+
+def load_specs(specs):
+    """
+    Compila un dict {nombre: spec} (ej: case_mappings["case_3"]["extraction_specs"]).
+
+    Returns:
+        list: ExtractionSpec en el mismo orden
+    """
+    return [ExtractionSpec(name, spec) for name, spec in (specs or {}).items()]
+
+
+# ==================== CACHE DE BODIES PARSEADOS ====================
+class ParsedBodyCache:
+    """
+    Cache de árboles JSON por requestId: cada body se parsea una sola vez.
+
+    Los bodies que no son JSON válido se recuerdan como None (no se reintentan).
+    """
+
+    def __init__(self):
+        self._trees = {}
+        self.parses = 0  # json.loads ejecutados (para diagnóstico)
+
+    def get(self, request_id, load_body):
+        """
+        Devuelve el árbol parseado de un body.
+
+        Args:
+            request_id: requestId de la respuesta
+            load_body: Función sin argumentos que devuelve el body (str o None)
+
+        Returns:
+            Árbol JSON o None (sin body o JSON inválido)
+        """
+        if request_id in self._trees:
+            return self._trees[request_id]
+        body = load_body()
+        if body is None:
+            return None  # Sin body aún: se puede reintentar más tarde
+        tree = None
+        try:
+            self.parses += 1
+            tree = json.loads(body)
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Failed to parse JSON for requestId {request_id}: {e}")
+        self._trees[request_id] = tree
+        return tree
+
+    def clear(self):
+        """Olvida todos los árboles cacheados."""
+        self._trees.clear()
+
+
+# ==================== EXTRACCIÓN SOBRE CANDIDATOS ====================
+def extract_from_candidates(specs, candidates, cache):
+    """
+    Aplica varias specs sobre bodies candidatos (en orden), parseando cada body una vez.
+
+    Args:
+        specs: Lista de ExtractionSpec
+        candidates: Lista de (request_id, load_body)
+        cache: ParsedBodyCache compartida
+
+    Returns:
+        dict: {spec.name: {spec.output: [registros], "requestId": id, "complete": bool}}
+              Una spec sin ningún body que la cumpla no aparece en el resultado.
+              complete=False indica que se usó el mejor body sin llegar a min_records.
+    """
+    results = {}
+    best = {}  # spec.name -> (cantidad, request_id, registros)
+    pending = list(specs)
+
+    for request_id, load_body in candidates:
+        if not pending:
+            break
+        tree = cache.get(request_id, load_body)
+        if tree is None:
+            continue
+        for spec in list(pending):
+            records = spec.extract(tree)
+            if not records:
+                continue
+            if len(records) >= spec.min_records:
+                results[spec.name] = {spec.output: records, "requestId": request_id, "complete": True}
+                pending.remove(spec)
+            elif len(records) > best.get(spec.name, (0,))[0]:
+                best[spec.name] = (len(records), request_id, records)
+
+    # Specs sin body completo: usar el mejor encontrado
+    for spec in pending:
+        if spec.name in best:
+            count, request_id, records = best[spec.name]
+            logger.info(f"Spec '{spec.name}': no body with {spec.min_records}+ records, using best ({count}) from {request_id}")
+            results[spec.name] = {spec.output: records, "requestId": request_id, "complete": False}
+    return results
@@ -0,0 +1,254 @@
+"""
+seatmap_scanner.py - Lectura del seatmap completo en UNA llamada y estrategias de asignación
+
+SeatmapPage leía get_attribute("class") asiento por asiento: cada lectura es un
+round-trip HTTP a WebDriver, repetido por pasajero y por vuelo (Case 2). Este
+módulo lee toda la grilla con un solo execute_script y decide en Python.
+
+Snapshot (scan_seatmap):
+- Una fila compacta por asiento: [id, fila, letra, cabina, x, flags, elemento]
+- flags (bits): 1 selected, 2 unavailable, 4 occupied, 8 upfront (Premium), 16 xlarge (Plus)
+- elemento: WebElement solo de los asientos disponibles (para el click, sin otra búsqueda)
+- x: posición horizontal en pantalla; los pasillos se detectan como los huecos
+  más grandes entre asientos consecutivos de una fila
+
+Estrategias (SEAT_STRATEGIES, elegibles con --seat-strategy):
+- first_available: el primero disponible (fila, luego posición), como antes
+- adjacent: bloque de N asientos contiguos en la misma fila sin cruzar pasillo
+- window: ventanas primero
+- aisle: pasillos primero
+
+Una estrategia recibe (snapshot, cantidad, filtro) y devuelve los candidatos en
+orden de preferencia; el page object toma el primero y usa el resto como respaldo.
+"""
+
+# ==================== IMPORTS ====================
+import logging
+import time
+from collections import namedtuple
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+DEFAULT_SEAT_STRATEGY = "first_available"
+AISLE_GAP_FACTOR = 1.5  # Un hueco > 1.5x el hueco normal entre asientos es un pasillo
+ALERT_MODAL_SELECTOR = "ngb-modal-window.modal-alert"
+
+_FLAG_SELECTED, _FLAG_UNAVAILABLE, _FLAG_OCCUPIED, _FLAG_UPFRONT, _FLAG_XLARGE = 1, 2, 4, 8, 16
+
+# Asientos reales: <button class="seat ..." id="4A_ECONOMY"> (también _PLUS y _PREMIUM)
+_SCAN_JS = """
+var pattern = /^(\\d+)([A-Z]+)_([A-Z]+)$/;
+var buttons = document.querySelectorAll('button[id]');
+var seats = [];
+for (var i = 0; i < buttons.length; i++) {
+    var button = buttons[i];
+    var match = pattern.exec(button.id);
+    var classes = button.className || '';
+    if (!match || classes.indexOf('seat') < 0) { continue; }
+    var flags = (classes.indexOf('selected') >= 0 ? 1 : 0) | (classes.indexOf('unavailable') >= 0 ? 2 : 0)
+        | (classes.indexOf('occupied') >= 0 ? 4 : 0) | (classes.indexOf('upfront') >= 0 ? 8 : 0)
+        | (classes.indexOf('xlarge') >= 0 ? 16 : 0);
+    var x = Math.round(button.getBoundingClientRect().left);
+    seats.push([button.id, parseInt(match[1], 10), match[2], match[3], x, flags, (flags & 7) ? null : button]);
+}
+return seats;
+"""
+
+# Resultado del click en un asiento: "modal" (alerta de error), "selected" o false (aún no)
+_SEAT_OUTCOME_JS = """
+if (document.querySelector(arguments[1])) { return 'modal'; }
+var seat = document.getElementById(arguments[0]);
+return (seat && (seat.className || '').indexOf('selected') >= 0) ? 'selected' : false;
+"""
+
+
+# ==================== SNAPSHOT ====================
+class Seat(namedtuple("Seat", "id row letter cabin x flags element")):
+    """Asiento del snapshot (inmutable)."""
+    __slots__ = ()
+
+    @property
+    def selected(self):
+        return bool(self.flags & _FLAG_SELECTED)
+
+    @property
+    def available(self):
+        return not self.flags & (_FLAG_SELECTED | _FLAG_UNAVAILABLE | _FLAG_OCCUPIED)
+
+    @property
+    def upfront(self):
+        return bool(self.flags & _FLAG_UPFRONT)
+
+    @property
+    def xlarge(self):
+        return bool(self.flags & _FLAG_XLARGE)
+
+    @property
+    def seat_type(self):
+        """Tipo para logs: Premium (upfront), Plus (xlarge) o Economy."""
+        return "Premium" if self.upfront else "Plus" if self.xlarge else "Economy"
+
+
+def economy_seat(seat):
+    """Filtro Economy: cabina ECONOMY sin clases upfront/xlarge (como select_first_available_economy_seat)."""
+    return seat.cabin == "ECONOMY" and not seat.upfront and not seat.xlarge
+
+
+def any_seat(seat):
+    """Filtro de cualquier tipo (Economy, Plus o Premium)."""
+    return True
+
+
+class SeatmapSnapshot:
+    """
+    Grilla de asientos leída en un solo round-trip.
+
+    Atributos:
+    - seats: Lista de Seat ordenada por fila y posición horizontal
+    - scan_ms: Duración del execute_script
+    """
+
+    def __init__(self, rows, scan_ms=0.0):
+        self.seats = sorted((Seat(*row) for row in rows), key=lambda s: (s.row, s.x, s.letter))
+        self.scan_ms = scan_ms
+        self._rows = {}
+        for seat in self.seats:
+            self._rows.setdefault(seat.row, []).append(seat)
+        self._blocks = {}  # fila -> lista de bloques (asientos entre pasillos)
+
+    def __len__(self):
+        return len(self.seats)
+
+    def get(self, seat_id):
+        """Asiento por ID (None si no está en el snapshot)."""
+        return next((seat for seat in self.seats if seat.id == seat_id), None)
+
+    def candidates(self, seat_filter=any_seat):
+        """Asientos disponibles que cumplen el filtro, en orden de fila/posición."""
+        return [seat for seat in self.seats if seat.available and seat_filter(seat)]
+
+    def blocks(self, row):
+        """
+        Bloques de asientos de una fila separados por pasillos.
+
+        Returns:
+            list: Listas de Seat (izquierda a derecha)
+        """
+        if row not in self._blocks:
+            seats = self._rows.get(row, [])
+            gaps = [b.x - a.x for a, b in zip(seats, seats[1:])]
+            positive = sorted(g for g in gaps if g > 0)
+            # Sin posiciones (página sin layout): la fila completa es un bloque
+            threshold = positive[0] * AISLE_GAP_FACTOR if positive else None
+            blocks, current = [], seats[:1]
+            for seat, gap in zip(seats[1:], gaps):
+                if threshold is not None and gap > threshold:
+                    blocks.append(current)
+                    current = []
+                current.append(seat)
+            if current:
+                blocks.append(current)
+            self._blocks[row] = blocks
+        return self._blocks[row]
+
+    def is_window(self, seat):
+        """Primer o último asiento de su fila."""
+        row = self._rows.get(seat.row, [])
+        return bool(row) and seat.id in (row[0].id, row[-1].id)
+
+    def is_aisle(self, seat):
+        """Asiento junto a un pasillo (borde interior de un bloque)."""
+        blocks = self.blocks(seat.row)
+        if len(blocks) < 2:
+            return False
+        for index, block in enumerate(blocks):
+            if index > 0 and block[0].id == seat.id:
+                return True
+            if index < len(blocks) - 1 and block[-1].id == seat.id:
+                return True
+        return False
+
+
+def scan_seatmap(driver):
+    """
+    Lee toda la grilla de asientos en UNA llamada execute_script.
+
+    Returns:
+        SeatmapSnapshot
+    """
+    start = time.perf_counter()
+    rows = driver.execute_script(_SCAN_JS) or []
+    snapshot = SeatmapSnapshot(rows, (time.perf_counter() - start) * 1000)
+    logger.info(f"  Seatmap scanned: {len(snapshot)} seats, {len(snapshot.candidates())} available "
+                f"(1 round-trip, {snapshot.scan_ms:.0f}ms)")
+    return snapshot
+
+
+def seat_outcome(seat_id, modal_selector=ALERT_MODAL_SELECTOR):
+    """
+    Predicado para WaitEngine.until: "selected" cuando el asiento quedó marcado,
+    "modal" si apareció la alerta de error (ambos en una sola consulta).
+    """
+    def predicate(driver):
+        return driver.execute_script(_SEAT_OUTCOME_JS, seat_id, modal_selector)
+    predicate.label = "seat selected or alert modal"
+    return predicate
+
+
+# ==================== ESTRATEGIAS ====================
+def first_available(snapshot, count, seat_filter=any_seat):
+    """Primeros disponibles en orden de fila y posición."""
+    return snapshot.candidates(seat_filter)
+
+
+def adjacent(snapshot, count, seat_filter=any_seat):
+    """
+    Primer bloque de `count` asientos contiguos disponibles (misma fila, sin
+    cruzar pasillo); si no hay, igual que first_available.
+    """
+    candidates = snapshot.candidates(seat_filter)
+    if count > 1:
+        eligible = {seat.id for seat in candidates}
+        for row in sorted({seat.row for seat in candidates}):
+            for block in snapshot.blocks(row):
+                run = []
+                for seat in block:
+                    run = run + [seat] if seat.id in eligible else []
+                    if len(run) == count:
+                        chosen = {s.id for s in run}
+                        return run + [seat for seat in candidates if seat.id not in chosen]
+        logger.info(f"  No block of {count} adjacent seats available, using first available")
+    return candidates
+
+
+def window(snapshot, count, seat_filter=any_seat):
+    """Ventanas primero (luego el resto en orden)."""
+    return sorted(snapshot.candidates(seat_filter), key=lambda seat: not snapshot.is_window(seat))
+
+
+def aisle(snapshot, count, seat_filter=any_seat):
+    """Pasillos primero (luego el resto en orden)."""
+    return sorted(snapshot.candidates(seat_filter), key=lambda seat: not snapshot.is_aisle(seat))
+
+
+SEAT_STRATEGIES = {
+    "first_available": first_available,
+    "adjacent": adjacent,
+    "window": window,
+    "aisle": aisle,
+}
+
+
+def get_seat_strategy(name):
+    """
+    Estrategia registrada por nombre.
+
+    Raises:
+        ValueError: Si el nombre no está en SEAT_STRATEGIES
+    """
+    try:
+        return SEAT_STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown seat strategy '{name}'. Available: {', '.join(SEAT_STRATEGIES)}")
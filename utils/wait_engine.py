@@ -0,0 +1,399 @@
+"""
+wait_engine.py - Esperas por condición (en lugar de time.sleep fijos) para los page objects
+
+Los page objects esperaban con time.sleep después de cada click, ajustados a mano
+("OPTIMIZADO: 1s → 0.5s"). Un sleep fijo siempre cuesta lo mismo: demasiado si
+la página ya está lista y muy poco si el backend está lento. Este módulo espera
+hasta que se cumpla una condición real de la página.
+
+Condiciones (predicados) disponibles:
+- angular_stable(): Angular sin tareas pendientes (zone.js estable)
+- no_page_loader(): sin el loader "avión en movimiento" (div.page-loader) visible
+- network_idle(): sin XHR/fetch en curso durante N ms (hook registrado por CDP en
+  Chrome/Edge desde el inicio de cada documento; instalación perezosa en Firefox)
+- page_settled(): las tres anteriores juntas (la espera típica después de un click)
+- element_clickable(locator), element_stale(element), element_has_class(locator, clase)
+- count_at_least(locator, n)
+- url_changed_or_new_window(url, n): navegación o pestaña nueva después de un click
+
+Polling adaptativo:
+- La primera consulta es casi inmediata (50 ms) y el intervalo crece x1.5 hasta
+  500 ms: las condiciones que ya se cumplen cuestan un solo round-trip y las
+  esperas largas (carga de vuelos) no saturan la sesión WebDriver
+
+Reporte de tiempo ahorrado:
+- Cada espera puede declarar el sleep que reemplaza (replaces=segundos); las
+  estadísticas se guardan por driver (get_wait_stats) y el fixture driver las
+  adjunta a Allure ("Wait Engine") comparando espera real vs sleep anterior
+
+Uso en un page object:
+    self.waits = WaitEngine(driver)
+    self.waits.settle("after search click", replaces=2)
+    self.waits.until(count_at_least(FARE_BUTTONS, 3), "fare buttons", replaces=1.5)
+"""
+
+# ==================== IMPORTS ====================
+import logging
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+# ==================== LOGGER ====================
+logger = logging.getLogger(__name__)
+
+# ==================== CONSTANTES ====================
+INITIAL_POLL = 0.05  # Primer intervalo de polling (segundos)
+POLL_BACKOFF = 1.5  # Factor de crecimiento del intervalo
+MAX_POLL = 0.5  # Intervalo máximo
+PAGE_LOADER_SELECTOR = "div.page-loader"
+
+# Angular expone getAllAngularTestabilities() (el mismo hook que usa Protractor).
+# Sin Angular en la página se considera estable cuando el documento terminó de cargar.
+_ANGULAR_STABLE_JS = """
+if (document.readyState !== 'complete') { return false; }
+if (typeof window.getAllAngularTestabilities !== 'function') { return true; }
+return window.getAllAngularTestabilities().every(function (t) { return t.isStable(); });
+"""
+
+_NO_PAGE_LOADER_JS = """
+var loaders = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < loaders.length; i++) {
+    var style = window.getComputedStyle(loaders[i]);
+    if (loaders[i].offsetParent !== null && style.visibility !== 'hidden' && style.display !== 'none') { return false; }
+}
+return true;
+"""
+
+# Cuenta XHR/fetch en curso parcheando XMLHttpRequest y fetch (una vez por documento).
+# En Chromium se registra con Page.addScriptToEvaluateOnNewDocument (ver install_network_hook)
+# y corre antes que los scripts de la página; si no, se instala en la primera consulta
+_NETWORK_HOOK_JS = """
+var w = window;
+if (!w.__waitEngineNet) {
+    var net = w.__waitEngineNet = {pending: 0, last: performance.now()};
+    var done = function () { net.pending = Math.max(0, net.pending - 1); net.last = performance.now(); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++; net.last = performance.now();
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (w.fetch) {
+        var originalFetch = w.fetch;
+        w.fetch = function () {
+            net.pending++; net.last = performance.now();
+            return originalFetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; });
+        };
+    }
+}
+"""
+
+_NETWORK_IDLE_JS = "var idleMs = arguments[0];" + _NETWORK_HOOK_JS + """
+var lastResource = 0;
+var entries = performance.getEntriesByType('resource');
+if (entries.length) { lastResource = entries[entries.length - 1].responseEnd; }
+var net = w.__waitEngineNet;
+return net.pending === 0 && performance.now() - Math.max(net.last, lastResource) >= idleMs;
+"""
+
+_COUNT_JS = {
+    By.CSS_SELECTOR: "return document.querySelectorAll(arguments[0]).length;",
+    By.XPATH: "return document.evaluate('count(' + arguments[0] + ')', document, null, XPathResult.NUMBER_TYPE, null).numberValue;",
+}
+
+
+# ==================== HOOK DE RED ====================
+def install_network_hook(driver):
+    """
+    Registra el contador de XHR/fetch en cada documento nuevo (una vez por driver).
+
+    Con la instalación perezosa (primera consulta de network_idle) las peticiones
+    que ya estaban en curso no se cuentan. En Chrome/Edge se registra vía CDP
+    Page.addScriptToEvaluateOnNewDocument para que el hook exista desde el inicio
+    de cada página; en los demás navegadores queda la instalación perezosa.
+
+    Returns:
+        bool: True si el hook quedó registrado por CDP
+    """
+    if getattr(driver, '_wait_engine_hook', None) is not None:
+        return driver._wait_engine_hook
+    installed = False
+    if hasattr(driver, 'execute_cdp_cmd'):
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _NETWORK_HOOK_JS})
+            installed = True
+        except WebDriverException as e:
+            logger.debug(f"Network hook not registered over CDP, using lazy install: {str(e)[:100]}")
+    try:
+        driver._wait_engine_hook = installed
+    except AttributeError:
+        pass  # Drivers sin atributos dinámicos: se reintenta en el próximo WaitEngine
+    return installed
+
+
+# ==================== PREDICADOS ====================
+def angular_stable():
+    """Angular sin tareas pendientes (o documento cargado si la página no usa Angular)."""
+    def predicate(driver):
+        return driver.execute_script(_ANGULAR_STABLE_JS)
+    predicate.label = "angular stable"
+    return predicate
+
+
+def no_page_loader(selector=PAGE_LOADER_SELECTOR):
+    """Ningún loader visible (div.page-loader: avión en movimiento de nuxqa)."""
+    def predicate(driver):
+        return driver.execute_script(_NO_PAGE_LOADER_JS, selector)
+    predicate.label = "no page loader"
+    return predicate
+
+
+def network_idle(idle_ms=300):
+    """Sin XHR/fetch en curso y sin actividad de red durante idle_ms."""
+    def predicate(driver):
+        return driver.execute_script(_NETWORK_IDLE_JS, idle_ms)
+    predicate.label = f"network idle {idle_ms}ms"
+    return predicate
+
+
+def page_settled(idle_ms=300, loader_selector=PAGE_LOADER_SELECTOR):
+    """Angular estable + sin loader + red en reposo (en una sola ida al navegador)."""
+    script = ("var args = arguments;"
+              " return (function () {" + _ANGULAR_STABLE_JS + "})()"
+              " && (function () {" + _NO_PAGE_LOADER_JS + "}).apply(null, [args[0]])"
+              " && (function () {" + _NETWORK_IDLE_JS + "}).apply(null, [args[1]]);")
+
+    def predicate(driver):
+        return driver.execute_script(script, loader_selector, idle_ms)
+    predicate.label = "page settled"
+    return predicate
+
+
+def element_clickable(locator):
+    """Elemento visible y habilitado (devuelve el elemento)."""
+    predicate = EC.element_to_be_clickable(locator)
+    return _labelled(predicate, f"clickable {locator[1][:60]}")
+
+
+def element_stale(element):
+    """El elemento dejó de estar en el DOM (ej: la página navegó o se re-renderizó)."""
+    return _labelled(EC.staleness_of(element), "element stale")
+
+
+def element_has_class(locator, css_class):
+    """El elemento tiene la clase CSS indicada (ej: asiento marcado como "selected")."""
+    def predicate(driver):
+        return css_class in (driver.find_element(*locator).get_attribute("class") or "").split()
+    predicate.label = f"class '{css_class}'"
+    return predicate
+
+
+def url_changed_or_new_window(initial_url, window_count):
+    """La URL cambió o se abrió una pestaña nueva (ej: después de un link con target="_blank")."""
+    def predicate(driver):
+        return len(driver.window_handles) > window_count or driver.current_url != initial_url
+    predicate.label = "URL change or new tab"
+    return predicate
+
+
+def count_at_least(locator, count):
+    """
+    Al menos `count` elementos presentes (devuelve la lista).
+
+    Cuenta con JavaScript antes de pedir los elementos: find_elements con cero
+    resultados esperaría el implicit wait completo en cada polling.
+    """
+    def predicate(driver):
+        if locator[0] in _COUNT_JS and driver.execute_script(_COUNT_JS[locator[0]], locator[1]) < count:
+            return False
+        elements = driver.find_elements(*locator)
+        return elements if len(elements) >= count else False
+    predicate.label = f"{count}+ of {locator[1][:60]}"
+    return predicate
+
+
+def _labelled(predicate, label):
+    """Envuelve un expected_condition para poder reportarlo por nombre."""
+    def wrapper(driver):
+        return predicate(driver)
+    wrapper.label = label
+    return wrapper
+
+
+# ==================== ESTADÍSTICAS ====================
+class WaitStats:
+    """
+    Registro de esperas de un driver: tiempo real vs sleep que reemplazan.
+
+    Atributos:
+    - entries: Lista de dicts {label, condition, waited_s, replaced_s, met}
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def record(self, label, condition, waited, replaced, met):
+        self.entries.append({
+            'label': label,
+            'condition': condition,
+            'waited_s': round(waited, 3),
+            'replaced_s': replaced,
+            'met': met,
+        })
+
+    def reset(self):
+        self.entries.clear()
+
+    def get_summary(self):
+        """
+        Resume las esperas (agrupadas por etiqueta) y el tiempo ahorrado.
+
+        Returns:
+            str: Reporte en texto (vacío si no hubo esperas)
+        """
+        if not self.entries:
+            return ""
+        # "saved" solo compara esperas que reemplazan un sleep (replaces=...); las demás
+        # ya eran esperas explícitas y se listan sin comparación
+        by_label = {}
+        for entry in self.entries:
+            group = by_label.setdefault(entry['label'], {'calls': 0, 'waited': 0.0, 'compared': 0.0,
+                                                          'replaced': None, 'timeouts': 0})
+            group['calls'] += 1
+            group['waited'] += entry['waited_s']
+            group['timeouts'] += not entry['met']
+            if entry['replaced_s'] is not None:
+                group['compared'] += entry['waited_s']
+                group['replaced'] = (group['replaced'] or 0) + entry['replaced_s']
+
+        compared = [g for g in by_label.values() if g['replaced'] is not None]
+        total_waited = sum(g['compared'] for g in compared)
+        total_replaced = sum(g['replaced'] for g in compared)
+        lines = [f"Condition waits: {len(self.entries)} | replacing sleeps: waited {total_waited:.2f}s "
+                 f"vs old {total_replaced:.2f}s | saved {total_replaced - total_waited:.2f}s", ""]
+        lines.append(f"{'step':<50} {'calls':>5} {'waited':>8} {'old':>8} {'saved':>8} {'timeouts':>8}")
+        for label, group in by_label.items():
+            if group['replaced'] is None:
+                old = saved = f"{'-':>8}"
+            else:
+                old = f"{group['replaced']:>7.2f}s"
+                saved = f"{group['replaced'] - group['compared']:>7.2f}s"
+            lines.append(f"{label[:50]:<50} {group['calls']:>5} {group['waited']:>7.2f}s {old} {saved} {group['timeouts']:>8}")
+        return "\n".join(lines)
+
+
+def get_wait_stats(driver):
+    """
+    Estadísticas de espera asociadas a un driver (se crean la primera vez).
+
+    Se guardan en el propio driver para que todos los page objects del test
+    compartan el mismo registro.
+    """
+    stats = getattr(driver, '_wait_stats', None)
+    if stats is None:
+        stats = WaitStats()
+        try:
+            driver._wait_stats = stats
+        except AttributeError:
+            pass  # Drivers sin atributos dinámicos: estadísticas solo locales
+    return stats
+
+
+# ==================== MOTOR DE ESPERAS ====================
+class WaitEngine:
+    """
+    Espera condiciones con polling adaptativo y registra el tiempo ahorrado.
+
+    - until(): espera una condición; lanza TimeoutException (como WebDriverWait)
+    - settle(): espera que la página se asiente; NUNCA falla (reemplazo directo
+      de un time.sleep después de un click)
+    """
+
+    def __init__(self, driver, timeout=10, initial_poll=INITIAL_POLL, backoff=POLL_BACKOFF, max_poll=MAX_POLL):
+        """
+        Args:
+            driver: Instancia de Selenium WebDriver
+            timeout: Timeout por defecto en segundos
+            initial_poll: Primer intervalo de polling
+            backoff: Factor de crecimiento del intervalo
+            max_poll: Intervalo máximo de polling
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.initial_poll = initial_poll
+        self.backoff = backoff
+        self.max_poll = max_poll
+        self.stats = get_wait_stats(driver)
+        install_network_hook(driver)
+
+    def _poll(self, condition, timeout):
+        """
+        Evalúa la condición con intervalos crecientes hasta que sea verdadera.
+
+        Returns:
+            tuple: (resultado o None, segundos esperados)
+        """
+        start = time.perf_counter()
+        deadline = start + timeout
+        interval = self.initial_poll
+        while True:
+            try:
+                result = condition(self.driver)
+                if result:
+                    return result, time.perf_counter() - start
+            except WebDriverException:
+                pass  # Elemento no presente / stale / JS durante la navegación: reintentar
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None, time.perf_counter() - start
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
+
+    def until(self, condition, label="", timeout=None, replaces=None):
+        """
+        Espera hasta que la condición se cumpla.
+
+        Args:
+            condition: Predicado driver -> valor (ver predicados del módulo)
+            label: Nombre del paso para el reporte (ej: "SelectFlight: fare buttons")
+            timeout: Segundos máximos (por defecto el del motor)
+            replaces: Segundos del time.sleep que reemplaza (para el reporte)
+
+        Returns:
+            Valor devuelto por la condición (ej: el elemento)
+
+        Raises:
+            TimeoutException: Si no se cumple en el tiempo indicado
+        """
+        timeout = self.timeout if timeout is None else timeout
+        condition_label = getattr(condition, 'label', getattr(condition, '__name__', 'condition'))
+        result, waited = self._poll(condition, timeout)
+        self.stats.record(label or condition_label, condition_label, waited, replaces, result is not None)
+        if result is None:
+            raise TimeoutException(f"Timed out after {timeout}s waiting for {condition_label} ({label})")
+        logger.debug(f"Wait '{label or condition_label}': {waited * 1000:.0f}ms")
+        return result
+
+    def settle(self, label="", timeout=None, replaces=None, idle_ms=300):
+        """
+        Espera que la página se asiente (Angular estable, sin loader, red en reposo).
+
+        No lanza excepción: si se agota el tiempo se registra y el flujo sigue,
+        igual que con el time.sleep que reemplaza. Si no se indica timeout se usa
+        la duración del sleep reemplazado: una página que nunca se asienta (ej:
+        polling constante) cuesta a lo sumo lo mismo que el sleep anterior.
+
+        Returns:
+            bool: True si la página se asentó antes del timeout
+        """
+        if timeout is None:
+            timeout = replaces if replaces else self.timeout
+        try:
+            self.until(page_settled(idle_ms), label, timeout=timeout, replaces=replaces)
+            return True
+        except TimeoutException:
+            logger.info(f"Page did not settle in time ({label}), continuing")
+            return False